@@ -0,0 +1,71 @@
+"""
+Compares meshapi.util.spatial_index against a plain Python haversine scan, for a synthetic set of points
+spread over NYC. Doesn't touch the database. Run from src/, e.g.
+
+    PYTHONPATH=. DJANGO_SETTINGS_MODULE=meshdb.settings python ../scripts/benchmark_spatial_index.py 100000
+"""
+
+import math
+import random
+import sys
+import time
+
+import django
+
+django.setup()
+
+from meshapi.util.geo import BoundingBox  # noqa: E402
+from meshapi.util.spatial_index import EARTH_RADIUS_KM, SpatialIndex  # noqa: E402
+
+NYC = BoundingBox(-74.26, 40.49, -73.70, 40.92)
+QUERIES = 1000
+
+
+def python_haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def timed(name: str, count: int, function) -> None:  # type: ignore[no-untyped-def]
+    start = time.perf_counter()
+    for i in range(count):
+        function(i)
+    print(f"{name:<40} {(time.perf_counter() - start) / count * 1000:8.3f} ms")
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(0)
+    points = [(rng.uniform(NYC.min_lat, NYC.max_lat), rng.uniform(NYC.min_lon, NYC.max_lon)) for _ in range(size)]
+    queries = [(rng.uniform(NYC.min_lat, NYC.max_lat), rng.uniform(NYC.min_lon, NYC.max_lon)) for _ in range(QUERIES)]
+
+    start = time.perf_counter()
+    index = SpatialIndex(list(range(size)), [p[0] for p in points], [p[1] for p in points])
+    print(f"{size} points, built index in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    timed("index: within 2 km", QUERIES, lambda i: index.within_radius(*queries[i], 2))
+    timed("index: 10 nearest", QUERIES, lambda i: index.nearest(*queries[i], 10))
+    timed(
+        "index: 0.02 degree box",
+        QUERIES,
+        lambda i: index.within_bbox(
+            BoundingBox(queries[i][1], queries[i][0], queries[i][1] + 0.02, queries[i][0] + 0.02)
+        ),
+    )
+
+    scans = QUERIES // 100
+    timed(
+        "python scan: within 2 km",
+        scans,
+        lambda i: [p for p in points if python_haversine_km(*queries[i], *p) <= 2],
+    )
+    timed(
+        "python scan: 10 nearest",
+        scans,
+        lambda i: sorted(points, key=lambda p: python_haversine_km(*queries[i], *p))[:10],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
-from typing import Any, List, Optional, Tuple
+import typing
+from typing import Any, Dict, List, Optional, Tuple
 
 from dal_select2.widgets import ModelSelect2
 from django.contrib import admin
-from django.contrib.admin import AdminSite, TabularInline
-from django.core.exceptions import ValidationError
+from django.contrib.admin import AdminSite, ModelAdmin, TabularInline
+from django.contrib.admin.utils import unquote
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.db.models import Model, Q, QuerySet
-from django.forms import BaseInlineFormSet
-from django.http import HttpRequest
+from django.forms import BaseInlineFormSet, BaseModelFormSet
+from django.http import Http404, HttpRequest, HttpResponse
+from django.template.response import TemplateResponse
+from django.urls import URLPattern, path
 from nonrelated_inlines.admin import NonrelatedTabularInline
 
 from meshapi.models import (
@@ -22,9 +26,89 @@ from meshapi.models import (
     Sector,
 )
 
+# Trick stolen from https://stackoverflow.com/a/56991089 to make mypy happy about mixin types
+if typing.TYPE_CHECKING:
+    _Base = ModelAdmin
+else:
+    _Base = object
+
+
+class LazyInlineMixin:
+    """
+    For read-only inlines which may list a large number of rows. On the change page these render an
+    empty placeholder, and their rows are only queried and rendered once the placeholder scrolls into
+    view (see static/admin/lazy_inline.js), by the view that LazyInlineAdminMixin adds to the parent
+    ModelAdmin. Inline instances are created per-request, so rows_loaded is only ever set for the
+    request that is rendering the rows
+    """
+
+    rows_template = "admin/install_tabular_rows.html"
+    rows_loaded = False
+
+    parent_model: Any
+    admin_site: Any
+
+    @property
+    def lazy_name(self) -> str:
+        return type(self).__name__
+
+    @property
+    def rows_url_name(self) -> str:
+        opts = self.parent_model._meta
+        return f"{self.admin_site.name}:{opts.app_label}_{opts.model_name}_inline_rows"
+
+    def get_rows_context(self, request: HttpRequest, formset: BaseModelFormSet) -> Dict[str, Any]:
+        """Extra context for rows_template"""
+        return {}
+
+
+class LazyInlineAdminMixin(_Base):
+    """
+    Adds a view to a ModelAdmin which renders the rows of one of its lazy inlines (see LazyInlineMixin)
+    for a single object, as an HTML fragment
+    """
+
+    def get_urls(self) -> List[URLPattern]:
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path(
+                "<path:object_id>/inline/<str:inline_name>/",
+                self.admin_site.admin_view(self.inline_rows_view),
+                name="%s_%s_inline_rows" % info,
+            ),
+        ] + super().get_urls()
+
+    def inline_rows_view(self, request: HttpRequest, object_id: str, inline_name: str) -> HttpResponse:
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None:
+            raise Http404
+
+        if not self.has_view_or_change_permission(request, obj):
+            raise PermissionDenied
+
+        for inline in self.get_inline_instances(request, obj):
+            if isinstance(inline, LazyInlineMixin) and inline.lazy_name == inline_name:
+                break
+        else:
+            raise Http404
+
+        inline.rows_loaded = True
+        formset_class = inline.get_formset(request, obj)
+        formset = formset_class(**self.get_formset_kwargs(request, obj, inline, formset_class.get_default_prefix()))
+        inline_admin_formset = self.get_inline_formsets(request, [formset], [inline], obj)[0]
+
+        return TemplateResponse(
+            request,
+            inline.rows_template,
+            {
+                "inline_admin_formset": inline_admin_formset,
+                **inline.get_rows_context(request, formset),
+            },
+        )
+
 
 # Inline with the typical rules we want + Formatting
-class BetterInline(admin.TabularInline):
+class BetterInline(LazyInlineMixin, admin.TabularInline):
     extra = 0
     can_delete = False
     template = "admin/install_tabular.html"
@@ -32,13 +116,18 @@ class BetterInline(admin.TabularInline):
     def has_add_permission(self, request: HttpRequest, obj: Optional[Any]) -> bool:  # type: ignore[override]
         return False
 
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        queryset = super().get_queryset(request)
+        return queryset if self.rows_loaded else queryset.none()
+
     class Media:
         css = {
             "all": ("admin/install_tabular.css",),
         }
+        js = ["admin/lazy_inline.js"]
 
 
-class BetterNonrelatedInline(NonrelatedTabularInline):
+class BetterNonrelatedInline(LazyInlineMixin, NonrelatedTabularInline):
     extra = 0
     can_delete = False
     template = "admin/install_tabular.html"
@@ -49,10 +138,17 @@ class BetterNonrelatedInline(NonrelatedTabularInline):
     def save_new_instance(self, parent: Any, instance: Any) -> None:
         pass
 
+    def get_formset(self, request: HttpRequest, obj: Optional[Model] = None, **kwargs: Any) -> Any:
+        formset = super().get_formset(request, obj, **kwargs)
+        if not self.rows_loaded:
+            formset.real_queryset = self.model.objects.none()
+        return formset
+
     class Media:
         css = {
             "all": ("admin/install_tabular.css",),
         }
+        js = ["admin/lazy_inline.js"]
 
 
 # This is such a horrific hack but it works I guess?
@@ -61,16 +157,16 @@ class PanoramaInline(BetterNonrelatedInline):
     fields = ["panoramas"]
     readonly_fields = fields
     template = "admin/node_panorama_viewer.html"
-
-    all_panoramas: dict[str, list[Any]] = {}
+    rows_template = "admin/node_panorama_viewer_rows.html"
 
     def get_form_queryset(self, obj: Node) -> QuerySet[Building]:
-        buildings = self.model.objects.filter(nodes=obj)
+        return self.model.objects.filter(nodes=obj)
+
+    def get_rows_context(self, request: HttpRequest, formset: BaseModelFormSet) -> Dict[str, Any]:
         panoramas = []
-        for b in buildings:
-            panoramas += b.panoramas
-        self.all_panoramas = {"value": panoramas}
-        return buildings
+        for building in formset.get_queryset():
+            panoramas += building.panoramas
+        return {"all_panoramas": {"value": panoramas}}
 
     class Media:
         css = {
@@ -135,7 +231,7 @@ class NodeLinkInline(BetterNonrelatedInline):
         from_device_q = Q(from_device__in=obj.devices.all())
         to_device_q = Q(to_device__in=obj.devices.all())
         all_links = from_device_q | to_device_q
-        return self.model.objects.filter(all_links)
+        return self.model.objects.filter(all_links).select_related("from_device__node", "to_device__node")
 
 
 class DeviceLinkInline(BetterNonrelatedInline):
@@ -147,7 +243,7 @@ class DeviceLinkInline(BetterNonrelatedInline):
         from_device_q = Q(from_device=obj)
         to_device_q = Q(to_device=obj)
         all_links = from_device_q | to_device_q
-        return self.model.objects.filter(all_links)
+        return self.model.objects.filter(all_links).select_related("from_device__node", "to_device__node")
 
 
 class SectorInline(BetterInline):
@@ -185,7 +281,7 @@ class InstallInline(BetterInline):
             self.reverse_relation = "member"
 
     def get_queryset(self, request: HttpRequest) -> QuerySet[Install]:
-        return super().get_queryset(request).order_by("install_number")
+        return super().get_queryset(request).select_related("node", "member", "building").order_by("install_number")
 
 
 class BuildingLOSInline(BetterNonrelatedInline):
@@ -194,7 +290,11 @@ class BuildingLOSInline(BetterNonrelatedInline):
     readonly_fields = fields
 
     def get_form_queryset(self, obj: Building) -> QuerySet[LOS]:
-        return self.model.objects.filter(Q(from_building=obj) | Q(to_building=obj))
+        return (
+            self.model.objects.filter(Q(from_building=obj) | Q(to_building=obj))
+            .select_related("from_building__primary_node", "to_building__primary_node")
+            .prefetch_related("from_building__installs", "to_building__installs")
+        )
 
 
 class AdditionalMembersInline(TabularInline):
@@ -1,7 +1,6 @@
 from typing import Any, Optional, Type
 
 from django.contrib import admin
-from django.contrib.postgres.search import SearchVector
 from django.forms import Field, ModelForm
 from django.http import HttpRequest
 from import_export.admin import ExportActionMixin, ImportExportMixin
@@ -10,7 +9,8 @@ from simple_history.admin import SimpleHistoryAdmin
 from meshapi.models import AccessPoint
 from meshapi.widgets import AutoPopulateLocationWidget, DeviceIPAddressWidget, ExternalHyperlinkWidget
 
-from ..ranked_search import RankedSearchMixin
+from ..inlines import LazyInlineAdminMixin
+from ..ranked_search import RankedSearchMixin, SearchTermKind
 from .device import UISP_URL, DeviceAdmin, DeviceAdminForm, DeviceLinkInline
 
 
@@ -33,15 +33,21 @@ class AccessPointAdminForm(DeviceAdminForm):
 
 
 @admin.register(AccessPoint)
-class AccessPointAdmin(RankedSearchMixin, ImportExportMixin, ExportActionMixin, SimpleHistoryAdmin):
+class AccessPointAdmin(
+    LazyInlineAdminMixin, RankedSearchMixin, ImportExportMixin, ExportActionMixin, SimpleHistoryAdmin
+):
     form = AccessPointAdminForm
     search_fields = ["name__icontains", "@notes"]
-    search_vector = SearchVector("name", weight="A") + SearchVector("notes", weight="D")
+    exact_search_lookups = {
+        SearchTermKind.NETWORK_NUMBER: ["node__network_number"],
+        SearchTermKind.UUID: ["pk"],
+    }
     list_display = [
         "__str__",
         "name",
         "node",
     ]
+    list_select_related = ["node"]
     list_filter = [
         "status",
         "install_date",
@@ -2,7 +2,6 @@ from typing import Any, OrderedDict
 
 from django import forms
 from django.contrib import admin
-from django.contrib.postgres.search import SearchVector
 from import_export import resources
 from import_export.admin import ExportActionMixin, ImportExportMixin
 from pydantic import UUID4
@@ -11,7 +10,7 @@ from simple_history.admin import SimpleHistoryAdmin
 from meshapi.models.billing import InstallFeeBillingDatum
 
 from ...models import Install
-from ..ranked_search import RankedSearchMixin
+from ..ranked_search import RankedSearchMixin, SearchTermKind
 
 
 class InstallFeeBillingDatumImportExportResource(resources.ModelResource):
@@ -29,6 +28,7 @@ class InstallFeeBillingDatumImportExportResource(resources.ModelResource):
 
     class Meta:
         model = InstallFeeBillingDatum
+        exclude = ("search_document",)
 
 
 class InstallFeeBillingDatumAdminForm(forms.ModelForm):
@@ -49,14 +49,13 @@ class InstallFeeBillingDatumAdmin(RankedSearchMixin, ImportExportMixin, ExportAc
         "install__building__street_address__icontains",
         "@notes",
     ]
-    search_vector = (
-        SearchVector("invoice_number", weight="A")
-        + SearchVector("install__node__network_number", weight="A")
-        + SearchVector("install__install_number", weight="A")
-        + SearchVector("install__building__street_address", weight="B")
-        + SearchVector("notes", weight="D")
-    )
+    exact_search_lookups = {
+        SearchTermKind.NETWORK_NUMBER: ["install__node__network_number"],
+        SearchTermKind.INSTALL_NUMBER: ["install__install_number"],
+        SearchTermKind.UUID: ["pk", "install"],
+    }
     list_display = ["__str__", "status", "billing_date", "invoice_number", "notes"]
+    list_select_related = ["install"]
     list_filter = ["status", "billing_date"]
 
     autocomplete_fields = ["install"]
@@ -3,7 +3,6 @@ from typing import Any, Iterable, Optional, Type
 from django import forms
 from django.contrib import admin
 from django.contrib.admin import ModelAdmin
-from django.contrib.postgres.search import SearchVector
 from django.db.models import QuerySet
 from django.forms import ModelForm
 from django.http import HttpRequest
@@ -13,8 +12,8 @@ from simple_history.admin import SimpleHistoryAdmin
 from meshapi.models import AddressTruthSource, Building
 from meshapi.widgets import AutoPopulateLocationWidget, DOBIdentifierWidget, PanoramaViewer
 
-from ..inlines import BuildingLOSInline, InstallInline
-from ..ranked_search import RankedSearchMixin
+from ..inlines import BuildingLOSInline, InstallInline, LazyInlineAdminMixin
+from ..ranked_search import RankedSearchMixin, SearchTermKind
 
 
 class BoroughFilter(admin.SimpleListFilter):
@@ -60,7 +59,7 @@ class BuildingAdminForm(forms.ModelForm):
 
 
 @admin.register(Building)
-class BuildingAdmin(RankedSearchMixin, ImportExportMixin, ExportActionMixin, SimpleHistoryAdmin):
+class BuildingAdmin(LazyInlineAdminMixin, RankedSearchMixin, ImportExportMixin, ExportActionMixin, SimpleHistoryAdmin):
     form = BuildingAdminForm
     list_display = ["__str__", "street_address", "primary_node"]
     search_fields = [
@@ -74,14 +73,12 @@ class BuildingAdmin(RankedSearchMixin, ImportExportMixin, ExportActionMixin, Sim
         "nodes__network_number__iexact",
         "installs__install_number__iexact",
     ]
-    search_vector = (
-        SearchVector("nodes__name", weight="A")
-        + SearchVector("street_address", weight="A")
-        + SearchVector("zip_code", weight="A")
-        + SearchVector("bin", weight="A")
-        + SearchVector("nodes__network_number", weight="B")
-        + SearchVector("installs__install_number", weight="B")
-    )
+    exact_search_lookups = {
+        SearchTermKind.NETWORK_NUMBER: ["nodes__network_number"],
+        SearchTermKind.INSTALL_NUMBER: ["installs__install_number"],
+        SearchTermKind.BIN: ["bin"],
+        SearchTermKind.UUID: ["pk"],
+    }
     list_filter = [
         BoroughFilter,
         ("primary_node", admin.EmptyFieldListFilter),
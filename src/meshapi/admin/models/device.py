@@ -4,7 +4,6 @@ from typing import Any, List, Optional
 from django import forms
 from django.contrib import admin
 from django.contrib.admin.utils import unquote
-from django.contrib.postgres.search import SearchVector
 from django.db.models import QuerySet
 from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
 from django.shortcuts import redirect
@@ -14,8 +13,8 @@ from simple_history.admin import SimpleHistoryAdmin
 from meshapi.models import Device
 from meshapi.widgets import ExternalHyperlinkWidget
 
-from ..inlines import DeviceLinkInline
-from ..ranked_search import RankedSearchMixin
+from ..inlines import DeviceLinkInline, LazyInlineAdminMixin
+from ..ranked_search import RankedSearchMixin, SearchTermKind
 from ..utils import downclass_device, get_admin_url
 
 UISP_URL: str = os.environ.get("UISP_URL", "https://uisp.mesh.nycmesh.net/nms")
@@ -35,10 +34,13 @@ class DeviceAdminForm(forms.ModelForm):
 
 
 @admin.register(Device)
-class DeviceAdmin(RankedSearchMixin, ImportExportMixin, ExportActionMixin, SimpleHistoryAdmin):
+class DeviceAdmin(LazyInlineAdminMixin, RankedSearchMixin, ImportExportMixin, ExportActionMixin, SimpleHistoryAdmin):
     form = DeviceAdminForm
     search_fields = ["name__icontains", "@notes"]
-    search_vector = SearchVector("name", weight="A") + SearchVector("notes", weight="D")
+    exact_search_lookups = {
+        SearchTermKind.NETWORK_NUMBER: ["node__network_number"],
+        SearchTermKind.UUID: ["pk"],
+    }
     autocomplete_fields = ["node"]
     list_display = [
         "__str__",
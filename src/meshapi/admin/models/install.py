@@ -1,22 +1,22 @@
 import os
-from typing import Any, List, Optional, Tuple
+from typing import Any, List, Optional
 
 import tablib
 from django import forms
 from django.contrib import admin
 from django.contrib.admin.options import InlineModelAdmin
-from django.contrib.postgres.search import SearchVector
-from django.db.models import QuerySet
 from django.http import HttpRequest
+from django.utils.html import format_html_join
 from import_export import resources
 from import_export.admin import ExportActionMixin, ImportExportMixin
 from simple_history.admin import SimpleHistoryAdmin
 
 from meshapi.admin import InstallFeeBillingDatumInline, inlines
 from meshapi.models import Install
+from meshapi.util.node_candidates import format_candidate_node
 from meshapi.widgets import ExternalHyperlinkWidget, InstallStatusWidget, WarnAboutDatesWidget
 
-from ..ranked_search import RankedSearchMixin
+from ..ranked_search import RankedSearchMixin, SearchTermKind
 
 OSTICKET_URL = os.environ.get("OSTICKET_URL", "https://support.nycmesh.net")
 STRIPE_SUBSCRIPTIONS_URL = os.environ.get("STRIPE_SUBSCRIPTIONS_URL", "https://dashboard.stripe.com/subscriptions/")
@@ -31,6 +31,7 @@ class InstallImportExportResource(resources.ModelResource):
     class Meta:
         model = Install
         import_id_fields = ("install_number",)
+        exclude = ("search_document", "candidate_nodes")
 
 
 class InstallAdminForm(forms.ModelForm):
@@ -94,23 +95,16 @@ class InstallAdmin(RankedSearchMixin, ImportExportMixin, ExportActionMixin, Simp
         "@referral",
         "@notes",
     ]
-    search_vector = (
-        SearchVector("install_number", weight="A")
-        + SearchVector("node__network_number", weight="A")
-        + SearchVector("member__name", weight="A")
-        + SearchVector("member__primary_email_address", weight="B")
-        + SearchVector("member__phone_number", weight="B")
-        + SearchVector("member__slack_handle", weight="C")
-        + SearchVector("building__street_address", weight="C")
-        + SearchVector("unit", weight="C")
-        + SearchVector("building__zip_code", weight="C")
-        + SearchVector("building__bin", weight="C")
-        + SearchVector("ticket_number", weight="C")
-        + SearchVector("referral", weight="D")
-        + SearchVector("notes", weight="D")
-    )
+    exact_search_lookups = {
+        SearchTermKind.NETWORK_NUMBER: ["node__network_number"],
+        SearchTermKind.INSTALL_NUMBER: ["install_number"],
+        SearchTermKind.BIN: ["building__bin"],
+        SearchTermKind.UUID: ["pk", "member", "building", "node"],
+        SearchTermKind.EMAIL: ["member__in"],
+        SearchTermKind.PHONE: ["member__in"],
+    }
     autocomplete_fields = ["building", "member", "node"]
-    readonly_fields = ["install_number"]
+    readonly_fields = ["install_number", "get_candidate_nodes"]
     fieldsets = [
         (
             "Details",
@@ -129,6 +123,7 @@ class InstallAdmin(RankedSearchMixin, ImportExportMixin, ExportActionMixin, Simp
             {
                 "fields": [
                     "node",
+                    "get_candidate_nodes",
                 ]
             },
         ),
@@ -166,35 +161,20 @@ class InstallAdmin(RankedSearchMixin, ImportExportMixin, ExportActionMixin, Simp
     ]
     inlines = [inlines.AdditionalMembersInline]
 
-    def get_search_results(
-        self, request: HttpRequest, queryset: QuerySet[Install], search_term: str
-    ) -> Tuple[QuerySet[Install], bool]:
-        queryset, may_have_duplicates = super().get_search_results(
-            request,
-            queryset,
-            search_term,
-        )
-        try:
-            upper_search = search_term.upper()
-            if len(upper_search) > 2 and upper_search[:2] == "NN":
-                search_term_as_int = int(upper_search[2:])
-                queryset = (
-                    self.rank_queryset(
-                        self.model.objects.filter(node__network_number=search_term_as_int),
-                        upper_search[2:],
-                    )
-                    | queryset  # We do this rather than |= since it floats the more relevant results to the top
-                )
-                may_have_duplicates = False
-        except ValueError:
-            pass
-        return queryset, may_have_duplicates
-
     def get_node_status(self, obj: Install) -> str:
         if not obj.node or not obj.node.status:
             return "-"
         return obj.node.status
 
+    def get_candidate_nodes(self, obj: Install) -> str:
+        if not obj.candidate_nodes:
+            return "-"
+        return format_html_join(
+            "",
+            "<div>{}</div>",
+            ((format_candidate_node(candidate),) for candidate in obj.candidate_nodes),
+        )
+
     def get_inline_instances(self, request: HttpRequest, obj: Optional[Install] = None) -> List[InlineModelAdmin]:
         static_inlines = super().get_inline_instances(request, obj)
 
@@ -209,3 +189,4 @@ class InstallAdmin(RankedSearchMixin, ImportExportMixin, ExportActionMixin, Simp
 
     get_node_status.short_description = "Node Status"  # type: ignore[attr-defined]
     get_node_status.admin_order_field = "node__status"  # type: ignore[attr-defined]
+    get_candidate_nodes.short_description = "Nearby hubs, supernodes & POPs"  # type: ignore[attr-defined]
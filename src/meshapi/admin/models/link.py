@@ -1,12 +1,11 @@
 from django import forms
 from django.contrib import admin
-from django.contrib.postgres.search import SearchVector
 from import_export.admin import ExportActionMixin, ImportExportMixin
 from simple_history.admin import SimpleHistoryAdmin
 
 from meshapi.models import Link
 
-from ..ranked_search import RankedSearchMixin
+from ..ranked_search import RankedSearchMixin, SearchTermKind
 
 
 class LinkAdminForm(forms.ModelForm):
@@ -30,16 +29,12 @@ class LinkAdmin(RankedSearchMixin, ImportExportMixin, ExportActionMixin, SimpleH
         "to_device__node__network_number__iexact",
         "@notes",
     ]
-    search_vector = (
-        SearchVector("from_device__node__network_number", weight="A")
-        + SearchVector("to_device__node__network_number", weight="A")
-        + SearchVector("from_device__node__name", weight="B")
-        + SearchVector("to_device__node__name", weight="B")
-        + SearchVector("from_device__node__buildings__street_address", weight="C")
-        + SearchVector("to_device__node__buildings__street_address", weight="C")
-        + SearchVector("notes", weight="D")
-    )
+    exact_search_lookups = {
+        SearchTermKind.NETWORK_NUMBER: ["from_device__node__network_number", "to_device__node__network_number"],
+        SearchTermKind.UUID: ["pk"],
+    }
     list_display = ["__str__", "status", "from_device", "to_device", "description"]
+    list_select_related = ["from_device__node", "to_device__node"]
     list_filter = ["status", "type"]
 
     autocomplete_fields = ["from_device", "to_device"]
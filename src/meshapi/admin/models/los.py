@@ -3,7 +3,6 @@ from typing import Optional
 
 from django import forms
 from django.contrib import admin
-from django.contrib.postgres.search import SearchVector
 from django.forms import ModelForm
 from django.http import HttpRequest
 from import_export.admin import ExportActionMixin, ImportExportMixin
@@ -11,7 +10,7 @@ from simple_history.admin import SimpleHistoryAdmin
 
 from meshapi.models import LOS
 
-from ..ranked_search import RankedSearchMixin
+from ..ranked_search import RankedSearchMixin, SearchTermKind
 
 
 class LOSAdminForm(forms.ModelForm):
@@ -34,18 +33,18 @@ class LOSAdmin(RankedSearchMixin, ImportExportMixin, ExportActionMixin, SimpleHi
         "to_building__street_address__icontains",
         "@notes",
     ]
-    search_vector = (
-        SearchVector("from_building__nodes__network_number", weight="A")
-        + SearchVector("to_building__nodes__network_number", weight="A")
-        + SearchVector("from_building__installs__install_number", weight="A")
-        + SearchVector("to_building__installs__install_number", weight="A")
-        + SearchVector("from_building__nodes__name", weight="B")
-        + SearchVector("to_building__nodes__name", weight="B")
-        + SearchVector("from_building__street_address", weight="B")
-        + SearchVector("to_building__street_address", weight="B")
-        + SearchVector("notes", weight="D")
-    )
+    exact_search_lookups = {
+        SearchTermKind.NETWORK_NUMBER: ["from_building__nodes__network_number", "to_building__nodes__network_number"],
+        SearchTermKind.INSTALL_NUMBER: [
+            "from_building__installs__install_number",
+            "to_building__installs__install_number",
+        ],
+        SearchTermKind.BIN: ["from_building__bin", "to_building__bin"],
+        SearchTermKind.UUID: ["pk"],
+    }
     list_display = ["__str__", "source", "from_building", "to_building", "analysis_date"]
+    list_select_related = ["from_building__primary_node", "to_building__primary_node"]
+    list_prefetch_related = ["from_building__installs", "to_building__installs"]
     list_filter = ["source"]
 
     autocomplete_fields = ["from_building", "to_building"]
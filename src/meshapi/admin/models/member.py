@@ -1,13 +1,12 @@
 from django import forms
 from django.contrib import admin
-from django.contrib.postgres.search import SearchVector
 from import_export.admin import ExportActionMixin, ImportExportMixin
 from simple_history.admin import SimpleHistoryAdmin
 
 from meshapi.models import Member
 
-from ..inlines import InstallInline
-from ..ranked_search import RankedSearchMixin
+from ..inlines import InstallInline, LazyInlineAdminMixin
+from ..ranked_search import RankedSearchMixin, SearchTermKind
 
 
 class MemberAdminForm(forms.ModelForm):
@@ -23,7 +22,7 @@ class MemberAdminForm(forms.ModelForm):
 
 
 @admin.register(Member)
-class MemberAdmin(RankedSearchMixin, ImportExportMixin, ExportActionMixin, SimpleHistoryAdmin):
+class MemberAdmin(LazyInlineAdminMixin, RankedSearchMixin, ImportExportMixin, ExportActionMixin, SimpleHistoryAdmin):
     form = MemberAdminForm
     search_fields = [
         # Search by name
@@ -40,18 +39,13 @@ class MemberAdmin(RankedSearchMixin, ImportExportMixin, ExportActionMixin, Simpl
         # Notes
         "@notes",
     ]
-    search_vector = (
-        SearchVector("name", weight="A")
-        + SearchVector("primary_email_address", weight="A")
-        + SearchVector("stripe_email_address", weight="A")
-        + SearchVector("additional_email_addresses", weight="A")
-        + SearchVector("phone_number", weight="A")
-        + SearchVector("additional_phone_numbers", weight="A")
-        + SearchVector("slack_handle", weight="A")
-        + SearchVector("installs__node__network_number", weight="B")
-        + SearchVector("installs__install_number", weight="B")
-        + SearchVector("notes", weight="D")
-    )
+    exact_search_lookups = {
+        SearchTermKind.NETWORK_NUMBER: ["installs__node__network_number"],
+        SearchTermKind.INSTALL_NUMBER: ["installs__install_number"],
+        SearchTermKind.UUID: ["pk"],
+        SearchTermKind.EMAIL: ["pk__in"],
+        SearchTermKind.PHONE: ["pk__in"],
+    }
     list_display = [
         "__str__",
         "name",
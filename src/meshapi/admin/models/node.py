@@ -3,8 +3,6 @@ from typing import Any, List, Optional, Tuple, Type
 import tablib
 from django import forms
 from django.contrib import admin
-from django.contrib.postgres.search import SearchVector
-from django.db.models import QuerySet
 from django.forms import ModelForm
 from django.http import HttpRequest
 from import_export import resources
@@ -19,12 +17,13 @@ from ..inlines import (
     BuildingMembershipInline,
     DeviceInline,
     InstallInline,
+    LazyInlineAdminMixin,
     NodeLinkInline,
     NonrelatedBuildingInline,
     PanoramaInline,
     SectorInline,
 )
-from ..ranked_search import RankedSearchMixin
+from ..ranked_search import RankedSearchMixin, SearchTermKind
 
 
 class NodeImportExportResource(resources.ModelResource):
@@ -36,6 +35,7 @@ class NodeImportExportResource(resources.ModelResource):
     class Meta:
         model = Node
         import_id_fields = ("network_number",)
+        exclude = ("search_document",)
 
 
 class NodeAdminForm(forms.ModelForm):
@@ -55,7 +55,7 @@ class NodeAdminForm(forms.ModelForm):
 
 
 @admin.register(Node)
-class NodeAdmin(RankedSearchMixin, ExportActionMixin, ImportExportModelAdmin, SimpleHistoryAdmin):
+class NodeAdmin(LazyInlineAdminMixin, RankedSearchMixin, ExportActionMixin, ImportExportModelAdmin, SimpleHistoryAdmin):
     form = NodeAdminForm
     resource_classes = [NodeImportExportResource]
     search_fields = [
@@ -64,14 +64,15 @@ class NodeAdmin(RankedSearchMixin, ExportActionMixin, ImportExportModelAdmin, Si
         "buildings__street_address__icontains",
         "@notes",
     ]
-    search_vector = (
-        SearchVector("network_number", weight="A")
-        + SearchVector("name", weight="B")
-        + SearchVector("buildings__street_address", weight="D")
-        + SearchVector("notes", weight="D")
-    )
+    exact_search_lookups = {
+        SearchTermKind.NETWORK_NUMBER: ["network_number"],
+        SearchTermKind.INSTALL_NUMBER: ["installs__install_number"],
+        SearchTermKind.BIN: ["buildings__bin"],
+        SearchTermKind.UUID: ["pk"],
+    }
     list_filter = ["status", ("name", admin.EmptyFieldListFilter), "install_date", "abandon_date"]
     list_display = ["__network_number__", "name", "status", "address", "install_date"]
+    list_prefetch_related = ["buildings"]
     fieldsets = [
         (
             "Details",
@@ -148,14 +149,5 @@ class NodeAdmin(RankedSearchMixin, ExportActionMixin, ImportExportModelAdmin, Si
         else:
             return super().get_readonly_fields(request, obj)
 
-    def get_queryset(self, request: HttpRequest) -> QuerySet:
-        return (
-            super()
-            .get_queryset(request)
-            .prefetch_related("buildings")
-            .prefetch_related("installs")
-            .prefetch_related("devices")
-        )
-
     def address(self, obj: Node) -> Optional[Building]:
         return obj.buildings.first()
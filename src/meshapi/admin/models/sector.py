@@ -1,12 +1,12 @@
 from django.contrib import admin
-from django.contrib.postgres.search import SearchVector
 from import_export.admin import ExportActionMixin, ImportExportMixin
 from simple_history.admin import SimpleHistoryAdmin
 
 from meshapi.models import Sector
 from meshapi.widgets import ExternalHyperlinkWidget
 
-from ..ranked_search import RankedSearchMixin
+from ..inlines import LazyInlineAdminMixin
+from ..ranked_search import RankedSearchMixin, SearchTermKind
 from .device import UISP_URL, DeviceAdmin, DeviceAdminForm, DeviceLinkInline
 
 
@@ -23,10 +23,13 @@ class SectorAdminForm(DeviceAdminForm):
 
 
 @admin.register(Sector)
-class SectorAdmin(RankedSearchMixin, ImportExportMixin, ExportActionMixin, SimpleHistoryAdmin):
+class SectorAdmin(LazyInlineAdminMixin, RankedSearchMixin, ImportExportMixin, ExportActionMixin, SimpleHistoryAdmin):
     form = SectorAdminForm
     search_fields = ["name__icontains", "@notes"]
-    search_vector = SearchVector("name", weight="A") + SearchVector("notes", weight="D")
+    exact_search_lookups = {
+        SearchTermKind.NETWORK_NUMBER: ["node__network_number"],
+        SearchTermKind.UUID: ["pk"],
+    }
     autocomplete_fields = ["node"]
     list_display = [
         "__str__",
@@ -1,13 +1,19 @@
+import re
 import typing
-from typing import Dict, List, Optional, Tuple, Type
+import uuid
+from enum import Enum
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
 
 from django.contrib.admin import ModelAdmin
 from django.contrib.admin.views.main import ORDER_VAR, ChangeList
-from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
-from django.db.models import QuerySet
-from django.db.models.expressions import CombinedExpression, Expression, F, OuterRef, Subquery
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Prefetch, Q, QuerySet
+from django.db.models.expressions import Case, Exists, Expression, F, OuterRef, Value, When
 from django.http import HttpRequest
 
+from meshapi.models import MemberContactIndex
+from meshapi.validation import normalize_phone_number, validate_phone_number
+
 # Trick stolen from https://stackoverflow.com/a/56991089 to make mypy happy about mixin types
 if typing.TYPE_CHECKING:
     _Base = ModelAdmin
@@ -15,7 +21,80 @@ else:
     _Base = object
 
 
+class SearchTermKind(Enum):
+    NETWORK_NUMBER = "network_number"
+    INSTALL_NUMBER = "install_number"
+    BIN = "bin"
+    UUID = "uuid"
+    EMAIL = "email"
+    PHONE = "phone"
+
+
+# Kinds of identifier that are tokenized as a single distinctive word in a search document, meaning that
+# we can cheaply (and usefully) also find objects that mention them, e.g. in the notes. Install numbers,
+# BINs, UUIDs and phone numbers don't qualify, their digits would match all sorts of unrelated numbers
+MENTIONABLE_KINDS = {SearchTermKind.NETWORK_NUMBER, SearchTermKind.EMAIL}
+
+NETWORK_NUMBER_REGEX = re.compile(r"^nn\s*(\d+)$", re.IGNORECASE)
+INSTALL_NUMBER_REGEX = re.compile(r"^#\s*(\d+)$")
+# NYC BINs are 7 digits, the first of which is the borough code (1-5)
+BIN_REGEX = re.compile(r"^[1-5]\d{6}$")
+EMAIL_REGEX = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+PHONE_REGEX = re.compile(r"^\+?[\d\s().-]+$")
+
+
+def classify_search_term(search_term: str) -> Optional[Tuple[SearchTermKind, Any]]:
+    """
+    Recognizes search terms that can only be an exact identifier of some object (e.g. "NN1234", "#5678",
+    a BIN, a UUID, an email address or a phone number), returning the kind of identifier and its normalized
+    value. Returns None for anything else, which should be treated as free text
+    """
+    search_term = search_term.strip()
+
+    if match := NETWORK_NUMBER_REGEX.match(search_term):
+        return SearchTermKind.NETWORK_NUMBER, int(match.group(1))
+
+    if match := INSTALL_NUMBER_REGEX.match(search_term):
+        return SearchTermKind.INSTALL_NUMBER, int(match.group(1))
+
+    if BIN_REGEX.match(search_term):
+        return SearchTermKind.BIN, int(search_term)
+
+    try:
+        return SearchTermKind.UUID, uuid.UUID(search_term)
+    except ValueError:
+        pass
+
+    if EMAIL_REGEX.match(search_term):
+        return SearchTermKind.EMAIL, MemberContactIndex.member_ids_matching(
+            MemberContactIndex.ContactType.EMAIL, search_term, exact=True
+        )
+
+    # Require at least a full 10 digit number, shorter strings of digits are much more likely to be
+    # install numbers, zip codes, etc
+    if PHONE_REGEX.match(search_term) and len(re.sub(r"\D", "", search_term)) >= 10:
+        if validate_phone_number(search_term):
+            return SearchTermKind.PHONE, MemberContactIndex.member_ids_matching(
+                MemberContactIndex.ContactType.PHONE, normalize_phone_number(search_term), exact=True
+            )
+
+    return None
+
+
 class GentleOrderingChangelist(ChangeList):
+    def apply_select_related(self, qs: QuerySet) -> QuerySet:
+        qs = super().apply_select_related(qs)
+
+        # Prefetches are applied here, rather than in ModelAdmin.get_queryset(), so that they only
+        # happen for the changelist, and not for the change form, autocomplete, etc.
+        list_prefetch_related = getattr(self.model_admin, "list_prefetch_related", [])
+        if list_prefetch_related:
+            qs = qs.prefetch_related(*list_prefetch_related)
+
+        # The stored search documents are only ever used from within SQL, so avoid sending
+        # them over the wire for every row on the page
+        return qs.defer("search_document")
+
     def get_ordering(self, request: HttpRequest, qs: QuerySet) -> List[Expression | str]:
         if qs.query.order_by:
             return list(qs.query.order_by)
@@ -24,45 +103,74 @@ class GentleOrderingChangelist(ChangeList):
 
 
 class RankedSearchMixin(_Base):
-    search_vector: Optional[CombinedExpression | SearchVector] = None
+    """
+    Orders admin search results by relevance, using the pre-computed search_document column of the model
+    (see meshapi.models.util.search_document). For free text, the set of matching objects is still determined
+    by search_fields
+
+    Search terms that are unambiguously an identifier (see classify_search_term) skip search_fields entirely
+    and are answered with one indexed equality lookup per entry in exact_search_lookups for that kind of
+    identifier. For some kinds of identifier, objects whose search document mentions the term (e.g. "NN123"
+    in the notes) are also included, after the exact matches. For email and phone terms, the value given to
+    the lookup is a queryset of matching member ids, so those lookups should end in __in
+    """
+
+    exact_search_lookups: Dict[SearchTermKind, List[str]] = {}
+
+    # Like list_select_related, but for many-valued relations used when rendering the changelist
+    list_prefetch_related: List[str | Prefetch] = []
 
     def get_search_results(self, request: HttpRequest, queryset: QuerySet, search_term: str) -> Tuple[QuerySet, bool]:
         params = dict(request.GET.items())
         explicit_ordering = ORDER_VAR in params and params.get(ORDER_VAR)
+
+        classified_term = classify_search_term(search_term) if search_term else None
+        if classified_term and classified_term[0] in self.exact_search_lookups:
+            kind, value = classified_term
+            return self.exact_search_results(queryset, kind, value, search_term, bool(explicit_ordering)), False
+
         queryset, use_distinct = super().get_search_results(request, queryset, search_term)
 
-        # Annotate and order the search results based on the search_vector class variable,
+        # Annotate and order the search results based on the search_document column,
         # this DRAMATICALLY improves search relevancy
-        if search_term and self.search_vector and not explicit_ordering:
-            # Perform the actual search-relevancy ordering
+        if search_term and not explicit_ordering:
             # We do the de-duplication that would normally be done by the calling method here instead
             # (and use_distinct to False so that it for sure doesn't happen up there)
             # because the de-duplication method used by the caller requires replacing the queryset
             # which will destroy our ordering
+            if use_distinct:
+                queryset = self.get_queryset(request).filter(Exists(queryset.filter(pk=OuterRef("pk"))))
             queryset = self.rank_queryset(queryset, search_term)
             use_distinct = False
 
         return queryset, use_distinct
 
+    def exact_search_results(
+        self, queryset: QuerySet, kind: SearchTermKind, value: Any, search_term: str, explicit_ordering: bool
+    ) -> QuerySet:
+        # We run each lookup as its own query, rather than OR-ing them together, since postgres can use an
+        # index for each of these alone but generally can't once they are combined across several joins
+        exact_pks: Set[Any] = set()
+        for lookup in self.exact_search_lookups[kind]:
+            exact_pks.update(self.model._default_manager.filter(**{lookup: value}).values_list("pk", flat=True))
+
+        matches = Q(pk__in=exact_pks)
+        if kind in MENTIONABLE_KINDS:
+            matches |= Q(search_document=SearchQuery(search_term))
+
+        queryset = queryset.filter(matches)
+        if explicit_ordering:
+            return queryset
+
+        return queryset.annotate(
+            exact_match=Case(When(pk__in=exact_pks, then=Value(True)), default=Value(False))
+        ).order_by("-exact_match", "pk")
+
     def rank_queryset(self, queryset: QuerySet, search_term: str) -> QuerySet:
-        if search_term and self.search_vector:
-            # Somehow we end up with duplicate objects in the search queryset,
-            # with different values for the rank, as well as with the same rank.
-            # This means we need to do an extra step rather than just DISTINCT rank, pk
-            # Here we find the row(s) with the highest rank and filter them to move on,
-            # the distinct call below will consolidate this to a single row per pk
-            rank_annotated_queryset = queryset.annotate(rank=SearchRank(self.search_vector, SearchQuery(search_term)))
-            one_rank_per_pk_queryset = rank_annotated_queryset.annotate(
-                highest_rank=Subquery(
-                    rank_annotated_queryset.filter(
-                        pk=OuterRef("pk"),
-                    )
-                    .order_by("-rank")
-                    .values("rank")[:1]
-                )
-            ).filter(rank=F("highest_rank"))
-
-            return one_rank_per_pk_queryset.order_by("-rank", "pk").distinct("rank", "pk")
+        if search_term:
+            return queryset.annotate(rank=SearchRank(F("search_document"), SearchQuery(search_term))).order_by(
+                "-rank", "pk"
+            )
         return queryset
 
     def get_changelist(self, request: HttpRequest, **kwargs: Dict) -> Type[ChangeList]:
@@ -0,0 +1,30 @@
+from argparse import ArgumentParser
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from meshapi.models import Member, MemberContactIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the member contact index from every member. This is normally kept up to date automatically, "
+        "this is only needed after bulk changes that bypass Member.save() (e.g. QuerySet.update() or loaddata)"
+    )
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        pass
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            MemberContactIndex.objects.all().delete()
+            rows = MemberContactIndex.objects.bulk_create(
+                (
+                    MemberContactIndex(member=member, contact_type=contact_type, value=value)
+                    for member in Member.objects.all().iterator()
+                    for contact_type, value in MemberContactIndex.entries_for_member(member)
+                ),
+                batch_size=1000,
+            )
+        self.stdout.write(f"Rebuilt {len(rows)} member contact index entries")
@@ -0,0 +1,22 @@
+from argparse import ArgumentParser
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from meshapi.models.util.search_document import get_searchable_models, update_search_documents
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the stored admin search documents for every object. These are normally kept up to date "
+        "automatically, this is only needed after bulk changes that bypass model signals (e.g. loaddata)"
+    )
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        pass
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        for model in get_searchable_models():
+            fields = model.search_document_fields  # type: ignore[attr-defined]
+            count = update_search_documents(model._default_manager.all(), fields)
+            self.stdout.write(f"Rebuilt {count} {model._meta.verbose_name_plural} search documents")
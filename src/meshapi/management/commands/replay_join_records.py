@@ -6,9 +6,16 @@ from typing import Any
 
 from django.core.management.base import BaseCommand
 from prettytable import PrettyTable
+from rest_framework.response import Response
 
-from meshapi.util.join_records import JoinRecord, JoinRecordProcessor, SubmissionStage
-from meshapi.views.forms import JoinFormRequest, process_join_form
+from meshapi.util.join_record_replay import LOOKUP_WORKERS, JoinRecordReplayer
+from meshapi.util.join_records import (
+    JoinRecord,
+    JoinRecordProcessor,
+    entry_to_join_record,
+    get_consistent_join_records,
+)
+from meshapi.views.forms import JoinFormRequest
 
 
 class Command(BaseCommand):
@@ -41,6 +48,20 @@ class Command(BaseCommand):
             help=f"Display all information from the Join Record: {self.hidden_fields}",
         )
 
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=LOOKUP_WORKERS,
+            help="How many addresses and email addresses to look up at once, before the records are replayed "
+            "one at a time, in order",
+        )
+
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Estimate how many records would be replayed, and what that would cost, without replaying them",
+        )
+
     def handle(self, *args: Any, **options: Any) -> None:
         # Default to getting join records from 1 week ago unless otherwise specified
         since = options["since"] or self.past_week()
@@ -53,10 +74,12 @@ class Command(BaseCommand):
 
         logging.info("Fetching Join Records...")
 
-        # Ensure that the join records in pre-submission match the ones in post-submission
-        # This method will get both sets of records and supplement the post-submission
-        # records if any are missing.
-        consistent_join_records_dict = p.ensure_pre_post_consistency(since)
+        # Bring the index up to date with anything uploaded since it was last synced, then get the
+        # post-submission records from it, supplemented by the pre-submission ones if any are missing.
+        p.sync_index(since)
+        consistent_join_records_dict = {
+            entry.uuid: entry_to_join_record(entry) for entry in get_consistent_join_records(since)
+        }
 
         # Bail if there are no join records to show
         if not consistent_join_records_dict:
@@ -90,6 +113,19 @@ class Command(BaseCommand):
 
         print(table)
 
+        if options["dry_run"]:
+            estimate = JoinRecordReplayer(p, self.resolve_conflict, workers=options["workers"]).estimate(
+                list(join_records_to_replay.values())
+            )
+            print(
+                f"Replaying would submit {estimate.records} records "
+                f"({estimate.already_replayed} more have already been replayed), "
+                f"geocoding {estimate.geocode_lookups} distinct addresses and checking "
+                f"{estimate.email_domains} distinct email domains. "
+                f"This would take roughly {estimate.seconds:.0f}s."
+            )
+            return
+
         if not options["write"]:
             return
 
@@ -105,73 +141,43 @@ class Command(BaseCommand):
 
         print("Replaying Join Records...")
 
-        for record in join_records_to_replay.values():
-            # Make the request
-            r = JoinFormRequest(
-                **{k: v for k, v in record.__dict__.items() if k in JoinFormRequest.__dataclass_fields__}
-            )
-            response = process_join_form(r)
-
-            print(f"{response.status_code} : {response.data}")
-
-            if response.status_code == 409:
-                print("Please confirm some information:")
-                print("Changed Info:")
-
-                confirmation_table = PrettyTable()
-                confirmation_table.padding_width = 0
-                confirmation_table.field_names = ["Field", "Original", "Suggested"]
-
-                for field, value in response.data["changed_info"].items():
-                    original_value = r.__dict__[field]
-                    confirmation_table.add_row([field, original_value, value])
-
-                print(confirmation_table)
-
-                if not options["noinput"]:
-                    # Trap the user until they make a valid choice
-                    while True:
-                        user_input = input("(A)ccept/(R)eject/(S)kip ?: ")
-                        if user_input in ["accept", "reject", "skip", "a", "r", "s"]:
-                            break
-                else:
-                    user_input = "accept"
-                    logging.warning("--no-input was specified, so auto-accepting")
-
-                if user_input.lower() in ["accept", "a"]:
-                    logging.info("Re-submitting with accepted changes...")
-                    r.__dict__.update(response.data["changed_info"])
-
-                    # If this doesn't work, then uh, skill issue.
-                    response = process_join_form(r)
-                    logging.info(f"Code: {response.status_code}")
-
-                elif user_input.lower() in ["reject", "r"]:
-                    logging.info("Rejecting changes and re-submitting...")
-                    r.__dict__.update({"trust_me_bro": True})
-                    record.trust_me_bro = True
-
-                    # If this doesn't work, then uh, skill issue.
-                    response = process_join_form(r)
-                    logging.info(f"Code: {response.status_code}")
-
-                elif user_input.lower() in ["skip", "s"]:
-                    logging.info("Skipping...")
-                    continue
-
-            record.code = str(response.status_code)
-            record.replayed += 1
-            if response.data.get("install_number"):
-                record.install_number = response.data["install_number"]
-                logging.info("OK")
-            else:
-                logging.error(
-                    "Replay failed! Did not get an install number for "
-                    f"record: {JoinRecordProcessor.get_key(record, SubmissionStage.POST)}."
-                )
-
-            key = JoinRecordProcessor.get_key(record, SubmissionStage.POST)
-            p.upload(record, key)
+        self.noinput = options["noinput"]
+        replayer = JoinRecordReplayer(p, self.resolve_conflict, workers=options["workers"])
+        stats = replayer.replay(list(join_records_to_replay.values()))
+
+        print(
+            f"Replayed {stats.records} records in {stats.seconds:.1f}s ({stats.records_per_second:.1f} records/s): "
+            f"{stats.succeeded} succeeded, {stats.failed} failed, {stats.skipped} skipped, "
+            f"{stats.already_replayed} already replayed"
+        )
+
+    def resolve_conflict(self, record: JoinRecord, r: JoinFormRequest, response: Response) -> str:
+        print("Please confirm some information:")
+        print("Changed Info:")
+
+        confirmation_table = PrettyTable()
+        confirmation_table.padding_width = 0
+        confirmation_table.field_names = ["Field", "Original", "Suggested"]
+
+        for field, value in response.data["changed_info"].items():
+            original_value = r.__dict__[field]
+            confirmation_table.add_row([field, original_value, value])
+
+        print(confirmation_table)
+
+        if self.noinput:
+            logging.warning("--no-input was specified, so auto-accepting")
+            return "accept"
+
+        # Trap the user until they make a valid choice
+        while True:
+            user_input = input("(A)ccept/(R)eject/(S)kip ?: ").lower()
+            if user_input in ["accept", "a"]:
+                return "accept"
+            if user_input in ["reject", "r"]:
+                return "reject"
+            if user_input in ["skip", "s"]:
+                return "skip"
 
     @staticmethod
     def past_week() -> datetime:
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:06
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+def populate_member_contact_index(apps, schema_editor):
+    Member = apps.get_model("meshapi", "Member")
+    MemberContactIndex = apps.get_model("meshapi", "MemberContactIndex")
+
+    rows = []
+    for member in Member.objects.all().iterator():
+        emails = {
+            e.lower()
+            for e in [member.primary_email_address, member.stripe_email_address]
+            + (member.additional_email_addresses or [])
+            if e
+        }
+        phones = {p.lower() for p in [member.phone_number] + (member.additional_phone_numbers or []) if p}
+        rows += [MemberContactIndex(member=member, contact_type="email", value=e) for e in emails]
+        rows += [MemberContactIndex(member=member, contact_type="phone", value=p) for p in phones]
+
+    MemberContactIndex.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("meshapi", "0014_alter_historicallink_type_alter_link_type"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name="MemberContactIndex",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("contact_type", models.CharField(choices=[("email", "Email"), ("phone", "Phone")])),
+                ("value", models.CharField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="building",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("street_address"), name="gin_trgm_ops"
+                ),
+                name="meshapi_building_addr_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="member",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="meshapi_member_name_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="member",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("primary_email_address"), name="gin_trgm_ops"
+                ),
+                name="meshapi_member_email_trgm",
+            ),
+        ),
+        migrations.AddField(
+            model_name="membercontactindex",
+            name="member",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="meshapi.member"),
+        ),
+        migrations.AddIndex(
+            model_name="membercontactindex",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["value"], name="meshapi_member_contact_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.RunPython(populate_member_contact_index, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,214 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:23
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+import meshapi.models.util.search_document
+from meshapi.models.util.search_document import update_search_documents
+
+# Frozen copies of the search_document_fields of each model at the time of this migration
+SEARCH_DOCUMENT_FIELDS = {
+    "Building": [
+        ("nodes__name", "A"),
+        ("street_address", "A"),
+        ("zip_code", "A"),
+        ("bin", "A"),
+        ("nodes__network_number", "B"),
+        ("installs__install_number", "B"),
+    ],
+    "Device": [
+        ("name", "A"),
+        ("notes", "D"),
+    ],
+    "Install": [
+        ("install_number", "A"),
+        ("node__network_number", "A"),
+        ("member__name", "A"),
+        ("member__primary_email_address", "B"),
+        ("member__phone_number", "B"),
+        ("member__slack_handle", "C"),
+        ("building__street_address", "C"),
+        ("unit", "C"),
+        ("building__zip_code", "C"),
+        ("building__bin", "C"),
+        ("ticket_number", "C"),
+        ("referral", "D"),
+        ("notes", "D"),
+    ],
+    "InstallFeeBillingDatum": [
+        ("invoice_number", "A"),
+        ("install__node__network_number", "A"),
+        ("install__install_number", "A"),
+        ("install__building__street_address", "B"),
+        ("notes", "D"),
+    ],
+    "Link": [
+        ("from_device__node__network_number", "A"),
+        ("to_device__node__network_number", "A"),
+        ("from_device__node__name", "B"),
+        ("to_device__node__name", "B"),
+        ("from_device__node__buildings__street_address", "C"),
+        ("to_device__node__buildings__street_address", "C"),
+        ("notes", "D"),
+    ],
+    "LOS": [
+        ("from_building__nodes__network_number", "A"),
+        ("to_building__nodes__network_number", "A"),
+        ("from_building__installs__install_number", "A"),
+        ("to_building__installs__install_number", "A"),
+        ("from_building__nodes__name", "B"),
+        ("to_building__nodes__name", "B"),
+        ("from_building__street_address", "B"),
+        ("to_building__street_address", "B"),
+        ("notes", "D"),
+    ],
+    "Member": [
+        ("name", "A"),
+        ("primary_email_address", "A"),
+        ("stripe_email_address", "A"),
+        ("additional_email_addresses", "A"),
+        ("phone_number", "A"),
+        ("additional_phone_numbers", "A"),
+        ("slack_handle", "A"),
+        ("installs__node__network_number", "B"),
+        ("installs__install_number", "B"),
+        ("notes", "D"),
+    ],
+    "Node": [
+        ("network_number", "A"),
+        ("name", "B"),
+        ("buildings__street_address", "D"),
+        ("notes", "D"),
+    ],
+}
+
+
+def populate_search_documents(apps, schema_editor):
+    for model_name, fields in SEARCH_DOCUMENT_FIELDS.items():
+        model = apps.get_model("meshapi", model_name)
+        update_search_documents(model.objects.all(), fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("meshapi", "0015_trigram_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="building",
+            name="search_document",
+            field=meshapi.models.util.search_document.SearchDocumentField(
+                editable=False,
+                help_text="Pre-computed full-text search document, used to rank admin search results. Maintained automatically",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="device",
+            name="search_document",
+            field=meshapi.models.util.search_document.SearchDocumentField(
+                editable=False,
+                help_text="Pre-computed full-text search document, used to rank admin search results. Maintained automatically",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="install",
+            name="search_document",
+            field=meshapi.models.util.search_document.SearchDocumentField(
+                editable=False,
+                help_text="Pre-computed full-text search document, used to rank admin search results. Maintained automatically",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="installfeebillingdatum",
+            name="search_document",
+            field=meshapi.models.util.search_document.SearchDocumentField(
+                editable=False,
+                help_text="Pre-computed full-text search document, used to rank admin search results. Maintained automatically",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="link",
+            name="search_document",
+            field=meshapi.models.util.search_document.SearchDocumentField(
+                editable=False,
+                help_text="Pre-computed full-text search document, used to rank admin search results. Maintained automatically",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="los",
+            name="search_document",
+            field=meshapi.models.util.search_document.SearchDocumentField(
+                editable=False,
+                help_text="Pre-computed full-text search document, used to rank admin search results. Maintained automatically",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="member",
+            name="search_document",
+            field=meshapi.models.util.search_document.SearchDocumentField(
+                editable=False,
+                help_text="Pre-computed full-text search document, used to rank admin search results. Maintained automatically",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="node",
+            name="search_document",
+            field=meshapi.models.util.search_document.SearchDocumentField(
+                editable=False,
+                help_text="Pre-computed full-text search document, used to rank admin search results. Maintained automatically",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="building",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_document"], name="meshapi_building_search_doc"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="device",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_document"], name="meshapi_device_search_doc"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="install",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_document"], name="meshapi_install_search_doc"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="installfeebillingdatum",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_document"], name="meshapi_billing_search_doc"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="link",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["search_document"], name="meshapi_link_search_doc"),
+        ),
+        migrations.AddIndex(
+            model_name="los",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["search_document"], name="meshapi_los_search_doc"),
+        ),
+        migrations.AddIndex(
+            model_name="member",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_document"], name="meshapi_member_search_doc"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="node",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["search_document"], name="meshapi_node_search_doc"),
+        ),
+        migrations.RunPython(populate_search_documents, reverse_code=migrations.RunPython.noop),
+    ]
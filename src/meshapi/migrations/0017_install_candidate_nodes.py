@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("meshapi", "0016_search_documents"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="install",
+            name="candidate_nodes",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                editable=False,
+                help_text="The active hubs, supernodes, and POPs nearest to this install's building at the time it was created, nearest first. See meshapi.util.node_candidates",
+            ),
+        ),
+    ]
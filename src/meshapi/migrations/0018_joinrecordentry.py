@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("meshapi", "0017_install_candidate_nodes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JoinRecordEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "key",
+                    models.CharField(help_text="The key of the record in the S3 bucket", max_length=255, unique=True),
+                ),
+                (
+                    "etag",
+                    models.CharField(blank=True, help_text="The ETag of the record when it was copied", max_length=64),
+                ),
+                ("stage", models.CharField(choices=[("pre", "Pre"), ("post", "Post")], max_length=8)),
+                ("uuid", models.CharField(db_index=True, max_length=36)),
+                ("version", models.IntegerField()),
+                ("submission_time", models.DateTimeField()),
+                ("code", models.CharField(blank=True, max_length=8)),
+                ("replayed", models.IntegerField(default=0)),
+                ("install_number", models.IntegerField(blank=True, null=True)),
+                ("record", models.JSONField(help_text="The full join record")),
+            ],
+            options={
+                "ordering": ["submission_time", "key"],
+                "indexes": [models.Index(fields=["stage", "submission_time"], name="meshapi_joinrecord_stage_time")],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("meshapi", "0018_joinrecordentry"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="accesspoint",
+            index=models.Index(fields=["latitude", "longitude"], name="meshapi_accesspoint_lat_lon"),
+        ),
+        migrations.AddIndex(
+            model_name="building",
+            index=models.Index(fields=["latitude", "longitude"], name="meshapi_building_lat_lon"),
+        ),
+        migrations.AddIndex(
+            model_name="node",
+            index=models.Index(fields=["latitude", "longitude"], name="meshapi_node_lat_lon"),
+        ),
+    ]
@@ -2,6 +2,7 @@ from .billing import *
 from .building import *
 from .devices import *
 from .install import *
+from .join_record import *
 from .link import *
 from .los import *
 from .member import *
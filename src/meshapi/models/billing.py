@@ -1,8 +1,11 @@
 import uuid
 
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from simple_history.models import HistoricalRecords
 
+from .util.search_document import SearchDocumentField
+
 
 class InstallFeeBillingDatum(models.Model):
     """
@@ -15,8 +18,9 @@ class InstallFeeBillingDatum(models.Model):
     class Meta:
         verbose_name = "Install Fee Billing Datum"
         verbose_name_plural = "Install Fee Billing Data"
+        indexes = [GinIndex(fields=["search_document"], name="meshapi_billing_search_doc")]
 
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=["search_document"])
 
     class BillingStatus(models.TextChoices):
         TO_BE_BILLED = "ToBeBilled", "To Be Billed"
@@ -26,6 +30,15 @@ class InstallFeeBillingDatum(models.Model):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
+    search_document = SearchDocumentField()
+    search_document_fields = [
+        ("invoice_number", "A"),
+        ("install__node__network_number", "A"),
+        ("install__install_number", "A"),
+        ("install__building__street_address", "B"),
+        ("notes", "D"),
+    ]
+
     install = models.OneToOneField(
         "Install",
         related_name="install_fee_billing_datum",
@@ -3,13 +3,16 @@ from enum import Enum
 from typing import Any
 
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.db.models import ManyToManyField
+from django.db.models.functions import Upper
 from django_jsonform.models.fields import ArrayField as JSONFormArrayField
 from simple_history.models import HistoricalRecords
 
 from .node import Node
+from .util.search_document import SearchDocumentField
 
 
 class AddressTruthSource(Enum):
@@ -31,13 +34,30 @@ class Building(models.Model):
     "Building" object for each address, but these "Building" objects will all share a BIN.
     """
 
-    history = HistoricalRecords(m2m_fields=["nodes"])
+    history = HistoricalRecords(m2m_fields=["nodes"], excluded_fields=["search_document"])
 
     class Meta:
         ordering = ["id"]
+        indexes = [
+            # Matches the UPPER(street_address::text) LIKE ... expression generated for icontains lookups
+            GinIndex(OpClass(Upper("street_address"), name="gin_trgm_ops"), name="meshapi_building_addr_trgm"),
+            GinIndex(fields=["search_document"], name="meshapi_building_search_doc"),
+            # For the bounding box filters of the map endpoints
+            models.Index(fields=["latitude", "longitude"], name="meshapi_building_lat_lon"),
+        ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
+    search_document = SearchDocumentField()
+    search_document_fields = [
+        ("nodes__name", "A"),
+        ("street_address", "A"),
+        ("zip_code", "A"),
+        ("bin", "A"),
+        ("nodes__network_number", "B"),
+        ("installs__install_number", "B"),
+    ]
+
     bin = models.IntegerField(
         blank=True,
         null=True,
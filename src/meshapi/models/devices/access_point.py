@@ -5,7 +5,13 @@ from .device import Device
 
 
 class AccessPoint(Device):
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=["search_document"])
+
+    class Meta:
+        indexes = [
+            # For the bounding box filters of the map endpoints
+            models.Index(fields=["latitude", "longitude"], name="meshapi_accesspoint_lat_lon"),
+        ]
 
     latitude = models.FloatField(
         help_text="Approximate AP latitude in decimal degrees (this will match the attached "
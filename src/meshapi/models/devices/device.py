@@ -1,18 +1,21 @@
 import uuid
 from typing import Optional
 
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.db.models import F, FloatField, IntegerField
 from simple_history.models import HistoricalRecords
 
 from meshapi.models.node import Node
+from meshapi.models.util.search_document import SearchDocumentField
 
 
 class Device(models.Model):
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=["search_document"])
 
     class Meta:
         ordering = [F("install_date").desc(nulls_last=True)]
+        indexes = [GinIndex(fields=["search_document"], name="meshapi_device_search_doc")]
 
     class DeviceStatus(models.TextChoices):
         INACTIVE = "Inactive"
@@ -21,6 +24,12 @@ class Device(models.Model):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
+    search_document = SearchDocumentField()
+    search_document_fields = [
+        ("name", "A"),
+        ("notes", "D"),
+    ]
+
     node = models.ForeignKey(
         Node,
         related_name="devices",
@@ -6,7 +6,7 @@ from .device import Device
 
 
 class Sector(Device):
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=["search_document"])
 
     radius = models.FloatField(
         help_text="The radius to display this sector on the map (in km)",
@@ -1,6 +1,7 @@
 import uuid
 from typing import Any, Optional
 
+from django.contrib.postgres.indexes import GinIndex
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.db import models
@@ -11,10 +12,11 @@ from .building import Building
 from .member import Member
 from .node import Node
 from .util.auto_incrementing_integer_field import AutoIncrementingIntegerField
+from .util.search_document import SearchDocumentField
 
 
 class Install(models.Model):
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=["search_document", "candidate_nodes"])
 
     class Meta:
         permissions = [
@@ -23,6 +25,7 @@ class Install(models.Model):
             ("update_panoramas", "Can update panoramas"),
         ]
         ordering = ["-install_number"]
+        indexes = [GinIndex(fields=["search_document"], name="meshapi_install_search_doc")]
 
     class InstallStatus(models.TextChoices):
         REQUEST_RECEIVED = "Request Received", "Request Received"
@@ -35,6 +38,23 @@ class Install(models.Model):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
+    search_document = SearchDocumentField()
+    search_document_fields = [
+        ("install_number", "A"),
+        ("node__network_number", "A"),
+        ("member__name", "A"),
+        ("member__primary_email_address", "B"),
+        ("member__phone_number", "B"),
+        ("member__slack_handle", "C"),
+        ("building__street_address", "C"),
+        ("unit", "C"),
+        ("building__zip_code", "C"),
+        ("building__bin", "C"),
+        ("ticket_number", "C"),
+        ("referral", "D"),
+        ("notes", "D"),
+    ]
+
     # Install Number (generated when form is submitted)
     # We use a custom field to ensure that mark this column as "GENERATED BY DEFAULT AS IDENTITY"
     # in the SQL DDL which causes this field to autopopulate at the DB level
@@ -148,6 +168,13 @@ class Install(models.Model):
         help_text="Was this install conducted by the member themselves? "
         "If not, it was done by a volunteer installer on their behalf",
     )
+    candidate_nodes = models.JSONField(
+        default=list,
+        blank=True,
+        editable=False,
+        help_text="The active hubs, supernodes, and POPs nearest to this install's building at the time it was "
+        "created, nearest first. See meshapi.util.node_candidates",
+    )
 
     @property
     def network_number(self) -> IntegerField | Optional[int]:
@@ -0,0 +1,32 @@
+from django.db import models
+
+
+class JoinRecordEntry(models.Model):
+    """
+    A copy of a join record (see meshapi.util.join_records), so that the join record viewer and the
+    replay_join_records command can find the ones they need with a query, rather than downloading
+    everything in the time period from S3. S3 remains the source of truth: these are written whenever a
+    record is uploaded by MeshDB, and otherwise synced from the bucket periodically
+    """
+
+    class Meta:
+        ordering = ["submission_time", "key"]
+        indexes = [models.Index(fields=["stage", "submission_time"], name="meshapi_joinrecord_stage_time")]
+
+    class Stage(models.TextChoices):
+        PRE = "pre"
+        POST = "post"
+
+    key = models.CharField(max_length=255, unique=True, help_text="The key of the record in the S3 bucket")
+    etag = models.CharField(max_length=64, blank=True, help_text="The ETag of the record when it was copied")
+    stage = models.CharField(max_length=8, choices=Stage.choices)
+    uuid = models.CharField(max_length=36, db_index=True)
+    version = models.IntegerField()
+    submission_time = models.DateTimeField()
+    code = models.CharField(max_length=8, blank=True)
+    replayed = models.IntegerField(default=0)
+    install_number = models.IntegerField(null=True, blank=True)
+    record = models.JSONField(help_text="The full join record")
+
+    def __str__(self) -> str:
+        return self.key
@@ -2,14 +2,16 @@ import datetime
 import uuid
 from typing import Optional
 
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from simple_history.models import HistoricalRecords
 
 from meshapi.models.devices.device import Device
+from meshapi.models.util.search_document import SearchDocumentField
 
 
 class Link(models.Model):
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=["search_document"])
 
     class LinkStatus(models.TextChoices):
         INACTIVE = "Inactive"
@@ -31,9 +33,21 @@ class Link(models.Model):
 
     class Meta:
         ordering = ["id"]
+        indexes = [GinIndex(fields=["search_document"], name="meshapi_link_search_doc")]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
+    search_document = SearchDocumentField()
+    search_document_fields = [
+        ("from_device__node__network_number", "A"),
+        ("to_device__node__network_number", "A"),
+        ("from_device__node__name", "B"),
+        ("to_device__node__name", "B"),
+        ("from_device__node__buildings__street_address", "C"),
+        ("to_device__node__buildings__street_address", "C"),
+        ("notes", "D"),
+    ]
+
     from_device = models.ForeignKey(
         Device,
         on_delete=models.PROTECT,
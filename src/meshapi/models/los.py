@@ -1,9 +1,11 @@
 import uuid
 
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from simple_history.models import HistoricalRecords
 
 from meshapi.models import Building
+from meshapi.models.util.search_document import SearchDocumentField
 
 
 class LOS(models.Model):
@@ -19,12 +21,13 @@ class LOS(models.Model):
     between any pair of street addresses (MeshDB Buildings), no need to create any other DB objects.
     """
 
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=["search_document"])
 
     class Meta:
         verbose_name = "LOS"
         verbose_name_plural = "LOSes"
         ordering = ["id"]
+        indexes = [GinIndex(fields=["search_document"], name="meshapi_los_search_doc")]
 
     class LOSSource(models.TextChoices):
         HUMAN_ANNOTATED = "Human Annotated"
@@ -32,6 +35,19 @@ class LOS(models.Model):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
+    search_document = SearchDocumentField()
+    search_document_fields = [
+        ("from_building__nodes__network_number", "A"),
+        ("to_building__nodes__network_number", "A"),
+        ("from_building__installs__install_number", "A"),
+        ("to_building__installs__install_number", "A"),
+        ("from_building__nodes__name", "B"),
+        ("to_building__nodes__name", "B"),
+        ("from_building__street_address", "B"),
+        ("to_building__street_address", "B"),
+        ("notes", "D"),
+    ]
+
     from_building = models.ForeignKey(
         Building,
         on_delete=models.PROTECT,
@@ -1,16 +1,32 @@
 import uuid
-from typing import Any, List
+from typing import Any, List, Set, Tuple
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models import QuerySet
 from django.db.models.fields import EmailField
+from django.db.models.functions import Upper
 from django_jsonform.models.fields import ArrayField as JSONFormArrayField
 from simple_history.models import HistoricalRecords
 
 from meshapi.validation import normalize_phone_number, validate_multi_phone_number_field, validate_phone_number_field
 
+from .util.search_document import SearchDocumentField
+
+# The fields MemberContactIndex is built from
+CONTACT_FIELDS = frozenset(
+    [
+        "primary_email_address",
+        "stripe_email_address",
+        "additional_email_addresses",
+        "phone_number",
+        "additional_phone_numbers",
+    ]
+)
+
 
 class Member(models.Model):
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=["search_document"])
     payment_preference_choices = (
         (None, "None"),
         ("cash", "Cash"),
@@ -19,8 +35,33 @@ class Member(models.Model):
 
     class Meta:
         ordering = ["id"]
+        indexes = [
+            # Trigram indexes on UPPER(...) so that Django's icontains/istartswith lookups, which compile
+            # to UPPER(col::text) LIKE UPPER(%s), can use them instead of scanning the whole table
+            GinIndex(OpClass(Upper("name"), name="gin_trgm_ops"), name="meshapi_member_name_trgm"),
+            GinIndex(
+                OpClass(Upper("primary_email_address"), name="gin_trgm_ops"),
+                name="meshapi_member_email_trgm",
+            ),
+            GinIndex(fields=["search_document"], name="meshapi_member_search_doc"),
+        ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    search_document = SearchDocumentField()
+    search_document_fields = [
+        ("name", "A"),
+        ("primary_email_address", "A"),
+        ("stripe_email_address", "A"),
+        ("additional_email_addresses", "A"),
+        ("phone_number", "A"),
+        ("additional_phone_numbers", "A"),
+        ("slack_handle", "A"),
+        ("installs__node__network_number", "B"),
+        ("installs__install_number", "B"),
+        ("notes", "D"),
+    ]
+
     name = models.CharField(help_text='Member full name in the format: "First Last"')
     primary_email_address = models.EmailField(
         blank=True, null=True, help_text="Primary email address used to contact the member"
@@ -107,3 +148,75 @@ class Member(models.Model):
                 normalize_phone_number(num) for num in self.additional_phone_numbers if num
             ]
         super().save(*args, **kwargs)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or not CONTACT_FIELDS.isdisjoint(update_fields):
+            MemberContactIndex.rebuild_for_member(self)
+
+
+class MemberContactIndex(models.Model):
+    """
+    A normalized copy of every email address and phone number attached to a Member (including the
+    contents of the additional_email_addresses and additional_phone_numbers array fields), one row per
+    value. Values are stored lowercase, and the table carries a trigram index, so that substring searches
+    across all of a member's contact details are a single indexed lookup rather than a scan of the
+    member table with a text cast of each array column.
+
+    This table is derived data, it is rebuilt from the Member object on every call to Member.save().
+    Anything which changes members without calling save() (e.g. QuerySet.update(), bulk_create() or
+    loaddata) must be followed by the rebuild_member_contact_index management command
+    """
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["value"], opclasses=["gin_trgm_ops"], name="meshapi_member_contact_trgm"),
+        ]
+
+    class ContactType(models.TextChoices):
+        EMAIL = "email"
+        PHONE = "phone"
+
+    member = models.ForeignKey(Member, on_delete=models.CASCADE, related_name="+")
+    contact_type = models.CharField(choices=ContactType.choices)
+    value = models.CharField()
+
+    def __str__(self) -> str:
+        return f"{self.contact_type}: {self.value}"
+
+    @staticmethod
+    def entries_for_member(member: Member) -> Set[Tuple[str, str]]:
+        """
+        Returns the (contact_type, value) pairs the index should hold for the member. Values which only
+        differ in case are only indexed once
+        """
+        ContactType = MemberContactIndex.ContactType
+        return {(ContactType.EMAIL.value, e.lower()) for e in member.all_email_addresses} | {
+            (ContactType.PHONE.value, p.lower()) for p in member.all_phone_numbers
+        }
+
+    @staticmethod
+    def rebuild_for_member(member: Member) -> None:
+        entries = MemberContactIndex.entries_for_member(member)
+        existing = MemberContactIndex.objects.filter(member=member)
+        if set(existing.values_list("contact_type", "value")) == entries:
+            return
+
+        existing.delete()
+        MemberContactIndex.objects.bulk_create(
+            [
+                MemberContactIndex(member=member, contact_type=contact_type, value=value)
+                for contact_type, value in entries
+            ]
+        )
+
+    @classmethod
+    def member_ids_matching(
+        cls, contact_type: "MemberContactIndex.ContactType", value: str, exact: bool = False
+    ) -> QuerySet:
+        """
+        Returns a queryset of the ids of all members with a contact value of the given type containing
+        (or if exact is set, equal to) value (case-insensitive), suitable for use as the right hand side
+        of an __in lookup
+        """
+        lookup = "value" if exact else "value__contains"
+        return cls.objects.filter(contact_type=contact_type, **{lookup: value.lower()}).values("member_id")
@@ -1,6 +1,7 @@
 import uuid
 from typing import TYPE_CHECKING, Any
 
+from django.contrib.postgres.indexes import GinIndex
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator
 from django.db import models, transaction
@@ -14,6 +15,8 @@ from meshapi.util.network_number import (
     validate_network_number_unused_and_claim_install_if_needed,
 )
 
+from .util.search_document import SearchDocumentField
+
 if TYPE_CHECKING:
     # Gate the import to avoid cycles
     from meshapi.models.building import Building
@@ -21,13 +24,18 @@ if TYPE_CHECKING:
 
 
 class Node(models.Model):
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=["search_document"])
 
     # This should be added automatically by django-stubs, but for some reason it's not :(
     buildings: Manager["Building"]
 
     class Meta:
         ordering = ["network_number"]
+        indexes = [
+            GinIndex(fields=["search_document"], name="meshapi_node_search_doc"),
+            # For the bounding box filters of the map endpoints
+            models.Index(fields=["latitude", "longitude"], name="meshapi_node_lat_lon"),
+        ]
 
     class NodeStatus(models.TextChoices):
         INACTIVE = "Inactive"
@@ -51,6 +59,14 @@ class Node(models.Model):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4)
 
+    search_document = SearchDocumentField()
+    search_document_fields = [
+        ("network_number", "A"),
+        ("name", "B"),
+        ("buildings__street_address", "D"),
+        ("notes", "D"),
+    ]
+
     network_number = models.IntegerField(
         unique=True,
         blank=True,
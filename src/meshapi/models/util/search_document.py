@@ -0,0 +1,150 @@
+"""
+Stored full-text search documents for the admin search.
+
+Each searchable model carries a search_document column (a tsvector with a GIN index) together with a
+search_document_fields class attribute listing the (field path, weight) pairs that make up that document.
+Field paths may span relations (e.g. "member__name" on Install), in which case the document is stored
+denormalized on the searchable model and must be refreshed whenever the related object changes.
+
+This module knows how to compute a document in SQL, and how to work out, for a changed object of any
+model, which rows of which searchable models embed data from it. The signal receivers that use this to keep
+the documents fresh live in meshapi.util.events.search_documents
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from django.apps import apps
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db.models import Model, OuterRef, QuerySet, Subquery, TextField
+from django.db.models.expressions import CombinedExpression
+from django.db.models.functions import Cast
+
+SearchDocumentFields = Sequence[Tuple[str, str]]
+
+
+class SearchDocumentField(SearchVectorField):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        kwargs.setdefault("null", True)
+        kwargs.setdefault("editable", False)
+        kwargs.setdefault(
+            "help_text",
+            "Pre-computed full-text search document, used to rank admin search results. Maintained automatically",
+        )
+        super().__init__(*args, **kwargs)
+
+
+def search_document_expression(fields: SearchDocumentFields) -> CombinedExpression | SearchVector:
+    """
+    Builds the tsvector expression for a search document. Each field is aggregated (so that fields
+    across many-valued relations contribute every related value) and the query using this expression
+    must therefore be grouped by the primary key of the searchable model
+    """
+    vectors = [
+        SearchVector(StringAgg(Cast(path, TextField()), delimiter=" ", distinct=True), weight=weight)
+        for path, weight in fields
+    ]
+    expression: CombinedExpression | SearchVector = vectors[0]
+    for vector in vectors[1:]:
+        expression = expression + vector
+    return expression
+
+
+def update_search_documents(queryset: QuerySet, fields: SearchDocumentFields) -> int:
+    """
+    Recomputes and stores the search_document column for every row in queryset
+    """
+    model = queryset.model
+    document = (
+        model._default_manager.filter(pk=OuterRef("pk"))
+        .order_by()
+        .values("pk")
+        .annotate(document=search_document_expression(fields))
+        .values("document")
+    )
+    return queryset.order_by().update(search_document=Subquery(document))
+
+
+def get_searchable_models() -> List[Type[Model]]:
+    """
+    Every model that stores its own search_document column. Multi-table inheritance children
+    (e.g. Sector, AccessPoint) share the document of their parent and are not included
+    """
+    searchable = []
+    for model in apps.get_app_config("meshapi").get_models():
+        if not hasattr(model, "search_document_fields"):
+            continue
+        if model._meta.get_field("search_document").model is model:
+            searchable.append(model)
+    return searchable
+
+
+_dependency_cache: Optional[Dict[Type[Model], List[Tuple[Type[Model], str]]]] = None
+
+
+def _get_dependencies() -> Dict[Type[Model], List[Tuple[Type[Model], str]]]:
+    """
+    Map from each model to the (searchable model, lookup) pairs whose search documents embed data from it.
+    For example Member maps to (Install, "member") since Install documents include member__name
+    """
+    global _dependency_cache
+    if _dependency_cache is not None:
+        return _dependency_cache
+
+    dependencies: Dict[Type[Model], List[Tuple[Type[Model], str]]] = {}
+    for searchable_model in get_searchable_models():
+        dependencies.setdefault(searchable_model, []).append((searchable_model, "pk"))
+        for path, _ in searchable_model.search_document_fields:  # type: ignore[attr-defined]
+            current_model = searchable_model
+            parts = path.split("__")
+            for i, part in enumerate(parts[:-1]):
+                related_model = current_model._meta.get_field(part).related_model
+                assert isinstance(related_model, type)
+                lookup = "__".join(parts[: i + 1])
+                if (searchable_model, lookup) not in dependencies.setdefault(related_model, []):
+                    dependencies[related_model].append((searchable_model, lookup))
+                current_model = related_model
+
+    _dependency_cache = dependencies
+    return dependencies
+
+
+def get_search_document_senders() -> List[Type[Model]]:
+    """
+    Every model whose changes can affect a stored search document, including the multi-table inheritance
+    children of those models (which send their own signals)
+    """
+    dependencies = _get_dependencies()
+    return [model for model in apps.get_models() if any(issubclass(model, dependency) for dependency in dependencies)]
+
+
+def get_search_document_m2m_senders() -> List[Type[Model]]:
+    """
+    The through models of the many-to-many relations of get_search_document_senders(), which send the
+    m2m_changed signal
+    """
+    through_models: List[Type[Model]] = []
+    for model in get_search_document_senders():
+        for field in model._meta.local_many_to_many:
+            through_model = field.remote_field.through
+            assert isinstance(through_model, type)
+            if through_model not in through_models:
+                through_models.append(through_model)
+    return through_models
+
+
+def get_dependent_querysets(instance: Model) -> List[QuerySet]:
+    """
+    Returns querysets of all rows (of any searchable model) whose search documents embed data from instance
+    """
+    querysets = []
+    for model, dependents in _get_dependencies().items():
+        if isinstance(instance, model):
+            for searchable_model, lookup in dependents:
+                querysets.append(searchable_model._default_manager.filter(**{lookup: instance.pk}))
+    return querysets
+
+
+def refresh_search_documents(querysets: Sequence[QuerySet]) -> None:
+    for queryset in querysets:
+        update_search_documents(queryset, queryset.model.search_document_fields)
@@ -54,6 +54,15 @@ class HasExplorerAccessPermission(HasDjangoPermission):
     django_permission = "meshapi.explorer_access"
 
 
+class HasTopologyViewPermission(BasePermission):
+    """
+    The topology endpoints are built from Nodes and Links, so anyone who can see those can use them
+    """
+
+    def has_permission(self, request: Request, view: View) -> bool:
+        return bool(request.user) and request.user.has_perms(["meshapi.view_node", "meshapi.view_link"])
+
+
 # Janky
 class LegacyMeshQueryPassword(permissions.BasePermission):
     def has_permission(self, request: Request, view: View) -> bool:
@@ -21,7 +21,7 @@ from meshapi.serializers.nested_key_object_related_field import NestedKeyObjectR
 class BuildingSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
     class Meta:
         model = Building
-        fields = "__all__"
+        exclude = ["search_document"]
         extra_kwargs = {
             "primary_node": {"additional_keys": ("network_number",)},
             "nodes": {"additional_keys": ("network_number",), "required": False},
@@ -33,7 +33,7 @@ class BuildingSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
 class MemberSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
     class Meta:
         model = Member
-        fields = "__all__"
+        exclude = ["search_document"]
 
     all_email_addresses: serializers.ReadOnlyField = serializers.ReadOnlyField()
     all_phone_numbers: serializers.ReadOnlyField = serializers.ReadOnlyField()
@@ -46,7 +46,7 @@ class InstallSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
 
     class Meta:
         model = Install
-        fields = "__all__"
+        exclude = ["search_document", "candidate_nodes"]
         extra_kwargs = {
             "node": {"additional_keys": ("network_number",)},
             "install_number": {"read_only": True},
@@ -69,7 +69,7 @@ class InstallSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
 class NodeSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
     class Meta:
         model = Node
-        fields = "__all__"
+        exclude = ["search_document"]
         extra_kwargs = {
             "network_number": {
                 "validators": [
@@ -94,13 +94,13 @@ class NodeEditSerializer(NodeSerializer):
 class LinkSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
     class Meta:
         model = Link
-        fields = "__all__"
+        exclude = ["search_document"]
 
 
 class DeviceSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
     class Meta:
         model = Device
-        fields = "__all__"
+        exclude = ["search_document"]
         extra_kwargs = {
             "node": {"additional_keys": ("network_number",)},
         }
@@ -128,7 +128,7 @@ class DeviceSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
 class SectorSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
     class Meta:
         model = Sector
-        fields = "__all__"
+        exclude = ["search_document"]
         extra_kwargs = {
             "node": {"additional_keys": ("network_number",)},
         }
@@ -156,7 +156,7 @@ class SectorSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
 class AccessPointSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
     class Meta:
         model = AccessPoint
-        fields = "__all__"
+        exclude = ["search_document"]
         extra_kwargs = {
             "node": {"additional_keys": ("network_number",)},
         }
@@ -168,7 +168,7 @@ class AccessPointSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
 class LOSSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
     class Meta:
         model = LOS
-        fields = "__all__"
+        exclude = ["search_document"]
 
 
 class InstallFeeBillingDatumSerializer(NestedKeyRelatedMixIn, serializers.ModelSerializer):
@@ -176,7 +176,7 @@ class InstallFeeBillingDatumSerializer(NestedKeyRelatedMixIn, serializers.ModelS
 
     class Meta:
         model = InstallFeeBillingDatum
-        fields = "__all__"
+        exclude = ["search_document"]
         extra_kwargs = {
             "install": {"additional_keys": ("install_number",)},
         }
@@ -0,0 +1,39 @@
+// Fills in the rows of lazy inlines (see LazyInlineMixin in meshapi/admin/inlines.py). The change page only
+// contains a placeholder for each of these, which we swap for the rows fetched from the server once the
+// placeholder scrolls into view. Inlines that are collapsed are never visible, so these are only loaded
+// once they are expanded
+document.addEventListener('DOMContentLoaded', () => {
+    function initWidgets(container) {
+        // Flickity only initializes the carousels present at page load, so we need to do these ourselves
+        if (window.Flickity) {
+            container.querySelectorAll('[data-flickity]').forEach((element) => {
+                new Flickity(element, JSON.parse(element.dataset.flickity));
+            });
+        }
+    }
+
+    async function loadRows(container) {
+        try {
+            const response = await fetch(container.dataset.url, {credentials: 'same-origin'});
+            if (!response.ok) {
+                throw new Error(`Got ${response.status} from ${container.dataset.url}`);
+            }
+            container.innerHTML = await response.text();
+            initWidgets(container);
+        } catch (error) {
+            console.error(error);
+            container.innerHTML = '<p class="errornote">Could not load these rows, please refresh the page</p>';
+        }
+    }
+
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach((entry) => {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                loadRows(entry.target);
+            }
+        });
+    });
+
+    document.querySelectorAll('.lazy-inline-rows[data-url]').forEach((container) => observer.observe(container));
+});
@@ -1,5 +1,6 @@
 import logging
 import os
+from datetime import datetime, timedelta, timezone
 
 from celery.schedules import crontab
 from datadog import statsd
@@ -8,6 +9,8 @@ from flags.state import disable_flag, enable_flag
 
 from meshapi.util.admin_notifications import notify_admins
 from meshapi.util.django_flag_decorator import skip_if_flag_disabled
+from meshapi.util.linknyc_kiosks import refresh_kiosk_snapshot
+from meshapi.util.map_artifacts import build_map_artifacts
 from meshapi.util.panoramas import sync_github_panoramas
 from meshapi.util.uisp_import.fetch_uisp import get_uisp_devices, get_uisp_links
 from meshapi.util.uisp_import.sync_handlers import (
@@ -93,6 +96,54 @@ def run_update_panoramas() -> None:
     statsd.increment("meshdb.tasks.run_update_panoramas", tags=["status:success"])
 
 
+@celery_app.task
+@skip_if_flag_disabled("TASK_ENABLED_BUILD_MAP_ARTIFACTS")
+def run_build_map_artifacts() -> None:
+    logging.info("Building map artifacts")
+    try:
+        hashes = build_map_artifacts()
+        logging.info(f"Built map artifacts: {hashes}")
+    except Exception as e:
+        logging.exception(e)
+        statsd.increment("meshdb.tasks.run_build_map_artifacts", tags=["status:failure"])
+        raise e
+
+    statsd.increment("meshdb.tasks.run_build_map_artifacts", tags=["status:success"])
+
+
+@celery_app.task
+@skip_if_flag_disabled("TASK_ENABLED_REFRESH_LINKNYC_KIOSKS")
+def run_refresh_linknyc_kiosks() -> None:
+    logging.info("Refreshing LinkNYC kiosk snapshot")
+    try:
+        snapshot = refresh_kiosk_snapshot()
+        logging.info(f"LinkNYC kiosk snapshot has {len(snapshot['kiosks'])} kiosks")
+    except Exception as e:
+        # The map keeps getting the last good snapshot, so this is fine as long as it doesn't go on for long
+        logging.exception(e)
+        statsd.increment("meshdb.tasks.run_refresh_linknyc_kiosks", tags=["status:failure"])
+        raise e
+
+    statsd.increment("meshdb.tasks.run_refresh_linknyc_kiosks", tags=["status:success"])
+
+
+@celery_app.task
+@skip_if_flag_disabled("TASK_ENABLED_SYNC_JOIN_RECORDS")
+def run_sync_join_records() -> None:
+    # Inline import to prevent circular import loop
+    from meshapi.util.join_records import JoinRecordProcessor
+
+    try:
+        synced = JoinRecordProcessor().sync_index(datetime.now(timezone.utc) - timedelta(days=7))
+        logging.info(f"Synced {synced} join records from S3")
+    except Exception as e:
+        logging.exception(e)
+        statsd.increment("meshdb.tasks.run_sync_join_records", tags=["status:failure"])
+        raise e
+
+    statsd.increment("meshdb.tasks.run_sync_join_records", tags=["status:success"])
+
+
 @celery_app.task
 @skip_if_flag_disabled("TASK_ENABLED_SYNC_WITH_UISP")
 def run_update_from_uisp() -> None:
@@ -121,6 +172,19 @@ celery_app.conf.beat_schedule = {
         "task": "meshapi.tasks.run_update_from_uisp",
         "schedule": crontab(minute=str(jitter_minutes + 10), hour="*/1"),
     },
+    # Normally rebuilt shortly after each change to the mesh, see meshapi.util.events.map_artifacts
+    "build-map-artifacts-every-15-minutes": {
+        "task": "meshapi.tasks.run_build_map_artifacts",
+        "schedule": crontab(minute="*/15"),
+    },
+    "refresh-linknyc-kiosks-hourly": {
+        "task": "meshapi.tasks.run_refresh_linknyc_kiosks",
+        "schedule": crontab(minute=str(jitter_minutes + 20), hour="*/1"),
+    },
+    "sync-join-records-every-10-minutes": {
+        "task": "meshapi.tasks.run_sync_join_records",
+        "schedule": crontab(minute="*/10"),
+    },
 }
 
 celery_app.conf.beat_schedule["run-database-backup-hourly"] = {
@@ -10,7 +10,6 @@ from meshapi.models import Building, Device, Install, Link, Member, Node
 from meshapi.views.active_mesh_kml import (
     DOT_FALLBACK_URL,
     LINK_TYPE_COLORS,
-    ActiveMeshKML,
     absolute_static_url,
     get_kml_link_type,
     hex_to_kml_color,
@@ -404,28 +403,19 @@ class TestActiveMeshKMLEndpoint(TestCase):
 
     def test_prioritize_links_reverse_direction(self):
         """Links between the same pair of nodes but in opposite directions should still deduplicate."""
-        view = ActiveMeshKML()
-        coord_a = (-73.91, 40.71, 30.0)
-        coord_b = (-73.92, 40.72, 25.0)
-
-        kml_links = [
-            {
-                "link_label": "A<->B",
-                "from_coord": coord_a,
-                "to_coord": coord_b,
-                "extended_data": {"type": "5 GHz", "from": "3001", "to": "3002"},
-            },
-            {
-                "link_label": "B<->A",
-                "from_coord": coord_b,
-                "to_coord": coord_a,
-                "extended_data": {"type": "Ethernet", "from": "3002", "to": "3001"},
-            },
-        ]
-
-        result = view.prioritize_links(kml_links)
-        self.assertEqual(len(result), 1)
-        self.assertEqual(result[0]["extended_data"]["type"], "Ethernet")
+        node_a = _make_node(3001, lat=40.71, lon=-73.91, alt=30)
+        node_b = _make_node(3002, lat=40.72, lon=-73.92, alt=25)
+        dev_a = _make_device(node_a)
+        dev_b = _make_device(node_b)
+        _make_link(dev_a, dev_b, link_type=Link.LinkType.FIVE_GHZ_UNSPECIFIED)
+        _make_link(dev_b, dev_a, link_type=Link.LinkType.ETHERNET)
+
+        response = self.c.get("/api/v1/geography/active-mesh.kml")
+        doc = _parse_kml(response)
+        links_folder = next(f for f in doc.features if f.name == "Links")
+        self.assertEqual(sum(len(f.features) for f in links_folder.features), 1)
+        ethernet_folder = next(f for f in links_folder.features if f.name == "Ethernet")
+        self.assertEqual(ethernet_folder.features[0].name, "NN3002<->NN3001")
 
     def test_coordinate_edge_cases(self):
         """Null altitude defaults to 5m; node coordinates take precedence over building coordinates."""
@@ -0,0 +1,136 @@
+import datetime
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from meshapi.models import (
+    LOS,
+    AccessPoint,
+    Building,
+    Device,
+    Install,
+    InstallFeeBillingDatum,
+    Link,
+    Member,
+    Node,
+    Sector,
+)
+from meshapi.tests.sample_data import sample_building, sample_device, sample_install, sample_member, sample_node
+from meshapi.tests.util import get_admin_results_count
+
+ROW_COUNT = 500
+
+# The number of queries needed to render any changelist, regardless of the number of rows on the page.
+# This covers the session, user & permission lookups, the count queries for the paginator, the page
+# of results itself and the eager loads declared by each admin
+CHANGELIST_QUERY_CEILING = 12
+
+
+# Makes sure that every changelist loads the related objects its columns need up front (via
+# list_select_related & list_prefetch_related), rather than issuing one or more queries per row
+class TestAdminChangelistQueries(TestCase):
+    c = Client()
+
+    @classmethod
+    def setUpTestData(cls):
+        buildings = Building.objects.bulk_create(
+            [Building(**{**sample_building, "bin": 1000000 + i}) for i in range(ROW_COUNT)]
+        )
+        members = Member.objects.bulk_create([Member(**sample_member) for _ in range(ROW_COUNT)])
+        nodes = Node.objects.bulk_create(
+            [Node(**{**sample_node, "network_number": 1000 + i}) for i in range(ROW_COUNT)]
+        )
+        Building.nodes.through.objects.bulk_create(
+            [Building.nodes.through(building=building, node=node) for building, node in zip(buildings, nodes)]
+        )
+        for building, node in zip(buildings, nodes):
+            building.primary_node = node
+        Building.objects.bulk_update(buildings, ["primary_node"])
+
+        installs = Install.objects.bulk_create(
+            [
+                Install(**sample_install, install_number=10000 + i, building=building, member=member, node=node)
+                for i, (building, member, node) in enumerate(zip(buildings, members, nodes))
+            ]
+        )
+        InstallFeeBillingDatum.objects.bulk_create([InstallFeeBillingDatum(install=install) for install in installs])
+
+        devices = Device.objects.bulk_create([Device(**sample_device, node=node) for node in nodes])
+        Link.objects.bulk_create(
+            [
+                Link(from_device=from_device, to_device=to_device, status=Link.LinkStatus.ACTIVE)
+                for from_device, to_device in zip(devices, devices[1:] + devices[:1])
+            ]
+        )
+        LOS.objects.bulk_create(
+            [
+                LOS(
+                    from_building=from_building,
+                    to_building=to_building,
+                    analysis_date=datetime.date(2024, 1, 1),
+                    source=LOS.LOSSource.HUMAN_ANNOTATED,
+                )
+                for from_building, to_building in zip(buildings, buildings[1:] + buildings[:1])
+            ]
+        )
+
+        # Multi-table inheritance models can't be bulk created
+        for node in nodes:
+            Sector(**sample_device, node=node, radius=1, azimuth=45, width=180).save()
+            AccessPoint(**sample_device, node=node, latitude=0, longitude=0).save()
+
+        User.objects.create_superuser(username="admin", password="admin_password", email="admin@example.com")
+
+    def setUp(self):
+        self.c.login(username="admin", password="admin_password")
+
+    def assertChangelistQueryCount(self, model):
+        model_admin = admin.site._registry[model]
+        route = f"/admin/meshapi/{model._meta.model_name}/"
+
+        with mock.patch.object(model_admin, "list_per_page", ROW_COUNT):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.c.get(route)
+
+        self.assertEqual(200, response.status_code, f"Could not view {route} in the admin panel.")
+        self.assertEqual(ROW_COUNT, get_admin_results_count(response.content.decode()))
+        self.assertLessEqual(
+            len(queries),
+            CHANGELIST_QUERY_CEILING,
+            f"Rendering {route} with {ROW_COUNT} rows took {len(queries)} queries:\n"
+            + "\n".join(query["sql"] for query in queries.captured_queries),
+        )
+
+    def test_building_changelist(self):
+        self.assertChangelistQueryCount(Building)
+
+    def test_member_changelist(self):
+        self.assertChangelistQueryCount(Member)
+
+    def test_install_changelist(self):
+        self.assertChangelistQueryCount(Install)
+
+    def test_installfeebillingdatum_changelist(self):
+        self.assertChangelistQueryCount(InstallFeeBillingDatum)
+
+    def test_node_changelist(self):
+        self.assertChangelistQueryCount(Node)
+
+    def test_link_changelist(self):
+        self.assertChangelistQueryCount(Link)
+
+    def test_los_changelist(self):
+        self.assertChangelistQueryCount(LOS)
+
+    def test_device_changelist(self):
+        self.assertChangelistQueryCount(Device)
+
+    def test_sector_changelist(self):
+        self.assertChangelistQueryCount(Sector)
+
+    def test_accesspoint_changelist(self):
+        self.assertChangelistQueryCount(AccessPoint)
@@ -0,0 +1,31 @@
+from django.test import TestCase
+
+from meshapi.admin.models.billing import InstallFeeBillingDatumImportExportResource
+from meshapi.admin.models.install import InstallImportExportResource
+from meshapi.admin.models.node import NodeImportExportResource
+from meshapi.models import Building, Install, Member, Node
+
+from .sample_data import sample_building, sample_install, sample_member, sample_node
+
+
+class TestImportExportResources(TestCase):
+    def setUp(self):
+        node = Node(**sample_node)
+        node.save()
+        building = Building(**sample_building)
+        building.save()
+        member = Member(**sample_member)
+        member.save()
+        install = Install(**sample_install, building=building, member=member, node=node)
+        install.save()
+
+    def test_generated_fields_are_not_exported(self):
+        for resource, generated_fields in [
+            (InstallImportExportResource(), {"search_document", "candidate_nodes"}),
+            (NodeImportExportResource(), {"search_document"}),
+            (InstallFeeBillingDatumImportExportResource(), {"search_document"}),
+        ]:
+            with self.subTest(resource=type(resource).__name__):
+                headers = set(resource.export().headers)
+                self.assertTrue(headers)
+                self.assertFalse(headers & generated_fields)
@@ -0,0 +1,90 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from meshapi.models import Building, Device, Install, Link, Member, Node
+
+from .sample_data import sample_building, sample_device, sample_install, sample_member, sample_node
+
+
+class TestAdminLazyInlines(TestCase):
+    c = Client()
+
+    def setUp(self):
+        self.node = Node(**sample_node)
+        self.node.network_number = 1234
+        self.node.save()
+
+        self.building = Building(**sample_building)
+        self.building.primary_node = self.node
+        self.building.panoramas = ["https://example.com/pano1.jpg", "https://example.com/pano2.jpg"]
+        self.building.save()
+        self.building.nodes.add(self.node)
+
+        self.member = Member(**sample_member)
+        self.member.save()
+
+        self.install = Install(**sample_install, building=self.building, member=self.member, node=self.node)
+        self.install.save()
+
+        self.device_1 = Device(**sample_device, node=self.node, name="nycmesh-1234-dev1")
+        self.device_1.save()
+        self.device_2 = Device(**sample_device, node=self.node, name="nycmesh-1234-dev2")
+        self.device_2.save()
+        self.link = Link(from_device=self.device_1, to_device=self.device_2, status=Link.LinkStatus.ACTIVE)
+        self.link.save()
+
+        User.objects.create_superuser(username="admin", password="admin_password", email="admin@example.com")
+        self.c.login(username="admin", password="admin_password")
+
+    def test_change_page_does_not_load_inline_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.c.get(f"/admin/meshapi/node/{self.node.id}/change/")
+        self.assertEqual(response.status_code, 200)
+
+        for table in ["meshapi_install", "meshapi_link", "meshapi_device"]:
+            self.assertFalse(
+                any(f'FROM "{table}"' in query["sql"] for query in queries.captured_queries),
+                f"Change page queried {table}",
+            )
+
+        content = response.content.decode()
+        for inline_name in ["PanoramaInline", "InstallInline", "DeviceInline", "NodeLinkInline"]:
+            self.assertIn(f"/admin/meshapi/node/{self.node.id}/inline/{inline_name}/", content)
+        self.assertNotIn("pano1.jpg", content)
+
+    def test_inline_rows(self):
+        response = self.c.get(f"/admin/meshapi/node/{self.node.id}/inline/InstallInline/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f"#{self.install.install_number}", response.content.decode())
+        self.assertNotIn("<form", response.content.decode())
+
+        response = self.c.get(f"/admin/meshapi/node/{self.node.id}/inline/NodeLinkInline/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("nycmesh-1234-dev1", response.content.decode())
+
+        response = self.c.get(f"/admin/meshapi/building/{self.building.id}/inline/InstallInline/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f"#{self.install.install_number}", response.content.decode())
+
+    def test_panorama_rows(self):
+        response = self.c.get(f"/admin/meshapi/node/{self.node.id}/inline/PanoramaInline/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("https://example.com/pano1.jpg", response.content.decode())
+        self.assertIn("https://example.com/pano2.jpg", response.content.decode())
+
+    def test_inline_rows_not_found(self):
+        response = self.c.get(f"/admin/meshapi/node/{self.node.id}/inline/BuildingMembershipInline/")
+        self.assertEqual(response.status_code, 404)
+
+        response = self.c.get(f"/admin/meshapi/node/{self.node.id}/inline/NotARealInline/")
+        self.assertEqual(response.status_code, 404)
+
+        response = self.c.get(f"/admin/meshapi/node/{self.building.id}/inline/InstallInline/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_inline_rows_requires_login(self):
+        self.c.logout()
+        response = self.c.get(f"/admin/meshapi/node/{self.node.id}/inline/InstallInline/")
+        self.assertEqual(response.status_code, 302)
@@ -1,7 +1,10 @@
 import datetime
+import uuid
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 
 from meshapi.models import (
     LOS,
@@ -16,6 +19,7 @@ from meshapi.models import (
     Sector,
 )
 
+from ..admin.ranked_search import SearchTermKind, classify_search_term
 from .sample_data import sample_building, sample_device, sample_install, sample_member, sample_node
 from .util import get_admin_results_count
 
@@ -24,89 +28,91 @@ class TestAdminSearchView(TestCase):
     c = Client()
 
     def setUp(self):
-        sample_install_copy = sample_install.copy()
-        self.building_1 = Building(**sample_building)
-        self.building_1.save()
-        sample_install_copy["building"] = self.building_1
-
-        self.building_2 = Building(**sample_building)
-        self.building_2.save()
-
-        self.los = LOS(
-            from_building=self.building_1,
-            to_building=self.building_2,
-            analysis_date=datetime.date(2024, 1, 1),
-            source=LOS.LOSSource.HUMAN_ANNOTATED,
-        )
-        self.los.save()
-
-        self.member = Member(**sample_member)
-        self.member.save()
-        sample_install_copy["member"] = self.member
-
-        self.install = Install(**sample_install_copy)
-        self.install.referral = "reddit or something, I don't remember"
-        self.install.save()
-
-        self.billing_datum = InstallFeeBillingDatum(
-            install=self.install,
-        )
-        self.billing_datum.save()
-
-        self.node1 = Node(**sample_node)
-        self.node1.save()
-
-        self.building_1.primary_node = self.node1
-        self.building_1.save()
-
-        self.node2 = Node(**sample_node)
-        self.node2.save()
-
-        self.install.node = self.node1
-        self.install.save()
-
-        self.building_2.primary_node = self.node2
-        self.building_2.save()
-
-        self.device1 = Device(
-            **sample_device,
-            name="Device1",
-        )
-        self.device1.node = self.node1
-        self.device1.save()
-
-        self.device2 = Device(
-            **sample_device,
-            name="Device2",
-        )
-        self.device2.node = self.node2
-        self.device2.save()
-
-        self.sector = Sector(
-            name="Sector1",
-            radius=1,
-            azimuth=45,
-            width=180,
-            **sample_device,
-        )
-        self.sector.node = self.node2
-        self.sector.save()
-
-        self.access_point = AccessPoint(
-            **sample_device,
-            name="AP1",
-            latitude=0,
-            longitude=0,
-        )
-        self.access_point.node = self.node2
-        self.access_point.save()
-
-        self.link = Link(
-            from_device=self.device1,
-            to_device=self.device2,
-            status=Link.LinkStatus.ACTIVE,
-        )
-        self.link.save()
+        # Search documents are refreshed once changes are committed
+        with self.captureOnCommitCallbacks(execute=True):
+            sample_install_copy = sample_install.copy()
+            self.building_1 = Building(**sample_building)
+            self.building_1.save()
+            sample_install_copy["building"] = self.building_1
+
+            self.building_2 = Building(**sample_building)
+            self.building_2.save()
+
+            self.los = LOS(
+                from_building=self.building_1,
+                to_building=self.building_2,
+                analysis_date=datetime.date(2024, 1, 1),
+                source=LOS.LOSSource.HUMAN_ANNOTATED,
+            )
+            self.los.save()
+
+            self.member = Member(**sample_member)
+            self.member.save()
+            sample_install_copy["member"] = self.member
+
+            self.install = Install(**sample_install_copy)
+            self.install.referral = "reddit or something, I don't remember"
+            self.install.save()
+
+            self.billing_datum = InstallFeeBillingDatum(
+                install=self.install,
+            )
+            self.billing_datum.save()
+
+            self.node1 = Node(**sample_node)
+            self.node1.save()
+
+            self.building_1.primary_node = self.node1
+            self.building_1.save()
+
+            self.node2 = Node(**sample_node)
+            self.node2.save()
+
+            self.install.node = self.node1
+            self.install.save()
+
+            self.building_2.primary_node = self.node2
+            self.building_2.save()
+
+            self.device1 = Device(
+                **sample_device,
+                name="Device1",
+            )
+            self.device1.node = self.node1
+            self.device1.save()
+
+            self.device2 = Device(
+                **sample_device,
+                name="Device2",
+            )
+            self.device2.node = self.node2
+            self.device2.save()
+
+            self.sector = Sector(
+                name="Sector1",
+                radius=1,
+                azimuth=45,
+                width=180,
+                **sample_device,
+            )
+            self.sector.node = self.node2
+            self.sector.save()
+
+            self.access_point = AccessPoint(
+                **sample_device,
+                name="AP1",
+                latitude=0,
+                longitude=0,
+            )
+            self.access_point.node = self.node2
+            self.access_point.save()
+
+            self.link = Link(
+                from_device=self.device1,
+                to_device=self.device2,
+                status=Link.LinkStatus.ACTIVE,
+            )
+            self.link.save()
 
         self.admin_user = User.objects.create_superuser(
             username="admin", password="admin_password", email="admin@example.com"
@@ -170,7 +176,8 @@ class TestAdminSearchView(TestCase):
         install2.building = self.building_2
         install2.member = self.member
         install2.notes = "NN101"
-        install2.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            install2.save()
 
         response = self._call("/admin/meshapi/install/?q=NN101", 200)
         self.assertEqual(2, get_admin_results_count(response.content.decode()))
@@ -186,3 +193,79 @@ class TestAdminSearchView(TestCase):
     def test_search_install_referral(self):
         response = self._call("/admin/meshapi/install/?q=reddit", 200)
         self.assertEqual(1, get_admin_results_count(response.content.decode()))
+
+    def test_search_install_by_install_number_hash(self):
+        response = self._call(f"/admin/meshapi/install/?q=%23{self.install.install_number}", 200)
+        self.assertEqual(1, get_admin_results_count(response.content.decode()))
+
+    def test_search_building_by_bin(self):
+        self.building_1.bin = 1234567
+        with self.captureOnCommitCallbacks(execute=True):
+            self.building_1.save()
+
+        response = self._call("/admin/meshapi/building/?q=1234567", 200)
+        self.assertEqual([self.building_1], list(response.context["cl"].result_list))
+
+    def test_search_by_uuid(self):
+        response = self._call(f"/admin/meshapi/member/?q={self.member.id}", 200)
+        self.assertEqual([self.member], list(response.context["cl"].result_list))
+
+        # On installs, this also finds the installs of a member/building/node
+        response = self._call(f"/admin/meshapi/install/?q={self.member.id}", 200)
+        self.assertEqual([self.install], list(response.context["cl"].result_list))
+
+    def test_search_by_email(self):
+        self.member.additional_email_addresses = ["other.address@example.com"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.save()
+
+        response = self._call("/admin/meshapi/member/?q=Other.Address@example.com", 200)
+        self.assertEqual([self.member], list(response.context["cl"].result_list))
+
+        response = self._call("/admin/meshapi/install/?q=john.smith@example.com", 200)
+        self.assertEqual([self.install], list(response.context["cl"].result_list))
+
+    def test_search_by_phone(self):
+        response = self._call("/admin/meshapi/member/?q=(555) 555-5555", 200)
+        self.assertEqual([self.member], list(response.context["cl"].result_list))
+
+        response = self._call("/admin/meshapi/install/?q=5555555555", 200)
+        self.assertEqual([self.install], list(response.context["cl"].result_list))
+
+    def test_exact_matches_sorted_before_mentions(self):
+        install2 = Install(**sample_install)
+        install2.building = self.building_2
+        install2.member = self.member
+        install2.notes = f"NN{self.node1.network_number}"
+        with self.captureOnCommitCallbacks(execute=True):
+            install2.save()
+
+        response = self._call(f"/admin/meshapi/install/?q=NN{self.node1.network_number}", 200)
+        self.assertEqual([self.install, install2], list(response.context["cl"].result_list))
+
+    def test_exact_search_skips_search_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._call(f"/admin/meshapi/install/?q=NN{self.node1.network_number}", 200)
+
+        for query in queries.captured_queries:
+            self.assertNotIn("LIKE", query["sql"])
+
+
+class TestClassifySearchTerm(TestCase):
+    def test_identifiers(self):
+        self.assertEqual(classify_search_term("NN1234"), (SearchTermKind.NETWORK_NUMBER, 1234))
+        self.assertEqual(classify_search_term(" nn 1234 "), (SearchTermKind.NETWORK_NUMBER, 1234))
+        self.assertEqual(classify_search_term("#5678"), (SearchTermKind.INSTALL_NUMBER, 5678))
+        self.assertEqual(classify_search_term("1234567"), (SearchTermKind.BIN, 1234567))
+
+        member_uuid = uuid.uuid4()
+        self.assertEqual(classify_search_term(str(member_uuid)), (SearchTermKind.UUID, member_uuid))
+
+        kind, _ = classify_search_term("someone@example.com")
+        self.assertEqual(kind, SearchTermKind.EMAIL)
+        kind, _ = classify_search_term("+1 (212) 555-8888")
+        self.assertEqual(kind, SearchTermKind.PHONE)
+
+    def test_free_text(self):
+        for term in ["", "nN", "NNabc", "1234", "8888", "9234567", "Chom St", "john smith", "555-5555", "#abc"]:
+            self.assertIsNone(classify_search_term(term), term)
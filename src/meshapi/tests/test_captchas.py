@@ -5,7 +5,12 @@ import requests_mock
 from django.test import TestCase
 from flags.state import disable_flag, enable_flag
 
-from meshapi.validation import RECAPTCHA_TOKEN_VALIDATION_URL, check_recaptcha_token, validate_recaptcha_tokens
+from meshapi.validation import (
+    RECAPTCHA_TIMEOUT,
+    RECAPTCHA_TOKEN_VALIDATION_URL,
+    check_recaptcha_token,
+    validate_recaptcha_tokens,
+)
 
 
 class TestHelpers(TestCase):
@@ -32,6 +37,7 @@ class TestHelpers(TestCase):
             request_mocker.request_history[0].text,
             "secret=fake_secret&response=fake_token&remoteip=0.0.0.0",
         )
+        self.assertEqual(request_mocker.request_history[0].timeout, RECAPTCHA_TIMEOUT)
 
     @requests_mock.Mocker()
     def test_check_recaptcha_v3_token_success(self, request_mocker):
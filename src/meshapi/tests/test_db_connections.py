@@ -0,0 +1,38 @@
+from unittest import mock
+
+from django.conf import settings
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+
+from meshapi.util.events.db_connections import record_db_connections_reused
+
+
+class TestDatabaseConnectionSettings(TestCase):
+    def test_persistent_connections_enabled(self):
+        for alias in ["default", "readonly"]:
+            self.assertGreater(settings.DATABASES[alias]["CONN_MAX_AGE"], 0)
+            self.assertTrue(settings.DATABASES[alias]["CONN_HEALTH_CHECKS"])
+
+
+class TestDatabaseConnectionMetrics(TransactionTestCase):
+    @mock.patch("meshapi.util.events.db_connections.statsd")
+    def test_connection_created(self, statsd):
+        connections["default"].close()
+        connections["default"].ensure_connection()
+
+        statsd.increment.assert_called_once_with("meshdb.db.connection.created", tags=["alias:default"])
+
+    @mock.patch("meshapi.util.events.db_connections.statsd")
+    def test_connection_reused(self, statsd):
+        connections["default"].ensure_connection()
+        record_db_connections_reused("request")
+
+        statsd.increment.assert_any_call("meshdb.db.connection.reused", tags=["alias:default", "context:request"])
+
+    @mock.patch("meshapi.util.events.db_connections.statsd")
+    def test_closed_connection_not_counted_as_reused(self, statsd):
+        for connection in connections.all():
+            connection.close()
+        record_db_connections_reused("task")
+
+        statsd.increment.assert_not_called()
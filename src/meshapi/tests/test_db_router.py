@@ -0,0 +1,145 @@
+from unittest import mock
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from meshapi.models import Install, Member
+from meshdb import db_router
+from meshdb.db_router import (
+    READ_FROM_PRIMARY_COOKIE,
+    REPLICA_DB_ALIAS,
+    ReplicaRouter,
+    get_replica_lag,
+    read_from_replica,
+    replica_usable,
+)
+from meshweb.middleware import ReplicaStickinessMiddleware
+
+from .sample_data import sample_member
+
+
+@read_from_replica
+def install_db_view(request):
+    return HttpResponse(Install.objects.all().db)
+
+
+class TestReadFromReplica(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        patcher = mock.patch("meshdb.db_router.replica_configured", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch("meshdb.db_router.replica_usable", return_value=True)
+        self.replica_usable = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_safe_request_reads_from_replica(self):
+        response = install_db_view(self.factory.get("/"))
+        self.assertEqual(response.content.decode(), REPLICA_DB_ALIAS)
+
+    def test_routing_ends_with_view(self):
+        install_db_view(self.factory.get("/"))
+        self.assertEqual(Install.objects.all().db, DEFAULT_DB_ALIAS)
+
+    def test_unsafe_request_reads_from_primary(self):
+        response = install_db_view(self.factory.post("/"))
+        self.assertEqual(response.content.decode(), DEFAULT_DB_ALIAS)
+
+    def test_recent_writer_reads_from_primary(self):
+        request = self.factory.get("/")
+        request.COOKIES[READ_FROM_PRIMARY_COOKIE] = "1"
+        response = install_db_view(request)
+        self.assertEqual(response.content.decode(), DEFAULT_DB_ALIAS)
+
+    def test_unusable_replica_reads_from_primary(self):
+        self.replica_usable.return_value = False
+        response = install_db_view(self.factory.get("/"))
+        self.assertEqual(response.content.decode(), DEFAULT_DB_ALIAS)
+
+    def test_not_configured_reads_from_primary(self):
+        with mock.patch("meshdb.db_router.replica_configured", return_value=False):
+            response = install_db_view(self.factory.get("/"))
+        self.assertEqual(response.content.decode(), DEFAULT_DB_ALIAS)
+        self.replica_usable.assert_not_called()
+
+    def test_writes_go_to_primary(self):
+        member = Member(**sample_member)
+        member._state.db = REPLICA_DB_ALIAS
+        self.assertEqual(ReplicaRouter().db_for_write(Member, instance=member), DEFAULT_DB_ALIAS)
+
+
+@override_settings(DB_REPLICA_MAX_LAG=10, DB_REPLICA_LAG_CHECK_INTERVAL=5)
+class TestReplicaUsable(TestCase):
+    def setUp(self):
+        db_router._replica_status = None
+        self.addCleanup(setattr, db_router, "_replica_status", None)
+
+        # Stand in for the replica with the primary, which always reports zero lag
+        patcher = mock.patch("meshdb.db_router.connections", {REPLICA_DB_ALIAS: connection})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch("meshdb.db_router.replica_configured", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_primary_has_no_lag(self):
+        self.assertEqual(get_replica_lag(connection), 0)
+        self.assertTrue(replica_usable())
+
+    def test_lagging_replica_not_usable(self):
+        with mock.patch("meshdb.db_router.get_replica_lag", return_value=60):
+            self.assertFalse(replica_usable())
+
+    def test_unreachable_replica_not_usable(self):
+        with mock.patch(
+            "meshdb.db_router.get_replica_lag", side_effect=OperationalError("connection refused")
+        ), self.assertLogs(level="ERROR"):
+            self.assertFalse(replica_usable())
+
+    def test_status_cached_between_checks(self):
+        with mock.patch("meshdb.db_router.get_replica_lag", return_value=0) as get_lag:
+            self.assertTrue(replica_usable())
+            self.assertTrue(replica_usable())
+        get_lag.assert_called_once()
+
+    def test_status_rechecked_after_interval(self):
+        with mock.patch("meshdb.db_router.get_replica_lag", return_value=0) as get_lag, mock.patch(
+            "meshdb.db_router.time.monotonic", side_effect=[100, 106]
+        ):
+            self.assertTrue(replica_usable())
+            get_lag.return_value = 60
+            self.assertFalse(replica_usable())
+        self.assertEqual(get_lag.call_count, 2)
+
+
+@override_settings(DB_REPLICA_STICKY_SECONDS=30)
+class TestReplicaStickinessMiddleware(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def write_view(self, request):
+        Member(**sample_member).save()
+        return HttpResponse()
+
+    def read_view(self, request):
+        list(Member.objects.all())
+        return HttpResponse()
+
+    def test_write_sets_cookie(self):
+        with mock.patch("meshweb.middleware.replica_configured", return_value=True):
+            response = ReplicaStickinessMiddleware(self.write_view)(self.factory.post("/"))
+        self.assertIn(READ_FROM_PRIMARY_COOKIE, response.cookies)
+        self.assertEqual(response.cookies[READ_FROM_PRIMARY_COOKIE]["max-age"], 30)
+
+    def test_read_does_not_set_cookie(self):
+        with mock.patch("meshweb.middleware.replica_configured", return_value=True):
+            response = ReplicaStickinessMiddleware(self.read_view)(self.factory.get("/"))
+        self.assertNotIn(READ_FROM_PRIMARY_COOKIE, response.cookies)
+
+    def test_no_cookie_without_replica(self):
+        response = ReplicaStickinessMiddleware(self.write_view)(self.factory.post("/"))
+        self.assertNotIn(READ_FROM_PRIMARY_COOKIE, response.cookies)
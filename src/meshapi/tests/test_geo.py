@@ -0,0 +1,261 @@
+import datetime
+import json
+import struct
+
+from django.test import Client, TestCase
+
+from meshapi.models import LOS, AccessPoint, Building, Device, Install, Link, Member, Node, Sector
+from meshapi.util.geo import BoundingBox, parse_bbox
+from meshapi.util.vector_tiles import EXTENT, tile_bounds
+
+
+def read_varint(data, i):
+    value, shift = 0, 0
+    while True:
+        byte = data[i]
+        i += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, i
+
+
+def read_fields(data):
+    """
+    Yields (field number, value) for each field of a protobuf message, with length delimited fields as bytes
+    """
+    i = 0
+    while i < len(data):
+        key, i = read_varint(data, i)
+        field_number, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, i = read_varint(data, i)
+        elif wire_type == 1:
+            value, i = data[i : i + 8], i + 8
+        else:
+            length, i = read_varint(data, i)
+            value, i = data[i : i + length], i + length
+        yield field_number, value
+
+
+def read_packed(data):
+    values, i = [], 0
+    while i < len(data):
+        value, i = read_varint(data, i)
+        values.append(value)
+    return values
+
+
+def unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def decode_value(data):
+    field_number, value = next(read_fields(data))
+    if field_number == 1:
+        return value.decode()
+    if field_number == 3:
+        return struct.unpack("<d", value)[0]
+    if field_number == 6:
+        return unzigzag(value)
+    return bool(value)
+
+
+def decode_tile(data):
+    """
+    Decodes a vector tile into {layer name: [(geometry type, [(x, y), ...], properties), ...]}
+    """
+    layers = {}
+    for _, layer_data in read_fields(data):
+        fields = list(read_fields(layer_data))
+        name = next(value.decode() for field_number, value in fields if field_number == 1)
+        keys = [value.decode() for field_number, value in fields if field_number == 3]
+        values = [decode_value(value) for field_number, value in fields if field_number == 4]
+        assert dict(fields)[5] == EXTENT
+
+        features = []
+        for feature_data in (value for field_number, value in fields if field_number == 2):
+            feature = dict(read_fields(feature_data))
+            tags = read_packed(feature[2])
+            properties = {keys[tags[i]]: values[tags[i + 1]] for i in range(0, len(tags), 2)}
+
+            commands = read_packed(feature[4])
+            points, cursor, i = [], (0, 0), 0
+            while i < len(commands):
+                count = commands[i] >> 3
+                i += 1
+                for _ in range(count):
+                    cursor = (cursor[0] + unzigzag(commands[i]), cursor[1] + unzigzag(commands[i + 1]))
+                    points.append(cursor)
+                    i += 2
+            features.append((feature[3], points, properties))
+        layers[name] = features
+    return layers
+
+
+class TestGeo(TestCase):
+    c = Client()
+
+    def setUp(self):
+        member = Member(name="Stacy Fakename")
+        member.save()
+
+        # Grand St, and SN1 at Dumbo
+        self.grand = Node(
+            network_number=1934, status=Node.NodeStatus.ACTIVE, type=Node.NodeType.HUB, latitude=40.7, longitude=-74.0
+        )
+        self.grand.save()
+        self.sn1 = Node(
+            network_number=227,
+            status=Node.NodeStatus.ACTIVE,
+            type=Node.NodeType.SUPERNODE,
+            latitude=40.704,
+            longitude=-73.987,
+        )
+        self.sn1.save()
+        Node(network_number=99, status=Node.NodeStatus.INACTIVE, latitude=40.7, longitude=-74.0).save()
+
+        self.grand_building = Building(address_truth_sources=[], latitude=40.7, longitude=-74.0, altitude=20)
+        self.grand_building.save()
+        self.sn1_building = Building(address_truth_sources=[], latitude=40.704, longitude=-73.987)
+        self.sn1_building.save()
+
+        for install_number, building, node, status in [
+            (1934, self.grand_building, self.grand, Install.InstallStatus.ACTIVE),
+            (227, self.sn1_building, self.sn1, Install.InstallStatus.ACTIVE),
+            (5000, self.grand_building, None, Install.InstallStatus.CLOSED),
+        ]:
+            Install(
+                install_number=install_number,
+                member=member,
+                building=building,
+                node=node,
+                status=status,
+                request_date=datetime.datetime.now(datetime.timezone.utc),
+                roof_access=True,
+            ).save()
+
+        grand_device = Device(node=self.grand, status=Device.DeviceStatus.ACTIVE)
+        grand_device.save()
+        self.sector = Sector(
+            node=self.sn1, name="SN1 Sector", status=Device.DeviceStatus.ACTIVE, radius=1, azimuth=90, width=120
+        )
+        self.sector.save()
+        AccessPoint(
+            node=self.sn1, name="SN1 AP", status=Device.DeviceStatus.ACTIVE, latitude=40.7041, longitude=-73.9871
+        ).save()
+
+        self.link = Link(
+            from_device=grand_device,
+            to_device=self.sector,
+            status=Link.LinkStatus.ACTIVE,
+            type=Link.LinkType.FIVE_GHZ_UNSPECIFIED,
+        )
+        self.link.save()
+        LOS(
+            from_building=self.grand_building, to_building=self.sn1_building, source=LOS.LOSSource.HUMAN_ANNOTATED
+        ).save()
+
+    def get_features(self, layer, **params):
+        response = self.c.get(f"/api/v1/geo/{layer}/", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/geo+json")
+        collection = json.loads(response.content)
+        self.assertEqual(collection["type"], "FeatureCollection")
+        return collection["features"]
+
+    def test_nodes(self):
+        features = self.get_features("nodes")
+        self.assertEqual([feature["properties"]["network_number"] for feature in features], [227, 1934])
+        self.assertEqual(features[1]["geometry"], {"type": "Point", "coordinates": [-74.0, 40.7]})
+        self.assertEqual(features[1]["properties"]["type"], "Hub")
+
+    def test_installs(self):
+        features = self.get_features("installs")
+        self.assertEqual([feature["properties"]["install_number"] for feature in features], [227, 1934])
+        self.assertEqual(
+            features[1]["properties"],
+            {"install_number": 1934, "status": "Active", "roof_access": True, "network_number": 1934, "altitude": 20},
+        )
+
+    def test_sectors_and_access_points(self):
+        sectors = self.get_features("sectors")
+        self.assertEqual(len(sectors), 1)
+        self.assertEqual(sectors[0]["geometry"]["coordinates"], [-73.987, 40.704])
+        self.assertEqual(sectors[0]["properties"]["azimuth"], 90)
+
+        access_points = self.get_features("accesspoints")
+        self.assertEqual(access_points[0]["geometry"]["coordinates"], [-73.9871, 40.7041])
+
+    def test_links_and_los(self):
+        links = self.get_features("links")
+        self.assertEqual(len(links), 1)
+        self.assertEqual(
+            links[0]["geometry"], {"type": "LineString", "coordinates": [[-74.0, 40.7], [-73.987, 40.704]]}
+        )
+        self.assertEqual((links[0]["properties"]["from"], links[0]["properties"]["to"]), (1934, 227))
+
+        self.assertEqual(len(self.get_features("los")), 1)
+
+    def test_bbox(self):
+        around_sn1 = "-73.99,40.703,-73.98,40.705"
+        self.assertEqual(
+            [feature["properties"]["network_number"] for feature in self.get_features("nodes", bbox=around_sn1)],
+            [227],
+        )
+        self.assertEqual(len(self.get_features("links", bbox=around_sn1)), 1)
+
+        # Between the two nodes, so neither end of the link is inside
+        between = "-73.995,40.701,-73.99,40.703"
+        self.assertEqual(self.get_features("nodes", bbox=between), [])
+        self.assertEqual(len(self.get_features("links", bbox=between)), 1)
+
+        self.assertEqual(self.get_features("links", bbox="-73.9,40.8,-73.8,40.9"), [])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.c.get("/api/v1/geo/members/").status_code, 404)
+        for bbox in ["1,2,3", "a,b,c,d", "-73,40,-74,41", "-200,40,-73,41"]:
+            response = self.c.get("/api/v1/geo/nodes/", {"bbox": bbox})
+            self.assertEqual(response.status_code, 400, bbox)
+
+    def test_parse_bbox(self):
+        self.assertEqual(parse_bbox("-74.1,40.5,-73.7,40.9"), BoundingBox(-74.1, 40.5, -73.7, 40.9))
+
+    def test_tile_bounds(self):
+        self.assertEqual(tile_bounds(0, 0, 0)[::2], (-180, 180))
+        self.assertAlmostEqual(tile_bounds(0, 0, 0).max_lat, 85.0511, places=4)
+
+        bounds = tile_bounds(12, 1206, 1540)
+        self.assertTrue(bounds.min_lon < -74.0 < bounds.max_lon and bounds.min_lat < 40.7 < bounds.max_lat)
+
+    def test_vector_tile(self):
+        response = self.c.get("/api/v1/geo/tiles/12/1206/1540.mvt")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/vnd.mapbox-vector-tile")
+
+        layers = decode_tile(response.content)
+        self.assertEqual(set(layers.keys()), {"nodes", "installs", "accesspoints", "sectors", "links", "los"})
+
+        grand = next(feature for feature in layers["nodes"] if feature[2]["network_number"] == 1934)
+        self.assertEqual(grand[0], 1)
+        self.assertEqual(grand[2]["type"], "Hub")
+        self.assertNotIn("altitude", grand[2])  # None values are left out
+        x, y = grand[1][0]
+        self.assertTrue(0 <= x < EXTENT and 0 <= y < EXTENT)
+
+        geometry_type, points, properties = layers["links"][0]
+        self.assertEqual(geometry_type, 2)
+        self.assertEqual(points[0], (x, y))
+        self.assertEqual(properties["status"], "Active")
+
+        install = next(feature for feature in layers["installs"] if feature[2]["install_number"] == 1934)
+        self.assertEqual(install[2]["altitude"], 20.0)
+        self.assertIs(install[2]["roof_access"], True)
+
+    def test_empty_and_invalid_tiles(self):
+        response = self.c.get("/api/v1/geo/tiles/12/0/0.mvt")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+
+        self.assertEqual(self.c.get("/api/v1/geo/tiles/2/4/0.mvt").status_code, 404)
+        self.assertEqual(self.c.get("/api/v1/geo/tiles/30/0/0.mvt").status_code, 404)
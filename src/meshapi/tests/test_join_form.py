@@ -1,23 +1,32 @@
 import copy
 import datetime
 import json
+import threading
 import time
 from unittest import mock
 from unittest.mock import ANY, patch
 
 import requests_mock
 from django.contrib.auth.models import User
+from django.db import connection
 from django.db.models import Q
 from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from flags.state import enable_flag
 from parameterized import parameterized
 
+from meshapi.exceptions import InvalidAddressError
 from meshapi.models import Building, Install, Member, Node
 from meshapi.views import JoinFormRequest
 
 from ..serializers import MemberSerializer
 from ..util.constants import RECAPTCHA_CHECKBOX_TOKEN_HEADER, RECAPTCHA_INVISIBLE_TOKEN_HEADER
-from ..validation import BUILDING_FOOTPRINTS_API, NYC_GEOSEARCH_API, NYCAddressInfo
+from ..validation import (
+    BUILDING_FOOTPRINTS_API,
+    NYC_GEOSEARCH_API,
+    RECAPTCHA_TOKEN_VALIDATION_URL,
+    NYCAddressInfo,
+)
 from .sample_data import sample_building, sample_node
 from .sample_join_form_data import (
     bronx_join_form_submission,
@@ -177,7 +186,7 @@ class TestJoinForm(TestCase):
                 },
             )
             self.assertContains(response, "Captcha verification failed", status_code=401)
-            mock_validate_captcha_tokens.assert_called_once_with(None, None, None)
+            mock_validate_captcha_tokens.assert_called_once_with(None, None, None, fail_all_invisible_recaptchas=False)
 
     @patch("meshapi.views.forms.validate_recaptcha_tokens")
     def test_valid_join_form_captcha_env_vars_not_configured(self, mock_validate_captcha_tokens):
@@ -194,6 +203,89 @@ class TestJoinForm(TestCase):
             response = self.c.post("/api/v1/join/", request, content_type="application/json")
             self.assertContains(response, "Captcha verification failed", status_code=401)
 
+    @patch("meshapi.views.forms.validate_email_address", return_value=True)
+    @patch("meshapi.views.forms.geocode_nyc_address")
+    @patch("meshapi.views.forms.validate_recaptcha_tokens")
+    def test_invalid_captcha_is_verified_alongside_validation(
+        self, mock_validate_captcha_tokens, mock_geocode, mock_validate_email
+    ):
+        request, _ = pull_apart_join_form_submission(valid_join_form_submission)
+        geocoding = threading.Event()
+        verified_while_geocoding = []
+
+        def geocode(street_address, city, state, zip_code):
+            geocoding.set()
+            return mock.Mock(spec=NYCAddressInfo, street_address=street_address, city=city)
+
+        def validate_captcha_tokens(*args, **kwargs):
+            verified_while_geocoding.append(geocoding.wait(timeout=5))
+            raise ValueError("Invalid recaptcha token")
+
+        mock_geocode.side_effect = geocode
+        mock_validate_captcha_tokens.side_effect = validate_captcha_tokens
+
+        with patch("meshapi.views.forms.DISABLE_RECAPTCHA_VALIDATION", False):
+            response = self.c.post("/api/v1/join/", request, content_type="application/json")
+
+        self.assertContains(response, "Captcha verification failed", status_code=401)
+        self.assertEqual(verified_while_geocoding, [True])
+        self.assertEqual(Member.objects.count(), 0)
+        self.assertEqual(Building.objects.count(), 0)
+        self.assertEqual(Install.objects.count(), 0)
+
+    @patch("meshapi.views.forms.validate_email_address", return_value=False)
+    @patch("meshapi.views.forms.validate_recaptcha_tokens", side_effect=ValueError)
+    def test_invalid_captcha_takes_precedence_over_invalid_form(
+        self, mock_validate_captcha_tokens, mock_validate_email
+    ):
+        request, _ = pull_apart_join_form_submission(valid_join_form_submission)
+
+        with patch("meshapi.views.forms.DISABLE_RECAPTCHA_VALIDATION", False):
+            response = self.c.post("/api/v1/join/", request, content_type="application/json")
+
+        self.assertContains(response, "Captcha verification failed", status_code=401)
+
+    @patch("meshapi.views.forms.validate_email_address", return_value=True)
+    @patch("meshapi.views.forms.geocode_nyc_address", side_effect=InvalidAddressError)
+    def test_server_timing_for_staff(self, mock_geocode, mock_validate_email):
+        request, _ = pull_apart_join_form_submission(valid_join_form_submission)
+
+        response = self.admin_c.post("/api/v1/join/", request, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        stages = [timing.split(";")[0] for timing in response["Server-Timing"].split(", ")]
+        self.assertEqual(stages[-1], "total")
+        self.assertIn("phone", stages)
+        self.assertIn("geocode", stages)
+        self.assertIn("email_wait", stages)
+
+        response = self.c.post("/api/v1/join/", request, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn("Server-Timing", response)
+
+    @patch("meshapi.views.forms.validate_email_address", return_value=True)
+    @patch("meshapi.views.forms.geocode_nyc_address")
+    @patch("meshapi.views.forms.validate_recaptcha_tokens")
+    def test_captcha_wait_timed_once(self, mock_validate_captcha_tokens, mock_geocode, mock_validate_email):
+        request, _ = pull_apart_join_form_submission(valid_join_form_submission)
+        mock_geocode.return_value = mock.Mock(
+            spec=NYCAddressInfo,
+            street_address=request["street_address"],
+            city=request["city"],
+            state="NY",
+            zip=10002,
+            bin=1077609,
+            latitude=40.716,
+            longitude=-73.985,
+            altitude=0.0,
+        )
+
+        with patch("meshapi.views.forms.DISABLE_RECAPTCHA_VALIDATION", False):
+            response = self.admin_c.post("/api/v1/join/", request, content_type="application/json")
+
+        self.assertEqual(response.status_code, 201, response.content.decode("utf-8"))
+        stages = [timing.split(";")[0] for timing in response["Server-Timing"].split(", ")]
+        self.assertEqual(stages.count("captcha_wait"), 1)
+
     @patch("meshapi.views.forms.validate_recaptcha_tokens")
     @patch("meshapi.views.forms.get_client_ip")
     def test_valid_join_form_captcha_valid(self, mock_get_client_ip, validate_captcha_tokens):
@@ -217,7 +309,37 @@ class TestJoinForm(TestCase):
             )
             self.assertEqual(response.status_code, 201)
             validate_successful_join_form_submission(self, "Valid Join Form", s, response)
-            validate_captcha_tokens.assert_called_once_with("mock_invisible_token", "mock_checkbox_token", "1.1.1.1")
+            validate_captcha_tokens.assert_called_once_with(
+                "mock_invisible_token", "mock_checkbox_token", "1.1.1.1", fail_all_invisible_recaptchas=False
+            )
+
+    @patch("meshapi.views.forms.validate_email_address", return_value=True)
+    @patch("meshapi.views.forms.geocode_nyc_address")
+    @patch("meshapi.validation.RECAPTCHA_SECRET_KEY_V2", "fake_secret_v2")
+    @patch("meshapi.validation.RECAPTCHA_SECRET_KEY_V3", "fake_secret_v3")
+    def test_valid_invisible_captcha_fails_with_flag_enabled(self, mock_geocode, mock_validate_email):
+        request, _ = pull_apart_join_form_submission(valid_join_form_submission)
+        mock_geocode.return_value = mock.Mock(
+            spec=NYCAddressInfo, street_address=request["street_address"], city=request["city"]
+        )
+        self.requests_mocker.post(RECAPTCHA_TOKEN_VALIDATION_URL, json={"success": True, "score": 0.9})
+        # Set inside the test's transaction, so only visible to the request thread
+        enable_flag("JOIN_FORM_FAIL_ALL_INVISIBLE_RECAPTCHAS")
+
+        with patch("meshapi.views.forms.DISABLE_RECAPTCHA_VALIDATION", False):
+            response = self.c.post(
+                "/api/v1/join/",
+                request,
+                content_type="application/json",
+                headers={RECAPTCHA_INVISIBLE_TOKEN_HEADER: "mock_invisible_token"},
+            )
+
+        self.assertContains(response, "Captcha verification failed", status_code=401)
+        self.assertEqual(
+            [r.url for r in self.requests_mocker.request_history if r.method == "POST"],
+            [RECAPTCHA_TOKEN_VALIDATION_URL],
+        )
+        self.assertEqual(Install.objects.count(), 0)
 
     @parameterized.expand(
         [
@@ -1309,6 +1431,66 @@ class TestJoinForm(TestCase):
         self.assertEqual(install.building.id, building.id)
         self.assertEqual(install.node.network_number, node.network_number)
 
+    def resubmission_queries(self, mock_geocode, house_number, bin, structure_size):
+        """
+        Submits the join form for a building whose structure has structure_size other buildings in it, each
+        with nodes of their own, then submits it again. Returns the queries made by the second submission
+        """
+        mock_geocode.return_value = mock.Mock(
+            spec=NYCAddressInfo,
+            street_address=f"{house_number} Broome Street",
+            city="New York",
+            state="NY",
+            zip=10002,
+            bin=bin,
+            latitude=40.716,
+            longitude=-73.985,
+            altitude=0.0,
+        )
+        request, _ = pull_apart_join_form_submission(valid_join_form_submission)
+        request["street_address"] = f"{house_number} Broome Street"
+        request["email_address"] = f"member{bin}@example.com"
+
+        nodes = []
+        for i in range(structure_size):
+            primary_node = Node(**sample_node, network_number=bin % 1000 + 2 * i)
+            primary_node.save()
+            other_node = Node(**sample_node, network_number=bin % 1000 + 2 * i + 1)
+            other_node.save()
+            nodes += [primary_node, other_node]
+
+            building = Building(
+                **{**sample_building, "bin": bin, "street_address": f"{house_number + 2 + 2 * i} Broome Street"},
+                primary_node=primary_node,
+            )
+            building.save()
+            building.nodes.add(primary_node, other_node)
+
+        response = self.c.post("/api/v1/join/", request, content_type="application/json")
+        self.assertEqual(201, response.status_code, response.content.decode("utf-8"))
+        install = Install.objects.get(install_number=response.json()["install_number"])
+        self.assertEqual(set(install.building.nodes.all()), set(nodes))
+        self.assertIn(install.node, nodes)
+
+        # Submitting it again finds the same install without writing anything
+        with CaptureQueriesContext(connection) as queries:
+            response = self.c.post("/api/v1/join/", request, content_type="application/json")
+        self.assertEqual(200, response.status_code, response.content.decode("utf-8"))
+        self.assertEqual(response.json()["install_number"], install.install_number)
+        self.assertEqual(response.json()["install_id"], str(install.id))
+        return queries
+
+    @patch("meshapi.views.forms.validate_email_address", return_value=True)
+    @patch("meshapi.views.forms.geocode_nyc_address")
+    def test_dedup_queries_do_not_grow_with_structure(self, mock_geocode, mock_validate_email):
+        small_structure = self.resubmission_queries(mock_geocode, 151, 1077609, structure_size=1)
+        large_structure = self.resubmission_queries(mock_geocode, 351, 1077700, structure_size=5)
+
+        # Apart from the flags and the join form lock, that's one query for the member and a single query for
+        # the whole structure, however many buildings it has
+        self.assertEqual(len(small_structure), 5, [query["sql"] for query in small_structure.captured_queries])
+        self.assertEqual(len(large_structure), 5, [query["sql"] for query in large_structure.captured_queries])
+
 
 @patch("meshapi.views.forms.DISABLE_RECAPTCHA_VALIDATION", True)
 class TestJoinFormInstallEventHooks(TestCase):
@@ -0,0 +1,130 @@
+import dataclasses
+import datetime
+from unittest.mock import patch
+
+from django.test import TestCase
+from moto import mock_aws
+
+from meshapi.management.commands import replay_join_records
+from meshapi.models import JoinRecordEntry
+from meshapi.tests.sample_join_records import (
+    MOCK_JOIN_RECORD_PREFIX,
+    basic_sample_post_submission_join_records,
+    basic_sample_pre_submission_join_records,
+)
+from meshapi.util.join_records import (
+    JOIN_RECORD_BUCKET_NAME,
+    JoinRecordProcessor,
+    SubmissionStage,
+    entry_to_join_record,
+    exclude_irrelevant_records,
+    get_consistent_join_records,
+)
+
+
+@mock_aws
+@patch("meshapi.util.join_records.JOIN_RECORD_PREFIX", MOCK_JOIN_RECORD_PREFIX)
+class TestJoinRecordProcessorScan(TestCase):
+    p = JoinRecordProcessor()
+
+    def setUp(self) -> None:
+        self.p.s3_client.create_bucket(Bucket=JOIN_RECORD_BUCKET_NAME)
+        self.p.flush_test_data()
+
+        for key, record in basic_sample_post_submission_join_records.items():
+            self.p.upload(record, key)
+
+    def tearDown(self) -> None:
+        self.p.flush_test_data()
+
+    @patch("meshapi.util.join_records.JOIN_RECORD_LIST_PAGE_SIZE", 2)
+    def test_get_all_reads_every_page(self):
+        records = self.p.get_all()
+
+        self.assertEqual(len(records), len(basic_sample_post_submission_join_records))
+        # In key (i.e. submission time) order
+        self.assertEqual(records, list(basic_sample_post_submission_join_records.values()))
+
+    def test_get_all_only_fetches_new_records(self):
+        self.p.get_all()
+
+        with patch.object(self.p.s3_client, "get_object", wraps=self.p.s3_client.get_object) as get_object:
+            records = self.p.get_all()
+            get_object.assert_not_called()
+
+            # Modifying the records we get back doesn't affect anybody else's
+            records[0].replayed += 1
+            self.assertEqual(self.p.get_all()[0].replayed, records[0].replayed - 1)
+
+            # Uploading a record again changes its ETag, so we have to fetch it again
+            replayed = dataclasses.replace(records[0], code="201", install_number=1234)
+            self.p.upload(replayed, JoinRecordProcessor.get_key(replayed, SubmissionStage.POST))
+            records = self.p.get_all()
+
+        get_object.assert_called_once()
+        self.assertEqual(records[0].install_number, 1234)
+
+
+@mock_aws
+@patch("meshapi.util.join_records.JOIN_RECORD_PREFIX", MOCK_JOIN_RECORD_PREFIX)
+class TestJoinRecordIndex(TestCase):
+    p = JoinRecordProcessor()
+
+    def setUp(self) -> None:
+        self.p.s3_client.create_bucket(Bucket=JOIN_RECORD_BUCKET_NAME)
+        self.p.flush_test_data()
+
+        for key, record in basic_sample_pre_submission_join_records.items():
+            self.p.upload(record, key)
+
+        for key, record in basic_sample_post_submission_join_records.items():
+            self.p.upload(record, key)
+
+    def tearDown(self) -> None:
+        self.p.flush_test_data()
+
+    def test_upload_indexes_records(self):
+        self.assertEqual(
+            JoinRecordEntry.objects.count(),
+            len(basic_sample_pre_submission_join_records) + len(basic_sample_post_submission_join_records),
+        )
+        for key, record in basic_sample_post_submission_join_records.items():
+            entry = JoinRecordEntry.objects.get(key=key)
+            self.assertEqual(entry.stage, JoinRecordEntry.Stage.POST)
+            self.assertEqual(entry.install_number, record.install_number)
+            self.assertEqual(entry_to_join_record(entry), record)
+
+    def test_consistent_records_match_s3(self):
+        since = datetime.datetime(2024, 10, 1, tzinfo=datetime.timezone.utc)
+        expected = self.p.ensure_pre_post_consistency(since)
+        entries = list(get_consistent_join_records(since))
+
+        self.assertEqual(sorted(entry.uuid for entry in entries), sorted(expected.keys()))
+        for entry in entries:
+            self.assertEqual(entry_to_join_record(entry), expected[entry.uuid])
+
+        relevant = {
+            uuid
+            for uuid, record in expected.items()
+            if not replay_join_records.Command.filter_irrelevant_record(record)
+        }
+        self.assertEqual(
+            {entry.uuid for entry in exclude_irrelevant_records(get_consistent_join_records(since))}, relevant
+        )
+
+    def test_sync_index(self):
+        JoinRecordEntry.objects.all().delete()
+
+        self.assertEqual(
+            self.p.sync_index(),
+            len(basic_sample_pre_submission_join_records) + len(basic_sample_post_submission_join_records),
+        )
+        self.assertEqual(
+            JoinRecordEntry.objects.filter(stage=JoinRecordEntry.Stage.PRE).count(),
+            len(basic_sample_pre_submission_join_records),
+        )
+
+        # Nothing has changed since
+        with patch.object(self.p.s3_client, "get_object") as get_object:
+            self.assertEqual(self.p.sync_index(), 0)
+            get_object.assert_not_called()
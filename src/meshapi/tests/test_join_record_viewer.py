@@ -1,10 +1,14 @@
+import dataclasses
+import json
 import logging
+from datetime import datetime, timezone
 from unittest.mock import patch
 
 from botocore.exceptions import ClientError
 from bs4 import BeautifulSoup
 from django.contrib.auth.models import User
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
 from moto import mock_aws
 
 from meshapi.tests.sample_join_records import (
@@ -12,7 +16,12 @@ from meshapi.tests.sample_join_records import (
     basic_sample_post_submission_join_records,
     basic_sample_pre_submission_join_records,
 )
-from meshapi.util.join_records import JOIN_RECORD_BUCKET_NAME, JoinRecordProcessor
+from meshapi.util.join_records import (
+    JOIN_RECORD_BUCKET_NAME,
+    JOIN_RECORD_INDEX_SYNCED_CACHE_KEY,
+    JoinRecordProcessor,
+    SubmissionStage,
+)
 
 
 @mock_aws
@@ -45,9 +54,9 @@ class TestJoinRecordViewer(TestCase):
     def test_view_join_records_client_error(
         self,
     ):
-        with patch("meshapi.util.join_records.JoinRecordProcessor.ensure_pre_post_consistency") as mock_jrp:
+        with patch("meshapi.util.join_records.JoinRecordProcessor.sync_index") as mock_jrp:
             mock_jrp.side_effect = ClientError({"error": "Chom"}, operation_name="Skz")
-            response = self.c.get("/join-records/view/?since=2024-09-30T00:00:00")
+            response = self.c.get("/join-records/view/?since=2024-09-30T00:00:00&refresh=True")
             self.assertEqual(503, response.status_code)
 
     def test_view_join_records_unauthenticated(self):
@@ -94,3 +103,69 @@ class TestJoinRecordViewer(TestCase):
             logging.info(v.uuid)
             record_row = soup.find(id=v.uuid)
             self.assertIsNotNone(record_row)
+
+    @patch("meshweb.views.join_record_viewer.JOIN_RECORD_VIEWER_PAGE_SIZE", 2)
+    def test_view_join_records_pages(self):
+        response = self.c.get("/join-records/view/?since=2024-09-30T00:00:00&all=True&page=2")
+        self.assertEqual(200, response.status_code)
+
+        soup = BeautifulSoup(response.content.decode(), "html.parser")
+        self.assertEqual(len(soup.find(id="record_table").find_all("tr")), 3)  # Including the header
+        self.assertIn("Page 2 of", response.content.decode())
+
+    def put_record_directly(self, uuid, submission_time):
+        # As the join form does, which writes to S3 directly rather than through MeshDB
+        record = dataclasses.replace(
+            next(iter(basic_sample_post_submission_join_records.values())),
+            uuid=uuid,
+            submission_time=submission_time,
+            code="500",
+            install_number=None,
+        )
+        self.p.s3_client.put_object(
+            Bucket=JOIN_RECORD_BUCKET_NAME,
+            Key=JoinRecordProcessor.get_key(record, SubmissionStage.POST),
+            Body=json.dumps(dataclasses.asdict(record)),
+        )
+        return record
+
+    def shows(self, response, record):
+        return BeautifulSoup(response.content.decode(), "html.parser").find(id=record.uuid) is not None
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_view_join_records_refresh(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        # The index hasn't been synced, so the viewer does it
+        response = self.c.get("/join-records/view/?since=2024-09-30T00:00:00")
+        self.assertEqual(200, response.status_code)
+
+        # Having just been synced, the index is used as it is
+        record = self.put_record_directly("9b5c1a3e-77aa-4a1f-9d5e-3f2b1c0d4e5f", "2024-10-31T10:00:00")
+        response = self.c.get("/join-records/view/?since=2024-09-30T00:00:00")
+        self.assertFalse(self.shows(response, record))
+
+        response = self.c.get("/join-records/view/?since=2024-09-30T00:00:00&refresh=True")
+        self.assertTrue(self.shows(response, record))
+
+        # Until it gets too old
+        record = self.put_record_directly("9b5c1a3e-88aa-4a1f-9d5e-3f2b1c0d4e5f", "2024-10-31T11:00:00")
+        cache.delete(JOIN_RECORD_INDEX_SYNCED_CACHE_KEY)
+        response = self.c.get("/join-records/view/?since=2024-09-30T00:00:00")
+        self.assertTrue(self.shows(response, record))
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_view_join_records_syncs_older_window(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        # e.g. by meshapi.tasks.run_sync_join_records, which only syncs the last week
+        self.p.sync_index(datetime(2024, 10, 24, tzinfo=timezone.utc))
+        record = self.put_record_directly("9b5c1a3e-99aa-4a1f-9d5e-3f2b1c0d4e5f", "2024-10-01T10:00:00")
+
+        response = self.c.get("/join-records/view/?since=2024-10-24T00:00:00")
+        self.assertFalse(self.shows(response, record))
+
+        response = self.c.get("/join-records/view/?since=2024-09-30T00:00:00")
+        self.assertTrue(self.shows(response, record))
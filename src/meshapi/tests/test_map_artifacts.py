@@ -0,0 +1,159 @@
+import gzip
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from meshapi.models import Building, Install, Member
+from meshapi.tasks import run_build_map_artifacts
+from meshapi.util.events.map_artifacts import BUILD_SCHEDULED_KEY
+from meshapi.util.map_artifacts import ARTIFACT_URL_NAMES, build_map_artifacts, get_current_artifact_hash
+
+from .sample_data import sample_building, sample_install, sample_member
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestMapArtifacts(TestCase):
+    c = Client()
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.building = Building(**sample_building)
+        self.building.save()
+        self.member = Member(**sample_member)
+        self.member.save()
+        self.install = Install(**sample_install, building=self.building, member=self.member)
+        self.install.save()
+
+    def test_build(self):
+        hashes = build_map_artifacts()
+        self.assertEqual(set(hashes.keys()), set(ARTIFACT_URL_NAMES))
+        for url_name, content_hash in hashes.items():
+            self.assertEqual(get_current_artifact_hash(url_name), content_hash)
+
+    def test_serves_gzipped_artifact(self):
+        uncompressed = self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="application/json")
+        build_map_artifacts()
+
+        with mock.patch("meshapi.views.map.MapDataNodeList.get_queryset") as get_queryset:
+            response = self.c.get(
+                "/api/v1/mapdata/nodes/", HTTP_ACCEPT="application/json", HTTP_ACCEPT_ENCODING="gzip, br"
+            )
+        get_queryset.assert_not_called()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), uncompressed.content)
+
+    def test_serves_identity_artifact(self):
+        build_map_artifacts()
+        response = self.c.get("/api/v1/geography/whole-mesh.kml")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertTrue(response["Content-Type"].startswith("application/vnd.google-earth.kml+xml"))
+        self.assertIn(b"<kml", response.content)
+
+    def test_etag(self):
+        build_map_artifacts()
+        first = self.c.get("/api/v1/mapdata/links/", HTTP_ACCEPT="application/json", HTTP_ACCEPT_ENCODING="gzip")
+        plain = self.c.get("/api/v1/mapdata/links/", HTTP_ACCEPT="application/json")
+        self.assertNotEqual(first["ETag"], plain["ETag"])
+
+        second = self.c.get(
+            "/api/v1/mapdata/links/",
+            HTTP_ACCEPT="application/json",
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=first["ETag"],
+        )
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b"")
+
+    def test_hashed_url(self):
+        build_map_artifacts()
+        canonical = self.c.get("/api/v1/mapdata/sectors/", HTTP_ACCEPT="application/json")
+        self.assertEqual(canonical["Cache-Control"], "public, max-age=60")
+
+        hashed = self.c.get(canonical["Content-Location"])
+        self.assertEqual(hashed.status_code, 200)
+        self.assertEqual(hashed.content, canonical.content)
+        self.assertIn("immutable", hashed["Cache-Control"])
+
+        self.assertEqual(self.c.get("/api/v1/mapdata/artifacts/0123abcd").status_code, 404)
+
+    def test_falls_back_to_view_without_artifact(self):
+        response = self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Content-Location"))
+        self.assertEqual({node["id"] for node in json.loads(response.content)}, {self.install.install_number})
+
+    def test_browsable_api_not_served_from_artifact(self):
+        build_map_artifacts()
+        response = self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="text/html")
+        self.assertTrue(response["Content-Type"].startswith("text/html"))
+
+    def test_query_string_not_served_from_artifact(self):
+        build_map_artifacts()
+        response = self.c.get("/api/v1/mapdata/nodes/?format=json")
+        self.assertFalse(response.has_header("Content-Location"))
+
+    def test_change_clears_current_artifacts(self):
+        build_map_artifacts()
+
+        install = Install(**{**sample_install, "install_number": 4567}, building=self.building, member=self.member)
+        with self.captureOnCommitCallbacks(execute=True):
+            install.save()
+        for url_name in ARTIFACT_URL_NAMES:
+            self.assertIsNone(get_current_artifact_hash(url_name))
+
+        response = self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="application/json")
+        self.assertEqual({node["id"] for node in json.loads(response.content)}, {self.install.install_number, 4567})
+
+    @mock.patch("meshapi.tasks.run_build_map_artifacts.apply_async")
+    def test_change_schedules_one_build(self, apply_async):
+        with mock.patch("meshapi.util.events.map_artifacts.flag_enabled", return_value=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.building.notes = "Some notes"
+                self.building.save()
+                self.install.notes = "Some notes"
+                self.install.save()
+                self.member.notes = "Not part of the map"
+                self.member.save()
+
+        apply_async.assert_called_once_with(countdown=30)
+
+    @mock.patch("meshapi.tasks.run_build_map_artifacts.apply_async")
+    def test_uncommitted_change_does_nothing(self, apply_async):
+        build_map_artifacts()
+
+        with mock.patch("meshapi.util.events.map_artifacts.flag_enabled", return_value=True):
+            # e.g. because the transaction is rolled back
+            with self.captureOnCommitCallbacks(execute=False):
+                self.building.notes = "Some notes"
+                self.building.save()
+
+        for url_name in ARTIFACT_URL_NAMES:
+            self.assertIsNotNone(get_current_artifact_hash(url_name))
+        self.assertIsNone(cache.get(BUILD_SCHEDULED_KEY))
+        apply_async.assert_not_called()
+
+    @mock.patch("meshapi.tasks.run_build_map_artifacts.apply_async")
+    def test_change_with_flag_disabled_does_not_schedule_build(self, apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.building.notes = "Some notes"
+            self.building.save()
+
+        apply_async.assert_not_called()
+
+    @mock.patch("meshapi.tasks.build_map_artifacts")
+    def test_task(self, build):
+        with mock.patch("meshapi.util.django_flag_decorator.flag_state", return_value=True):
+            run_build_map_artifacts()
+        build.assert_called_once()
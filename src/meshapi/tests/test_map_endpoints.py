@@ -3,13 +3,22 @@ import json
 import uuid
 from unittest.mock import patch
 
+import requests
 import requests_mock
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from flags.state import enable_flag
 
 from meshapi.models import LOS, AccessPoint, Building, Device, Install, Link, Member, Node, Sector
 from meshapi.serializers import JavascriptDateField, JavascriptDatetimeField, MapDataLinkSerializer
+from meshapi.tasks import run_refresh_linknyc_kiosks
 from meshapi.tests.sample_kiosk_data import SAMPLE_OPENDATA_NYC_LINKNYC_KIOSK_RESPONSE
-from meshapi.views import LINKNYC_KIOSK_DATA_URL
+from meshapi.util.linknyc_kiosks import (
+    KIOSK_SNAPSHOT_CACHE_KEY,
+    KIOSK_SNAPSHOT_MAX_AGE_SECONDS,
+    LINKNYC_KIOSK_DATA_URL,
+    refresh_executor,
+)
 
 
 class TestViewsGetUnauthenticated(TestCase):
@@ -1840,6 +1849,124 @@ class TestKiosk(TestCase):
             )
 
 
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TestKioskSnapshot(TestCase):
+    c = Client()
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def expire_snapshot(self):
+        snapshot = cache.get(KIOSK_SNAPSHOT_CACHE_KEY)
+        snapshot["fetched_at"] -= KIOSK_SNAPSHOT_MAX_AGE_SECONDS + 1
+        cache.set(KIOSK_SNAPSHOT_CACHE_KEY, snapshot)
+
+    def wait_for_refresh(self):
+        # The executor has a single thread, so this runs after any refresh already submitted to it
+        refresh_executor.submit(lambda: None).result()
+
+    @requests_mock.Mocker()
+    def test_kiosks_served_from_snapshot(self, city_api_call_request_mocker):
+        city_api_call_request_mocker.get(LINKNYC_KIOSK_DATA_URL, json=SAMPLE_OPENDATA_NYC_LINKNYC_KIOSK_RESPONSE)
+
+        first = self.c.get("/api/v1/mapdata/kiosks/")
+        second = self.c.get("/api/v1/mapdata/kiosks/")
+        self.assertEqual(city_api_call_request_mocker.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(len(json.loads(second.content.decode("UTF8"))), 7)
+
+    @requests_mock.Mocker()
+    def test_kiosks_etag(self, city_api_call_request_mocker):
+        city_api_call_request_mocker.get(LINKNYC_KIOSK_DATA_URL, json=SAMPLE_OPENDATA_NYC_LINKNYC_KIOSK_RESPONSE)
+
+        response = self.c.get("/api/v1/mapdata/kiosks/")
+        etag = response["ETag"]
+
+        response = self.c.get("/api/v1/mapdata/kiosks/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        response = self.c.get("/api/v1/mapdata/kiosks/", HTTP_IF_NONE_MATCH='"something-else"')
+        self.assertEqual(response.status_code, 200)
+
+    @requests_mock.Mocker()
+    def test_kiosks_conditional_refresh(self, city_api_call_request_mocker):
+        city_api_call_request_mocker.get(
+            LINKNYC_KIOSK_DATA_URL,
+            json=SAMPLE_OPENDATA_NYC_LINKNYC_KIOSK_RESPONSE,
+            headers={"ETag": '"city-etag"', "Last-Modified": "Mon, 02 Mar 2026 00:00:00 GMT"},
+        )
+        first = self.c.get("/api/v1/mapdata/kiosks/")
+
+        self.expire_snapshot()
+        city_api_call_request_mocker.get(LINKNYC_KIOSK_DATA_URL, status_code=304)
+        second = self.c.get("/api/v1/mapdata/kiosks/")
+        self.wait_for_refresh()
+
+        request = city_api_call_request_mocker.last_request
+        self.assertEqual(request.headers["If-None-Match"], '"city-etag"')
+        self.assertEqual(request.headers["If-Modified-Since"], "Mon, 02 Mar 2026 00:00:00 GMT")
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.content, second.content)
+
+        # The refresh is recorded, so the next request doesn't start another one
+        self.c.get("/api/v1/mapdata/kiosks/")
+        self.wait_for_refresh()
+        self.assertEqual(city_api_call_request_mocker.call_count, 2)
+
+    @requests_mock.Mocker()
+    def test_kiosks_last_good_copy_when_city_down(self, city_api_call_request_mocker):
+        city_api_call_request_mocker.get(LINKNYC_KIOSK_DATA_URL, json=SAMPLE_OPENDATA_NYC_LINKNYC_KIOSK_RESPONSE)
+        first = self.c.get("/api/v1/mapdata/kiosks/")
+
+        self.expire_snapshot()
+        city_api_call_request_mocker.get(LINKNYC_KIOSK_DATA_URL, status_code=500)
+        with self.assertLogs(level="ERROR"):
+            second = self.c.get("/api/v1/mapdata/kiosks/")
+            self.wait_for_refresh()
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.content, second.content)
+
+        # Having just failed, the city isn't tried again for a while
+        third = self.c.get("/api/v1/mapdata/kiosks/")
+        self.wait_for_refresh()
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(first.content, third.content)
+        self.assertEqual(city_api_call_request_mocker.call_count, 2)
+
+    @requests_mock.Mocker()
+    def test_kiosks_not_fetched_again_after_failure_without_snapshot(self, city_api_call_request_mocker):
+        city_api_call_request_mocker.get(LINKNYC_KIOSK_DATA_URL, status_code=500)
+        with self.assertLogs(level="ERROR"):
+            first = self.c.get("/api/v1/mapdata/kiosks/")
+            second = self.c.get("/api/v1/mapdata/kiosks/")
+
+        self.assertEqual(first.status_code, 502)
+        self.assertEqual(second.status_code, 502)
+        self.assertEqual(city_api_call_request_mocker.call_count, 1)
+
+    @requests_mock.Mocker()
+    def test_refresh_task(self, city_api_call_request_mocker):
+        city_api_call_request_mocker.get(LINKNYC_KIOSK_DATA_URL, json=SAMPLE_OPENDATA_NYC_LINKNYC_KIOSK_RESPONSE)
+        run_refresh_linknyc_kiosks()
+        self.assertEqual(city_api_call_request_mocker.call_count, 0)
+        self.assertIsNone(cache.get(KIOSK_SNAPSHOT_CACHE_KEY))
+
+        enable_flag("TASK_ENABLED_REFRESH_LINKNYC_KIOSKS")
+        run_refresh_linknyc_kiosks()
+
+        response = self.c.get("/api/v1/mapdata/kiosks/")
+        self.assertEqual(city_api_call_request_mocker.call_count, 1)
+        self.assertEqual(len(json.loads(response.content.decode("UTF8"))), 7)
+
+        city_api_call_request_mocker.get(LINKNYC_KIOSK_DATA_URL, status_code=500)
+        with self.assertRaises(requests.exceptions.HTTPError), self.assertLogs(level="ERROR"):
+            run_refresh_linknyc_kiosks()
+        self.assertEqual(len(cache.get(KIOSK_SNAPSHOT_CACHE_KEY)["kiosks"]), 7)
+
+
 class TestNodeWithoutInstallDoesntCrash(TestCase):
     def test_node_without_install(self):
         node = Node(
@@ -0,0 +1,140 @@
+import json
+from unittest.mock import patch
+
+import requests_mock
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+from flags.state import disable_flag, enable_flag
+
+from meshapi.models import Building, Install, Member, Node
+from meshapi.util.node_candidates import find_candidate_nodes, format_candidate_node
+
+from .sample_data import sample_building, sample_install, sample_member
+
+
+class TestNodeCandidates(TestCase):
+    def setUp(self):
+        # A new install near the Grand St hub, with the Dumbo supernode a little further away
+        self.building = Building(**{**sample_building, "latitude": 40.7155, "longitude": -73.984, "altitude": 20})
+        self.building.save()
+        self.member = Member(**sample_member)
+        self.member.save()
+
+        # The candidates are only rebuilt once the nodes are committed
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grand = Node(
+                network_number=1934,
+                status=Node.NodeStatus.ACTIVE,
+                type=Node.NodeType.HUB,
+                latitude=40.715,
+                longitude=-73.983,
+                altitude=50,
+            )
+            self.grand.save()
+            self.sn1 = Node(
+                network_number=227,
+                status=Node.NodeStatus.ACTIVE,
+                type=Node.NodeType.SUPERNODE,
+                latitude=40.704,
+                longitude=-73.987,
+            )
+            self.sn1.save()
+
+            # Neither of these are candidates
+            Node(
+                network_number=100,
+                status=Node.NodeStatus.ACTIVE,
+                type=Node.NodeType.STANDARD,
+                latitude=40.7155,
+                longitude=-73.984,
+            ).save()
+            Node(
+                network_number=101,
+                status=Node.NodeStatus.INACTIVE,
+                type=Node.NodeType.HUB,
+                latitude=40.7155,
+                longitude=-73.984,
+            ).save()
+
+    def create_install(self):
+        install = Install(**{**sample_install, "building": self.building, "member": self.member})
+        install.save()
+        return install
+
+    def test_find_candidate_nodes(self):
+        candidates = find_candidate_nodes(self.building)
+        self.assertEqual([candidate["network_number"] for candidate in candidates], [1934, 227])
+        self.assertEqual(candidates[0]["type"], "Hub")
+        self.assertEqual(candidates[0]["node_id"], str(self.grand.id))
+        self.assertAlmostEqual(candidates[0]["distance_km"], 0.1, places=1)
+        self.assertEqual(candidates[0]["altitude_delta_m"], 30)
+        self.assertIsNone(candidates[1]["altitude_delta_m"])
+
+        self.assertEqual(len(find_candidate_nodes(self.building, k=1)), 1)
+
+    def test_candidates_follow_node_changes(self):
+        self.assertEqual(len(find_candidate_nodes(self.building)), 2)
+        self.sn1.status = Node.NodeStatus.INACTIVE
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sn1.save()
+        self.assertEqual([candidate["network_number"] for candidate in find_candidate_nodes(self.building)], [1934])
+
+    def test_no_candidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Node.objects.filter(type__in=[Node.NodeType.HUB, Node.NodeType.SUPERNODE]).delete()
+        self.assertEqual(find_candidate_nodes(self.building), [])
+        self.assertEqual(self.create_install().candidate_nodes, [])
+
+    def test_attached_to_new_install(self):
+        install = self.create_install()
+        install.refresh_from_db()
+        self.assertEqual([candidate["network_number"] for candidate in install.candidate_nodes], [1934, 227])
+        self.assertEqual(install.history.count(), 1)
+
+    def test_not_recomputed_on_update(self):
+        install = self.create_install()
+        with patch("meshapi.util.events.candidate_nodes.attach_candidate_nodes") as attach:
+            install.notes = "Some notes"
+            install.save()
+        attach.assert_not_called()
+
+    def test_failure_does_not_block_install(self):
+        with patch("meshapi.util.events.candidate_nodes.attach_candidate_nodes", side_effect=ValueError("oops")):
+            with self.assertLogs(level="ERROR"):
+                install = self.create_install()
+        self.assertTrue(Install.objects.filter(pk=install.pk).exists())
+
+    def test_format(self):
+        self.assertEqual(format_candidate_node(find_candidate_nodes(self.building)[0]), "NN1934 (Hub) 0.1 km, +30 m")
+
+    @patch(
+        "meshapi.util.events.join_requests_slack_channel.SLACK_JOIN_REQUESTS_CHANNEL_WEBHOOK_URL",
+        "http://example.com/test-url",
+    )
+    @requests_mock.Mocker()
+    def test_slack_message(self, request_mocker):
+        request_mocker.post("http://example.com/test-url", text="data")
+        enable_flag("INTEGRATION_ENABLED_SEND_JOIN_REQUEST_SLACK_MESSAGES")
+        disable_flag("INTEGRATION_ENABLED_CREATE_OSTICKET_TICKETS")
+
+        install = self.create_install()
+
+        self.assertEqual(
+            json.loads(request_mocker.request_history[0].text),
+            {
+                "text": f"*<https://www.nycmesh.net/map/nodes/{install.install_number}"
+                f"|3333 Chom St, Brooklyn NY, 11111>*\n"
+                f"20m · Roof access · No LoS Data Available\n"
+                f"Nearby: NN1934 (Hub) 0.1 km, +30 m · NN227 (Supernode) 1.3 km"
+            },
+        )
+
+    def test_admin_change_view(self):
+        install = self.create_install()
+        admin = User.objects.create_superuser(username="admin", password="admin_password", email="admin@example.com")
+        client = Client()
+        client.force_login(admin)
+
+        response = client.get(f"/admin/meshapi/install/{install.id}/change/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "<div>NN1934 (Hub) 0.1 km, +30 m</div>", html=True)
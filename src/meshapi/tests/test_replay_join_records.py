@@ -1,10 +1,13 @@
 import json
+from dataclasses import replace
 from datetime import datetime, timedelta, timezone
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
+from botocore.exceptions import ClientError
 from django.core import management
 from django.test import TestCase
 from moto import mock_aws
+from rest_framework.response import Response
 
 from meshapi.exceptions import InvalidAddressError
 from meshapi.models.install import Install
@@ -15,6 +18,12 @@ from meshapi.tests.sample_join_records import (
     sample_dont_replay_join_records_post,
     sample_dont_replay_join_records_pre,
 )
+from meshapi.util.join_record_replay import (
+    EMAIL_SECONDS_ESTIMATE,
+    GEOCODE_SECONDS_ESTIMATE,
+    SUBMISSION_SECONDS_ESTIMATE,
+    JoinRecordReplayer,
+)
 from meshapi.util.join_records import (
     JOIN_RECORD_BUCKET_NAME,
     JoinRecord,
@@ -176,24 +185,25 @@ class TestReplayJoinRecords(TestCase):
             raise e
 
     @patch("meshapi.management.commands.replay_join_records.Command.past_week")
-    @patch("meshapi.views.forms.geocode_nyc_address")
+    @patch("meshapi.util.join_record_replay.geocode_nyc_address")
     def test_replay_join_records_with_write(self, mock_geocode_func, past_week_function):
         # Pretend that it's halloween
         halloween_minus_one_week = datetime(2024, 10, 31, 8, 0, 0, 0, tzinfo=timezone.utc) - timedelta(days=7)
         past_week_function.return_value = halloween_minus_one_week
 
-        # Mock return variables from Geocode API
-        mock_geocode_func.side_effect = [
-            NYCAddressInfo("197 Prospect Place", "Brooklyn", "NY", "11238"),
-            InvalidAddressError("NJ not allowed yet!"),
-            NYCAddressInfo("99 Kane Street", "Brooklyn", "NY", "11231"),
-            # These next two are both for the 4th join record (Rachel Doe) that got 409'ed
-            NYCAddressInfo("99 Kane Street", "Brooklyn", "NY", "11231"),
-            NYCAddressInfo("99 Kane Street", "Brooklyn", "NY", "11231"),
-        ]
+        # Mock return variables from Geocode API. Each address is only looked up once, so these are by
+        # address rather than in order
+        def geocode(street_address, city, state, zip_code):
+            if zip_code == "07030":
+                raise InvalidAddressError("NJ not allowed yet!")
+            if street_address == "197 Prospect Place":
+                return NYCAddressInfo("197 Prospect Place", "Brooklyn", "NY", "11238")
+            return NYCAddressInfo("99 Kane Street", "Brooklyn", "NY", "11231")
+
+        mock_geocode_func.side_effect = geocode
 
         # Replay the records (this should get from the last week (halloween -7 days))
-        management.call_command("replay_join_records", "--noinput", "--write")
+        management.call_command("replay_join_records", "--noinput", "--write", "--workers", "1")
 
         records = self.p.get_all(submission_prefix=SubmissionStage.POST)
 
@@ -354,7 +364,7 @@ class TestDontReplayJoinRecords(TestCase):
         # Force user input to skip
         mocked_input.side_effect = ["yes", "reject"]
 
-        management.call_command("replay_join_records", "--write")
+        management.call_command("replay_join_records", "--write", "--workers", "1")
 
         records = self.p.get_all(submission_prefix=SubmissionStage.POST)
 
@@ -372,3 +382,119 @@ class TestDontReplayJoinRecords(TestCase):
         self.assertEqual(True, r.trust_me_bro, "Trust me bro should have been true.")
         install = Install.objects.get(install_number=r.install_number)
         self.assertEqual("Rachel Doe", install.member.name, "Did not get expected name for submitted install.")
+
+
+def make_join_record(uuid: str, street_address: str, submission_time: str) -> JoinRecord:
+    record = basic_sample_pre_submission_join_records[f"{MOCK_JOIN_RECORD_PREFIX}/v3/pre/2024/10/28/12/34/56/ec7b.json"]
+    return replace(record, uuid=uuid, street_address=street_address, submission_time=submission_time)
+
+
+def mock_geocode(street_address, city, state, zip_code):
+    info = Mock(spec=NYCAddressInfo)
+    info.street_address = "99 Kane Street" if "kane" in street_address.lower() else street_address
+    info.city, info.state, info.zip = city, state, zip_code
+    return info
+
+
+@mock_aws
+@patch("meshapi.util.join_records.JOIN_RECORD_PREFIX", MOCK_JOIN_RECORD_PREFIX)
+@patch("meshapi.util.join_record_replay.geocode_nyc_address", side_effect=mock_geocode)
+class TestJoinRecordReplayer(TestCase):
+    p = JoinRecordProcessor()
+
+    def setUp(self) -> None:
+        self.p.s3_client.create_bucket(Bucket=JOIN_RECORD_BUCKET_NAME)
+        self.p.flush_test_data()
+        self.records = [
+            make_join_record("0a5a968f-1111-4c18-92e1-085e34a3e093", "99 Kane St", "2024-10-28T12:34:56"),
+            make_join_record("0b5a968f-2222-4c18-92e1-085e34a3e093", "197 Prospect Place", "2024-10-28T12:35:56"),
+            make_join_record("0c5a968f-3333-4c18-92e1-085e34a3e093", "99 Kane Street", "2024-10-28T12:36:56"),
+            make_join_record("0d5a968f-4444-4c18-92e1-085e34a3e093", "99  kane st", "2024-10-28T12:37:56"),
+        ]
+        self.install_numbers = iter(range(1000, 2000))
+
+    def tearDown(self) -> None:
+        self.p.flush_test_data()
+
+    def submit(self, r, request=None, geocode=None, validate_email=None):
+        geocode(r.street_address, r.city, r.state, r.zip_code)
+        validate_email(r.email_address)
+        return Response({"install_number": next(self.install_numbers)}, status=201)
+
+    @patch("meshapi.util.join_record_replay.validate_email_address", return_value=True)
+    def test_each_address_is_looked_up_once(self, validate_email_address, geocode):
+        submitted = []
+
+        def submit(r, **kwargs):
+            submitted.append(r.street_address)
+            return self.submit(r, **kwargs)
+
+        with patch("meshapi.util.join_record_replay.process_join_form", side_effect=submit):
+            stats = JoinRecordReplayer(self.p, Mock(), workers=4).replay(self.records)
+
+        self.assertEqual(submitted, [record.street_address for record in self.records])
+        self.assertEqual(geocode.call_count, 3)
+        validate_email_address.assert_called_once_with(self.records[0].email_address)
+        self.assertEqual(stats.succeeded, 4)
+
+    def test_replay_is_idempotent(self, geocode):
+        with patch("meshapi.util.join_record_replay.process_join_form", side_effect=self.submit) as submit:
+            JoinRecordReplayer(self.p, Mock(), workers=1).replay(self.records[:2])
+            stats = JoinRecordReplayer(self.p, Mock(), workers=1).replay(self.records)
+
+        self.assertEqual(submit.call_count, 4)
+        self.assertEqual(stats.succeeded, 2)
+        self.assertEqual(stats.already_replayed, 2)
+        for record in self.p.get_all(submission_prefix=SubmissionStage.POST):
+            self.assertEqual(record.replayed, 1)
+            self.assertIsNotNone(record.install_number)
+
+    def test_replay_is_idempotent_when_upload_fails(self, geocode):
+        record = self.records[0]
+        self.p.upload(record, JoinRecordProcessor.get_key(record, SubmissionStage.POST))
+
+        error = ClientError({"Error": {"Code": "InternalError"}}, "PutObject")
+        with patch("meshapi.util.join_record_replay.process_join_form", side_effect=self.submit) as submit:
+            with patch.object(self.p.s3_client, "put_object", side_effect=error), self.assertLogs(level="ERROR"):
+                JoinRecordReplayer(self.p, Mock()).replay([record])
+
+            # The copy in S3 is older than what we indexed, so mustn't replace it
+            self.p.sync_index()
+            stats = JoinRecordReplayer(self.p, Mock()).replay([record])
+
+        submit.assert_called_once()
+        self.assertEqual(stats.already_replayed, 1)
+
+    def test_conflicts_are_resolved(self, geocode):
+        record = self.records[0]
+        resolve_conflict = Mock(return_value="skip")
+        conflict = Response({"changed_info": {"street_address": "99 Kane Street"}}, status=409)
+        with patch("meshapi.util.join_record_replay.process_join_form", return_value=conflict) as submit:
+            stats = JoinRecordReplayer(self.p, resolve_conflict, workers=1).replay([record])
+
+        submit.assert_called_once()
+        resolve_conflict.assert_called_once()
+        self.assertEqual(stats.skipped, 1)
+        self.assertEqual(self.p.get_all(submission_prefix=SubmissionStage.POST), [])
+
+    def test_estimate(self, geocode):
+        estimate = JoinRecordReplayer(self.p, Mock(), workers=2).estimate(self.records)
+
+        geocode.assert_not_called()
+        self.assertEqual(estimate.records, 4)
+        self.assertEqual(estimate.geocode_lookups, 3)
+        self.assertEqual(estimate.email_domains, 1)
+        self.assertEqual(
+            estimate.seconds,
+            (3 * GEOCODE_SECONDS_ESTIMATE + EMAIL_SECONDS_ESTIMATE) / 2 + 4 * SUBMISSION_SECONDS_ESTIMATE,
+        )
+
+    def test_dry_run(self, geocode):
+        for record in self.records:
+            self.p.upload(record, JoinRecordProcessor.get_key(record, SubmissionStage.PRE))
+
+        with patch("meshapi.util.join_record_replay.process_join_form") as submit:
+            management.call_command("replay_join_records", "--since", "2024-10-01T00:00:00", "--write", "--dry-run")
+
+        submit.assert_not_called()
+        geocode.assert_not_called()
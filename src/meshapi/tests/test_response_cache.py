@@ -0,0 +1,165 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from meshapi.models import Building, Install, Member, Node
+from meshapi.util import response_cache
+
+from .sample_data import sample_building, sample_install, sample_member
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestResponseCache(TestCase):
+    c = Client()
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.building = Building(**sample_building)
+        self.building.save()
+        self.member = Member(**sample_member)
+        self.member.save()
+        self.install = Install(**sample_install, building=self.building, member=self.member)
+        self.install.save()
+
+    def get_map_install_numbers(self):
+        response = self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 200)
+        return {node["id"] for node in json.loads(response.content)}
+
+    def test_repeat_request_served_from_cache(self):
+        first = self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="application/json")
+
+        with mock.patch("meshapi.views.map.MapDataNodeList.get_queryset") as get_queryset:
+            second = self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="application/json")
+        get_queryset.assert_not_called()
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first["Content-Type"], second["Content-Type"])
+
+    def test_save_invalidates(self):
+        self.assertEqual(self.get_map_install_numbers(), {self.install.install_number})
+
+        install = Install(**{**sample_install, "install_number": 4567}, building=self.building, member=self.member)
+        with self.captureOnCommitCallbacks(execute=True):
+            install.save()
+        self.assertEqual(self.get_map_install_numbers(), {self.install.install_number, 4567})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            install.delete()
+        self.assertEqual(self.get_map_install_numbers(), {self.install.install_number})
+
+    def test_invalidated_after_commit(self):
+        self.get_map_install_numbers()
+
+        with mock.patch("meshapi.util.events.response_cache.invalidate_model_label") as invalidate:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.install.save()
+            # Before the change is committed, another request could cache the old data all over again
+            invalidate.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+        invalidate.assert_called_with("meshapi.Install")
+
+    def test_m2m_change_invalidates(self):
+        self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="application/json")
+
+        node = Node.objects.create(network_number=123, status=Node.NodeStatus.ACTIVE, latitude=0, longitude=0)
+        with mock.patch("meshapi.util.events.response_cache.invalidate_model_label") as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.building.nodes.add(node)
+        invalidated = {call.args[0] for call in invalidate.call_args_list}
+        self.assertEqual(invalidated, {"meshapi.Building", "meshapi.Node"})
+
+    def test_unrelated_save_does_not_invalidate(self):
+        first = self.c.get("/website-embeds/stats-graph.json")
+        self.member.name = "Someone Else"
+        self.member.save()
+
+        with mock.patch("meshweb.views.website_stats.compute_graph_stats") as compute_graph_stats:
+            second = self.c.get("/website-embeds/stats-graph.json")
+        compute_graph_stats.assert_not_called()
+        self.assertEqual(first.content, second.content)
+
+    def test_error_responses_not_cached(self):
+        response = self.c.get("/website-embeds/stats-graph.json?data=invalid")
+        self.assertEqual(response.status_code, 400)
+
+        with mock.patch("meshweb.views.website_stats.parse_stats_request_params", side_effect=ValueError("bad")):
+            response = self.c.get("/website-embeds/stats-graph.json?data=invalid")
+        self.assertEqual(json.loads(response.content), {"error": "bad"})
+
+    def test_browsable_api_not_cached(self):
+        self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="text/html")
+
+        with mock.patch("meshapi.views.map.MapDataNodeList.get_queryset", return_value=[]) as get_queryset:
+            self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="text/html")
+        get_queryset.assert_called()
+
+    def test_waits_for_concurrent_recompute(self):
+        request = mock.Mock(META={"HTTP_ACCEPT": "application/json"})
+        request.get_full_path.return_value = "/api/v1/mapdata/nodes/"
+        key = response_cache._get_cache_key(response_cache.MAP_DATA_POLICY, request)
+
+        # Another worker holds the lock and stores its response while we are waiting
+        cache.add(f"{key}:lock", 1)
+
+        def store_response(seconds):
+            cache.set(key, {"status": 200, "content": b"[]", "headers": {"Content-Type": "application/json"}})
+
+        with mock.patch("meshapi.util.response_cache.time.sleep", side_effect=store_response), mock.patch(
+            "meshapi.views.map.MapDataNodeList.get_queryset"
+        ) as get_queryset:
+            response = self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="application/json")
+
+        get_queryset.assert_not_called()
+        self.assertEqual(response.content, b"[]")
+
+    def test_cache_unavailable_serves_uncached(self):
+        with mock.patch.object(cache, "get_many", side_effect=ConnectionError("Redis is down")), self.assertLogs(
+            level="WARNING"
+        ):
+            self.assertEqual(self.get_map_install_numbers(), {self.install.install_number})
+
+    @mock.patch("meshapi.util.response_cache.statsd")
+    def test_metrics(self, statsd):
+        self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="application/json")
+        self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="application/json")
+
+        statsd.increment.assert_has_calls(
+            [
+                mock.call("meshdb.response_cache.miss", tags=["policy:map_data"]),
+                mock.call("meshdb.response_cache.hit", tags=["policy:map_data"]),
+            ]
+        )
+        statsd.timing.assert_called_once_with(
+            "meshdb.response_cache.recompute_time", mock.ANY, tags=["policy:map_data"]
+        )
+
+
+class TestResponsesNotCachedByDefault(TestCase):
+    c = Client()
+
+    def get_map_install_count(self):
+        response = self.c.get("/api/v1/mapdata/nodes/", HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 200)
+        return len(json.loads(response.content))
+
+    def test_changes_are_seen_without_a_commit(self):
+        # Changes in tests are never committed, so with a real cache this would serve the first response again
+        building = Building(**sample_building)
+        building.save()
+        member = Member(**sample_member)
+        member.save()
+        Install(**sample_install, building=building, member=member).save()
+        self.assertEqual(self.get_map_install_count(), 1)
+
+        Install(**sample_install, building=building, member=member).save()
+        self.assertEqual(self.get_map_install_count(), 2)
@@ -0,0 +1,156 @@
+from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchQuery
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from meshapi.models import Building, Install, Member, Node
+
+from .sample_data import sample_building, sample_install, sample_member, sample_node
+
+
+class TestSearchDocuments(TestCase):
+    def setUp(self):
+        # Search documents are refreshed once changes are committed
+        with self.captureOnCommitCallbacks(execute=True):
+            self.building = Building(**sample_building)
+            self.building.save()
+            self.member = Member(**sample_member)
+            self.member.save()
+            self.node = Node(**sample_node)
+            self.node.network_number = 1234
+            self.node.save()
+
+            self.install = Install(**sample_install)
+            self.install.building = self.building
+            self.install.member = self.member
+            self.install.node = self.node
+            self.install.save()
+
+    def assertDocumentMatches(self, obj, term):
+        self.assertTrue(
+            type(obj).objects.filter(pk=obj.pk, search_document=SearchQuery(term)).exists(),
+            f"Expected search document of {obj} to match {term!r}",
+        )
+
+    def assertDocumentDoesNotMatch(self, obj, term):
+        self.assertFalse(
+            type(obj).objects.filter(pk=obj.pk, search_document=SearchQuery(term)).exists(),
+            f"Expected search document of {obj} not to match {term!r}",
+        )
+
+    def test_document_populated_on_save(self):
+        self.assertDocumentMatches(self.install, "smith")
+        self.assertDocumentMatches(self.install, "chom")
+        self.assertDocumentMatches(self.install, "1234")
+        self.assertDocumentMatches(self.member, "john.smith@example.com")
+        self.assertDocumentMatches(self.member, str(self.install.install_number))
+
+    def test_document_refreshed_when_related_object_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.name = "Donald Duck"
+            self.member.save()
+
+        self.assertDocumentMatches(self.install, "duck")
+        self.assertDocumentDoesNotMatch(self.install, "smith")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.building.street_address = "1 Quack Ave"
+            self.building.save()
+
+        self.assertDocumentMatches(self.install, "quack")
+        self.assertDocumentDoesNotMatch(self.install, "chom")
+
+    def test_document_refreshed_on_m2m_change(self):
+        self.assertDocumentDoesNotMatch(self.building, "amazing")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.building.nodes.add(self.node)
+        self.assertDocumentMatches(self.building, "amazing")
+        self.assertDocumentMatches(self.node, "chom")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.building.nodes.remove(self.node)
+        self.assertDocumentDoesNotMatch(self.building, "amazing")
+        self.assertDocumentDoesNotMatch(self.node, "chom")
+
+    def test_document_refreshed_on_delete(self):
+        install_number = str(self.install.install_number)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.install.delete()
+        self.assertDocumentDoesNotMatch(self.member, install_number)
+
+    def test_document_refreshed_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.member.name = "Donald Duck"
+            self.member.save()
+        self.assertDocumentDoesNotMatch(self.install, "duck")
+
+        for callback in callbacks:
+            callback()
+        self.assertDocumentMatches(self.install, "duck")
+
+    def test_unrelated_models_are_not_connected(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            User.objects.create_user(username="someone")
+        self.assertEqual(callbacks, [])
+
+    def test_rebuild_command(self):
+        Install.objects.update(search_document=None)
+        self.assertDocumentDoesNotMatch(self.install, "smith")
+
+        call_command("rebuild_search_documents", stdout=open("/dev/null", "w"))
+        self.assertDocumentMatches(self.install, "smith")
+
+
+class TestAdminRankedSearch(TestCase):
+    c = Client()
+
+    def setUp(self):
+        # Search documents are refreshed once changes are committed
+        with self.captureOnCommitCallbacks(execute=True):
+            building = Building(**sample_building)
+            building.save()
+
+            self.member_1 = Member(**sample_member)
+            self.member_1.save()
+            self.member_2 = Member(**sample_member)
+            self.member_2.name = "Jane Doe"
+            self.member_2.notes = "Friends with John Smith"
+            self.member_2.save()
+
+            # The notes only match with weight D, the name of the member with weight A
+            self.install_1 = Install(**sample_install, building=building, member=self.member_2)
+            self.install_1.notes = "smith"
+            self.install_1.save()
+            self.install_2 = Install(**sample_install, building=building, member=self.member_1)
+            self.install_2.save()
+
+        User.objects.create_superuser(username="admin", password="admin_password", email="admin@example.com")
+        self.c.login(username="admin", password="admin_password")
+
+    def test_results_ordered_by_rank(self):
+        response = self.c.get("/admin/meshapi/install/?q=smith")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.context["cl"].result_list),
+            [self.install_2, self.install_1],
+        )
+
+        response = self.c.get("/admin/meshapi/member/?q=smith")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.context["cl"].result_list),
+            [self.member_1, self.member_2],
+        )
+
+    def test_ranking_does_not_recompute_documents(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.c.get("/admin/meshapi/install/?q=smith")
+            self.assertEqual(response.status_code, 200)
+
+        # The documents are pre-computed, so we should only ever read the stored column
+        for query in queries.captured_queries:
+            self.assertNotIn("STRING_AGG", query["sql"].upper())
+            self.assertNotIn("DISTINCT ON", query["sql"])
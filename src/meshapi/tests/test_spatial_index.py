@@ -0,0 +1,135 @@
+import math
+import random
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from meshapi.models import Building, Member, Node
+from meshapi.util import spatial_index
+from meshapi.util.geo import BoundingBox
+from meshapi.util.spatial_index import SpatialIndex, get_spatial_index, haversine_km
+
+from .sample_data import sample_building, sample_member
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def brute_force_distances(points, latitude, longitude):
+    return sorted(
+        (float(haversine_km(latitude, longitude, [lat], [lon])[0]), key) for key, (lat, lon) in enumerate(points)
+    )
+
+
+class TestSpatialIndex(TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.points = [(rng.uniform(40.5, 40.9), rng.uniform(-74.25, -73.7)) for _ in range(2000)]
+        self.index = SpatialIndex(
+            list(range(len(self.points))), [p[0] for p in self.points], [p[1] for p in self.points]
+        )
+
+    def test_haversine(self):
+        # Grand St to SN1, about 1.2 km apart
+        self.assertAlmostEqual(haversine_km(40.715, -73.983, [40.704], [-73.987])[0], 1.27, places=2)
+        self.assertAlmostEqual(haversine_km(0, 0, [0], [1])[0], 2 * math.pi * 6371.0088 / 360, places=3)
+
+    def test_within_radius(self):
+        for latitude, longitude in [(40.7, -74.0), (40.85, -73.75), (41.5, -73.0)]:
+            expected = [
+                key for distance, key in brute_force_distances(self.points, latitude, longitude) if distance <= 3
+            ]
+            matches = self.index.within_radius(latitude, longitude, 3)
+            self.assertEqual([match.key for match in matches], expected)
+
+    def test_nearest(self):
+        for latitude, longitude in [(40.7, -74.0), (40.55, -74.2), (42, -70)]:
+            expected = [key for distance, key in brute_force_distances(self.points, latitude, longitude)[:7]]
+            matches = self.index.nearest(latitude, longitude, 7)
+            self.assertEqual([match.key for match in matches], expected)
+            self.assertEqual([match.distance_km for match in matches], sorted(match.distance_km for match in matches))
+
+    def test_nearest_max_distance(self):
+        self.assertEqual(self.index.nearest(42, -70, 5, max_distance_km=10), [])
+        self.assertTrue(all(match.distance_km <= 0.5 for match in self.index.nearest(40.7, -74.0, 50, 0.5)))
+
+    def test_within_bbox(self):
+        bbox = BoundingBox(-74.0, 40.7, -73.95, 40.75)
+        expected = {
+            key
+            for key, (lat, lon) in enumerate(self.points)
+            if bbox.min_lat <= lat <= bbox.max_lat and bbox.min_lon <= lon <= bbox.max_lon
+        }
+        self.assertEqual(set(self.index.within_bbox(bbox)), expected)
+        self.assertEqual(self.index.within_bbox(BoundingBox(0, 0, 1, 1)), [])
+
+    def test_empty(self):
+        index = SpatialIndex([], [], [])
+        self.assertEqual(index.nearest(40.7, -74.0, 3), [])
+        self.assertEqual(index.within_radius(40.7, -74.0, 3), [])
+        self.assertEqual(index.within_bbox(BoundingBox(-75, 40, -73, 41)), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestModelSpatialIndex(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for index in spatial_index._indexes.values():
+            index.clear()
+            self.addCleanup(index.clear)
+
+        self.building = Building(**sample_building)
+        self.building.save()
+        Member(**sample_member).save()
+
+    def test_index_follows_saves(self):
+        self.assertEqual(
+            get_spatial_index(Building)
+            .within_radius(sample_building["latitude"], sample_building["longitude"], 0.1)[0]
+            .key,
+            self.building.pk,
+        )
+
+        node = Node(network_number=1234, status=Node.NodeStatus.ACTIVE, latitude=40.7, longitude=-74.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            node.save()
+        self.assertEqual([match.key for match in get_spatial_index(Node).nearest(40.7, -74.0, 1)], [node.pk])
+
+        node.latitude = 40.8
+        with self.captureOnCommitCallbacks(execute=True):
+            node.save()
+        self.assertEqual(get_spatial_index(Node).nearest(40.7, -74.0, 1)[0].latitude, 40.8)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            node.delete()
+        self.assertEqual(len(get_spatial_index(Node)), 0)
+
+    def test_index_marked_stale_after_commit(self):
+        with mock.patch("meshapi.util.events.spatial_index.mark_spatial_index_stale") as mark_stale:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.building.save()
+            mark_stale.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+        mark_stale.assert_called_once_with(Building)
+
+    def test_index_reused_until_changed(self):
+        get_spatial_index(Building)
+        with mock.patch("meshapi.util.spatial_index.build_spatial_index") as build:
+            get_spatial_index(Building)
+        build.assert_not_called()
+
+    def test_other_process_change_rebuilds(self):
+        cache.set(spatial_index._versions["meshapi.Building"].key, 1)
+        get_spatial_index(Building)
+        # As if another process saved a Building, without our local copy being dropped
+        cache.incr(spatial_index._versions["meshapi.Building"].key)
+        with mock.patch("meshapi.util.spatial_index.build_spatial_index") as build:
+            get_spatial_index(Building)
+        build.assert_called_once_with(Building)
+
+    def test_unindexed_model(self):
+        with self.assertRaises(ValueError):
+            get_spatial_index(Member)
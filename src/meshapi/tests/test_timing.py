@@ -0,0 +1,51 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from meshapi.util.timing import StageTimer
+
+
+@patch("meshapi.util.timing.statsd")
+class TestStageTimer(TestCase):
+    def test_stage_outcomes(self, statsd):
+        timer = StageTimer("meshdb.test")
+
+        with timer.stage("first"):
+            pass
+
+        with timer.stage("second") as stage:
+            stage.outcome = "invalid"
+
+        with self.assertRaises(ValueError):
+            with timer.stage("third"):
+                raise ValueError
+
+        self.assertEqual(
+            [(call.args[0], call.kwargs["tags"]) for call in statsd.histogram.call_args_list],
+            [
+                ("meshdb.test.stage_duration", ["stage:first", "outcome:ok"]),
+                ("meshdb.test.stage_duration", ["stage:second", "outcome:invalid"]),
+                ("meshdb.test.stage_duration", ["stage:third", "outcome:error"]),
+            ],
+        )
+        self.assertEqual([name for name, _ in timer.timings], ["first", "second", "third"])
+
+    def test_stages_on_other_threads(self, statsd):
+        timer = StageTimer("meshdb.test")
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(timer.run, "background", sum, [1, 2, 3])
+            self.assertEqual(timer.wait("background", future), 6)
+
+        self.assertEqual(sorted(name for name, _ in timer.timings), ["background", "background_wait"])
+
+    def test_server_timing(self, statsd):
+        timer = StageTimer("meshdb.test")
+        with timer.stage("geocode"):
+            pass
+
+        self.assertRegex(timer.server_timing(), r"^geocode;dur=\d+\.\d, total;dur=\d+\.\d$")
+        total = float(re.search(r"total;dur=([\d.]+)", timer.server_timing()).group(1))
+        self.assertGreaterEqual(total, timer.timings[0][1])
@@ -0,0 +1,218 @@
+import uuid
+from unittest.mock import patch
+
+from django.contrib.auth.models import Permission, User
+from django.test import Client, TestCase
+
+from meshapi.models import Device, Link, Node
+from meshapi.util.topology import Topology, get_topology
+
+
+def make_topology(edges, pops=(), network_numbers=None):
+    network_numbers = network_numbers or sorted({nn for edge in edges for nn in edge})
+    positions = {nn: i for i, nn in enumerate(network_numbers)}
+    nodes = [
+        {
+            "id": str(uuid.uuid4()),
+            "network_number": nn,
+            "name": None,
+            "type": Node.NodeType.POP if nn in pops else Node.NodeType.STANDARD,
+        }
+        for nn in network_numbers
+    ]
+    link_ids = [uuid.uuid4() for _ in edges]
+    return Topology(nodes, link_ids, [(positions[a], positions[b]) for a, b in edges])
+
+
+def network_numbers(topology, positions):
+    return [topology.nodes[position]["network_number"] for position in positions]
+
+
+class TestTopology(TestCase):
+    def setUp(self):
+        # 1 (POP) - 2 - 3 - 4, with a loop 3 - 5 - 6 - 3, and a separate 7 - 8
+        self.edges = [(1, 2), (2, 3), (3, 4), (3, 5), (5, 6), (6, 3), (7, 8)]
+        self.topology = make_topology(self.edges, pops={1})
+
+    def test_csr(self):
+        topology = self.topology
+        self.assertEqual(len(topology), 8)
+        self.assertEqual(list(topology.indptr), [0, 1, 3, 7, 8, 10, 12, 13, 14])
+        three = topology.position_by_network_number[3]
+        self.assertEqual(sorted(network_numbers(topology, topology.neighbours(three))), [2, 4, 5, 6])
+
+    def test_shortest_path(self):
+        topology = self.topology
+        position = topology.position_by_network_number
+        self.assertEqual(network_numbers(topology, topology.shortest_path(position[1], position[6])), [1, 2, 3, 6])
+        self.assertEqual(network_numbers(topology, topology.shortest_path(position[4], position[4])), [4])
+        self.assertIsNone(topology.shortest_path(position[1], position[7]))
+
+    def test_components(self):
+        components = self.topology.components()
+        self.assertEqual(
+            [network_numbers(self.topology, component) for component in components], [[1, 2, 3, 4, 5, 6], [7, 8]]
+        )
+
+    def test_articulation_points(self):
+        self.assertEqual(network_numbers(self.topology, self.topology.articulation_points()), [2, 3])
+
+        # A second link between two nodes means neither link alone is a single point of failure, but the
+        # nodes themselves still are
+        topology = make_topology([(1, 2), (1, 2), (2, 3)])
+        self.assertEqual(network_numbers(topology, topology.articulation_points()), [2])
+
+    def test_articulation_points_of_a_long_chain(self):
+        topology = make_topology([(i, i + 1) for i in range(1, 5000)])
+        self.assertEqual(len(topology.articulation_points()), 4998)
+
+    def test_pop_reachability(self):
+        topology = self.topology
+        reachability = topology.pop_reachability()
+        self.assertEqual(list(reachability.hops), [0, 1, 2, 3, 3, 3, -1, -1])
+        six = topology.position_by_network_number[6]
+        self.assertEqual(network_numbers(topology, [reachability.next_hop[six]]), [3])
+
+    def test_islanded_without_link(self):
+        topology = self.topology
+        self.assertEqual(network_numbers(topology, topology.islanded_without_link(1)), [3, 4, 5, 6])
+        self.assertEqual(network_numbers(topology, topology.islanded_without_link(3)), [])  # 3 - 5 is in a loop
+        self.assertEqual(network_numbers(topology, topology.islanded_without_link(6)), [])  # 7 - 8 had no POP
+
+        topology = make_topology([(1, 2), (1, 2)], pops={1})
+        self.assertEqual(topology.islanded_without_link(0), [])
+
+    def test_empty(self):
+        topology = make_topology([])
+        self.assertEqual(len(topology), 0)
+        self.assertEqual(topology.components(), [])
+        self.assertEqual(topology.articulation_points(), [])
+
+
+class TestTopologyFromDatabase(TestCase):
+    def setUp(self):
+        self.devices = {}
+        # The topology is only rebuilt once changes to it are committed
+        with self.captureOnCommitCallbacks(execute=True):
+            for network_number, node_type in [
+                (1, Node.NodeType.POP),
+                (2, Node.NodeType.HUB),
+                (3, Node.NodeType.STANDARD),
+            ]:
+                node = Node(
+                    network_number=network_number,
+                    status=Node.NodeStatus.ACTIVE,
+                    type=node_type,
+                    latitude=40.7,
+                    longitude=-73.9,
+                )
+                node.save()
+                self.devices[network_number] = Device(node=node, status=Device.DeviceStatus.ACTIVE)
+                self.devices[network_number].save()
+
+            self.link_1_2 = self.create_link(1, 2)
+            self.link_2_3 = self.create_link(2, 3)
+            self.create_link(1, 3, Link.LinkStatus.PLANNED)
+
+        user = User.objects.create_user(username="topology", password="password")
+        user.user_permissions.add(*Permission.objects.filter(codename__in=["view_node", "view_link"]))
+        self.client = Client()
+        self.client.force_login(user)
+
+    def create_link(self, from_nn, to_nn, status=Link.LinkStatus.ACTIVE):
+        link = Link(from_device=self.devices[from_nn], to_device=self.devices[to_nn], status=status)
+        link.save()
+        return link
+
+    def test_build(self):
+        topology = get_topology()
+        self.assertEqual(len(topology), 3)
+        self.assertEqual(len(topology.link_ids), 2)
+        self.assertEqual(topology.nodes[topology.position_by_network_number[1]]["type"], "POP")
+
+    def test_follows_link_changes(self):
+        self.assertEqual(len(get_topology().link_ids), 2)
+        self.link_2_3.status = Link.LinkStatus.INACTIVE
+        with self.captureOnCommitCallbacks(execute=True):
+            self.link_2_3.save()
+        self.assertEqual(len(get_topology().link_ids), 1)
+        self.assertNotIn(3, get_topology().position_by_network_number)
+
+    def test_follows_device_changes(self):
+        self.assertEqual(len(get_topology().components()), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            new_node = Node(network_number=4, status=Node.NodeStatus.ACTIVE, latitude=40.7, longitude=-73.9)
+            new_node.save()
+            device = self.devices[3]
+            device.node = new_node
+            device.save()
+        self.assertIn(4, get_topology().position_by_network_number)
+
+    def test_marked_stale_after_commit(self):
+        with patch("meshapi.util.events.topology.mark_topology_stale") as mark_stale:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.link_2_3.save()
+            mark_stale.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+        mark_stale.assert_called_once()
+
+    def test_path(self):
+        response = self.client.get("/api/v1/topology/path/", {"from": 1, "to": 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["hops"], 2)
+        self.assertEqual([node["network_number"] for node in response.json()["path"]], [1, 2, 3])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Node(network_number=5, status=Node.NodeStatus.ACTIVE, latitude=40.7, longitude=-73.9).save()
+        response = self.client.get("/api/v1/topology/path/", {"from": 1, "to": 5})
+        self.assertEqual(response.json(), {"hops": None, "path": []})
+
+        self.assertEqual(self.client.get("/api/v1/topology/path/", {"from": 1, "to": 6}).status_code, 404)
+        self.assertEqual(self.client.get("/api/v1/topology/path/", {"from": 1, "to": "x"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/v1/topology/path/", {"from": 1}).status_code, 400)
+
+    def test_components(self):
+        response = self.client.get("/api/v1/topology/components/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["components"]), 1)
+        self.assertEqual(response.json()["components"][0]["size"], 3)
+        self.assertTrue(response.json()["components"][0]["has_pop"])
+
+    def test_articulation_points(self):
+        response = self.client.get("/api/v1/topology/articulation-points/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([node["network_number"] for node in response.json()["nodes"]], [2])
+
+    def test_pop_reachability(self):
+        response = self.client.get("/api/v1/topology/pop-reachability/", {"network_number": 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["hops"], 2)
+        self.assertEqual([node["network_number"] for node in response.json()["path"]], [3, 2, 1])
+
+        response = self.client.get("/api/v1/topology/pop-reachability/")
+        self.assertEqual(response.json(), {"unreachable": []})
+
+        self.link_1_2.status = Link.LinkStatus.INACTIVE
+        with self.captureOnCommitCallbacks(execute=True):
+            self.link_1_2.save()
+        response = self.client.get("/api/v1/topology/pop-reachability/")
+        self.assertEqual([node["network_number"] for node in response.json()["unreachable"]], [2, 3])
+
+    def test_islanded(self):
+        response = self.client.get("/api/v1/topology/islanded/", {"link": str(self.link_1_2.id)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([node["network_number"] for node in response.json()["islanded"]], [2, 3])
+
+        self.assertEqual(self.client.get("/api/v1/topology/islanded/", {"link": str(uuid.uuid4())}).status_code, 404)
+        self.assertEqual(self.client.get("/api/v1/topology/islanded/", {"link": "x"}).status_code, 400)
+
+    def test_permissions(self):
+        self.assertEqual(Client().get("/api/v1/topology/components/").status_code, 403)
+
+        user = User.objects.create_user(username="nodes_only", password="password")
+        user.user_permissions.add(Permission.objects.get(codename="view_node"))
+        client = Client()
+        client.force_login(user)
+        self.assertEqual(client.get("/api/v1/topology/components/").status_code, 403)
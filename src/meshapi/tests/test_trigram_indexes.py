@@ -0,0 +1,170 @@
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from meshapi.models import Building, Install, Member, MemberContactIndex
+from meshapi.views.autocomplete import MemberAutocomplete
+from meshapi.views.lookups import BuildingFilter, MemberFilter
+from meshapi.views.query_api import QueryBuildingFilter, QueryMemberFilter
+
+from .sample_data import sample_building, sample_install, sample_member
+
+
+class TestMemberContactIndex(TestCase):
+    def setUp(self):
+        self.member = Member(
+            id=uuid.UUID("c5a5af9c-35c3-4d04-af87-d917ca4d0d1b"),
+            name="Donald Smith",
+            primary_email_address="Donald.Smith@example.com",
+            stripe_email_address="donny.stripe@example.com",
+            additional_email_addresses=["donny.addl@example.com"],
+            phone_number="555-555-6666",
+            additional_phone_numbers=["212-555-8888"],
+        )
+        self.member.save()
+
+    def get_index_values(self, contact_type):
+        return set(
+            MemberContactIndex.objects.filter(member=self.member, contact_type=contact_type).values_list(
+                "value", flat=True
+            )
+        )
+
+    def test_index_populated_on_save(self):
+        self.assertEqual(
+            self.get_index_values(MemberContactIndex.ContactType.EMAIL),
+            {"donald.smith@example.com", "donny.stripe@example.com", "donny.addl@example.com"},
+        )
+        self.assertEqual(
+            self.get_index_values(MemberContactIndex.ContactType.PHONE),
+            {"+1 555-555-6666", "+1 212-555-8888"},
+        )
+
+    def test_index_rebuilt_on_update(self):
+        self.member.additional_email_addresses = []
+        self.member.additional_phone_numbers = ["212-555-1234"]
+        self.member.save()
+
+        self.assertEqual(
+            self.get_index_values(MemberContactIndex.ContactType.EMAIL),
+            {"donald.smith@example.com", "donny.stripe@example.com"},
+        )
+        self.assertEqual(
+            self.get_index_values(MemberContactIndex.ContactType.PHONE),
+            {"+1 555-555-6666", "+1 212-555-1234"},
+        )
+
+    def test_values_differing_in_case_indexed_once(self):
+        self.member.additional_email_addresses = ["DONALD.SMITH@example.com"]
+        self.member.save()
+
+        self.assertEqual(
+            MemberContactIndex.objects.filter(member=self.member, value="donald.smith@example.com").count(), 1
+        )
+
+    def test_unchanged_contact_details_not_rebuilt(self):
+        self.member.name = "Donny Smith"
+        with CaptureQueriesContext(connection) as queries:
+            self.member.save(update_fields=["name", "search_document"])
+        self.assertFalse(any(MemberContactIndex._meta.db_table in query["sql"] for query in queries))
+
+        # Without update_fields, the index is only compared, not rewritten
+        entry_ids = set(MemberContactIndex.objects.values_list("id", flat=True))
+        self.member.save()
+        self.assertEqual(set(MemberContactIndex.objects.values_list("id", flat=True)), entry_ids)
+
+    def test_rebuild_command(self):
+        Member.objects.filter(id=self.member.id).update(primary_email_address="dsmith@example.com")
+        MemberContactIndex.objects.create(
+            member=self.member, contact_type=MemberContactIndex.ContactType.EMAIL, value="stale@example.com"
+        )
+
+        call_command("rebuild_member_contact_index", stdout=open("/dev/null", "w"))
+
+        self.assertEqual(
+            self.get_index_values(MemberContactIndex.ContactType.EMAIL),
+            {"dsmith@example.com", "donny.stripe@example.com", "donny.addl@example.com"},
+        )
+        self.assertEqual(
+            self.get_index_values(MemberContactIndex.ContactType.PHONE),
+            {"+1 555-555-6666", "+1 212-555-8888"},
+        )
+
+    def test_index_removed_on_delete(self):
+        self.member.delete()
+        self.assertFalse(MemberContactIndex.objects.exists())
+
+
+class TestTrigramIndexUsage(TestCase):
+    """
+    The test tables are tiny, so postgres will always prefer a sequential scan (or walking the primary key
+    index to satisfy the ordering) if it is allowed to. We disable both for the duration of each test, leaving
+    only bitmap index scans, so that the plan shows whether a trigram index is usable for the query at all
+    """
+
+    def setUp(self):
+        building = Building(**sample_building)
+        building.save()
+        member = Member(**sample_member)
+        member.save()
+        install = Install(**sample_install)
+        install.building = building
+        install.member = member
+        install.save()
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_indexscan = off")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"Expected query plan to use {index_name}, got:\n{plan}")
+
+    def test_member_lookup_name(self):
+        qs = MemberFilter({"name": "smit"}, queryset=Member.objects.all()).qs
+        self.assertUsesIndex(qs, "meshapi_member_name_trgm")
+        self.assertEqual(qs.count(), 1)
+
+    def test_member_lookup_email(self):
+        qs = MemberFilter({"email_address": "JOHN.SMITH"}, queryset=Member.objects.all()).qs
+        self.assertUsesIndex(qs, "meshapi_member_contact_trgm")
+        self.assertEqual(qs.count(), 1)
+
+    def test_member_lookup_phone(self):
+        qs = MemberFilter({"phone_number": "555-555"}, queryset=Member.objects.all()).qs
+        self.assertUsesIndex(qs, "meshapi_member_contact_trgm")
+        self.assertEqual(qs.count(), 1)
+
+    def test_building_lookup_street_address(self):
+        qs = BuildingFilter({"street_address": "chom st"}, queryset=Building.objects.all()).qs
+        self.assertUsesIndex(qs, "meshapi_building_addr_trgm")
+        self.assertEqual(qs.count(), 1)
+
+    def test_query_form_email(self):
+        qs = QueryMemberFilter({"email_address": "john.smith"}, queryset=Install.objects.all()).qs
+        self.assertUsesIndex(qs, "meshapi_member_contact_trgm")
+        self.assertEqual(qs.count(), 1)
+
+    def test_query_form_phone(self):
+        qs = QueryMemberFilter({"phone_number": "555-555"}, queryset=Install.objects.all()).qs
+        self.assertUsesIndex(qs, "meshapi_member_contact_trgm")
+        self.assertEqual(qs.count(), 1)
+
+    def test_query_form_street_address(self):
+        qs = QueryBuildingFilter({"street_address": "chom st"}, queryset=Install.objects.all()).qs
+        self.assertUsesIndex(qs, "meshapi_building_addr_trgm")
+        self.assertEqual(qs.count(), 1)
+
+    def test_member_autocomplete(self):
+        request = RequestFactory().get("/member-autocomplete/")
+        request.user = User.objects.create_superuser(username="admin", password="admin_password")
+        view = MemberAutocomplete()
+        view.setup(request)
+        view.q = "john"
+        qs = view.get_queryset()
+        self.assertUsesIndex(qs, "meshapi_member_name_trgm")
+        self.assertUsesIndex(qs, "meshapi_member_email_trgm")
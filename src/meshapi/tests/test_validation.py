@@ -3,12 +3,19 @@ import logging
 from unittest.mock import MagicMock, patch
 
 import requests
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from email_validator import EmailUndeliverableError
 from requests import Session
 
 from meshapi.exceptions import AddressAPIError, InvalidAddressError, UnsupportedAddressError
 from meshapi.tests.sample_data import sample_address_response, sample_new_buildings_response
-from meshapi.validation import NYCAddressInfo, lookup_address_nyc_open_data_new_buildings
+from meshapi.validation import (
+    NYCAddressInfo,
+    get_dns_resolver,
+    lookup_address_nyc_open_data_new_buildings,
+    validate_email_address,
+)
 
 
 class TestValidationNYCAddressInfo(TestCase):
@@ -228,3 +235,45 @@ class TestValidationNYCAddressInfo(TestCase):
             self.assertEqual(nyc_addr_info.latitude, 40.716245)
             self.assertEqual(nyc_addr_info.altitude, None)
             self.assertEqual(nyc_addr_info.bin, 1234)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+@patch("meshapi.validation.validate_email_deliverability")
+class TestValidateEmailAddress(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_invalid_syntax(self, validate_email_deliverability):
+        self.assertFalse(validate_email_address("aljksdafljkasfjldsaf"))
+        validate_email_deliverability.assert_not_called()
+
+    def test_known_domain(self, validate_email_deliverability):
+        self.assertTrue(validate_email_address("js@gmail.com"))
+        self.assertTrue(validate_email_address("Someone.Else@GMAIL.com"))
+        validate_email_deliverability.assert_not_called()
+
+    def test_deliverable_domain_is_cached(self, validate_email_deliverability):
+        validate_email_deliverability.return_value = {"mx": [(10, "mx.nycmesh.net")], "mx_fallback_type": None}
+
+        self.assertTrue(validate_email_address("a@nycmesh.net"))
+        self.assertTrue(validate_email_address("b@nycmesh.net"))
+
+        validate_email_deliverability.assert_called_once_with(
+            "nycmesh.net", "nycmesh.net", dns_resolver=get_dns_resolver()
+        )
+
+    def test_undeliverable_domain_is_cached(self, validate_email_deliverability):
+        validate_email_deliverability.side_effect = EmailUndeliverableError("The domain name does not exist.")
+
+        self.assertFalse(validate_email_address("a@nycmesh.invalid-domain.com"))
+        self.assertFalse(validate_email_address("b@nycmesh.invalid-domain.com"))
+
+        validate_email_deliverability.assert_called_once()
+
+    def test_unknown_deliverability_is_not_cached(self, validate_email_deliverability):
+        validate_email_deliverability.return_value = {"unknown-deliverability": "timeout"}
+
+        self.assertTrue(validate_email_address("a@nycmesh.net"))
+        self.assertTrue(validate_email_address("b@nycmesh.net"))
+
+        self.assertEqual(validate_email_deliverability.call_count, 2)
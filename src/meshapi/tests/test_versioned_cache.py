@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from meshapi.util.versioned_cache import SharedVersion, VersionedValue
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestVersionedValue(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.version = SharedVersion("test:version", "the test value")
+        self.build = mock.Mock(side_effect=lambda: object())
+        self.value = VersionedValue(self.version, self.build, max_age_seconds=60)
+
+    def test_reused_until_changed(self):
+        first = self.value.get()
+        self.assertIs(self.value.get(), first)
+        self.build.assert_called_once()
+
+    def test_bump_rebuilds(self):
+        first = self.value.get()
+        self.version.bump()
+        self.assertIsNot(self.value.get(), first)
+        self.assertEqual(self.build.call_count, 2)
+
+    def test_other_process_change_rebuilds(self):
+        self.version.bump()
+        first = self.value.get()
+        # As if another process bumped the version, without our local copy being dropped
+        cache.incr(self.version.key)
+        self.assertIsNot(self.value.get(), first)
+
+    def test_rebuilt_once_too_old(self):
+        with mock.patch("meshapi.util.versioned_cache.time.monotonic", return_value=1000):
+            first = self.value.get()
+        with mock.patch("meshapi.util.versioned_cache.time.monotonic", return_value=1061):
+            self.assertIsNot(self.value.get(), first)
+
+    def test_local_change_seen_without_cache(self):
+        first = self.value.get()
+        with mock.patch("meshapi.util.versioned_cache.cache") as broken_cache:
+            broken_cache.get.side_effect = ConnectionError
+            broken_cache.add.side_effect = ConnectionError
+            with self.assertLogs(level="WARNING"):
+                self.version.bump()
+                second = self.value.get()
+        self.assertIsNot(second, first)
+
+    def test_clear(self):
+        first = self.value.get()
+        self.value.clear()
+        self.assertIsNot(self.value.get(), first)
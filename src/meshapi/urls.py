@@ -65,7 +65,23 @@ urlpatterns = [
     path("mapdata/links/", views.MapDataLinkList.as_view(), name="meshapi-v1-map-data-links"),
     path("mapdata/sectors/", views.MapDataSectorList.as_view(), name="meshapi-v1-map-data-sectors"),
     path("mapdata/kiosks/", views.KioskListWrapper.as_view(), name="meshapi-v1-map-data-kiosks"),
+    path("mapdata/artifacts/<str:content_hash>", views.map_artifact_by_hash, name="meshapi-v1-map-artifact"),
     path("geography/whole-mesh.kml", views.WholeMeshKML.as_view(), name="meshapi-v1-geography-whole-mesh-kml"),
     path("geography/active-mesh.kml", views.ActiveMeshKML.as_view(), name="meshapi-v1-geography-active-mesh-kml"),
     path("geography/nyc-geocode/v2/search", views.NYCGeocodeWrapper.as_view(), name="meshapi-v1-geography-geocode"),
+    path("geo/tiles/<int:z>/<int:x>/<int:y>.mvt", views.VectorTile.as_view(), name="meshapi-v1-geo-tile"),
+    path("geo/<str:layer>/", views.GeoJSONLayer.as_view(), name="meshapi-v1-geo-layer"),
+    path("topology/path/", views.TopologyPath.as_view(), name="meshapi-v1-topology-path"),
+    path("topology/components/", views.TopologyComponents.as_view(), name="meshapi-v1-topology-components"),
+    path(
+        "topology/articulation-points/",
+        views.TopologyArticulationPoints.as_view(),
+        name="meshapi-v1-topology-articulation-points",
+    ),
+    path(
+        "topology/pop-reachability/",
+        views.TopologyPopReachability.as_view(),
+        name="meshapi-v1-topology-pop-reachability",
+    ),
+    path("topology/islanded/", views.TopologyIslanded.as_view(), name="meshapi-v1-topology-islanded"),
 ]
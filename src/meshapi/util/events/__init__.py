@@ -1,2 +1,26 @@
+from .candidate_nodes import attach_candidate_nodes_to_new_install
+from .db_connections import (
+    record_db_connection_created,
+    record_db_connections_reused_by_request,
+    record_db_connections_reused_by_task,
+)
 from .join_requests_slack_channel import send_join_request_slack_message
+from .map_artifacts import (
+    schedule_map_artifact_build_on_delete,
+    schedule_map_artifact_build_on_m2m_change,
+    schedule_map_artifact_build_on_save,
+)
 from .osticket_creation import create_os_ticket_for_install
+from .response_cache import (
+    invalidate_cached_responses_on_delete,
+    invalidate_cached_responses_on_m2m_change,
+    invalidate_cached_responses_on_save,
+)
+from .search_documents import (
+    collect_search_documents_on_delete,
+    refresh_search_documents_on_delete,
+    refresh_search_documents_on_m2m_change,
+    refresh_search_documents_on_save,
+)
+from .spatial_index import mark_spatial_index_stale_on_delete, mark_spatial_index_stale_on_save
+from .topology import mark_topology_stale_on_delete, mark_topology_stale_on_save
@@ -0,0 +1,27 @@
+import logging
+from typing import Any
+
+from django.db import transaction
+from django.db.models.base import ModelBase
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from meshapi.models import Install
+from meshapi.util.node_candidates import attach_candidate_nodes
+
+
+# This is connected before send_join_request_slack_message (see __init__.py), so that the message can
+# include the candidates
+@receiver(post_save, sender=Install, dispatch_uid="attach_candidate_nodes_to_new_install")
+def attach_candidate_nodes_to_new_install(
+    sender: ModelBase, instance: Install, created: bool, raw: bool = False, **kwargs: Any
+) -> None:
+    if not created or raw or instance.candidate_nodes:
+        return
+
+    try:
+        # In a savepoint, so that if anything goes wrong we don't break the transaction creating the install
+        with transaction.atomic():
+            attach_candidate_nodes(instance)
+    except Exception:
+        logging.exception(f"Could not find candidate nodes for install {instance}")
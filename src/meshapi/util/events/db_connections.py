@@ -0,0 +1,36 @@
+from typing import Any
+
+from celery.signals import task_prerun
+from datadog import statsd
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# With persistent connections (see CONN_MAX_AGE in settings.py), every request or task should reuse the
+# connection left open by the previous one. The ratio of these two counters (per alias) shows how often
+# we are still paying for a new connection handshake
+
+
+@receiver(connection_created, dispatch_uid="record_db_connection_created")
+def record_db_connection_created(sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+    statsd.increment("meshdb.db.connection.created", tags=[f"alias:{connection.alias}"])
+
+
+def record_db_connections_reused(context: str) -> None:
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None:
+            statsd.increment("meshdb.db.connection.reused", tags=[f"alias:{connection.alias}", f"context:{context}"])
+
+
+# Django closes any expired or broken connections in its own request_started receiver, which is always
+# connected before this one, so whatever is still open at this point is going to be reused
+@receiver(request_started, dispatch_uid="record_db_connections_reused_by_request")
+def record_db_connections_reused_by_request(sender: Any, **kwargs: Any) -> None:
+    record_db_connections_reused("request")
+
+
+@task_prerun.connect(dispatch_uid="record_db_connections_reused_by_task")
+def record_db_connections_reused_by_task(**kwargs: Any) -> None:
+    record_db_connections_reused("task")
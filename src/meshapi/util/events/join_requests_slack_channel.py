@@ -9,9 +9,13 @@ from django.dispatch import receiver
 
 from meshapi.models import Install
 from meshapi.util.django_flag_decorator import skip_if_flag_disabled
+from meshapi.util.node_candidates import format_candidate_node
 
 SLACK_JOIN_REQUESTS_CHANNEL_WEBHOOK_URL = os.environ.get("SLACK_JOIN_REQUESTS_CHANNEL_WEBHOOK_URL")
 
+# How many of the install's candidate nodes (see meshapi.util.node_candidates) to list in the message
+SLACK_CANDIDATE_NODES = 3
+
 
 @receiver(post_save, sender=Install, dispatch_uid="join_requests_slack_channel")
 @skip_if_flag_disabled("INTEGRATION_ENABLED_SEND_JOIN_REQUEST_SLACK_MESSAGES")
@@ -29,6 +33,11 @@ def send_join_request_slack_message(sender: ModelBase, instance: Install, create
 
     building_height = str(int(install.building.altitude)) + "m" if install.building.altitude else "Altitude not found"
     roof_access = "Roof access" if install.roof_access else "No roof access"
+    nearby_nodes = ""
+    if install.candidate_nodes:
+        nearby_nodes = "\nNearby: " + " · ".join(
+            format_candidate_node(candidate) for candidate in install.candidate_nodes[:SLACK_CANDIDATE_NODES]
+        )
 
     attempts = 0
     while attempts < 4:
@@ -39,6 +48,7 @@ def send_join_request_slack_message(sender: ModelBase, instance: Install, create
                 "text": f"*<https://www.nycmesh.net/map/nodes/{install.install_number}"
                 f"|{install.building.one_line_complete_address}>*\n"
                 f"{building_height} · {roof_access} · No LoS Data Available"
+                f"{nearby_nodes}"
             },
         )
 
@@ -0,0 +1,75 @@
+import logging
+from typing import Any, Type
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.base import ModelBase
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from flags.state import flag_enabled
+
+from meshapi.util.map_artifacts import clear_current_artifacts
+from meshapi.util.response_cache import MESH_MODEL_LABELS
+
+BUILD_SCHEDULED_KEY = "map_artifact:build_scheduled"
+
+# Changes tend to come in bursts (e.g. an import, or someone editing a few objects in the admin), so wait
+# a little while after the first one and rebuild once for the lot
+BUILD_DELAY_SECONDS = 30
+
+
+def enqueue_map_artifact_build() -> None:
+    # Imported here since the tasks module imports half the app, which isn't ready yet when this one is loaded
+    from meshapi.tasks import run_build_map_artifacts
+
+    try:
+        run_build_map_artifacts.apply_async(countdown=BUILD_DELAY_SECONDS)
+    except Exception:
+        # The scheduled build will pick the change up instead
+        logging.exception("Could not schedule a build of the map artifacts")
+
+
+def refresh_map_artifacts() -> None:
+    try:
+        clear_current_artifacts()
+        if not flag_enabled("TASK_ENABLED_BUILD_MAP_ARTIFACTS"):
+            return
+        if not cache.add(BUILD_SCHEDULED_KEY, 1, timeout=BUILD_DELAY_SECONDS):
+            # A build is already due to run, and will include this change
+            return
+    except Exception:
+        logging.warning("Could not schedule a build of the map artifacts", exc_info=True)
+        return
+
+    enqueue_map_artifact_build()
+
+
+def refresh_map_artifacts_for(model: Type[Model]) -> None:
+    if model._meta.label not in MESH_MODEL_LABELS:
+        return
+
+    # Until the change is committed, a build (or a request falling back to the views) would only see the
+    # old data, and if the change is rolled back there is nothing to build at all
+    transaction.on_commit(refresh_map_artifacts)
+
+
+@receiver(post_save, dispatch_uid="schedule_map_artifact_build_on_save")
+def schedule_map_artifact_build_on_save(sender: ModelBase, instance: Model, **kwargs: Any) -> None:
+    refresh_map_artifacts_for(type(instance))
+
+
+@receiver(post_delete, dispatch_uid="schedule_map_artifact_build_on_delete")
+def schedule_map_artifact_build_on_delete(sender: ModelBase, instance: Model, **kwargs: Any) -> None:
+    refresh_map_artifacts_for(type(instance))
+
+
+@receiver(m2m_changed, dispatch_uid="schedule_map_artifact_build_on_m2m_change")
+def schedule_map_artifact_build_on_m2m_change(
+    sender: ModelBase, instance: Model, action: str, model: Type[Model], **kwargs: Any
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    refresh_map_artifacts_for(type(instance))
+    refresh_map_artifacts_for(model)
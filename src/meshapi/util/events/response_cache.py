@@ -0,0 +1,37 @@
+from functools import partial
+from typing import Any, Type
+
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.base import ModelBase
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from meshapi.util.response_cache import get_invalidating_labels, invalidate_model_label
+
+
+def invalidate_cached_responses_for(model: Type[Model]) -> None:
+    if model._meta.label in get_invalidating_labels():
+        # Until the change is committed, other requests would just cache the old data again
+        transaction.on_commit(partial(invalidate_model_label, model._meta.label))
+
+
+@receiver(post_save, dispatch_uid="invalidate_cached_responses_on_save")
+def invalidate_cached_responses_on_save(sender: ModelBase, instance: Model, **kwargs: Any) -> None:
+    invalidate_cached_responses_for(type(instance))
+
+
+@receiver(post_delete, dispatch_uid="invalidate_cached_responses_on_delete")
+def invalidate_cached_responses_on_delete(sender: ModelBase, instance: Model, **kwargs: Any) -> None:
+    invalidate_cached_responses_for(type(instance))
+
+
+@receiver(m2m_changed, dispatch_uid="invalidate_cached_responses_on_m2m_change")
+def invalidate_cached_responses_on_m2m_change(
+    sender: ModelBase, instance: Model, action: str, model: Type[Model], **kwargs: Any
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    invalidate_cached_responses_for(type(instance))
+    invalidate_cached_responses_for(model)
@@ -0,0 +1,86 @@
+from functools import partial
+from typing import Any, Optional, Set, Type
+
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.base import ModelBase
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from meshapi.models.util.search_document import (
+    get_dependent_querysets,
+    get_search_document_m2m_senders,
+    get_search_document_senders,
+    refresh_search_documents,
+)
+
+# The refreshes are UPDATEs with a correlated subquery per row, and one change can touch many rows (e.g. every
+# Install and Link of a Node), so they run once the change has committed rather than inside the request's
+# transaction
+
+
+def refresh_search_documents_on_save(sender: ModelBase, instance: Model, raw: bool = False, **kwargs: Any) -> None:
+    if raw:
+        # Loading fixtures, the related objects may not exist yet
+        return
+
+    transaction.on_commit(partial(refresh_search_documents, get_dependent_querysets(instance)))
+
+
+def collect_search_documents_on_delete(sender: ModelBase, instance: Model, **kwargs: Any) -> None:
+    # Once the object is gone we can no longer find the rows that reference it, so we
+    # resolve them now and refresh them after the delete has happened
+    instance._search_document_dependents = [  # type: ignore[attr-defined]
+        qs.model._default_manager.filter(pk__in=list(qs.values_list("pk", flat=True)))
+        for qs in get_dependent_querysets(instance)
+    ]
+
+
+def refresh_search_documents_on_delete(sender: ModelBase, instance: Model, **kwargs: Any) -> None:
+    transaction.on_commit(partial(refresh_search_documents, getattr(instance, "_search_document_dependents", [])))
+
+
+def refresh_search_documents_on_m2m_change(
+    sender: ModelBase,
+    instance: Model,
+    action: str,
+    model: Type[Model],
+    pk_set: Optional[Set[Any]],
+    **kwargs: Any,
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    querysets = get_dependent_querysets(instance)
+
+    # pk_set is not provided for clear(), in that case the objects on the other side of the
+    # relation will pick up the change the next time they are saved
+    for related_object in model._default_manager.filter(pk__in=pk_set or []):
+        querysets += get_dependent_querysets(related_object)
+
+    transaction.on_commit(partial(refresh_search_documents, querysets))
+
+
+# Only the models that make up a search document are connected, so saving anything else costs nothing
+for _sender in get_search_document_senders():
+    post_save.connect(
+        refresh_search_documents_on_save,
+        sender=_sender,
+        dispatch_uid=f"refresh_search_documents_on_save:{_sender._meta.label}",
+    )
+    pre_delete.connect(
+        collect_search_documents_on_delete,
+        sender=_sender,
+        dispatch_uid=f"collect_search_documents_on_delete:{_sender._meta.label}",
+    )
+    post_delete.connect(
+        refresh_search_documents_on_delete,
+        sender=_sender,
+        dispatch_uid=f"refresh_search_documents_on_delete:{_sender._meta.label}",
+    )
+
+for _sender in get_search_document_m2m_senders():
+    m2m_changed.connect(
+        refresh_search_documents_on_m2m_change,
+        sender=_sender,
+        dispatch_uid=f"refresh_search_documents_on_m2m_change:{_sender._meta.label}",
+    )
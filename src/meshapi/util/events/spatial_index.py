@@ -0,0 +1,26 @@
+from functools import partial
+from typing import Any, Type
+
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.base import ModelBase
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from meshapi.util.spatial_index import INDEXED_MODELS, mark_spatial_index_stale
+
+
+def mark_spatial_index_stale_after_commit(model: Type[Model]) -> None:
+    if model in INDEXED_MODELS:
+        # Until the change is committed, a rebuild would just index the old coordinates again
+        transaction.on_commit(partial(mark_spatial_index_stale, model))
+
+
+@receiver(post_save, dispatch_uid="mark_spatial_index_stale_on_save")
+def mark_spatial_index_stale_on_save(sender: ModelBase, instance: Model, **kwargs: Any) -> None:
+    mark_spatial_index_stale_after_commit(type(instance))
+
+
+@receiver(post_delete, dispatch_uid="mark_spatial_index_stale_on_delete")
+def mark_spatial_index_stale_on_delete(sender: ModelBase, instance: Model, **kwargs: Any) -> None:
+    mark_spatial_index_stale_after_commit(type(instance))
@@ -0,0 +1,29 @@
+from typing import Any
+
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.base import ModelBase
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from meshapi.models import Device, Link, Node
+from meshapi.util.topology import mark_topology_stale
+
+# Devices include AccessPoints and Sectors
+TOPOLOGY_MODELS = (Node, Device, Link)
+
+
+def mark_topology_stale_after_commit(instance: Model) -> None:
+    if isinstance(instance, TOPOLOGY_MODELS):
+        # Until the change is committed, a rebuild would just load the old topology again
+        transaction.on_commit(mark_topology_stale)
+
+
+@receiver(post_save, dispatch_uid="mark_topology_stale_on_save")
+def mark_topology_stale_on_save(sender: ModelBase, instance: Model, **kwargs: Any) -> None:
+    mark_topology_stale_after_commit(instance)
+
+
+@receiver(post_delete, dispatch_uid="mark_topology_stale_on_delete")
+def mark_topology_stale_on_delete(sender: ModelBase, instance: Model, **kwargs: Any) -> None:
+    mark_topology_stale_after_commit(instance)
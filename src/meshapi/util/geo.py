@@ -0,0 +1,299 @@
+"""
+Geographic features for the /api/v1/geo/ endpoints, shared by the GeoJSON and vector tile output.
+
+Each layer is fetched with a single values() query, filtered in the database to the requested bounding box,
+so that clients (and the tile renderer) only pay for what is actually on screen. Lines are included if their
+own bounding box overlaps the requested one, so a link passing through the viewport is still drawn even if
+neither of its ends is in it
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.db.models.functions import Greatest, Least
+
+from meshapi.models import LOS, AccessPoint, Install, Link, Node, Sector
+from meshapi.serializers.map import EXCLUDED_INSTALL_STATUSES
+
+GEOJSON_CONTENT_TYPE = "application/geo+json"
+
+Coordinate = Tuple[float, float]  # (longitude, latitude), the GeoJSON order
+
+
+class BoundingBox(NamedTuple):
+    min_lon: float
+    min_lat: float
+    max_lon: float
+    max_lat: float
+
+    def expand(self, margin_lon: float, margin_lat: float) -> "BoundingBox":
+        return BoundingBox(
+            self.min_lon - margin_lon,
+            self.min_lat - margin_lat,
+            self.max_lon + margin_lon,
+            self.max_lat + margin_lat,
+        )
+
+
+def parse_bbox(value: str) -> BoundingBox:
+    """
+    Parses a bbox query parameter in the GeoJSON order, "min_lon,min_lat,max_lon,max_lat"
+
+    :raises ValueError: if the value isn't a valid bounding box
+    """
+    parts = value.split(",")
+    if len(parts) != 4:
+        raise ValueError("bbox must be four comma separated numbers: min_lon,min_lat,max_lon,max_lat")
+
+    bbox = BoundingBox(*(float(part) for part in parts))
+    if bbox.min_lon > bbox.max_lon or bbox.min_lat > bbox.max_lat:
+        raise ValueError("bbox minimums must not be greater than its maximums")
+    if not (-180 <= bbox.min_lon and bbox.max_lon <= 180 and -90 <= bbox.min_lat and bbox.max_lat <= 90):
+        raise ValueError("bbox must be within -180,-90,180,90")
+
+    return bbox
+
+
+@dataclass
+class GeoFeature:
+    geometry_type: str  # "Point" or "LineString"
+    coordinates: List[Coordinate]
+    properties: Dict[str, Any] = field(default_factory=dict)
+
+    def to_geojson(self) -> Dict[str, Any]:
+        if self.geometry_type == "Point":
+            coordinates: Any = list(self.coordinates[0])
+        else:
+            coordinates = [list(coordinate) for coordinate in self.coordinates]
+
+        return {
+            "type": "Feature",
+            "geometry": {"type": self.geometry_type, "coordinates": coordinates},
+            "properties": self.properties,
+        }
+
+
+def feature_collection(features: Sequence[GeoFeature]) -> Dict[str, Any]:
+    return {"type": "FeatureCollection", "features": [feature.to_geojson() for feature in features]}
+
+
+def _point_filter(bbox: Optional[BoundingBox], prefix: str = "") -> Q:
+    if bbox is None:
+        return Q()
+
+    return Q(
+        **{
+            f"{prefix}longitude__gte": bbox.min_lon,
+            f"{prefix}longitude__lte": bbox.max_lon,
+            f"{prefix}latitude__gte": bbox.min_lat,
+            f"{prefix}latitude__lte": bbox.max_lat,
+        }
+    )
+
+
+def _filter_lines(queryset: QuerySet, bbox: Optional[BoundingBox], from_prefix: str, to_prefix: str) -> QuerySet:
+    if bbox is None:
+        return queryset
+
+    return queryset.annotate(
+        line_min_lon=Least(f"{from_prefix}longitude", f"{to_prefix}longitude"),
+        line_max_lon=Greatest(f"{from_prefix}longitude", f"{to_prefix}longitude"),
+        line_min_lat=Least(f"{from_prefix}latitude", f"{to_prefix}latitude"),
+        line_max_lat=Greatest(f"{from_prefix}latitude", f"{to_prefix}latitude"),
+    ).filter(
+        line_min_lon__lte=bbox.max_lon,
+        line_max_lon__gte=bbox.min_lon,
+        line_min_lat__lte=bbox.max_lat,
+        line_max_lat__gte=bbox.min_lat,
+    )
+
+
+def get_node_features(bbox: Optional[BoundingBox] = None) -> List[GeoFeature]:
+    rows = (
+        Node.objects.filter(_point_filter(bbox))
+        .exclude(status=Node.NodeStatus.INACTIVE)
+        .order_by("network_number")
+        .values_list("id", "network_number", "name", "status", "type", "altitude", "longitude", "latitude")
+    )
+    return [
+        GeoFeature(
+            "Point",
+            [(longitude, latitude)],
+            {
+                "id": str(node_id),
+                "network_number": network_number,
+                "name": name,
+                "status": status,
+                "type": node_type,
+                "altitude": altitude,
+            },
+        )
+        for node_id, network_number, name, status, node_type, altitude, longitude, latitude in rows
+    ]
+
+
+def get_install_features(bbox: Optional[BoundingBox] = None) -> List[GeoFeature]:
+    rows = (
+        Install.objects.filter(_point_filter(bbox, "building__"))
+        .exclude(status__in=EXCLUDED_INSTALL_STATUSES)
+        .order_by("install_number")
+        .values_list(
+            "install_number",
+            "status",
+            "roof_access",
+            "node__network_number",
+            "building__altitude",
+            "building__longitude",
+            "building__latitude",
+        )
+    )
+    return [
+        GeoFeature(
+            "Point",
+            [(longitude, latitude)],
+            {
+                "install_number": install_number,
+                "status": status,
+                "roof_access": roof_access,
+                "network_number": network_number,
+                "altitude": altitude,
+            },
+        )
+        for install_number, status, roof_access, network_number, altitude, longitude, latitude in rows
+    ]
+
+
+def get_access_point_features(bbox: Optional[BoundingBox] = None) -> List[GeoFeature]:
+    rows = (
+        AccessPoint.objects.filter(_point_filter(bbox))
+        .exclude(status=AccessPoint.DeviceStatus.INACTIVE)
+        .order_by("id")
+        .values_list("id", "name", "status", "node__network_number", "altitude", "longitude", "latitude")
+    )
+    return [
+        GeoFeature(
+            "Point",
+            [(longitude, latitude)],
+            {
+                "id": str(access_point_id),
+                "name": name,
+                "status": status,
+                "network_number": network_number,
+                "altitude": altitude,
+            },
+        )
+        for access_point_id, name, status, network_number, altitude, longitude, latitude in rows
+    ]
+
+
+def get_sector_features(bbox: Optional[BoundingBox] = None) -> List[GeoFeature]:
+    rows = (
+        Sector.objects.filter(_point_filter(bbox, "node__"))
+        .exclude(status=Sector.DeviceStatus.INACTIVE)
+        .order_by("id")
+        .values_list(
+            "id",
+            "name",
+            "status",
+            "azimuth",
+            "width",
+            "radius",
+            "node__network_number",
+            "node__longitude",
+            "node__latitude",
+        )
+    )
+    return [
+        GeoFeature(
+            "Point",
+            [(longitude, latitude)],
+            {
+                "id": str(sector_id),
+                "name": name,
+                "status": status,
+                "azimuth": azimuth,
+                "width": width,
+                "radius": radius,
+                "network_number": network_number,
+            },
+        )
+        for sector_id, name, status, azimuth, width, radius, network_number, longitude, latitude in rows
+    ]
+
+
+def get_link_features(bbox: Optional[BoundingBox] = None) -> List[GeoFeature]:
+    queryset = Link.objects.exclude(status=Link.LinkStatus.INACTIVE)
+    rows = (
+        _filter_lines(queryset, bbox, "from_device__node__", "to_device__node__")
+        .order_by("id")
+        .values_list(
+            "id",
+            "status",
+            "type",
+            "from_device__node__network_number",
+            "to_device__node__network_number",
+            "from_device__node__longitude",
+            "from_device__node__latitude",
+            "to_device__node__longitude",
+            "to_device__node__latitude",
+        )
+    )
+    return [
+        GeoFeature(
+            "LineString",
+            [(from_lon, from_lat), (to_lon, to_lat)],
+            {
+                "id": str(link_id),
+                "status": status,
+                "type": link_type,
+                "from": from_nn,
+                "to": to_nn,
+            },
+        )
+        for link_id, status, link_type, from_nn, to_nn, from_lon, from_lat, to_lon, to_lat in rows
+    ]
+
+
+def get_los_features(bbox: Optional[BoundingBox] = None) -> List[GeoFeature]:
+    # Only LOSes between buildings which are on the map, same as the KML
+    queryset = LOS.objects.filter(
+        Exists(Install.objects.filter(building=OuterRef("from_building")))
+        & Exists(Install.objects.filter(building=OuterRef("to_building")))
+    )
+    rows = (
+        _filter_lines(queryset, bbox, "from_building__", "to_building__")
+        .order_by("id")
+        .values_list(
+            "id",
+            "source",
+            "analysis_date",
+            "from_building__longitude",
+            "from_building__latitude",
+            "to_building__longitude",
+            "to_building__latitude",
+        )
+    )
+    return [
+        GeoFeature(
+            "LineString",
+            [(from_lon, from_lat), (to_lon, to_lat)],
+            {
+                "id": str(los_id),
+                "source": source,
+                "analysis_date": analysis_date.isoformat() if analysis_date else None,
+            },
+        )
+        for los_id, source, analysis_date, from_lon, from_lat, to_lon, to_lat in rows
+    ]
+
+
+# Layer name -> function returning its features within a bounding box
+LAYERS: Dict[str, Callable[[Optional[BoundingBox]], List[GeoFeature]]] = {
+    "nodes": get_node_features,
+    "installs": get_install_features,
+    "accesspoints": get_access_point_features,
+    "sectors": get_sector_features,
+    "links": get_link_features,
+    "los": get_los_features,
+}
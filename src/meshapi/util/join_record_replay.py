@@ -0,0 +1,314 @@
+"""
+Replays join records into the join form, for submissions which never made it into MeshDB (e.g. because
+it was down at the time). See the replay_join_records command.
+
+Most of the time a replay takes is spent waiting on the geocoding APIs and on DNS lookups for email
+domains, so every distinct address and email address is checked once, concurrently, before anything is
+submitted. The records are then submitted one at a time, in order, taking the same lock as the join form so
+that they never overlap with live sign-ups. By then all that's left for each one is writing to the database,
+which the lock would serialize anyway.
+
+The record UUID is used as an idempotency key: a record which already has an install number in the join
+record index is never submitted again, and a lock on the UUID means two overlapping replays can't both
+submit the same record. This makes it safe to run the replay again after it was interrupted.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from rest_framework.response import Response
+
+from meshapi.exceptions import InvalidAddressError, UnsupportedAddressError
+from meshapi.models import JoinRecordEntry
+from meshapi.util.django_pglocks import advisory_lock
+from meshapi.util.join_records import JoinRecord, JoinRecordProcessor, SubmissionStage
+from meshapi.validation import NYCAddressInfo, geocode_nyc_address, validate_email_address
+from meshapi.views.forms import JoinFormRequest, process_join_form
+
+# How many addresses and email addresses to look up at once
+LOOKUP_WORKERS = 8
+
+# Rough costs used to estimate how long a replay will take. Geocoding an address makes up to four HTTP calls
+GEOCODE_SECONDS_ESTIMATE = 2.0
+EMAIL_SECONDS_ESTIMATE = 0.5
+SUBMISSION_SECONDS_ESTIMATE = 0.2
+
+# How often (in records) to log the progress of a replay
+PROGRESS_INTERVAL = 10
+
+AddressKey = Tuple[str, str, str, str]
+
+# Decides what to do when the join form asks for some information to be confirmed (409): "accept" the
+# changes it suggests, "reject" them and submit the record as it is, or "skip" the record
+ConflictResolver = Callable[[JoinRecord, JoinFormRequest, Response], str]
+
+
+def address_key(street_address: str, city: str, state: str, zip_code: str) -> AddressKey:
+    def normalize(part: str) -> str:
+        return " ".join(str(part).split()).casefold()
+
+    return normalize(street_address), normalize(city), normalize(state), normalize(zip_code)
+
+
+def join_record_to_request(record: JoinRecord) -> JoinFormRequest:
+    return JoinFormRequest(**{k: v for k, v in record.__dict__.items() if k in JoinFormRequest.__dataclass_fields__})
+
+
+def already_replayed(uuid: str) -> bool:
+    return JoinRecordEntry.objects.filter(uuid=uuid, install_number__isnull=False).exists()
+
+
+class GeocodeMemo:
+    """
+    Remembers the result of geocoding each address, so that it is only looked up once. Addresses the
+    geocoder rejected are remembered too, but lookups which failed for any other reason (e.g. the API being
+    down) are left to be tried again when the record is submitted
+    """
+
+    def __init__(self) -> None:
+        self._results: Dict[AddressKey, Union[NYCAddressInfo, UnsupportedAddressError, InvalidAddressError]] = {}
+        self._lock = threading.Lock()
+
+    def geocode(self, street_address: str, city: str, state: str, zip_code: str) -> NYCAddressInfo:
+        key = address_key(street_address, city, state, zip_code)
+        with self._lock:
+            result = self._results.get(key)
+
+        if result is None:
+            try:
+                result = geocode_nyc_address(street_address, city, state, zip_code)
+            except (UnsupportedAddressError, InvalidAddressError) as e:
+                result = e
+            with self._lock:
+                self._results[key] = result
+
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def get(self, r: JoinFormRequest) -> Optional[NYCAddressInfo]:
+        """Returns the address the request geocoded to, if it has been looked up successfully"""
+        with self._lock:
+            result = self._results.get(address_key(r.street_address, r.city, r.state, r.zip_code))
+        return None if isinstance(result, Exception) else result
+
+    def prefetch(self, requests: Iterable[JoinFormRequest], workers: int = LOOKUP_WORKERS) -> None:
+        pending: Dict[AddressKey, JoinFormRequest] = {}
+        for r in requests:
+            pending.setdefault(address_key(r.street_address, r.city, r.state, r.zip_code), r)
+        if not pending:
+            return
+
+        def lookup(r: JoinFormRequest) -> None:
+            try:
+                self.geocode(r.street_address, r.city, r.state, r.zip_code)
+            except Exception:
+                # Whatever went wrong will be reported when the record is submitted
+                pass
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            list(executor.map(lookup, pending.values()))
+
+
+class EmailMemo:
+    """
+    Remembers whether each email address is valid, so that it is only checked once
+    """
+
+    def __init__(self) -> None:
+        self._results: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    def validate(self, email_address: str) -> bool:
+        with self._lock:
+            result = self._results.get(email_address)
+
+        if result is None:
+            result = validate_email_address(email_address)
+            with self._lock:
+                self._results[email_address] = result
+        return result
+
+    def prefetch(self, email_addresses: Iterable[str], workers: int = LOOKUP_WORKERS) -> None:
+        pending = {email_address for email_address in email_addresses if email_address}
+        if not pending:
+            return
+
+        def lookup(email_address: str) -> None:
+            try:
+                self.validate(email_address)
+            except Exception:
+                # Whatever went wrong will be reported when the record is submitted
+                pass
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            list(executor.map(lookup, pending))
+
+
+@dataclass
+class ReplayEstimate:
+    records: int
+    already_replayed: int
+    geocode_lookups: int
+    email_domains: int
+    seconds: float
+
+
+@dataclass
+class ReplayStats:
+    records: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    already_replayed: int = 0
+    seconds: float = 0
+
+    @property
+    def records_per_second(self) -> float:
+        return (self.succeeded + self.failed + self.skipped) / self.seconds if self.seconds else 0
+
+
+class JoinRecordReplayer:
+    def __init__(
+        self,
+        processor: JoinRecordProcessor,
+        resolve_conflict: ConflictResolver,
+        workers: int = LOOKUP_WORKERS,
+    ):
+        """
+        :param workers: how many addresses and email addresses to look up at once
+        """
+        self.processor = processor
+        self.resolve_conflict = resolve_conflict
+        self.workers = workers
+        self.geocodes = GeocodeMemo()
+        self.emails = EmailMemo()
+
+        self._stats = ReplayStats()
+        self._started = 0.0
+
+    def estimate(self, records: List[JoinRecord]) -> ReplayEstimate:
+        """Estimates the cost of replaying the records, without calling any external APIs"""
+        pending = [record for record in records if not already_replayed(record.uuid)]
+        addresses = {
+            address_key(record.street_address, record.city, record.state, record.zip_code) for record in pending
+        }
+        email_domains = {
+            record.email_address.rpartition("@")[2].casefold() for record in pending if record.email_address
+        }
+        lookup_seconds = len(addresses) * GEOCODE_SECONDS_ESTIMATE + len(email_domains) * EMAIL_SECONDS_ESTIMATE
+        return ReplayEstimate(
+            records=len(pending),
+            already_replayed=len(records) - len(pending),
+            geocode_lookups=len(addresses),
+            email_domains=len(email_domains),
+            # Submissions are serialized by the join form lock, so there's no dividing those up
+            seconds=lookup_seconds / max(self.workers, 1) + len(pending) * SUBMISSION_SECONDS_ESTIMATE,
+        )
+
+    def replay(self, records: List[JoinRecord]) -> ReplayStats:
+        """
+        Submits each record to the join form, in order, and uploads the outcome
+        """
+        self._started = time.monotonic()
+        self._stats = ReplayStats(records=len(records))
+
+        pending = []
+        for record in records:
+            if already_replayed(record.uuid):
+                logging.info(f"Join record {record.uuid} has already been replayed, skipping")
+                self._stats.already_replayed += 1
+            else:
+                pending.append(record)
+
+        logging.info(f"Looking up the addresses and email addresses of {len(pending)} join records...")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            geocodes = executor.submit(
+                self.geocodes.prefetch, [join_record_to_request(record) for record in pending], self.workers
+            )
+            emails = executor.submit(self.emails.prefetch, [record.email_address for record in pending], self.workers)
+            geocodes.result()
+            emails.result()
+
+        logging.info(f"Replaying {len(pending)} join records...")
+        for record in pending:
+            try:
+                outcome = self._replay_record(record)
+            except Exception:
+                logging.exception(f"Could not replay join record {record.uuid}")
+                outcome = "failed"
+            self._record_progress(outcome)
+
+        self._stats.seconds = time.monotonic() - self._started
+        return self._stats
+
+    def _record_progress(self, outcome: str) -> None:
+        if outcome == "succeeded":
+            self._stats.succeeded += 1
+        elif outcome == "failed":
+            self._stats.failed += 1
+        elif outcome == "skipped":
+            self._stats.skipped += 1
+        else:
+            self._stats.already_replayed += 1
+
+        done = self._stats.succeeded + self._stats.failed + self._stats.skipped + self._stats.already_replayed
+        if done % PROGRESS_INTERVAL == 0 or done == self._stats.records:
+            self._stats.seconds = time.monotonic() - self._started
+            logging.info(
+                f"Replayed {done}/{self._stats.records} join records "
+                f"({self._stats.records_per_second:.1f} records/s)"
+            )
+
+    def _replay_record(self, record: JoinRecord) -> str:
+        with advisory_lock(f"join_record_replay_{record.uuid}", wait=False) as acquired:
+            # Either another replay is submitting this record right now, or one did since we started
+            if not acquired or already_replayed(record.uuid):
+                logging.info(f"Join record {record.uuid} has already been replayed, skipping")
+                return "already_replayed"
+
+            r = join_record_to_request(record)
+            response = self._submit(r)
+            logging.info(f"{response.status_code} : {response.data}")
+
+            if response.status_code == 409:
+                choice = self.resolve_conflict(record, r, response)
+
+                if choice == "accept":
+                    logging.info("Re-submitting with accepted changes...")
+                    r.__dict__.update(response.data["changed_info"])
+                    response = self._submit(r)
+                    logging.info(f"Code: {response.status_code}")
+                elif choice == "reject":
+                    logging.info("Rejecting changes and re-submitting...")
+                    r.__dict__.update({"trust_me_bro": True})
+                    record.trust_me_bro = True
+                    response = self._submit(r)
+                    logging.info(f"Code: {response.status_code}")
+                else:
+                    logging.info("Skipping...")
+                    return "skipped"
+
+            record.code = str(response.status_code)
+            record.replayed += 1
+            succeeded = bool(response.data.get("install_number"))
+            if succeeded:
+                record.install_number = response.data["install_number"]
+                logging.info("OK")
+            else:
+                logging.error(
+                    "Replay failed! Did not get an install number for "
+                    f"record: {JoinRecordProcessor.get_key(record, SubmissionStage.POST)}."
+                )
+
+            # This also records the install number in the index, which is what stops it being replayed again
+            self.processor.upload(record, JoinRecordProcessor.get_key(record, SubmissionStage.POST))
+            return "succeeded" if succeeded else "failed"
+
+    def _submit(self, r: JoinFormRequest) -> Response:
+        with advisory_lock("join_form_lock"):
+            return process_join_form(r, geocode=self.geocodes.geocode, validate_email=self.emails.validate)
@@ -3,13 +3,19 @@ import datetime
 import json
 import logging
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, fields
 from enum import Enum
-from typing import Optional
+from typing import Optional, Tuple
 
 import boto3
 from botocore.client import ClientError, Config
+from django.core.cache import cache
+from django.db.models import Q, QuerySet
 
+from meshapi.models import JoinRecordEntry
 from meshapi.views.forms import JoinFormRequest
 
 # Only used for dev with Minio. Don't set in deployed or unit testing envs
@@ -18,6 +24,22 @@ JOIN_RECORD_ENDPOINT = os.environ.get("S3_ENDPOINT", None)
 JOIN_RECORD_BUCKET_NAME = os.environ.get("JOIN_RECORD_BUCKET_NAME")
 JOIN_RECORD_PREFIX = os.environ.get("JOIN_RECORD_PREFIX")
 
+# The most keys S3 will return per list_objects_v2 call
+JOIN_RECORD_LIST_PAGE_SIZE = 1000
+
+# How many objects to download at once
+JOIN_RECORD_FETCH_WORKERS = 16
+
+# How many parsed records to keep in memory, so that repeated scans of the same period (replays, reloads of
+# the viewer) only need to download the records that are new or have changed since
+JOIN_RECORD_CACHE_SIZE = 10000
+
+# The index is synced from S3 this often by meshapi.tasks.run_sync_join_records. The viewer syncs the period it
+# is showing itself if that hasn't been synced this recently, e.g. because the task isn't enabled
+JOIN_RECORD_INDEX_MAX_AGE_SECONDS = 10 * 60
+
+JOIN_RECORD_INDEX_SYNCED_CACHE_KEY = "join_records:index_synced_since"
+
 
 class SubmissionStage(Enum):
     PRE = "pre"
@@ -59,6 +81,114 @@ def s3_content_to_join_record(object_key: str, content: str) -> JoinRecord:
     return join_record
 
 
+def join_record_to_entry(join_record: JoinRecord, key: str, etag: str = "") -> JoinRecordEntry:
+    # "<prefix>/v3/<stage>/..."
+    stage = key.split("/")[2]
+    return JoinRecordEntry(
+        key=key,
+        etag=etag,
+        stage=stage,
+        uuid=join_record.uuid,
+        version=join_record.version,
+        submission_time=datetime.datetime.fromisoformat(join_record.submission_time).replace(
+            tzinfo=datetime.timezone.utc
+        ),
+        code=join_record.code or "",
+        replayed=join_record.replayed or 0,
+        install_number=join_record.install_number,
+        record=dataclasses.asdict(join_record),
+    )
+
+
+def entry_to_join_record(entry: JoinRecordEntry) -> JoinRecord:
+    return JoinRecord(**{key.name: entry.record.get(key.name) for key in fields(JoinRecord)})
+
+
+def save_join_record_entries(entries: list[JoinRecordEntry]) -> None:
+    JoinRecordEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=[
+            "etag",
+            "stage",
+            "uuid",
+            "version",
+            "submission_time",
+            "code",
+            "replayed",
+            "install_number",
+            "record",
+        ],
+    )
+
+
+def get_consistent_join_records(since: datetime.datetime) -> QuerySet[JoinRecordEntry]:
+    """
+    The indexed equivalent of JoinRecordProcessor.ensure_pre_post_consistency: the post-submission records
+    since the given time, plus the pre-submission records which don't have one, in submission order
+    """
+    entries = JoinRecordEntry.objects.filter(submission_time__gte=since, version__gte=2)
+    post_uuids = entries.filter(stage=JoinRecordEntry.Stage.POST).values("uuid")
+    return entries.filter(
+        Q(stage=JoinRecordEntry.Stage.POST) | (Q(stage=JoinRecordEntry.Stage.PRE) & ~Q(uuid__in=post_uuids))
+    )
+
+
+def index_is_fresh(since: datetime.datetime) -> bool:
+    """
+    Returns True if the index has been synced from S3 back to at least the given time in the last
+    JOIN_RECORD_INDEX_MAX_AGE_SECONDS
+    """
+    try:
+        synced_since = cache.get(JOIN_RECORD_INDEX_SYNCED_CACHE_KEY)
+    except Exception:
+        logging.warning("Could not check when the join record index was synced", exc_info=True)
+        return False
+    return synced_since is not None and synced_since <= since.timestamp()
+
+
+def _record_index_synced(since: Optional[datetime.datetime]) -> None:
+    try:
+        cache.set(
+            JOIN_RECORD_INDEX_SYNCED_CACHE_KEY,
+            since.timestamp() if since else 0,
+            timeout=JOIN_RECORD_INDEX_MAX_AGE_SECONDS,
+        )
+    except Exception:
+        logging.warning("Could not record that the join record index was synced", exc_info=True)
+
+
+def exclude_irrelevant_records(entries: QuerySet[JoinRecordEntry]) -> QuerySet[JoinRecordEntry]:
+    """
+    The indexed equivalent of replay_join_records.Command.filter_irrelevant_record: leaves out submissions
+    which are known good, and 400s
+    """
+    return entries.filter(install_number__isnull=True).exclude(code__regex=r"^4[0-9][0-9]$")
+
+
+# Keyed by (S3 key, ETag), so a record which is uploaded again (e.g. after being replayed) is fetched again
+_join_record_cache: "OrderedDict[Tuple[str, str], JoinRecord]" = OrderedDict()
+_join_record_cache_lock = threading.Lock()
+
+
+def _get_cached_join_record(object_key: str, etag: str) -> Optional[JoinRecord]:
+    with _join_record_cache_lock:
+        record = _join_record_cache.get((object_key, etag))
+        if record is None:
+            return None
+        _join_record_cache.move_to_end((object_key, etag))
+    # Callers are free to modify the records they get back
+    return dataclasses.replace(record)
+
+
+def _cache_join_record(object_key: str, etag: str, record: JoinRecord) -> None:
+    with _join_record_cache_lock:
+        _join_record_cache[(object_key, etag)] = dataclasses.replace(record)
+        while len(_join_record_cache) > JOIN_RECORD_CACHE_SIZE:
+            _join_record_cache.popitem(last=False)
+
+
 class JoinRecordProcessor:
     def __init__(self) -> None:
         if not JOIN_RECORD_BUCKET_NAME:
@@ -75,7 +205,7 @@ class JoinRecordProcessor:
 
     def upload(self, join_record: JoinRecord, key: str) -> None:
         try:
-            self.s3_client.put_object(
+            response = self.s3_client.put_object(
                 Bucket=JOIN_RECORD_BUCKET_NAME,
                 Key=key,
                 Body=json.dumps(dataclasses.asdict(join_record)),
@@ -83,10 +213,46 @@ class JoinRecordProcessor:
             )
         except ClientError as e:
             logging.error(e)
+            # Index it anyway, so that e.g. the install number a replay got isn't lost, which would mean it
+            # being replayed again. Without an ETag, the stale copy in S3 won't replace it (see sync_index())
+            save_join_record_entries([join_record_to_entry(join_record, key)])
+            return
+
+        save_join_record_entries([join_record_to_entry(join_record, key, response.get("ETag", ""))])
 
     def get_all(
         self, since: Optional[datetime.datetime] = None, submission_prefix: SubmissionStage = SubmissionStage.POST
     ) -> list[JoinRecord]:
+        return self._fetch_all(self._list(since, submission_prefix))
+
+    def sync_index(self, since: Optional[datetime.datetime] = None) -> int:
+        """
+        Copies the records uploaded to S3 since the given time into the index (JoinRecordEntry), downloading
+        only the ones which are new or have changed since they were last copied. Returns how many that was.
+
+        Records indexed without an ETag were never uploaded (see upload()), so they are newer than whatever S3
+        has for them, and are left alone
+        """
+        synced = 0
+        for stage in SubmissionStage:
+            contents = self._list(since, stage)
+            known = set(
+                JoinRecordEntry.objects.filter(key__in=[obj["Key"] for obj in contents]).values_list("key", "etag")
+            )
+            not_uploaded = {key for key, etag in known if not etag}
+            changed = [
+                obj for obj in contents if (obj["Key"], obj["ETag"]) not in known and obj["Key"] not in not_uploaded
+            ]
+            records = self._fetch_all(changed)
+            save_join_record_entries(
+                [join_record_to_entry(record, obj["Key"], obj["ETag"]) for obj, record in zip(changed, records)]
+            )
+            synced += len(changed)
+
+        _record_index_synced(since)
+        return synced
+
+    def _list(self, since: Optional[datetime.datetime], submission_prefix: SubmissionStage) -> list[dict]:
         prefix = f"{JOIN_RECORD_PREFIX}/v3/{submission_prefix.value}"
         start_after = (
             since.strftime(f"{JOIN_RECORD_PREFIX}/v3/{submission_prefix.value}/%Y/%m/%d/%H/%M/%S")
@@ -94,11 +260,13 @@ class JoinRecordProcessor:
             else ""
         )
         try:
-            response = self.s3_client.list_objects_v2(
+            pages = self.s3_client.get_paginator("list_objects_v2").paginate(
                 Bucket=JOIN_RECORD_BUCKET_NAME,
                 Prefix=prefix,
                 StartAfter=start_after,
+                PaginationConfig={"PageSize": JOIN_RECORD_LIST_PAGE_SIZE},
             )
+            contents = [obj for page in pages for obj in page.get("Contents", [])]
         except ClientError as e:
             # This will raise ClientError (AccessDenied) if the bucket doesn't exist.
             logging.exception(
@@ -106,24 +274,36 @@ class JoinRecordProcessor:
             )
             raise e
 
-        contents = response.get("Contents")
         if not contents:
             logging.error(
                 f"Found no records. Check Prefix or StartAfter parameters. Prefix={prefix}, StartAfter={start_after}"
             )
-            return []
-
-        join_records = []
-        for obj in contents:
-            object_key = obj["Key"]
-
-            # Get object content
-            content_object = self.s3_client.get_object(Bucket=JOIN_RECORD_BUCKET_NAME, Key=object_key)
-            content = content_object["Body"].read().decode("utf-8")
-
-            join_records.append(s3_content_to_join_record(object_key, content))
-
-        return join_records
+        return contents
+
+    def _fetch_all(self, contents: list[dict]) -> list[JoinRecord]:
+        """
+        Returns the records for the given listed objects, in the same order
+        """
+        join_records: list[Optional[JoinRecord]] = [
+            _get_cached_join_record(obj["Key"], obj["ETag"]) for obj in contents
+        ]
+        missing = [i for i, record in enumerate(join_records) if record is None]
+        if missing:
+            # boto3 clients are safe to share between threads
+            with ThreadPoolExecutor(max_workers=min(JOIN_RECORD_FETCH_WORKERS, len(missing))) as executor:
+                fetched = executor.map(lambda i: self._fetch(contents[i]["Key"]), missing)
+                for i, record in zip(missing, fetched):
+                    join_records[i] = record
+
+        return [record for record in join_records if record is not None]
+
+    def _fetch(self, object_key: str) -> JoinRecord:
+        content_object = self.s3_client.get_object(Bucket=JOIN_RECORD_BUCKET_NAME, Key=object_key)
+        content = content_object["Body"].read().decode("utf-8")
+        record = s3_content_to_join_record(object_key, content)
+        # Cached under the ETag of what we actually got, in case it changed since it was listed
+        _cache_join_record(object_key, content_object["ETag"], record)
+        return record
 
     # I hardcoded the folder prefix to prevent any shenanigans
     def flush_test_data(self) -> None:
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, TypedDict
+
+import requests
+from django.core.cache import cache
+
+LINKNYC_KIOSK_DATA_URL = "https://data.cityofnewyork.us/resource/s4kf-3yrf.json?$limit=100000"
+
+LINKNYC_KIOSK_STATUS_TRANSLATION = {
+    "Live": "active",
+    "Ready for Activation": "pending",
+    "Installed": "installed",
+}
+
+# The full dataset is several MB, give the city a while to send it
+LINKNYC_API_TIMEOUT_SECONDS = 30
+
+# The snapshot is refreshed hourly by meshapi.tasks.run_refresh_linknyc_kiosks. If it gets much older than
+# that (e.g. beat isn't running, as in local dev) the next request for it refreshes it in the background
+KIOSK_SNAPSHOT_MAX_AGE_SECONDS = 3 * 60 * 60
+
+# After a refresh fails, requests don't try again for this long, so that they don't all pile on to the
+# city API while it's down
+KIOSK_REFRESH_BACKOFF_SECONDS = 5 * 60
+
+KIOSK_SNAPSHOT_CACHE_KEY = "linknyc_kiosks:snapshot"
+KIOSK_REFRESHING_CACHE_KEY = "linknyc_kiosks:refreshing"
+KIOSK_REFRESH_FAILED_CACHE_KEY = "linknyc_kiosks:refresh_failed"
+
+
+class KioskSnapshot(TypedDict):
+    kiosks: List[Dict[str, Any]]
+    etag: str  # Our own ETag, derived from the kiosks list above
+    upstream_etag: Optional[str]
+    upstream_last_modified: Optional[str]
+    fetched_at: float
+
+
+session = requests.Session()
+
+# Refreshes started by requests run here, so that they never hold up the request itself
+refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="linknyc_kiosks")
+
+
+def parse_kiosk_data(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Converts the City of New York dataset into the format expected by the website map.
+    Raises KeyError or ValueError if the data isn't what we expect
+    """
+    if not data:
+        raise ValueError("Expected at least one kiosk to be returned from the City of New York dataset")
+
+    kiosks = []
+    for row in data:
+        if not row:
+            logging.warning("Got empty row from City of New York LinkNYC kiosk dataset. Skipping row and moving on.")
+            continue
+        coordinates = [float(row["longitude"]), float(row["latitude"])]
+        kiosk_status = LINKNYC_KIOSK_STATUS_TRANSLATION.get(row["link_installation_status"])
+        kiosks.append(
+            {
+                "street_address": row["street_address"],
+                "type": row["planned_kiosk_type"],
+                "id": row["link_site_id"],
+                "coordinates": coordinates,
+                "status": kiosk_status,
+            }
+        )
+    return kiosks
+
+
+def fetch_kiosk_snapshot(previous: Optional[KioskSnapshot] = None) -> KioskSnapshot:
+    """
+    Downloads the kiosk dataset from the City of New York. If we already have a copy, the request is made
+    conditional on it so that the city doesn't send the whole thing again unless it has changed.
+    Raises requests.exceptions.RequestException, KeyError, ValueError (including JSONDecodeError)
+    """
+    headers = {}
+    if previous and previous["upstream_etag"]:
+        headers["If-None-Match"] = previous["upstream_etag"]
+    if previous and previous["upstream_last_modified"]:
+        headers["If-Modified-Since"] = previous["upstream_last_modified"]
+
+    response = session.get(LINKNYC_KIOSK_DATA_URL, headers=headers, timeout=LINKNYC_API_TIMEOUT_SECONDS)
+    if previous and response.status_code == 304:
+        return {**previous, "fetched_at": time.time()}
+    response.raise_for_status()
+
+    kiosks = parse_kiosk_data(response.json())
+    return {
+        "kiosks": kiosks,
+        "etag": hashlib.sha256(json.dumps(kiosks, sort_keys=True).encode("utf-8")).hexdigest(),
+        "upstream_etag": response.headers.get("ETag"),
+        "upstream_last_modified": response.headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+    }
+
+
+def _get_cached_snapshot() -> Optional[KioskSnapshot]:
+    try:
+        return cache.get(KIOSK_SNAPSHOT_CACHE_KEY)
+    except Exception:
+        logging.warning("Could not load LinkNYC kiosk snapshot from the cache", exc_info=True)
+        return None
+
+
+def _store_snapshot(snapshot: KioskSnapshot) -> None:
+    try:
+        # No expiry, we want to keep the last good copy around for as long as the city API might be down
+        cache.set(KIOSK_SNAPSHOT_CACHE_KEY, snapshot, timeout=None)
+    except Exception:
+        logging.warning("Could not store LinkNYC kiosk snapshot in the cache", exc_info=True)
+
+
+def refresh_kiosk_snapshot() -> KioskSnapshot:
+    snapshot = fetch_kiosk_snapshot(_get_cached_snapshot())
+    _store_snapshot(snapshot)
+    return snapshot
+
+
+def _refresh_failed_recently() -> bool:
+    try:
+        return bool(cache.get(KIOSK_REFRESH_FAILED_CACHE_KEY))
+    except Exception:
+        logging.warning("Could not check for a failed LinkNYC kiosk snapshot refresh", exc_info=True)
+        return False
+
+
+def _claim_refresh() -> bool:
+    """Returns True if nobody else is refreshing the snapshot already, and the last attempt didn't just fail"""
+    if _refresh_failed_recently():
+        return False
+    try:
+        # Expires in case whoever claimed it dies part way through
+        return bool(cache.add(KIOSK_REFRESHING_CACHE_KEY, 1, timeout=2 * LINKNYC_API_TIMEOUT_SECONDS))
+    except Exception:
+        logging.warning("Could not claim the LinkNYC kiosk snapshot refresh, refreshing anyway", exc_info=True)
+        return True
+
+
+def _refresh(previous: Optional[KioskSnapshot]) -> KioskSnapshot:
+    """
+    Like refresh_kiosk_snapshot(), but records a failure so that requests don't try again straight away
+    """
+    try:
+        snapshot = fetch_kiosk_snapshot(previous)
+    except (requests.exceptions.RequestException, KeyError, ValueError):
+        try:
+            cache.set(KIOSK_REFRESH_FAILED_CACHE_KEY, 1, timeout=KIOSK_REFRESH_BACKOFF_SECONDS)
+        except Exception:
+            logging.warning("Could not record the failed LinkNYC kiosk snapshot refresh", exc_info=True)
+        raise
+
+    _store_snapshot(snapshot)
+    return snapshot
+
+
+def _refresh_in_background(previous: KioskSnapshot) -> None:
+    try:
+        _refresh(previous)
+    except (requests.exceptions.RequestException, KeyError, ValueError):
+        logging.exception("Could not refresh LinkNYC kiosk snapshot, serving the last good copy")
+    finally:
+        try:
+            cache.delete(KIOSK_REFRESHING_CACHE_KEY)
+        except Exception:
+            logging.warning("Could not release the LinkNYC kiosk snapshot refresh", exc_info=True)
+
+
+def get_kiosk_snapshot() -> KioskSnapshot:
+    """
+    Returns the most recent copy of the kiosk dataset we have, straight away. If it is very out of date it is
+    refreshed in the background, and if we have no copy at all we go to the city for one and raise (see
+    fetch_kiosk_snapshot()) if that fails. Either way, the city isn't tried again for a while after a failure
+    """
+    snapshot = _get_cached_snapshot()
+    if snapshot is not None:
+        if time.time() - snapshot["fetched_at"] >= KIOSK_SNAPSHOT_MAX_AGE_SECONDS and _claim_refresh():
+            refresh_executor.submit(_refresh_in_background, snapshot)
+        return snapshot
+
+    if _refresh_failed_recently():
+        raise requests.exceptions.ConnectionError("Could not fetch LinkNYC kiosks recently, not trying again yet")
+    return _refresh(None)
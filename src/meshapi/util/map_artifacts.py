@@ -0,0 +1,211 @@
+"""
+Pre-built, pre-compressed copies of the website map data and KML endpoints.
+
+These responses are large, highly compressible, and only change when the mesh does, so rather than rendering
+(and having gunicorn send) them uncompressed for every visitor, build_map_artifacts() renders each of them
+once, and stores the result in the cache keyed by its content hash, along with a gzipped copy. It is run by
+meshapi.tasks.run_build_map_artifacts shortly after any change to the mesh, and on a schedule as a backstop.
+
+The views serve the current artifact (see serve_map_artifact) with a strong ETag and the best encoding the
+client accepts. Any change to the mesh clears the current artifacts straight away, so until the rebuild
+finishes the views are rendered (and cached by meshapi.util.response_cache) as usual.
+
+The same content is also available at an address derived from its hash, which never changes and so can be
+cached by clients and proxies indefinitely.
+
+Brotli would save a bit more than gzip on top of this, but needs a native dependency we don't otherwise have
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, TypedDict
+from urllib.parse import urlparse
+
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.urls import resolve, reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+ARTIFACT_URL_NAMES = [
+    "meshapi-v1-map-data-installs",
+    "meshapi-v1-map-data-links",
+    "meshapi-v1-map-data-sectors",
+    "meshapi-v1-geography-whole-mesh-kml",
+    "meshapi-v1-geography-active-mesh-kml",
+]
+
+KEY_PREFIX = "map_artifact"
+
+# If the builds stop running for any reason, go back to rendering the views rather than serving stale data
+CURRENT_ARTIFACT_MAX_AGE_SECONDS = 60 * 60
+
+# Old artifacts are kept around for a while after being replaced, for anyone still holding their hashed URL
+ARTIFACT_RETENTION_SECONDS = 24 * 60 * 60
+
+# The canonical URLs may change at any time, so clients must revalidate (cheaply, thanks to the ETag)
+CANONICAL_CACHE_CONTROL = "public, max-age=60"
+HASHED_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+GZIP_COMPRESS_LEVEL = 9
+
+
+class MapArtifact(TypedDict):
+    content_type: str
+    identity: bytes
+    gzip: bytes
+
+
+def _blob_key(content_hash: str) -> str:
+    return f"{KEY_PREFIX}:blob:{content_hash}"
+
+
+def _current_key(url_name: str) -> str:
+    return f"{KEY_PREFIX}:current:{url_name}"
+
+
+def _build_request(path: str) -> HttpRequest:
+    # Render as if requested from the public site, so that any absolute URLs in the output (e.g. KML icons)
+    # point to the right place
+    site = urlparse(os.environ.get("SITE_BASE_URL") or "http://localhost")
+    request = HttpRequest()
+    request.method = "GET"
+    request.path = request.path_info = path
+    request.META = {
+        "HTTP_ACCEPT": "*/*",
+        "HTTP_HOST": site.netloc,
+        "SERVER_NAME": site.hostname or "localhost",
+        "SERVER_PORT": str(site.port or (443 if site.scheme == "https" else 80)),
+        "wsgi.url_scheme": site.scheme,
+    }
+    request._building_map_artifact = True  # type: ignore[attr-defined]
+    return request
+
+
+def render_artifact(url_name: str) -> Optional[MapArtifact]:
+    path = reverse(url_name)
+    request = _build_request(path)
+    match = resolve(path)
+    request.resolver_match = match
+
+    response = match.func(request, *match.args, **match.kwargs)
+    if isinstance(response, SimpleTemplateResponse) and not response.is_rendered:
+        response.render()
+
+    if response.status_code != 200:
+        logging.error(f"Could not build map artifact for {path}, got HTTP {response.status_code}")
+        return None
+
+    return {
+        "content_type": response["Content-Type"],
+        "identity": response.content,
+        "gzip": gzip.compress(response.content, compresslevel=GZIP_COMPRESS_LEVEL, mtime=0),
+    }
+
+
+def build_map_artifacts() -> Dict[str, str]:
+    """
+    Renders every artifact and makes it current. Returns the content hash of each, by URL name
+    """
+    hashes = {}
+    for url_name in ARTIFACT_URL_NAMES:
+        artifact = render_artifact(url_name)
+        if artifact is None:
+            continue
+
+        content_hash = hashlib.sha256(artifact["identity"]).hexdigest()
+        # Artifacts are stored by hash, so if nothing has changed since the last build this just extends the
+        # life of what we already have, rather than storing another copy
+        if not cache.touch(_blob_key(content_hash), ARTIFACT_RETENTION_SECONDS):
+            cache.set(_blob_key(content_hash), artifact, timeout=ARTIFACT_RETENTION_SECONDS)
+        cache.set(_current_key(url_name), content_hash, timeout=CURRENT_ARTIFACT_MAX_AGE_SECONDS)
+        hashes[url_name] = content_hash
+
+    return hashes
+
+
+def clear_current_artifacts() -> None:
+    """
+    Stops serving the current artifacts, e.g. because the data in them has changed. They can still be fetched
+    by hash until they expire
+    """
+    cache.delete_many([_current_key(url_name) for url_name in ARTIFACT_URL_NAMES])
+
+
+def get_current_artifact_hash(url_name: str) -> Optional[str]:
+    return cache.get(_current_key(url_name))
+
+
+def get_artifact(content_hash: str) -> Optional[MapArtifact]:
+    return cache.get(_blob_key(content_hash))
+
+
+def artifact_response(
+    request: HttpRequest, content_hash: str, artifact: MapArtifact, cache_control: str
+) -> HttpResponse:
+    """
+    Serves the given artifact, gzipped if the client accepts it, or a 304 if the client already has it
+    """
+    accepted_encodings = [
+        encoding.split(";")[0].strip() for encoding in request.headers.get("Accept-Encoding", "").split(",")
+    ]
+    use_gzip = "gzip" in accepted_encodings
+
+    # Strong ETags must be unique to each encoding of the content, not just to the content
+    etag = quote_etag(f"{content_hash}.gz" if use_gzip else content_hash)
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+
+    if etag in if_none_match or "*" in if_none_match:
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(artifact["gzip"] if use_gzip else artifact["identity"])
+        response["Content-Type"] = artifact["content_type"]
+        if use_gzip:
+            response["Content-Encoding"] = "gzip"
+
+    response["ETag"] = etag
+    response["Cache-Control"] = cache_control
+    response["Content-Location"] = reverse("meshapi-v1-map-artifact", args=[content_hash])
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def serve_map_artifact(view: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+    """
+    View decorator which serves the current pre-built artifact for the view (see build_map_artifacts),
+    if there is one. Otherwise, and for anything other than a plain GET, the view is called as normal.
+    For class based views, decorate dispatch() with method_decorator(serve_map_artifact, name="dispatch")
+    """
+
+    @wraps(view)
+    def inner(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        url_name = request.resolver_match.url_name if request.resolver_match else None
+        if (
+            request.method != "GET"
+            or request.GET
+            or getattr(request, "_building_map_artifact", False)
+            or url_name not in ARTIFACT_URL_NAMES
+        ):
+            return view(request, *args, **kwargs)
+
+        try:
+            content_hash = get_current_artifact_hash(url_name)
+            artifact = get_artifact(content_hash) if content_hash else None
+        except Exception:
+            logging.warning("Could not load map artifact from the cache", exc_info=True)
+            return view(request, *args, **kwargs)
+
+        if content_hash is None or artifact is None:
+            return view(request, *args, **kwargs)
+
+        # Browsers visiting the JSON endpoints directly get the DRF browsable API
+        if artifact["content_type"].startswith("application/json") and "text/html" in request.headers.get("Accept", ""):
+            return view(request, *args, **kwargs)
+
+        return artifact_response(request, content_hash, artifact, CANONICAL_CACHE_CONTROL)
+
+    return inner
@@ -0,0 +1,103 @@
+"""
+Finds the hubs, supernodes and POPs nearest to a new install, so that volunteers don't have to go looking
+for them on the map. The results are stored on the install (Install.candidate_nodes) when it is created,
+and shown in the join requests Slack message and the admin.
+
+The candidates are few enough (hundreds) that rather than a spatial index we keep their coordinates in
+numpy arrays and compute the distance to all of them at once, which takes well under a millisecond. The
+arrays are rebuilt whenever the Node spatial index would be (see meshapi.util.spatial_index)
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, TypedDict
+
+import numpy as np
+
+from meshapi.models import Building, Install, Node
+from meshapi.util.spatial_index import SPATIAL_INDEX_MAX_AGE_SECONDS, get_spatial_index_version, haversine_km
+from meshapi.util.versioned_cache import VersionedValue
+
+CANDIDATE_NODE_TYPES = [Node.NodeType.HUB, Node.NodeType.SUPERNODE, Node.NodeType.POP]
+NEARBY_CANDIDATE_NODES = 5
+
+
+class CandidateNode(TypedDict):
+    node_id: str
+    network_number: Optional[int]
+    name: Optional[str]
+    type: str
+    distance_km: float
+    altitude_delta_m: Optional[float]  # Node altitude minus building altitude, positive if the node is higher
+
+
+@dataclass
+class _CandidateArrays:
+    nodes: List[Tuple[str, Optional[int], Optional[str], str, Optional[float]]]
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+
+
+def _build_candidate_arrays() -> _CandidateArrays:
+    rows = list(
+        Node.objects.filter(status=Node.NodeStatus.ACTIVE, type__in=CANDIDATE_NODE_TYPES).values_list(
+            "id", "network_number", "name", "type", "altitude", "latitude", "longitude"
+        )
+    )
+    return _CandidateArrays(
+        nodes=[(str(row[0]), row[1], row[2], row[3], row[4]) for row in rows],
+        latitudes=np.array([row[5] for row in rows], dtype=np.float64),
+        longitudes=np.array([row[6] for row in rows], dtype=np.float64),
+    )
+
+
+_candidates = VersionedValue(get_spatial_index_version(Node), _build_candidate_arrays, SPATIAL_INDEX_MAX_AGE_SECONDS)
+
+
+def find_candidate_nodes(building: Building, k: int = NEARBY_CANDIDATE_NODES) -> List[CandidateNode]:
+    """
+    Returns the k active hubs, supernodes and POPs nearest to the given building, nearest first
+    """
+    candidates = _candidates.get()
+    if not candidates.nodes:
+        return []
+
+    distances = haversine_km(building.latitude, building.longitude, candidates.latitudes, candidates.longitudes)
+    nearest = np.argsort(distances, kind="stable")[:k]
+
+    results: List[CandidateNode] = []
+    for i in nearest:
+        node_id, network_number, name, node_type, altitude = candidates.nodes[i]
+        results.append(
+            {
+                "node_id": node_id,
+                "network_number": network_number,
+                "name": name,
+                "type": node_type,
+                "distance_km": round(float(distances[i]), 3),
+                "altitude_delta_m": (
+                    round(altitude - building.altitude, 1)
+                    if altitude is not None and building.altitude is not None
+                    else None
+                ),
+            }
+        )
+    return results
+
+
+def attach_candidate_nodes(install: Install) -> List[CandidateNode]:
+    """
+    Finds the candidate nodes for the given install and stores them on it (without sending any signals or
+    creating a history record, since nothing about the install has really changed)
+    """
+    candidates = find_candidate_nodes(install.building)
+    Install.objects.filter(pk=install.pk).update(candidate_nodes=candidates)
+    install.candidate_nodes = candidates
+    return candidates
+
+
+def format_candidate_node(candidate: CandidateNode) -> str:
+    name = f"NN{candidate['network_number']}" if candidate["network_number"] else candidate["name"] or "Unnamed"
+    description = f"{name} ({candidate['type']}) {candidate['distance_km']:.1f} km"
+    if candidate["altitude_delta_m"] is not None:
+        description += f", {candidate['altitude_delta_m']:+.0f} m"
+    return description
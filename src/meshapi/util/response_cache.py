@@ -0,0 +1,199 @@
+"""
+Shared caching of whole responses for the expensive public endpoints (map data, KML, website stats, etc.)
+
+Each cached view declares a ResponseCachePolicy with a TTL and the models whose changes should invalidate it.
+Invalidation is generational: every model label has a version number in the cache which is bumped by the
+receivers in meshapi.util.events.response_cache whenever an object of that model is saved or deleted, and the
+current versions of a policy's models are part of its cache keys, so a bump makes every existing entry
+unreachable (they then expire on their own). The TTL is still what bounds staleness for changes which don't
+send signals (e.g. QuerySet.update())
+
+On a miss, only one process recomputes the response while the others wait (up to recompute_timeout) for it
+to appear in the cache, so that an invalidation doesn't send every worker to the database at once.
+
+If the cache is unavailable, we log a warning and serve every request uncached
+"""
+
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from datadog import statsd
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.template.response import SimpleTemplateResponse
+
+KEY_PREFIX = "response_cache"
+WAIT_POLL_INTERVAL_SECONDS = 0.05
+
+MESH_MODEL_LABELS = (
+    "meshapi.Building",
+    "meshapi.Install",
+    "meshapi.Node",
+    "meshapi.Device",
+    "meshapi.Sector",
+    "meshapi.AccessPoint",
+    "meshapi.Link",
+    "meshapi.LOS",
+)
+
+
+_policies: List["ResponseCachePolicy"] = []
+
+
+@dataclass(frozen=True)
+class ResponseCachePolicy:
+    name: str
+    ttl: int  # seconds
+    invalidated_by: Sequence[str] = ()  # model labels, e.g. "meshapi.Install"
+    recompute_timeout: int = 30  # seconds
+
+    def __post_init__(self) -> None:
+        _policies.append(self)
+
+
+MAP_DATA_POLICY = ResponseCachePolicy("map_data", ttl=10 * 60, invalidated_by=MESH_MODEL_LABELS)
+KML_POLICY = ResponseCachePolicy("kml", ttl=10 * 60, invalidated_by=MESH_MODEL_LABELS)
+GEO_POLICY = ResponseCachePolicy("geo", ttl=10 * 60, invalidated_by=MESH_MODEL_LABELS)
+WEBSITE_STATS_POLICY = ResponseCachePolicy("website_stats", ttl=60 * 60, invalidated_by=("meshapi.Install",))
+
+
+def get_invalidating_labels() -> Set[str]:
+    return {label for policy in _policies for label in policy.invalidated_by}
+
+
+def _tag_key(label: str) -> str:
+    return f"{KEY_PREFIX}:tag:{label}"
+
+
+def _get_tag_versions(labels: Sequence[str]) -> List[int]:
+    versions = cache.get_many([_tag_key(label) for label in labels])
+    result = []
+    for label in labels:
+        version = versions.get(_tag_key(label))
+        if version is None:
+            # Start from the current time rather than zero, so that if a tag is ever evicted we can't go back
+            # to a version that an old entry was stored under
+            version = time.time_ns()
+            if not cache.add(_tag_key(label), version, timeout=None):
+                version = cache.get(_tag_key(label), version)
+        result.append(version)
+    return result
+
+
+def invalidate_model_label(label: str) -> None:
+    try:
+        cache.incr(_tag_key(label))
+    except ValueError:
+        # Nothing has been cached against this tag yet
+        pass
+    except Exception:
+        logging.warning(f"Could not invalidate cached responses for {label}", exc_info=True)
+
+
+def _get_cache_key(policy: ResponseCachePolicy, request: HttpRequest) -> str:
+    versions = ".".join(str(version) for version in _get_tag_versions(policy.invalidated_by))
+    request_hash = hashlib.sha256(
+        f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}|{versions}".encode("utf-8")
+    ).hexdigest()
+    return f"{KEY_PREFIX}:{policy.name}:{request_hash}"
+
+
+def _is_cacheable(response: HttpResponse) -> bool:
+    # HTML responses are the DRF browsable API, which includes the current user and their CSRF token
+    return (
+        response.status_code == 200
+        and not response.cookies
+        and not response.get("Content-Type", "").startswith("text/html")
+    )
+
+
+def _serialize_response(response: HttpResponse) -> Dict[str, Any]:
+    return {"status": response.status_code, "content": response.content, "headers": dict(response.headers)}
+
+
+def _deserialize_response(cached: Dict[str, Any]) -> HttpResponse:
+    return HttpResponse(cached["content"], status=cached["status"], headers=cached["headers"])
+
+
+def _wait_for_recompute(policy: ResponseCachePolicy, key: str) -> Optional[Dict[str, Any]]:
+    deadline = time.monotonic() + policy.recompute_timeout
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_POLL_INTERVAL_SECONDS)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        if cache.get(f"{key}:lock") is None:
+            # Whoever was recomputing gave up without storing a response (e.g. it wasn't cacheable)
+            return None
+    return None
+
+
+def cache_response(policy: ResponseCachePolicy) -> Callable[[Callable[..., HttpResponse]], Callable[..., HttpResponse]]:
+    """
+    View decorator which caches GET responses according to the given policy. Only use this on views whose
+    response doesn't depend on who is asking. For class based views, decorate dispatch() with
+    method_decorator(cache_response(policy), name="dispatch")
+    """
+    tags = [f"policy:{policy.name}"]
+
+    def decorator(view: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+        def render(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+            response = view(request, *args, **kwargs)
+            # DRF responses are normally rendered by Django after the view returns, but we need the content now
+            if isinstance(response, SimpleTemplateResponse) and not response.is_rendered:
+                response.render()
+            return response
+
+        def recompute(request: HttpRequest, key: str, *args: Any, **kwargs: Any) -> HttpResponse:
+            start = time.perf_counter()
+            response = render(request, *args, **kwargs)
+            statsd.timing("meshdb.response_cache.recompute_time", (time.perf_counter() - start) * 1000, tags=tags)
+            if _is_cacheable(response):
+                try:
+                    cache.set(key, _serialize_response(response), timeout=policy.ttl)
+                except Exception:
+                    logging.warning(f"Could not store cached response for {request.path}", exc_info=True)
+            return response
+
+        @wraps(view)
+        def inner(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+            if request.method != "GET":
+                return view(request, *args, **kwargs)
+
+            locked = False
+            try:
+                key = _get_cache_key(policy, request)
+                cached = cache.get(key)
+                if cached is None:
+                    locked = cache.add(f"{key}:lock", 1, timeout=policy.recompute_timeout)
+                    if not locked:
+                        # Somebody else is already recomputing this response
+                        statsd.increment("meshdb.response_cache.wait", tags=tags)
+                        cached = _wait_for_recompute(policy, key)
+            except Exception:
+                logging.warning(f"Response cache unavailable, serving {request.path} uncached", exc_info=True)
+                statsd.increment("meshdb.response_cache.error", tags=tags)
+                return view(request, *args, **kwargs)
+
+            if cached is not None:
+                statsd.increment("meshdb.response_cache.hit", tags=tags)
+                return _deserialize_response(cached)
+
+            statsd.increment("meshdb.response_cache.miss", tags=tags)
+            try:
+                return recompute(request, key, *args, **kwargs)
+            finally:
+                if locked:
+                    try:
+                        cache.delete(f"{key}:lock")
+                    except Exception:
+                        # The lock expires on its own after recompute_timeout anyway
+                        logging.warning("Could not release response cache lock", exc_info=True)
+
+        return inner
+
+    return decorator
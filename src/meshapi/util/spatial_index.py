@@ -0,0 +1,239 @@
+"""
+In-process spatial index over the coordinates of Buildings, Nodes and AccessPoints, for answering proximity
+questions ("which active nodes are within 2 km of this building") without a table scan and a haversine
+per row in Python.
+
+We don't run PostGIS, so rather than a geography column and a GiST index, each process keeps a packed grid
+of the points (a few numpy arrays, sorted by grid cell) which is rebuilt from a single query the first time
+it is used after the model changes. The receivers in meshapi.util.events.spatial_index bump a version
+number in the cache whenever a Building, Node or AccessPoint is saved or deleted, which every process
+checks before using its copy. Changes which don't send signals (e.g. QuerySet.update()) are picked up
+within SPATIAL_INDEX_MAX_AGE_SECONDS.
+
+Typical use:
+
+    index = get_spatial_index(Node)
+    for match in index.nearest(latitude, longitude, k=5):
+        print(match.key, match.distance_km)
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+from django.db.models import Model
+
+from meshapi.models import AccessPoint, Building, Node
+from meshapi.util.geo import BoundingBox
+from meshapi.util.versioned_cache import SharedVersion, VersionedValue
+
+EARTH_RADIUS_KM = 6371.0088
+
+# About 1.1 km north-south and 0.85 km east-west in NYC. Queries look at every point in each grid cell
+# they overlap, so this should be around the size of a typical search
+CELL_SIZE_DEGREES = 0.01
+
+SPATIAL_INDEX_MAX_AGE_SECONDS = 10 * 60
+
+INDEXED_MODELS: Tuple[Type[Model], ...] = (Building, Node, AccessPoint)
+
+
+def haversine_km(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """
+    Returns the great circle distance in km from the given point to each of the given points
+    """
+    lat1, lon1 = math.radians(latitude), math.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def radius_bbox(latitude: float, longitude: float, radius_km: float) -> BoundingBox:
+    """
+    Returns a bounding box which contains every point within radius_km of the given point
+    """
+    lat_margin = math.degrees(radius_km / EARTH_RADIUS_KM)
+    lon_margin = min(lat_margin / max(math.cos(math.radians(latitude)), 1e-6), 180)
+    return BoundingBox(longitude - lon_margin, latitude - lat_margin, longitude + lon_margin, latitude + lat_margin)
+
+
+@dataclass(frozen=True)
+class SpatialMatch:
+    key: Any
+    latitude: float
+    longitude: float
+    distance_km: float
+
+
+class SpatialIndex:
+    """
+    A static grid index of points, each identified by a key (normally a primary key). To change the points,
+    build a new index
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[Any],
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+        cell_size: float = CELL_SIZE_DEGREES,
+    ):
+        lats = np.asarray(latitudes, dtype=np.float64)
+        lons = np.asarray(longitudes, dtype=np.float64)
+
+        self.cell_size = cell_size
+        self.origin = (float(lats.min()), float(lons.min())) if len(lats) else (0.0, 0.0)
+
+        rows, cols = self._cell(lats, lons)
+        self.columns = int(cols.max()) + 1 if len(cols) else 1
+        cell_ids = rows * self.columns + cols
+
+        order = np.argsort(cell_ids, kind="stable")
+        self.cell_ids = cell_ids[order]
+        self.latitudes = lats[order]
+        self.longitudes = lons[order]
+        self.keys = [keys[i] for i in order]
+
+        self.rows = int(rows.max()) + 1 if len(rows) else 1
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _cell(self, lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        rows = np.floor((lats - self.origin[0]) / self.cell_size).astype(np.int64)
+        cols = np.floor((lons - self.origin[1]) / self.cell_size).astype(np.int64)
+        return rows, cols
+
+    def _candidates(self, bbox: BoundingBox) -> np.ndarray:
+        """
+        Returns the positions of every point in a grid cell which overlaps the given box
+        """
+        (first_row, last_row), (first_col, last_col) = (
+            np.clip(cells, 0, limit - 1)
+            for cells, limit in zip(
+                self._cell(np.array([bbox.min_lat, bbox.max_lat]), np.array([bbox.min_lon, bbox.max_lon])),
+                (self.rows, self.columns),
+            )
+        )
+
+        # Within a row, the cells we need are contiguous, and so are their points
+        row_starts = np.arange(first_row, last_row + 1) * self.columns
+        starts = np.searchsorted(self.cell_ids, row_starts + first_col, side="left")
+        ends = np.searchsorted(self.cell_ids, row_starts + last_col, side="right")
+        if not len(starts):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, end) for start, end in zip(starts, ends)])
+
+    def within_bbox(self, bbox: BoundingBox) -> List[Any]:
+        """
+        Returns the keys of every point inside the given box, in no particular order
+        """
+        candidates = self._candidates(bbox)
+        lats, lons = self.latitudes[candidates], self.longitudes[candidates]
+        inside = (lats >= bbox.min_lat) & (lats <= bbox.max_lat) & (lons >= bbox.min_lon) & (lons <= bbox.max_lon)
+        return [self.keys[i] for i in candidates[inside]]
+
+    def _matches(self, candidates: np.ndarray, latitude: float, longitude: float) -> Tuple[np.ndarray, np.ndarray]:
+        distances = haversine_km(latitude, longitude, self.latitudes[candidates], self.longitudes[candidates])
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
+
+    def _to_matches(self, positions: np.ndarray, distances: np.ndarray) -> List[SpatialMatch]:
+        return [
+            SpatialMatch(self.keys[i], float(self.latitudes[i]), float(self.longitudes[i]), float(distance))
+            for i, distance in zip(positions, distances)
+        ]
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float) -> List[SpatialMatch]:
+        """
+        Returns every point within radius_km of the given point, nearest first
+        """
+        positions, distances = self._matches(
+            self._candidates(radius_bbox(latitude, longitude, radius_km)), latitude, longitude
+        )
+        within = distances <= radius_km
+        return self._to_matches(positions[within], distances[within])
+
+    def nearest(
+        self, latitude: float, longitude: float, k: int, max_distance_km: Optional[float] = None
+    ) -> List[SpatialMatch]:
+        """
+        Returns the k points nearest to the given point (fewer if there aren't k within max_distance_km),
+        nearest first
+        """
+        if k <= 0 or not len(self):
+            return []
+
+        # Look within a small radius first, and widen it until it holds k points. Once the search box covers
+        # the whole grid there is nothing more to find
+        radius_km = math.radians(self.cell_size) * EARTH_RADIUS_KM
+        while True:
+            if max_distance_km is not None:
+                radius_km = min(radius_km, max_distance_km)
+
+            bbox = radius_bbox(latitude, longitude, radius_km)
+            matches = self.within_radius(latitude, longitude, radius_km)
+            covers_grid = (
+                bbox.min_lat <= self.origin[0]
+                and bbox.min_lon <= self.origin[1]
+                and bbox.max_lat >= self.origin[0] + self.rows * self.cell_size
+                and bbox.max_lon >= self.origin[1] + self.columns * self.cell_size
+            )
+            if len(matches) >= k or covers_grid or radius_km == max_distance_km:
+                return matches[:k]
+            radius_km *= 2
+
+
+def build_spatial_index(model: Type[Model]) -> SpatialIndex:
+    rows = list(model._default_manager.values_list("pk", "latitude", "longitude"))
+    return SpatialIndex([row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows])
+
+
+def _index_builder(model: Type[Model]) -> Callable[[], SpatialIndex]:
+    # A function per model, since a lambda in the comprehension below would only see the last one
+    return lambda: build_spatial_index(model)
+
+
+# Label -> version
+_versions: Dict[str, SharedVersion] = {
+    model._meta.label: SharedVersion(
+        f"spatial_index:version:{model._meta.label}", f"the spatial index of {model._meta.label}"
+    )
+    for model in INDEXED_MODELS
+}
+# Label -> index
+_indexes: Dict[str, VersionedValue[SpatialIndex]] = {
+    model._meta.label: VersionedValue(
+        _versions[model._meta.label], _index_builder(model), SPATIAL_INDEX_MAX_AGE_SECONDS
+    )
+    for model in INDEXED_MODELS
+}
+
+
+def _check_indexed(model: Type[Model]) -> str:
+    if model not in INDEXED_MODELS:
+        raise ValueError(f"{model._meta.label} is not spatially indexed")
+    return model._meta.label
+
+
+def get_spatial_index_version(model: Type[Model]) -> SharedVersion:
+    """
+    Returns the version of the given model's index, for anything else derived from its coordinates which
+    needs to know when to rebuild
+    """
+    return _versions[_check_indexed(model)]
+
+
+def mark_spatial_index_stale(model: Type[Model]) -> None:
+    """
+    Makes every process rebuild its index of the given model before using it again
+    """
+    get_spatial_index_version(model).bump()
+
+
+def get_spatial_index(model: Type[Model]) -> SpatialIndex:
+    """
+    Returns an up to date spatial index of the given model (one of INDEXED_MODELS), keyed by primary key
+    """
+    return _indexes[_check_indexed(model)].get()
@@ -0,0 +1,82 @@
+"""
+Times the stages of handling a request, so we can see which of them (usually an external API) is making
+it slow. Each stage is reported three ways:
+
+- as a ddtrace span, a child of whichever span was active when the timer was created (even if the stage
+  runs on another thread)
+- as a statsd histogram, <metric>.stage_duration in milliseconds, tagged by stage and outcome
+- as an entry in the timer's Server-Timing header, for showing to staff
+
+Stages which run alongside others are usually also timed as "<stage>_wait", for how long the request was
+actually held up waiting for them.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Tuple, TypeVar
+
+from datadog import statsd
+from ddtrace import tracer
+
+T = TypeVar("T")
+
+
+class Stage:
+    def __init__(self, name: str):
+        self.name = name
+        # Set this to describe how the stage went, e.g. "invalid". Stages which raise are "error"
+        self.outcome = "ok"
+
+
+class StageTimer:
+    def __init__(self, metric: str):
+        """
+        :param metric: the prefix of the statsd metric, and the name of the spans
+        """
+        self.metric = metric
+        self.timings: List[Tuple[str, float]] = []
+        self._started = time.perf_counter()
+        self._parent = tracer.current_span()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Stage]:
+        stage = Stage(name)
+        span = tracer.start_span(f"{self.metric}.stage", child_of=self._parent, resource=name)
+        started = time.perf_counter()
+        try:
+            yield stage
+        except BaseException:
+            stage.outcome = "error"
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            span.set_tag("outcome", stage.outcome)
+            span.finish()
+            statsd.histogram(
+                f"{self.metric}.stage_duration", duration_ms, tags=[f"stage:{name}", f"outcome:{stage.outcome}"]
+            )
+            with self._lock:
+                self.timings.append((name, duration_ms))
+
+    def run(self, name: str, func: Callable[..., T], *args: Any) -> T:
+        """Calls func as a stage, e.g. so that it can be timed on another thread"""
+        with self.stage(name):
+            return func(*args)
+
+    def wait(self, name: str, future: "Future[T]") -> T:
+        """Waits for the result of a stage running on another thread, timing the wait as "<name>_wait" """
+        with self.stage(f"{name}_wait"):
+            return future.result()
+
+    def server_timing(self) -> str:
+        """
+        Returns the value of a Server-Timing header (https://www.w3.org/TR/server-timing/) listing each stage
+        timed so far in the order it finished, along with the total time since the timer was created
+        """
+        total_ms = (time.perf_counter() - self._started) * 1000
+        with self._lock:
+            timings = self.timings + [("total", total_ms)]
+        return ", ".join(f"{name};dur={duration_ms:.1f}" for name, duration_ms in timings)
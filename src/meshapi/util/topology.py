@@ -0,0 +1,277 @@
+"""
+In-process graph of the mesh, built from the active Links between Nodes, for answering questions about
+its shape ("how many hops is NN1234 from a POP", "which nodes would be cut off if this link went down")
+without walking Link -> Device -> Node one query at a time.
+
+The graph is held in compressed sparse row (CSR) form: the neighbours of node i are
+indices[indptr[i]:indptr[i + 1]], and links[indptr[i]:indptr[i + 1]] are the Links they are connected by.
+It is built from a single query over the active Links, so nodes without any active Links are not part of
+it. Like meshapi.util.spatial_index, each process keeps its own copy, and the receivers in
+meshapi.util.events.topology bump a version number in the cache whenever a Node, Device or Link is saved
+or deleted, which every process checks before using it. Changes which don't send signals are picked up
+within TOPOLOGY_MAX_AGE_SECONDS.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple, TypedDict
+from uuid import UUID
+
+import numpy as np
+from django.db.models import F
+
+from meshapi.models import Link, Node
+from meshapi.util.versioned_cache import SharedVersion, VersionedValue
+
+TOPOLOGY_MAX_AGE_SECONDS = 10 * 60
+
+
+class TopologyNode(TypedDict):
+    id: str
+    network_number: Optional[int]
+    name: Optional[str]
+    type: Optional[str]
+
+
+@dataclass(frozen=True)
+class PopReachability:
+    # For each node, the number of hops to the nearest POP (-1 if there is no path to one), and the next
+    # node along the way there (-1 for POPs and unreachable nodes)
+    hops: np.ndarray
+    next_hop: np.ndarray
+
+
+class Topology:
+    """
+    A static graph of nodes, by position 0..len(self) - 1. To change the graph, build a new one
+    """
+
+    def __init__(
+        self,
+        nodes: Sequence[TopologyNode],
+        link_ids: Sequence[UUID],
+        edges: Sequence[Tuple[int, int]],
+    ):
+        """
+        :param nodes: the nodes of the graph, and their positions within it
+        :param link_ids: the Link each edge comes from
+        :param edges: pairs of node positions, one per Link, in either order
+        """
+        self.nodes = list(nodes)
+        self.link_ids = list(link_ids)
+        self.position_by_id: Dict[str, int] = {node["id"]: i for i, node in enumerate(self.nodes)}
+        self.position_by_network_number: Dict[int, int] = {
+            node["network_number"]: i for i, node in enumerate(self.nodes) if node["network_number"] is not None
+        }
+        self.position_by_link_id: Dict[UUID, int] = {link_id: i for i, link_id in enumerate(self.link_ids)}
+        self.pops = np.array([node["type"] == Node.NodeType.POP for node in self.nodes], dtype=bool)
+
+        # Each edge goes in both directions
+        pairs = np.array(edges, dtype=np.int32).reshape(-1, 2)
+        sources = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        targets = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        links = np.tile(np.arange(len(pairs), dtype=np.int32), 2)
+
+        order = np.argsort(sources, kind="stable")
+        self.indices = targets[order]
+        self.links = links[order]
+        self.indptr = np.zeros(len(self.nodes) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(sources, minlength=len(self.nodes)), out=self.indptr[1:])
+
+        # Walking the graph one node at a time is much faster over Python ints than numpy scalars
+        self._indptr: List[int] = self.indptr.tolist()
+        self._indices: List[int] = self.indices.tolist()
+        self._links: List[int] = self.links.tolist()
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def neighbours(self, position: int) -> List[int]:
+        return self._indices[self._indptr[position] : self._indptr[position + 1]]
+
+    def shortest_path(self, source: int, target: int) -> Optional[List[int]]:
+        """
+        Returns the positions of the nodes on a shortest path from source to target (inclusive), or None if
+        there isn't one
+        """
+        if source == target:
+            return [source]
+
+        parents = {source: source}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            for neighbour in self.neighbours(current):
+                if neighbour in parents:
+                    continue
+                parents[neighbour] = current
+                if neighbour == target:
+                    path = [target]
+                    while path[-1] != source:
+                        path.append(parents[path[-1]])
+                    return path[::-1]
+                queue.append(neighbour)
+
+        return None
+
+    def components(self) -> List[List[int]]:
+        """
+        Returns the connected components of the graph, largest first, each as a sorted list of positions
+        """
+        labels = [-1] * len(self)
+        components: List[List[int]] = []
+        for start in range(len(self)):
+            if labels[start] != -1:
+                continue
+
+            label = len(components)
+            labels[start] = label
+            members = [start]
+            queue = deque([start])
+            while queue:
+                for neighbour in self.neighbours(queue.popleft()):
+                    if labels[neighbour] == -1:
+                        labels[neighbour] = label
+                        members.append(neighbour)
+                        queue.append(neighbour)
+            components.append(sorted(members))
+
+        return sorted(components, key=len, reverse=True)
+
+    def articulation_points(self) -> List[int]:
+        """
+        Returns the positions of the nodes whose loss would split their part of the mesh in two, in order
+        """
+        # Tarjan's algorithm, with an explicit stack since the mesh is deep enough to hit the recursion limit
+        discovered = [-1] * len(self)
+        low = [0] * len(self)
+        articulation_points: Set[int] = set()
+        counter = 0
+
+        for root in range(len(self)):
+            if discovered[root] != -1:
+                continue
+
+            discovered[root] = low[root] = counter
+            counter += 1
+            root_children = 0
+            # (node, the Link we arrived by, position of the next neighbour to look at)
+            stack = [(root, -1, self._indptr[root])]
+            while stack:
+                current, arrived_by, next_edge = stack[-1]
+                if next_edge < self._indptr[current + 1]:
+                    stack[-1] = (current, arrived_by, next_edge + 1)
+                    neighbour, link = self._indices[next_edge], self._links[next_edge]
+                    if link == arrived_by:
+                        continue
+                    if discovered[neighbour] == -1:
+                        discovered[neighbour] = low[neighbour] = counter
+                        counter += 1
+                        if current == root:
+                            root_children += 1
+                        stack.append((neighbour, link, self._indptr[neighbour]))
+                    else:
+                        low[current] = min(low[current], discovered[neighbour])
+                    continue
+
+                stack.pop()
+                if stack:
+                    parent = stack[-1][0]
+                    low[parent] = min(low[parent], low[current])
+                    if parent != root and low[current] >= discovered[parent]:
+                        articulation_points.add(parent)
+
+            if root_children > 1:
+                articulation_points.add(root)
+
+        return sorted(articulation_points)
+
+    def pop_reachability(self, without_link: Optional[int] = None) -> PopReachability:
+        """
+        Finds the nearest POP to every node, optionally as if the given Link (by position) were down
+        """
+        hops = np.full(len(self), -1, dtype=np.int32)
+        next_hop = np.full(len(self), -1, dtype=np.int32)
+        hops_list = hops.tolist()
+        next_hop_list = next_hop.tolist()
+
+        queue = deque(np.flatnonzero(self.pops).tolist())
+        for pop in queue:
+            hops_list[pop] = 0
+
+        while queue:
+            current = queue.popleft()
+            for edge in range(self._indptr[current], self._indptr[current + 1]):
+                neighbour = self._indices[edge]
+                if hops_list[neighbour] != -1 or self._links[edge] == without_link:
+                    continue
+                hops_list[neighbour] = hops_list[current] + 1
+                next_hop_list[neighbour] = current
+                queue.append(neighbour)
+
+        hops[:] = hops_list
+        next_hop[:] = next_hop_list
+        return PopReachability(hops, next_hop)
+
+    def islanded_without_link(self, link: int) -> List[int]:
+        """
+        Returns the positions of the nodes which can reach a POP now, but couldn't if the given Link (by
+        position) were down
+        """
+        before = self.pop_reachability().hops
+        after = self.pop_reachability(without_link=link).hops
+        return np.flatnonzero((before != -1) & (after == -1)).tolist()
+
+
+def build_topology() -> Topology:
+    rows = (
+        Link.objects.filter(status=Link.LinkStatus.ACTIVE)
+        .exclude(from_device__node=F("to_device__node"))
+        .order_by("id")
+        .values_list(
+            "id",
+            "from_device__node_id",
+            "from_device__node__network_number",
+            "from_device__node__name",
+            "from_device__node__type",
+            "to_device__node_id",
+            "to_device__node__network_number",
+            "to_device__node__name",
+            "to_device__node__type",
+        )
+    )
+
+    nodes: List[TopologyNode] = []
+    positions: Dict[UUID, int] = {}
+    link_ids = []
+    edges = []
+
+    def position(node_id: UUID, network_number: Optional[int], name: Optional[str], node_type: Optional[str]) -> int:
+        if node_id not in positions:
+            positions[node_id] = len(nodes)
+            nodes.append({"id": str(node_id), "network_number": network_number, "name": name, "type": node_type})
+        return positions[node_id]
+
+    for link_id, from_id, from_nn, from_name, from_type, to_id, to_nn, to_name, to_type in rows:
+        link_ids.append(link_id)
+        edges.append((position(from_id, from_nn, from_name, from_type), position(to_id, to_nn, to_name, to_type)))
+
+    return Topology(nodes, link_ids, edges)
+
+
+_version = SharedVersion("topology:version", "the topology")
+_topology = VersionedValue(_version, build_topology, TOPOLOGY_MAX_AGE_SECONDS)
+
+
+def mark_topology_stale() -> None:
+    """
+    Makes every process rebuild its graph of the mesh before using it again
+    """
+    _version.bump()
+
+
+def get_topology() -> Topology:
+    """
+    Returns an up to date graph of the active Links in the mesh
+    """
+    return _topology.get()
@@ -0,0 +1,176 @@
+"""
+Encoding of Mapbox Vector Tiles (https://github.com/mapbox/vector-tile-spec/tree/master/2.1)
+
+A tile is a small protobuf message, so rather than pull in a protobuf schema compiler (or PostGIS, for
+ST_AsMVT) we write the handful of message types it needs by hand. Only points and lines are supported,
+since that is all the map has
+"""
+
+import math
+import struct
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+from meshapi.util.geo import BoundingBox, Coordinate, GeoFeature
+
+CONTENT_TYPE = "application/vnd.mapbox-vector-tile"
+
+EXTENT = 4096
+MAX_ZOOM = 22
+
+# Features are included if they are within this many pixels (out of EXTENT) of the tile, so that markers
+# which straddle the edge of a tile are drawn on both sides of it
+BUFFER = 64
+
+# Geometry types
+POINT = 1
+LINESTRING = 2
+
+# Geometry commands
+MOVE_TO = 1
+LINE_TO = 2
+
+# Protobuf wire types
+VARINT = 0
+FIXED64 = 1
+LENGTH_DELIMITED = 2
+
+
+def tile_bounds(z: int, x: int, y: int) -> BoundingBox:
+    """
+    Returns the longitude/latitude bounds of the given web mercator (XYZ) tile
+    """
+    n = 2**z
+
+    def lat(tile_y: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return BoundingBox(x / n * 360 - 180, lat(y + 1), (x + 1) / n * 360 - 180, lat(y))
+
+
+def tile_query_bounds(z: int, x: int, y: int) -> BoundingBox:
+    """
+    Returns the bounds to query for the features of the given tile, including the buffer around it
+    """
+    bounds = tile_bounds(z, x, y)
+    return bounds.expand(
+        (bounds.max_lon - bounds.min_lon) * BUFFER / EXTENT,
+        (bounds.max_lat - bounds.min_lat) * BUFFER / EXTENT,
+    )
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z
+
+
+def _project(z: int, x: int, y: int, coordinate: Coordinate) -> Tuple[int, int]:
+    # Web mercator, in pixels from the top left of this tile
+    lon, lat = coordinate
+    lat = max(min(lat, 85.0511), -85.0511)
+    scale = 2**z * EXTENT
+    world_x = (lon + 180) / 360 * scale
+    world_y = (1 - math.log(math.tan(math.radians(lat)) + 1 / math.cos(math.radians(lat))) / math.pi) / 2 * scale
+    return round(world_x - x * EXTENT), round(world_y - y * EXTENT)
+
+
+def _varint(value: int) -> bytes:
+    result = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            result.append(byte | 0x80)
+        else:
+            result.append(byte)
+            return bytes(result)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field_number: int, wire_type: int) -> bytes:
+    return _varint((field_number << 3) | wire_type)
+
+
+def _length_delimited(field_number: int, data: bytes) -> bytes:
+    return _key(field_number, LENGTH_DELIMITED) + _varint(len(data)) + data
+
+
+def _packed(field_number: int, values: Sequence[int]) -> bytes:
+    return _length_delimited(field_number, b"".join(_varint(value) for value in values))
+
+
+def _encode_value(value: Any) -> bytes:
+    # Fields of the Value message: 1 string, 3 double, 6 sint64, 7 bool
+    if isinstance(value, bool):
+        return _key(7, VARINT) + _varint(int(value))
+    if isinstance(value, int):
+        return _key(6, VARINT) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return _key(3, FIXED64) + struct.pack("<d", value)
+    return _length_delimited(1, str(value).encode("utf-8"))
+
+
+def _encode_geometry(points: List[Tuple[int, int]]) -> List[int]:
+    commands = [(MOVE_TO & 0x7) | (1 << 3)]
+    cursor = (0, 0)
+    for i, point in enumerate(points):
+        if i == 1:
+            commands.append((LINE_TO & 0x7) | ((len(points) - 1) << 3))
+        commands += [_zigzag(point[0] - cursor[0]), _zigzag(point[1] - cursor[1])]
+        cursor = point
+    return commands
+
+
+def _encode_layer(name: str, features: Sequence[GeoFeature], z: int, x: int, y: int) -> bytes:
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    encoded_features = []
+
+    for feature in features:
+        points: List[Tuple[int, int]] = []
+        for coordinate in feature.coordinates:
+            point = _project(z, x, y, coordinate)
+            # Consecutive duplicate points aren't allowed, and are common at low zoom
+            if not points or points[-1] != point:
+                points.append(point)
+
+        if feature.geometry_type == "LineString":
+            if len(points) < 2:
+                continue
+            geometry_type = LINESTRING
+        else:
+            geometry_type = POINT
+            points = points[:1]
+
+        tags = []
+        for key, value in feature.properties.items():
+            if value is None:
+                continue
+            # The type is part of the key so that e.g. 1 and True aren't merged
+            tags += [keys.setdefault(key, len(keys)), values.setdefault((type(value), value), len(values))]
+
+        encoded_features.append(
+            _packed(2, tags) + _key(3, VARINT) + _varint(geometry_type) + _packed(4, _encode_geometry(points))
+        )
+
+    # Fields of the Layer message: 15 version, 1 name, 2 features, 3 keys, 4 values, 5 extent
+    return b"".join(
+        [
+            _key(15, VARINT) + _varint(2),
+            _length_delimited(1, name.encode("utf-8")),
+            *(_length_delimited(2, feature) for feature in encoded_features),
+            *(_length_delimited(3, key.encode("utf-8")) for key in keys),
+            *(_length_delimited(4, _encode_value(value)) for _, value in values),
+            _key(5, VARINT) + _varint(EXTENT),
+        ]
+    )
+
+
+def encode_tile(layers: Mapping[str, Sequence[GeoFeature]], z: int, x: int, y: int) -> bytes:
+    """
+    Encodes the given features, by layer name, as the vector tile z/x/y. Empty layers are left out
+    """
+    return b"".join(
+        _length_delimited(3, _encode_layer(name, features, z, x, y)) for name, features in layers.items() if features
+    )
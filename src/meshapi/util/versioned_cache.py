@@ -0,0 +1,113 @@
+"""
+Values built from the database which each process keeps its own copy of (the spatial indexes, the graph of
+the mesh, which webhook events are enabled), so that they aren't rebuilt on every request.
+
+Each value belongs to a SharedVersion, a number in the cache which is bumped whenever the data it is built
+from changes, and which every process checks before using its copy. Changes made by this process are seen
+straight away, even if the cache is unavailable, and changes which don't bump the version (e.g.
+QuerySet.update(), which doesn't send signals) are picked up once the copy is older than its max age.
+
+Typical use:
+
+    topology_version = SharedVersion("topology:version", "the topology")
+    topology = VersionedValue(topology_version, build_topology, max_age_seconds=10 * 60)
+
+    topology.get()  # Built the first time, and again after any process calls topology_version.bump()
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Generic, Optional, Tuple, TypeVar
+
+from django.core.cache import cache
+
+T = TypeVar("T")
+
+
+class SharedVersion:
+    """
+    A version number shared by every process through the cache, alongside the number of times this process
+    has bumped it
+    """
+
+    def __init__(self, key: str, description: str):
+        """
+        :param key: The cache key to keep the version in
+        :param description: What the version is of, for log messages (e.g. "the topology")
+        """
+        self.key = key
+        self.description = description
+        self._local_version = 0
+        self._lock = threading.Lock()
+
+    def get(self) -> Tuple[Optional[int], int]:
+        """
+        Returns a value which changes whenever bump() is called, in this process or any other
+        """
+        try:
+            shared_version = cache.get(self.key)
+        except Exception:
+            logging.warning(
+                f"Could not check whether {self.description} is up to date, relying on its age instead",
+                exc_info=True,
+            )
+            shared_version = None
+        return shared_version, self._local_version
+
+    def bump(self) -> None:
+        """
+        Makes every process rebuild anything built from this version before using it again
+        """
+        with self._lock:
+            self._local_version += 1
+
+        try:
+            if not cache.add(self.key, time.time_ns(), timeout=None):
+                cache.incr(self.key)
+        except Exception:
+            logging.warning(f"Could not invalidate {self.description}", exc_info=True)
+
+
+class VersionedValue(Generic[T]):
+    """
+    This process's copy of a value, rebuilt when its SharedVersion changes or once it is too old
+    """
+
+    def __init__(self, version: SharedVersion, build: Callable[[], T], max_age_seconds: float):
+        """
+        :param version: The version to check before using the value
+        :param build: Builds the value from scratch
+        :param max_age_seconds: How long to use the value for without the version changing
+        """
+        self.version = version
+        self.build = build
+        self.max_age_seconds = max_age_seconds
+        # (version, time.monotonic() when built, value)
+        self._value: Optional[Tuple[Tuple[Optional[int], int], float, T]] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        """
+        Returns the value, building it first if this process doesn't have an up to date copy
+        """
+        version = self.version.get()
+        with self._lock:
+            if (
+                self._value is not None
+                and self._value[0] == version
+                and time.monotonic() - self._value[1] < self.max_age_seconds
+            ):
+                return self._value[2]
+
+        value = self.build()
+        with self._lock:
+            self._value = (version, time.monotonic(), value)
+        return value
+
+    def clear(self) -> None:
+        """
+        Drops this process's copy, without affecting any other process
+        """
+        with self._lock:
+            self._value = None
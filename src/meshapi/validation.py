@@ -1,14 +1,20 @@
 import json
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List, Optional
 
+import dns.resolver
 import phonenumbers
 import requests
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from email_validator import EmailNotValidError, validate_email
+from email_validator import EmailNotValidError, caching_resolver, validate_email
+from email_validator.deliverability import validate_email_deliverability
 from flags.state import flag_state
+from requests.adapters import HTTPAdapter
 
 from meshapi.exceptions import AddressAPIError, InvalidAddressError, UnsupportedAddressError
 from meshapi.util.constants import DEFAULT_EXTERNAL_API_TIMEOUT_SECONDS, INVALID_ALTITUDE
@@ -32,21 +38,112 @@ BUILDING_FOOTPRINTS_API = "https://data.cityofnewyork.us/resource/5zhs-2jue.json
 DOB_NEW_BUILDINGS_API_URL = "https://data.cityofnewyork.us/resource/6xbh-bxki.json"
 RECAPTCHA_TOKEN_VALIDATION_URL = "https://www.google.com/recaptcha/api/siteverify"
 
+# (connect, read) in seconds. A join form can't be accepted until its captcha has been verified, so if
+# Google is slow to answer we'd rather fail the captcha than keep the member waiting
+RECAPTCHA_TIMEOUT = (3.05, DEFAULT_EXTERNAL_API_TIMEOUT_SECONDS)
+
+# Kept for the life of the process so that verifications reuse the same keep-alive connections to Google
+recaptcha_session = requests.Session()
+recaptcha_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=16))
+
 
 INVALID_BIN_NUMBERS = [-2, -1, 0, 1000000, 2000000, 3000000, 4000000]
 
 
+# How long to remember whether a domain can receive email. Domains which can't are rechecked sooner,
+# in case they were just misconfigured
+EMAIL_DOMAIN_DELIVERABLE_TTL_SECONDS = 24 * 60 * 60
+EMAIL_DOMAIN_UNDELIVERABLE_TTL_SECONDS = 10 * 60
+
+EMAIL_DNS_TIMEOUT_SECONDS = 5
+
+# Most sign-ups come from a handful of providers, which we don't need to look up every time
+KNOWN_DELIVERABLE_EMAIL_DOMAINS = frozenset(
+    {
+        "aol.com",
+        "comcast.net",
+        "gmail.com",
+        "hotmail.com",
+        "icloud.com",
+        "live.com",
+        "mac.com",
+        "me.com",
+        "msn.com",
+        "optonline.net",
+        "outlook.com",
+        "proton.me",
+        "protonmail.com",
+        "verizon.net",
+        "yahoo.com",
+    }
+)
+
+# Slow, network bound validation (e.g. DNS lookups) runs here, so that the join form can do several
+# lookups at once
+validation_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="validation")
+
+_dns_resolver: Optional[dns.resolver.Resolver] = None
+_dns_resolver_lock = threading.Lock()
+
+
+def get_dns_resolver() -> dns.resolver.Resolver:
+    """
+    Returns the resolver shared by every email deliverability check in this process. It caches the records
+    it looks up, and only reads the system DNS configuration once
+    """
+    global _dns_resolver
+    with _dns_resolver_lock:
+        if _dns_resolver is None:
+            _dns_resolver = caching_resolver(timeout=EMAIL_DNS_TIMEOUT_SECONDS)
+        return _dns_resolver
+
+
+def is_email_domain_deliverable(ascii_domain: str, domain: str) -> bool:
+    if ascii_domain in KNOWN_DELIVERABLE_EMAIL_DOMAINS:
+        return True
+
+    cache_key = f"email_domain_deliverable:{ascii_domain}"
+    try:
+        deliverable = cache.get(cache_key)
+    except Exception:
+        logging.warning(f"Could not check the cache for {ascii_domain}", exc_info=True)
+        deliverable = None
+    if deliverable is not None:
+        return deliverable
+
+    try:
+        deliverability_info = validate_email_deliverability(ascii_domain, domain, dns_resolver=get_dns_resolver())
+    except EmailNotValidError:
+        deliverable = False
+    else:
+        # Transient DNS issues are reported as "unknown deliverability" rather than raised. We give the
+        # address the benefit of the doubt, but don't remember it
+        if "unknown-deliverability" in deliverability_info:
+            return True
+        deliverable = True
+
+    try:
+        cache.set(
+            cache_key,
+            deliverable,
+            EMAIL_DOMAIN_DELIVERABLE_TTL_SECONDS if deliverable else EMAIL_DOMAIN_UNDELIVERABLE_TTL_SECONDS,
+        )
+    except Exception:
+        logging.warning(f"Could not cache the deliverability of {ascii_domain}", exc_info=True)
+    return deliverable
+
+
 def validate_email_address(email_address: str) -> bool:
     try:
-        # email_validator checks syntax and (with check_deliverability=True) DNS/MX records.
-        # Transient DNS issues are handled by the library as "unknown deliverability" and do not raise,
-        # so we no longer need separate timeout/SMTP exception handling.
-        validate_email(email_address, check_deliverability=True, timeout=5)
-        return True
+        # The syntax is checked here, and whether the domain can receive mail (i.e. has DNS/MX records) is
+        # checked separately, so that it can be cached across addresses
+        validated_email = validate_email(email_address, check_deliverability=False)
     except EmailNotValidError:
-        # The address is syntactically invalid or its domain is not deliverable.
+        # The address is syntactically invalid
         return False
 
+    return is_email_domain_deliverable(validated_email.ascii_domain, validated_email.domain)
+
 
 def normalize_phone_number(phone_number: str) -> str:
     return phonenumbers.format_number(
@@ -281,9 +378,10 @@ def check_recaptcha_token(token: Optional[str], server_secret: str, remote_ip: O
     if remote_ip:
         payload["remoteip"] = remote_ip
 
-    captcha_response = requests.post(
+    captcha_response = recaptcha_session.post(
         RECAPTCHA_TOKEN_VALIDATION_URL,
         payload,
+        timeout=RECAPTCHA_TIMEOUT,
     )
 
     captcha_response.raise_for_status()
@@ -302,8 +400,16 @@ def check_recaptcha_token(token: Optional[str], server_secret: str, remote_ip: O
 
 
 def validate_recaptcha_tokens(
-    recaptcha_invisible_token: Optional[str], recaptcha_checkbox_token: Optional[str], remote_ip: Optional[str]
+    recaptcha_invisible_token: Optional[str],
+    recaptcha_checkbox_token: Optional[str],
+    remote_ip: Optional[str],
+    fail_all_invisible_recaptchas: Optional[bool] = None,
 ) -> None:
+    """
+    :param fail_all_invisible_recaptchas: the JOIN_FORM_FAIL_ALL_INVISIBLE_RECAPTCHAS flag, read from the
+        database if not given. Callers on a worker thread should read it beforehand, since the thread's
+        database connection is never cleaned up
+    """
     if not RECAPTCHA_SECRET_KEY_V3 or not RECAPTCHA_SECRET_KEY_V2:
         raise EnvironmentError(
             "Enviornment variables RECAPTCHA_SERVER_SECRET_KEY_V2 and RECAPTCHA_SERVER_SECRET_KEY_V3 must be "
@@ -329,7 +435,9 @@ def validate_recaptcha_tokens(
             f"{RECAPTCHA_INVISIBLE_TOKEN_SCORE_THRESHOLD}"
         )
 
-    if flag_state("JOIN_FORM_FAIL_ALL_INVISIBLE_RECAPTCHAS"):
+    if fail_all_invisible_recaptchas is None:
+        fail_all_invisible_recaptchas = flag_state("JOIN_FORM_FAIL_ALL_INVISIBLE_RECAPTCHAS")
+    if fail_all_invisible_recaptchas:
         raise ValueError(
             "Feature flag JOIN_FORM_FAIL_ALL_INVISIBLE_RECAPTCHAS enabled, failing validation "
             "even though this request should have succeeded"
@@ -1,9 +1,11 @@
 from .active_mesh_kml import ActiveMeshKML
 from .forms import *
+from .geo import *
 from .geography import *
 from .helpers import *
 from .lookups import *
 from .map import *
 from .model_api import *
 from .query_api import *
+from .topology import *
 from .uisp_import import *
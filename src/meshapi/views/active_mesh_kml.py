@@ -1,12 +1,30 @@
+import datetime
 import logging
 import os
-from typing import Any, Dict, List, Optional, Tuple, TypedDict, cast
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, TypedDict, Union, cast
 from urllib.parse import urlparse
 
-from django.db.models import F, Q
-from django.db.models.functions import Greatest
+from django.contrib.postgres.aggregates import ArrayAgg, BoolOr
+from django.db.models import (
+    BooleanField,
+    Case,
+    CharField,
+    Expression,
+    ExpressionWrapper,
+    F,
+    Field,
+    FloatField,
+    Func,
+    IntegerField,
+    Min,
+    Q,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest, Least, NullIf
 from django.http import HttpRequest, HttpResponse
 from django.templatetags.static import static
+from django.utils.decorators import method_decorator
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiResponse, extend_schema
 from fastkml import Data, ExtendedData, geometry, kml, styles
@@ -17,12 +35,15 @@ from rest_framework import status as http_status
 from rest_framework.views import APIView
 
 from meshapi.models import Install, Link, Node
+from meshapi.util.map_artifacts import serve_map_artifact
+from meshapi.util.response_cache import KML_POLICY, cache_response
 from meshapi.views.geography import (
     DEFAULT_ALTITUDE,
     KML_CONTENT_TYPE,
     KML_CONTENT_TYPE_WITH_CHARSET,
     IgnoreClientContentNegotiation,
 )
+from meshdb.db_router import read_from_replica
 
 # Define node type colors
 ACTIVE_COLOR = "#F82C55"
@@ -73,9 +94,7 @@ def link_type_to_style_id(link_type: str) -> str:
     return f"{link_type.replace(' ', '_').replace('-', '_').replace('/', '_')}_line"
 
 
-def get_kml_link_type(link: Link) -> str:
-    raw_type = link.type
-
+def kml_link_type(raw_type: Optional[str]) -> str:
     # Group explicit WDS links into their own KML folder/style
     if raw_type == Link.LinkType.FIVE_GHZ_WDS:
         return WDS_5_GHZ_LINK_TYPE
@@ -91,6 +110,15 @@ def get_kml_link_type(link: Link) -> str:
     return raw_type or "Other"
 
 
+def get_kml_link_type(link: Link) -> str:
+    return kml_link_type(link.type)
+
+
+def node_label(network_number: int, name: Optional[str]) -> str:
+    # The same as str(node), for a node with a network number
+    return f"NN{network_number} ({name})" if name else f"NN{network_number}"
+
+
 logger = logging.getLogger(__name__)
 
 DOT_ICON_PATH = "meshapi/kml-icons/dot-100.png"
@@ -182,72 +210,87 @@ def create_placemark(
     return placemark
 
 
+# Lower numbers win when there are several links between the same two points
+LINK_TYPE_PRIORITY = {
+    "Fiber": 1,
+    "Ethernet": 2,
+    "70-80 GHz": 3,
+    "60 GHz": 4,
+    "24 GHz": 5,
+    "6 GHz": 6,
+    "5 GHz": 7,
+    WDS_5_GHZ_LINK_TYPE: 8,
+    "Other": 9,
+    "VPN": 10,
+}
+
+
+class LocationNode(NamedTuple):
+    network_number: Optional[int]
+    type: str
+    name: Optional[str]
+    status: str
+
+
 LocationMapData = TypedDict(
     "LocationMapData",
     {
-        "installs": List[Install],
-        "node": Optional[Node],
+        "node": Optional[LocationNode],
+        "first_install_number": Optional[int],
+        "first_install_status": Optional[str],
+        "first_install_node_type": Optional[str],
+        "first_install_node_name": Optional[str],
+        "active_install_numbers": List[int],
+        "pending_install_numbers": List[int],
+        "earliest_active_install_date": Optional[datetime.date],
         "active": bool,
         "pending": bool,
         "altitude": float,
-        "roof_access": bool,
     },
 )
 
 
-class ActiveMeshKML(APIView):
-    permission_classes = [permissions.AllowAny]
-    content_negotiation_class = IgnoreClientContentNegotiation
+def first_in_group(expression: Union[str, Expression], ordering: str, output_field: Field, **extra: Any) -> Func:
+    """
+    Aggregates to the value of expression for the first row of each group, by ordering
+    """
+    return Func(
+        ArrayAgg(expression, ordering=ordering, **extra),
+        template="(%(expressions)s)[1]",
+        output_field=output_field,
+    )
 
-    def prioritize_links(self, kml_links: List[LinkKMLDict]) -> List[LinkKMLDict]:
-        # Define priority order (lower number = higher priority)
-        priority_order = {
-            "Fiber": 1,
-            "Ethernet": 2,
-            "70-80 GHz": 3,
-            "60 GHz": 4,
-            "24 GHz": 5,
-            "6 GHz": 6,
-            "5 GHz": 7,
-            WDS_5_GHZ_LINK_TYPE: 8,
-            "Other": 9,
-            "VPN": 10,
-        }
 
-        # Group links by coordinates
-        link_groups: Dict[Tuple[Tuple[float, float, float], Tuple[float, float, float]], List[LinkKMLDict]] = {}
-        for link in kml_links:
-            # Create canonical representation of coordinates
-            # Sort coordinates to ensure consistent ordering regardless of from/to direction
-            coords = sorted([link["from_coord"], link["to_coord"]])
-            key: Tuple[Tuple[float, float, float], Tuple[float, float, float]] = (coords[0], coords[1])
-
-            if key not in link_groups:
-                link_groups[key] = []
-            link_groups[key].append(link)
-
-        # Select highest priority link from each group
-        prioritized_links = []
-        for group in link_groups.values():
-            if len(group) == 1:
-                # Only one link in this group, no need to prioritize
-                prioritized_links.append(group[0])
-            else:
-                # Multiple links, select the one with highest priority
-                best_link = group[0]
-                best_priority = priority_order.get(best_link["extended_data"].get("type", "Other"), 9)
+def link_endpoint(prefix: str) -> Func:
+    """
+    One end of a link, as a (longitude, latitude, altitude) row which sorts the same way as a tuple in Python
+    """
+    return Func(
+        F(f"{prefix}longitude"),
+        F(f"{prefix}latitude"),
+        Coalesce(NullIf(F(f"{prefix}altitude"), Value(0.0)), Value(float(DEFAULT_ALTITUDE))),
+        function="ROW",
+        output_field=Field(),
+    )
 
-                for link in group[1:]:
-                    link_type = link["extended_data"].get("type", "Other")
-                    link_priority = priority_order.get(link_type, 9)
 
-                    if link_priority < best_priority:
-                        best_link = link
-                        best_priority = link_priority
+def link_priority() -> Case:
+    return Case(
+        *(
+            When(
+                type=link_type,
+                then=Value(LINK_TYPE_PRIORITY.get(kml_link_type(link_type), LINK_TYPE_PRIORITY["Other"])),
+            )
+            for link_type in Link.LinkType.values
+        ),
+        default=Value(LINK_TYPE_PRIORITY["Other"]),
+    )
 
-                prioritized_links.append(best_link)
 
-        return prioritized_links
+@method_decorator([serve_map_artifact, cache_response(KML_POLICY), read_from_replica], name="dispatch")
+class ActiveMeshKML(APIView):
+    permission_classes = [permissions.AllowAny]
+    content_negotiation_class = IgnoreClientContentNegotiation
 
     @extend_schema(
         tags=["Geographic & KML Data"],
@@ -425,90 +468,105 @@ class ActiveMeshKML(APIView):
         planned_links_folder = kml.Folder(name="Planned Links")
         links_folder.append(planned_links_folder)
 
-        # Create a dictionary to map coordinates to installs and nodes
-        location_map: Dict[Tuple[float, float], LocationMapData] = {}
-
-        # First pass: group installs by location
-        for install in (
-            Install.objects.select_related("node", "building")
-            .filter(
-                Q(status__in=[Install.InstallStatus.ACTIVE, Install.InstallStatus.PENDING])
-                & Q(building__longitude__isnull=False)
-                & Q(building__latitude__isnull=False)
+        # Group the installs by where they are drawn (at their node if they have one, otherwise at their
+        # building), in order of the first install at each location
+        at_node = Q(node__isnull=False)
+        active_install = Q(status=Install.InstallStatus.ACTIVE)
+        pending_install = Q(status=Install.InstallStatus.PENDING)
+        with_network_number = Q(node__network_number__isnull=False)
+        install_locations = (
+            Install.objects.filter(status__in=[Install.InstallStatus.ACTIVE, Install.InstallStatus.PENDING])
+            .annotate(
+                location_longitude=Case(When(at_node, then=F("node__longitude")), default=F("building__longitude")),
+                location_latitude=Case(When(at_node, then=F("node__latitude")), default=F("building__latitude")),
             )
-            .order_by("install_number")
-        ):
-            # Create a location key based on coordinates
-            # Prioritize node coordinates if available
-            if install.node and install.node.latitude is not None and install.node.longitude is not None:
-                location_key = (float(install.node.longitude), float(install.node.latitude))
-                altitude = float(install.node.altitude or DEFAULT_ALTITUDE)
-            else:
-                location_key = (float(install.building.longitude), float(install.building.latitude))
-                altitude = float(install.building.altitude or DEFAULT_ALTITUDE)
-
-            # Initialize location entry if it doesn't exist
-            if location_key not in location_map:
-                location_map[location_key] = {
-                    "installs": [],
-                    "node": None,
-                    "active": False,
-                    "pending": False,
-                    "altitude": altitude,
-                    "roof_access": False,
-                }
-
-            # Add this install to the location
-            location_map[location_key]["installs"].append(install)
-
-            # Track if any install at this location is active
-            if install.status == Install.InstallStatus.ACTIVE:
-                location_map[location_key]["active"] = True
-
-            # Track if any install at this location is pending
-            if install.status == Install.InstallStatus.PENDING:
-                location_map[location_key]["pending"] = True
-
-            # Track if any install has roof access
-            if install.roof_access:
-                location_map[location_key]["roof_access"] = True
-
-            # If this install has a node with a network number, store it
-            if install.node and install.node.network_number:
-                location_map[location_key]["node"] = install.node
+            .values("location_longitude", "location_latitude")
+            .annotate(
+                first_install_number=Min("install_number"),
+                altitude=first_in_group(
+                    Case(When(at_node, then=F("node__altitude")), default=F("building__altitude")),
+                    "install_number",
+                    FloatField(),
+                ),
+                first_install_status=first_in_group("status", "install_number", CharField()),
+                first_install_node_type=first_in_group("node__type", "install_number", CharField()),
+                first_install_node_name=first_in_group("node__name", "install_number", CharField()),
+                # The node of the last install here which has a network number
+                node_network_number=first_in_group(
+                    "node__network_number", "-install_number", IntegerField(), filter=with_network_number
+                ),
+                node_type=first_in_group("node__type", "-install_number", CharField(), filter=with_network_number),
+                node_name=first_in_group("node__name", "-install_number", CharField(), filter=with_network_number),
+                node_status=first_in_group("node__status", "-install_number", CharField(), filter=with_network_number),
+                active=BoolOr(ExpressionWrapper(active_install, output_field=BooleanField())),
+                pending=BoolOr(ExpressionWrapper(pending_install, output_field=BooleanField())),
+                active_install_numbers=ArrayAgg(
+                    "install_number", filter=active_install, ordering="install_number", default=Value([])
+                ),
+                pending_install_numbers=ArrayAgg(
+                    "install_number", filter=pending_install, ordering="install_number", default=Value([])
+                ),
+                earliest_active_install_date=Min("install_date", filter=active_install),
+            )
+            .order_by("first_install_number")
+        )
 
-        # Additional pass: add active and planned nodes that might not have installs
-        for active_node in (
-            Node.objects.filter(status__in=[Node.NodeStatus.ACTIVE, Node.NodeStatus.PLANNED])
-            .filter(latitude__isnull=False)
-            .filter(longitude__isnull=False)
-        ):
-            # Create a location key based on coordinates
-            location_key = (float(active_node.longitude), float(active_node.latitude))
+        location_map: Dict[Tuple[float, float], LocationMapData] = {
+            (float(location["location_longitude"]), float(location["location_latitude"])): {
+                "node": (
+                    LocationNode(
+                        location["node_network_number"],
+                        location["node_type"],
+                        location["node_name"],
+                        location["node_status"],
+                    )
+                    if location["node_network_number"] is not None
+                    else None
+                ),
+                "first_install_number": location["first_install_number"],
+                "first_install_status": location["first_install_status"],
+                "first_install_node_type": location["first_install_node_type"],
+                "first_install_node_name": location["first_install_node_name"],
+                "active_install_numbers": location["active_install_numbers"],
+                "pending_install_numbers": location["pending_install_numbers"],
+                "earliest_active_install_date": location["earliest_active_install_date"],
+                "active": location["active"],
+                "pending": location["pending"],
+                "altitude": float(location["altitude"] or DEFAULT_ALTITUDE),
+            }
+            for location in install_locations
+        }
 
-            # Initialize location entry if it doesn't exist
-            if location_key not in location_map:
+        # Add active and planned nodes, which might not have installs
+        for network_number, node_type, node_name, node_status, altitude, longitude, latitude in Node.objects.filter(
+            status__in=[Node.NodeStatus.ACTIVE, Node.NodeStatus.PLANNED]
+        ).values_list("network_number", "type", "name", "status", "altitude", "longitude", "latitude"):
+            location_key = (float(longitude), float(latitude))
+            location_node = LocationNode(network_number, node_type, node_name, node_status)
+            existing = location_map.get(location_key)
+            if existing is None:
                 location_map[location_key] = {
-                    "installs": [],
-                    "node": active_node,
-                    "active": active_node.status == Node.NodeStatus.ACTIVE,
-                    "pending": active_node.status == Node.NodeStatus.PLANNED,
-                    "altitude": float(active_node.altitude or DEFAULT_ALTITUDE),
-                    "roof_access": False,
+                    "node": location_node,
+                    "first_install_number": None,
+                    "first_install_status": None,
+                    "first_install_node_type": None,
+                    "first_install_node_name": None,
+                    "active_install_numbers": [],
+                    "pending_install_numbers": [],
+                    "earliest_active_install_date": None,
+                    "active": node_status == Node.NodeStatus.ACTIVE,
+                    "pending": node_status == Node.NodeStatus.PLANNED,
+                    "altitude": float(altitude or DEFAULT_ALTITUDE),
                 }
             else:
-                # Update existing location with node information if not already set
-                if not location_map[location_key]["node"]:
-                    location_map[location_key]["node"] = active_node
-                if active_node.status == Node.NodeStatus.ACTIVE:
-                    location_map[location_key]["active"] = True
-                if active_node.status == Node.NodeStatus.PLANNED:
-                    location_map[location_key]["pending"] = True
-
-        # Second pass: create one placemark per unique location
+                if not existing["node"]:
+                    existing["node"] = location_node
+                existing["active"] |= node_status == Node.NodeStatus.ACTIVE
+                existing["pending"] |= node_status == Node.NodeStatus.PLANNED
+
+        # Create one placemark per unique location
         for location, data in location_map.items():
             lon, lat = location
-            installs = data["installs"]
             node = data["node"]
             is_active = data["active"]
             is_pending = data["pending"]
@@ -528,18 +586,16 @@ class ActiveMeshKML(APIView):
                 has_node = True
             else:
                 # Use the first install as the primary if no node exists
-                identifier = f"#{installs[0].install_number}"
-                node_type = installs[0].node.type if installs[0].node else "Standard"
-                status = installs[0].status
-                node_name = installs[0].node.name if installs[0].node else None  # Get the node name if available
+                identifier = f"#{data['first_install_number']}"
+                node_type = data["first_install_node_type"] or "Standard"
+                status = cast(str, data["first_install_status"])
+                node_name = data["first_install_node_name"]  # Get the node name if available
                 has_node = False
 
-            # Get active and pending install numbers at this location
-            active_installs = [install for install in installs if install.status == Install.InstallStatus.ACTIVE]
-            pending_installs = [install for install in installs if install.status == Install.InstallStatus.PENDING]
-            active_install_numbers = [str(install.install_number) for install in active_installs]
-            pending_install_numbers = [str(install.install_number) for install in pending_installs]
-            install_numbers = active_install_numbers + pending_install_numbers
+            install_numbers = [
+                str(install_number)
+                for install_number in data["active_install_numbers"] + data["pending_install_numbers"]
+            ]
 
             # Determine which folder and style to use
             # Pending nodes go to the Pending folder with white styling
@@ -589,71 +645,85 @@ class ActiveMeshKML(APIView):
             placemark_extended_data.elements.append(Data(name="install_count", value=str(len(install_numbers))))
 
             # Add install_date if available (from the earliest active install)
-            if active_installs:
-                # Get the earliest install_date from active installs
-                install_dates = [install.install_date for install in active_installs if install.install_date]
-                if install_dates:
-                    earliest_install_date = min(install_dates)
-                    placemark_extended_data.elements.append(
-                        Data(name="install_date", value=earliest_install_date.isoformat())
-                    )
+            if data["earliest_active_install_date"]:
+                placemark_extended_data.elements.append(
+                    Data(name="install_date", value=data["earliest_active_install_date"].isoformat())
+                )
 
             # Add to the appropriate folder
             folder.append(placemark)
 
-        kml_links: List[LinkKMLDict] = []
-        for link in (
-            Link.objects.select_related("from_device__node", "to_device__node")
-            .filter(status__in=[Link.LinkStatus.ACTIVE, Link.LinkStatus.PLANNED])  # Include active and planned links
+        # Where there are several links between the same two points, only draw the highest priority one
+        links = (
+            Link.objects.filter(status__in=[Link.LinkStatus.ACTIVE, Link.LinkStatus.PLANNED])
             .filter(from_device__node__network_number__isnull=False)
             .filter(to_device__node__network_number__isnull=False)
-            .filter(from_device__node__latitude__isnull=False)
-            .filter(from_device__node__longitude__isnull=False)
-            .filter(to_device__node__latitude__isnull=False)
-            .filter(to_device__node__longitude__isnull=False)
             .exclude(type=Link.LinkType.VPN)
-            .annotate(highest_altitude=Greatest("from_device__node__altitude", "to_device__node__altitude"))
-            .order_by(F("highest_altitude").asc(nulls_first=True))
-        ):
-            link_label: str = f"{str(link.from_device.node)}<->{str(link.to_device.node)}"
-            from_identifier = cast(  # Cast is safe due to corresponding filter above
-                int, link.from_device.node.network_number
+            .exclude(from_device__node=F("to_device__node"))  # Zero length
+            .annotate(
+                first_end=Least(link_endpoint("from_device__node__"), link_endpoint("to_device__node__")),
+                second_end=Greatest(link_endpoint("from_device__node__"), link_endpoint("to_device__node__")),
+                priority=link_priority(),
+                highest_altitude=Greatest("from_device__node__altitude", "to_device__node__altitude"),
             )
-            to_identifier = cast(  # Cast is safe due to corresponding filter above
-                int, link.to_device.node.network_number
+            .order_by("first_end", "second_end", "priority", "id")
+            .distinct("first_end", "second_end")
+            .values(
+                "first_end",
+                "second_end",
+                "highest_altitude",
+                "type",
+                "status",
+                "install_date",
+                "from_device__node__network_number",
+                "from_device__node__name",
+                "from_device__node__longitude",
+                "from_device__node__latitude",
+                "from_device__node__altitude",
+                "to_device__node__network_number",
+                "to_device__node__name",
+                "to_device__node__longitude",
+                "to_device__node__latitude",
+                "to_device__node__altitude",
             )
+        )
 
-            # Skip links where from and to nodes are the same (zero length)
-            if from_identifier == to_identifier:
-                continue
-
+        kml_links: List[LinkKMLDict] = []
+        # DISTINCT ON needs the results ordered by endpoints, so sort them by altitude (lowest first, unknown
+        # altitudes before everything else) here
+        for link in sorted(
+            links, key=lambda link: (link["highest_altitude"] is not None, link["highest_altitude"] or 0)
+        ):
+            # Casts are safe due to the corresponding filters above
+            from_identifier = cast(int, link["from_device__node__network_number"])
+            to_identifier = cast(int, link["to_device__node__network_number"])
             kml_links.append(
                 {
-                    "link_label": link_label,
+                    "link_label": (
+                        f"{node_label(from_identifier, link['from_device__node__name'])}"
+                        f"<->{node_label(to_identifier, link['to_device__node__name'])}"
+                    ),
                     "from_coord": (
-                        link.from_device.node.longitude,
-                        link.from_device.node.latitude,
-                        link.from_device.node.altitude or DEFAULT_ALTITUDE,
+                        link["from_device__node__longitude"],
+                        link["from_device__node__latitude"],
+                        link["from_device__node__altitude"] or DEFAULT_ALTITUDE,
                     ),
                     "to_coord": (
-                        link.to_device.node.longitude,
-                        link.to_device.node.latitude,
-                        link.to_device.node.altitude or DEFAULT_ALTITUDE,
+                        link["to_device__node__longitude"],
+                        link["to_device__node__latitude"],
+                        link["to_device__node__altitude"] or DEFAULT_ALTITUDE,
                     ),
                     "extended_data": {
-                        "type": get_kml_link_type(link),
-                        "raw_type": link.type,
-                        "status": link.status,
+                        "type": kml_link_type(link["type"]),
+                        "raw_type": link["type"],
+                        "status": link["status"],
                         "from": str(from_identifier),
                         "to": str(to_identifier),
-                        "install_date": link.install_date.isoformat() if link.install_date else None,
+                        "install_date": link["install_date"].isoformat() if link["install_date"] else None,
                     },
                 }
             )
 
-        # Prioritize links to show higher frequency links when there are duplicates
-        kml_links = self.prioritize_links(kml_links)
-
         for link_dict in kml_links:
             # Determine link type
             link_type_value = link_dict["extended_data"].get("type")
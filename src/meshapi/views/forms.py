@@ -1,16 +1,19 @@
 import json
 import logging
 import os
+from concurrent.futures import Future
 from dataclasses import dataclass
 from datetime import date, datetime, timezone
 from json.decoder import JSONDecodeError
-from typing import Optional
+from typing import Callable, Optional
 
 from datadog import statsd
 from ddtrace import tracer
+from django.contrib.postgres.aggregates import ArrayAgg
 from django.db import IntegrityError, transaction
-from django.db.models import Q
+from django.db.models import OuterRef, Q, Subquery, Value
 from drf_spectacular.utils import OpenApiResponse, extend_schema, extend_schema_view, inline_serializer
+from flags.state import flag_state
 from ipware import get_client_ip
 from rest_framework import permissions, serializers, status
 from rest_framework.decorators import api_view, permission_classes
@@ -26,6 +29,7 @@ from meshapi.util.admin_notifications import get_slack_link_to_model, notify_adm
 from meshapi.util.constants import RECAPTCHA_CHECKBOX_TOKEN_HEADER, RECAPTCHA_INVISIBLE_TOKEN_HEADER
 from meshapi.util.django_pglocks import advisory_lock
 from meshapi.util.network_number import NETWORK_NUMBER_ASSIGN_MIN, NETWORK_NUMBER_MAX, get_next_available_network_number
+from meshapi.util.timing import StageTimer
 from meshapi.validation import (
     NYCAddressInfo,
     geocode_nyc_address,
@@ -33,6 +37,7 @@ from meshapi.validation import (
     validate_email_address,
     validate_phone_number,
     validate_recaptcha_tokens,
+    validation_executor,
 )
 
 logging.basicConfig()
@@ -123,32 +128,100 @@ def join_form(request: Request) -> Response:
         logging.exception("TypeError while processing JoinForm")
         return Response({"detail": "Got incomplete form request"}, status=status.HTTP_400_BAD_REQUEST)
 
+    timer = StageTimer("meshdb.join_form")
+
+    # The captcha is verified while the rest of the form is validated, but nothing is written until it passes
+    captcha_check: Optional[CaptchaCheck] = None
     if not DISABLE_RECAPTCHA_VALIDATION:
-        try:
-            request_source_ip, request_source_ip_is_routable = get_client_ip(request)
-            if not request_source_ip_is_routable:
-                request_source_ip = None
+        # Flags are read from the database, which the worker threads shouldn't hold connections to
+        fail_all_invisible_recaptchas = flag_state("JOIN_FORM_FAIL_ALL_INVISIBLE_RECAPTCHAS")
+        captcha_check = CaptchaCheck(
+            validation_executor.submit(timer.run, "captcha", verify_captcha, request, fail_all_invisible_recaptchas)
+        )
 
-            recaptcha_invisible_token = request.headers.get(RECAPTCHA_INVISIBLE_TOKEN_HEADER)
-            if recaptcha_invisible_token == "":
-                recaptcha_invisible_token = None
+    response = process_join_form(r, request, captcha_check=captcha_check, timer=timer)
+    # Submissions which were turned away before the captcha mattered still have to pass it, so that only
+    # humans can find out what was wrong with them
+    if response.status_code != status.HTTP_401_UNAUTHORIZED and not captcha_passed(captcha_check, timer):
+        response = Response({"detail": "Captcha verification failed"}, status=status.HTTP_401_UNAUTHORIZED)
 
-            recaptcha_checkbox_token = request.headers.get(RECAPTCHA_CHECKBOX_TOKEN_HEADER)
-            if recaptcha_checkbox_token == "":
-                recaptcha_checkbox_token = None
+    if request.user.is_staff:
+        response["Server-Timing"] = timer.server_timing()
 
-            validate_recaptcha_tokens(recaptcha_invisible_token, recaptcha_checkbox_token, request_source_ip)
-        except Exception:
-            logging.exception("Captcha validation failed")
-            return Response({"detail": "Captcha verification failed"}, status=status.HTTP_401_UNAUTHORIZED)
-
-    response = process_join_form(r, request)
     statsd.increment("meshdb.join_form.response", tags=[f"status:{response.status_code}"])
     return response
 
 
+def verify_captcha(request: Request, fail_all_invisible_recaptchas: bool) -> None:
+    """
+    :param fail_all_invisible_recaptchas: the JOIN_FORM_FAIL_ALL_INVISIBLE_RECAPTCHAS flag
+    :raises Exception: if the request's captcha tokens aren't valid, or couldn't be verified
+    """
+    request_source_ip, request_source_ip_is_routable = get_client_ip(request)
+    if not request_source_ip_is_routable:
+        request_source_ip = None
+
+    recaptcha_invisible_token = request.headers.get(RECAPTCHA_INVISIBLE_TOKEN_HEADER)
+    if recaptcha_invisible_token == "":
+        recaptcha_invisible_token = None
+
+    recaptcha_checkbox_token = request.headers.get(RECAPTCHA_CHECKBOX_TOKEN_HEADER)
+    if recaptcha_checkbox_token == "":
+        recaptcha_checkbox_token = None
+
+    validate_recaptcha_tokens(
+        recaptcha_invisible_token,
+        recaptcha_checkbox_token,
+        request_source_ip,
+        fail_all_invisible_recaptchas=fail_all_invisible_recaptchas,
+    )
+
+
+class CaptchaCheck:
+    """The verification of a submission's captcha, running on another thread"""
+
+    def __init__(self, future: Future[None]):
+        self.future = future
+        self.passed: Optional[bool] = None
+
+
+def captcha_passed(captcha_check: Optional[CaptchaCheck], timer: StageTimer) -> bool:
+    """
+    Waits for the captcha to be verified, if it is being. Only the first call waits (and is timed), later
+    ones return the same result
+    """
+    if captcha_check is None:
+        return True
+
+    if captcha_check.passed is None:
+        try:
+            timer.wait("captcha", captcha_check.future)
+            captcha_check.passed = True
+        except Exception:
+            logging.exception("Captcha validation failed")
+            captcha_check.passed = False
+    return captcha_check.passed
+
+
 @tracer.wrap()
-def process_join_form(r: JoinFormRequest, request: Optional[Request] = None) -> Response:
+def process_join_form(
+    r: JoinFormRequest,
+    request: Optional[Request] = None,
+    geocode: Optional[Callable[[str, str, str, str], NYCAddressInfo]] = None,
+    validate_email: Optional[Callable[[str], bool]] = None,
+    captcha_check: Optional[CaptchaCheck] = None,
+    timer: Optional[StageTimer] = None,
+) -> Response:
+    """
+    :param geocode: looks up the address, in place of geocode_nyc_address (e.g. so that a replay of many
+        join records can look up each address once)
+    :param validate_email: checks the email address, in place of validate_email_address
+    :param captcha_check: the verification of the submission's captcha, which must succeed before anything
+        is written
+    :param timer: times each stage of processing the submission
+    """
+    timer = timer or StageTimer("meshdb.join_form")
+
     if not r.ncl:
         return Response(
             {"detail": "You must agree to the Network Commons License!"}, status=status.HTTP_400_BAD_REQUEST
@@ -159,33 +232,63 @@ def process_join_form(r: JoinFormRequest, request: Optional[Request] = None) ->
     if not r.email_address:
         return Response({"detail": "Must provide an email"}, status=status.HTTP_400_BAD_REQUEST)
 
-    if r.email_address and not validate_email_address(r.email_address):
-        return Response({"detail": f"{r.email_address} is not a valid email"}, status=status.HTTP_400_BAD_REQUEST)
+    # Checking that the email address's domain can receive mail may mean a DNS lookup, so it runs while we
+    # geocode the address. Whether the address is valid is still reported before anything else
+    def check_email() -> bool:
+        with timer.stage("email") as stage:
+            valid = (validate_email or validate_email_address)(r.email_address)
+            if not valid:
+                stage.outcome = "invalid"
+            return valid
+
+    email_check = validation_executor.submit(check_email)
+    invalid_email_response = Response(
+        {"detail": f"{r.email_address} is not a valid email"}, status=status.HTTP_400_BAD_REQUEST
+    )
 
     # Expects country code!!!!
-    if r.phone_number and not validate_phone_number(r.phone_number):
+    with timer.stage("phone") as stage:
+        phone_number_valid = not r.phone_number or validate_phone_number(r.phone_number)
+        if not phone_number_valid:
+            stage.outcome = "invalid"
+    if not phone_number_valid:
+        if not timer.wait("email", email_check):
+            return invalid_email_response
         return Response({"detail": f"{r.phone_number} is not a valid phone number"}, status=status.HTTP_400_BAD_REQUEST)
 
     formatted_phone_number = normalize_phone_number(r.phone_number) if r.phone_number else None
 
-    try:
-        nyc_addr_info: NYCAddressInfo = geocode_nyc_address(r.street_address, r.city, r.state, r.zip_code)
-    except UnsupportedAddressError:
-        return Response(
-            {"detail": UNSUPPORTED_ADDRESS_RESPONSE},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-    except InvalidAddressError:
-        return Response(
-            {"detail": INVALID_ADDRESS_RESPONSE},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-    except Exception:
-        # Either an API is down, or we have no idea what went wrong. It was probably our fault.
-        return Response(
-            {"detail": VALIDATION_500_RESPONSE},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        )
+    address_error_response: Optional[Response] = None
+    with timer.stage("geocode") as stage:
+        try:
+            nyc_addr_info: NYCAddressInfo = (geocode or geocode_nyc_address)(
+                r.street_address, r.city, r.state, r.zip_code
+            )
+        except UnsupportedAddressError:
+            stage.outcome = "invalid"
+            address_error_response = Response(
+                {"detail": UNSUPPORTED_ADDRESS_RESPONSE},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except InvalidAddressError:
+            stage.outcome = "invalid"
+            address_error_response = Response(
+                {"detail": INVALID_ADDRESS_RESPONSE},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception:
+            # Either an API is down, or we have no idea what went wrong. It was probably our fault.
+            stage.outcome = "error"
+            address_error_response = Response(
+                {"detail": VALIDATION_500_RESPONSE},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    if not timer.wait("email", email_check):
+        return invalid_email_response
+
+    if address_error_response is not None:
+        return address_error_response
 
     changed_info: dict[str, str | int] = {}
 
@@ -225,108 +328,134 @@ def process_join_form(r: JoinFormRequest, request: Optional[Request] = None) ->
                 status=status.HTTP_409_CONFLICT,
             )
 
-    # A member can have multiple install requests, if they move apartments for example, so we
-    # check if there's an existing member. Group members by matching only on primary email address
-    # This is sublte but important. We do NOT want to dedupe on phone number, or even on additional
-    # email addresses at this time because this could lead to a situation where the email address
-    # entered in the join form does not match the email address we send the OSTicket to.
-    #
-    # That seems like a minor problem, but is actually a potential safety risk. Consider the case
-    # where a couple uses one person's email address to fill out the join form, but signs up for
-    # stripe payments with the other person's email address. If they then break up, and one person
-    # moves out, we definitely do not want to send an email with their new home address to their ex
-    existing_members = list(Member.objects.filter(Q(primary_email_address=r.email_address)))
-
-    join_form_member = (
-        existing_members[0]
-        if len(existing_members) > 0
-        else Member(
-            name=join_form_full_name,
-            primary_email_address=r.email_address,
-            phone_number=formatted_phone_number,
-            slack_handle=None,
-        )
-    )
+    # Nothing is written for a submission until its captcha has passed
+    if not captcha_passed(captcha_check, timer):
+        return Response({"detail": "Captcha verification failed"}, status=status.HTTP_401_UNAUTHORIZED)
 
-    if r.email_address not in join_form_member.all_email_addresses:
-        join_form_member.additional_email_addresses.append(r.email_address)
+    with timer.stage("dedup") as stage:
+        # A member can have multiple install requests, if they move apartments for example, so we
+        # check if there's an existing member. Group members by matching only on primary email address
+        # This is sublte but important. We do NOT want to dedupe on phone number, or even on additional
+        # email addresses at this time because this could lead to a situation where the email address
+        # entered in the join form does not match the email address we send the OSTicket to.
+        #
+        # That seems like a minor problem, but is actually a potential safety risk. Consider the case
+        # where a couple uses one person's email address to fill out the join form, but signs up for
+        # stripe payments with the other person's email address. If they then break up, and one person
+        # moves out, we definitely do not want to send an email with their new home address to their ex
+        existing_members = list(Member.objects.filter(Q(primary_email_address=r.email_address)))
+
+        join_form_member = (
+            existing_members[0]
+            if len(existing_members) > 0
+            else Member(
+                name=join_form_full_name,
+                primary_email_address=r.email_address,
+                phone_number=formatted_phone_number,
+                slack_handle=None,
+            )
+        )
 
-    if formatted_phone_number not in join_form_member.all_phone_numbers:
-        join_form_member.additional_phone_numbers.append(formatted_phone_number)
+        if r.email_address not in join_form_member.all_email_addresses:
+            join_form_member.additional_email_addresses.append(r.email_address)
 
-    # Try to map this address to an existing Building or group of buildings
-    all_existing_buildings_for_structure = Building.objects.filter(bin=nyc_addr_info.bin)
-    existing_exact_buildings = all_existing_buildings_for_structure.filter(street_address=nyc_addr_info.street_address)
+        if formatted_phone_number not in join_form_member.all_phone_numbers:
+            join_form_member.additional_phone_numbers.append(formatted_phone_number)
 
-    existing_primary_nodes_for_structure = list(
-        {building.primary_node for building in all_existing_buildings_for_structure}
-    )
-    existing_nodes_for_structure = {
-        node for building in all_existing_buildings_for_structure for node in building.nodes.all()
-    }
-
-    if len(existing_exact_buildings) > 1:
-        logging.warning(
-            f"Found multiple buildings with BIN {nyc_addr_info.bin} and "
-            f"address {nyc_addr_info.street_address} this should not happen, "
-            f"and these should be consolidated"
+        # Try to map this address to an existing Building or group of buildings. Everything we need to
+        # know about the structure (its buildings, their nodes, and any install we might recycle) comes
+        # back in this one query, and is matched up in memory below
+        buildings_for_structure = (
+            Building.objects.filter(bin=nyc_addr_info.bin)
+            .select_related("primary_node")
+            .annotate(node_ids=ArrayAgg("nodes__id", filter=Q(nodes__isnull=False), distinct=True, default=Value([])))
         )
+        if existing_members:
+            # We only recycle install objects if nothing special has happened to them,
+            # if they're not REQUEST_RECEIVED, that dramatically increases the chance that
+            # a new identifier is warranted. e.g. NN_REASSIGNED indicates that's an absolute must
+            recyclable_installs = Install.objects.filter(
+                building=OuterRef("pk"),
+                member=join_form_member,
+                unit__exact=r.apartment,
+                status=Install.InstallStatus.REQUEST_RECEIVED,
+            ).order_by("-install_number")
+            buildings_for_structure = buildings_for_structure.annotate(
+                recyclable_install_id=Subquery(recyclable_installs.values("id")[:1]),
+                recyclable_install_number=Subquery(recyclable_installs.values("install_number")[:1]),
+            )
+        all_existing_buildings_for_structure = list(buildings_for_structure)
 
-    if len(existing_primary_nodes_for_structure) > 1:
-        logging.warning(
-            f"Found multiple primary nodes for the cluster of nodes {existing_nodes_for_structure} "
-            f"at address {nyc_addr_info.street_address}. This should not happen, "
-            f"these should be consolidated"
-        )
+        existing_exact_buildings = [
+            building
+            for building in all_existing_buildings_for_structure
+            if building.street_address == nyc_addr_info.street_address
+        ]
 
-    join_form_building = (
-        existing_exact_buildings[0]
-        if len(existing_exact_buildings) > 0
-        else Building(
-            bin=nyc_addr_info.bin if nyc_addr_info is not None else None,
-            street_address=nyc_addr_info.street_address,
-            city=nyc_addr_info.city,
-            state=nyc_addr_info.state,
-            zip_code=nyc_addr_info.zip,
-            latitude=nyc_addr_info.latitude,
-            longitude=nyc_addr_info.longitude,
-            altitude=nyc_addr_info.altitude,
-            address_truth_sources=[AddressTruthSource.NYCPlanningLabs],
+        existing_primary_nodes_for_structure = list(
+            {building.primary_node for building in all_existing_buildings_for_structure}
         )
-    )
+        existing_node_ids_for_structure = {
+            node_id for building in all_existing_buildings_for_structure for node_id in building.node_ids
+        }
 
-    if not join_form_building.primary_node:
-        join_form_building.primary_node = (
-            existing_primary_nodes_for_structure[0] if existing_primary_nodes_for_structure else None
-        )
+        if len(existing_exact_buildings) > 1:
+            logging.warning(
+                f"Found multiple buildings with BIN {nyc_addr_info.bin} and "
+                f"address {nyc_addr_info.street_address} this should not happen, "
+                f"and these should be consolidated"
+            )
 
-    existing_install = Install.objects.filter(
-        building=join_form_building,
-        member=join_form_member,
-        unit__exact=r.apartment,
-        # We only recycle install objects if nothing special has happened to them,
-        # if they're not REQUEST_RECEIVED, that dramatically increases the chance that
-        # a new identifier is warranted. e.g. NN_REASSIGNED indicates that's an absolute must
-        status=Install.InstallStatus.REQUEST_RECEIVED,
-    ).first()
-    if existing_install:
-        logging.warning(
-            f"Discarding join form submission because an install was found with exactly "
-            f"matching information: #{existing_install.install_number}"
-        )
-        return Response(
-            {
-                "detail": "Thanks! A volunteer will email you shortly",
-                "building_id": join_form_building.id,
-                "member_id": join_form_member.id,
-                "install_id": existing_install.id,
-                "install_number": existing_install.install_number,
-                "member_exists": True,
-                "changed_info": {},
-            },
-            status=status.HTTP_200_OK,
+        if len(existing_primary_nodes_for_structure) > 1:
+            logging.warning(
+                f"Found multiple primary nodes for the cluster of nodes {existing_node_ids_for_structure} "
+                f"at address {nyc_addr_info.street_address}. This should not happen, "
+                f"these should be consolidated"
+            )
+
+        join_form_building = (
+            existing_exact_buildings[0]
+            if len(existing_exact_buildings) > 0
+            else Building(
+                bin=nyc_addr_info.bin if nyc_addr_info is not None else None,
+                street_address=nyc_addr_info.street_address,
+                city=nyc_addr_info.city,
+                state=nyc_addr_info.state,
+                zip_code=nyc_addr_info.zip,
+                latitude=nyc_addr_info.latitude,
+                longitude=nyc_addr_info.longitude,
+                altitude=nyc_addr_info.altitude,
+                address_truth_sources=[AddressTruthSource.NYCPlanningLabs],
+            )
         )
 
+        if not join_form_building.primary_node:
+            join_form_building.primary_node = (
+                existing_primary_nodes_for_structure[0] if existing_primary_nodes_for_structure else None
+            )
+
+        # Only an existing member at an existing building can have an install to recycle
+        existing_install_id = getattr(join_form_building, "recyclable_install_id", None)
+        existing_install_number = getattr(join_form_building, "recyclable_install_number", None)
+        if existing_install_id:
+            stage.outcome = "duplicate"
+            logging.warning(
+                f"Discarding join form submission because an install was found with exactly "
+                f"matching information: #{existing_install_number}"
+            )
+            return Response(
+                {
+                    "detail": "Thanks! A volunteer will email you shortly",
+                    "building_id": join_form_building.id,
+                    "member_id": join_form_member.id,
+                    "install_id": existing_install_id,
+                    "install_number": existing_install_number,
+                    "member_exists": True,
+                    "changed_info": {},
+                },
+                status=status.HTTP_200_OK,
+            )
+
     join_form_install = Install(
         status=Install.InstallStatus.REQUEST_RECEIVED,
         ticket_number=None,
@@ -342,96 +471,100 @@ def process_join_form(r: JoinFormRequest, request: Optional[Request] = None) ->
         node=join_form_building.primary_node if join_form_building.primary_node else None,
     )
 
-    try:
-        join_form_member.save()
-    except IntegrityError:
-        logging.exception("Error saving member from join form")
-        return Response(
-            {"detail": "There was a problem saving your Member information"},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        )
-
-    try:
-        join_form_building.save()
-
-        # If this building is a new building in a shared structure of buildings with
-        # existing node(s), update the node-building relation to reflect the new building's
-        # association with the existing nodes
-        for node in existing_nodes_for_structure:
-            join_form_building.nodes.add(node)
-    except IntegrityError:
-        logging.exception("Error saving building from join form")
-        # Delete the member and bail
-        join_form_member.delete()
-        return Response(
-            {"detail": "There was a problem saving your Building information"}, status=status.HTTP_400_BAD_REQUEST
-        )
-
-    try:
-        join_form_install.save()
-    except IntegrityError:
-        logging.exception("Error saving install from join form")
-        # Delete the member, building (if we just created it), and bail
-        join_form_member.delete()
-        if len(existing_exact_buildings) == 0:
-            join_form_building.delete()
-        return Response(
-            {"detail": "There was a problem saving your Install information"}, status=status.HTTP_400_BAD_REQUEST
-        )
-
-    if existing_members:
-        if join_form_member.name.lower() != join_form_full_name.lower():
-            name_change_note = (
-                f"Dropped name change: {join_form_full_name} (install request #{join_form_install.install_number})"
-            )
-            if join_form_member.notes:
-                join_form_member.notes = join_form_member.notes.strip() + "\n" + name_change_note
-            else:
-                join_form_member.notes = name_change_note
+    with timer.stage("save") as stage:
+        try:
             join_form_member.save()
+        except IntegrityError:
+            logging.exception("Error saving member from join form")
+            stage.outcome = "error"
+            return Response(
+                {"detail": "There was a problem saving your Member information"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
 
-            notify_administrators_of_data_issue(
-                [join_form_member],
-                MemberSerializer,
-                name_change_note,
-                request,
+        try:
+            join_form_building.save()
+
+            # If this building is a new building in a shared structure of buildings with
+            # existing node(s), update the node-building relation to reflect the new building's
+            # association with the existing nodes
+            join_form_building.nodes.add(*existing_node_ids_for_structure)
+        except IntegrityError:
+            logging.exception("Error saving building from join form")
+            stage.outcome = "error"
+            # Delete the member and bail
+            join_form_member.delete()
+            return Response(
+                {"detail": "There was a problem saving your Building information"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        if len(existing_members) > 1:
-            notify_administrators_of_data_issue(
-                existing_members + [join_form_member],
-                MemberSerializer,
-                "Possible duplicate member objects detected",
-                request,
+        try:
+            join_form_install.save()
+        except IntegrityError:
+            logging.exception("Error saving install from join form")
+            stage.outcome = "error"
+            # Delete the member, building (if we just created it), and bail
+            join_form_member.delete()
+            if len(existing_exact_buildings) == 0:
+                join_form_building.delete()
+            return Response(
+                {"detail": "There was a problem saving your Install information"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-    success_message = f"""JoinForm submission success {"(trust_me_bro)" if r.trust_me_bro else ""}. \
-building_id: {join_form_building.id}, member_id: {join_form_member.id}, \
-install_number: {join_form_install.install_number}"""
-
-    if r.trust_me_bro:
-        logging.warning(success_message)
-        if changed_info:
-            building_url = get_slack_link_to_model(join_form_building)
-            member_url = get_slack_link_to_model(join_form_member)
-            install_url = get_slack_link_to_model(join_form_install)
-
-            notify_string = "[join_form_bug] A new member rejected our changes to their address.\n"
-            "**This is most likely due to a bug in MeshDB. Human intervention is "
-            "required to ensure data correctness.**\n"
-            "Please review the submission and verify building information.\n"
-            "If necessary, please reach out to the member and confirm their details.\n"
-            f"email: {r.email_address}\n"
-            f"building: {building_url}\n"
-            f"member: {member_url}\n"
-            f"install: {install_url}\n"
-            if r.street_address != nyc_addr_info.street_address:
-                notify_string += f"Changed street_address: {r.street_address} != {nyc_addr_info.street_address}\n"
-            if r.city != nyc_addr_info.city:
-                notify_string += f"Changed city: {r.city} != {nyc_addr_info.city}"
-            notify_admins(notify_string)
-    else:
-        logging.info(success_message)
+    with timer.stage("notify"):
+        if existing_members:
+            if join_form_member.name.lower() != join_form_full_name.lower():
+                name_change_note = (
+                    f"Dropped name change: {join_form_full_name} (install request #{join_form_install.install_number})"
+                )
+                if join_form_member.notes:
+                    join_form_member.notes = join_form_member.notes.strip() + "\n" + name_change_note
+                else:
+                    join_form_member.notes = name_change_note
+                join_form_member.save()
+
+                notify_administrators_of_data_issue(
+                    [join_form_member],
+                    MemberSerializer,
+                    name_change_note,
+                    request,
+                )
+
+            if len(existing_members) > 1:
+                notify_administrators_of_data_issue(
+                    existing_members + [join_form_member],
+                    MemberSerializer,
+                    "Possible duplicate member objects detected",
+                    request,
+                )
+
+        success_message = f"""JoinForm submission success {"(trust_me_bro)" if r.trust_me_bro else ""}. \
+    building_id: {join_form_building.id}, member_id: {join_form_member.id}, \
+    install_number: {join_form_install.install_number}"""
+
+        if r.trust_me_bro:
+            logging.warning(success_message)
+            if changed_info:
+                building_url = get_slack_link_to_model(join_form_building)
+                member_url = get_slack_link_to_model(join_form_member)
+                install_url = get_slack_link_to_model(join_form_install)
+
+                notify_string = "[join_form_bug] A new member rejected our changes to their address.\n"
+                "**This is most likely due to a bug in MeshDB. Human intervention is "
+                "required to ensure data correctness.**\n"
+                "Please review the submission and verify building information.\n"
+                "If necessary, please reach out to the member and confirm their details.\n"
+                f"email: {r.email_address}\n"
+                f"building: {building_url}\n"
+                f"member: {member_url}\n"
+                f"install: {install_url}\n"
+                if r.street_address != nyc_addr_info.street_address:
+                    notify_string += f"Changed street_address: {r.street_address} != {nyc_addr_info.street_address}\n"
+                if r.city != nyc_addr_info.city:
+                    notify_string += f"Changed city: {r.city} != {nyc_addr_info.city}"
+                notify_admins(notify_string)
+        else:
+            logging.info(success_message)
 
     return Response(
         {
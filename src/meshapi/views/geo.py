@@ -0,0 +1,87 @@
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from meshapi.util import vector_tiles
+from meshapi.util.geo import GEOJSON_CONTENT_TYPE, LAYERS, feature_collection, parse_bbox
+from meshapi.util.response_cache import GEO_POLICY, cache_response
+from meshapi.views.geography import IgnoreClientContentNegotiation
+from meshdb.db_router import read_from_replica
+
+
+@method_decorator([cache_response(GEO_POLICY), read_from_replica], name="dispatch")
+class GeoJSONLayer(APIView):
+    permission_classes = [permissions.AllowAny]
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    @extend_schema(
+        tags=["Geographic & KML Data"],
+        auth=[],
+        summary="Get one layer of the map (nodes, installs, accesspoints, sectors, links, or los) as a GeoJSON "
+        "FeatureCollection, optionally limited to a bounding box",
+        parameters=[
+            OpenApiParameter(
+                "layer",
+                OpenApiTypes.STR,
+                OpenApiParameter.PATH,
+                enum=list(LAYERS.keys()),
+                description="The layer to fetch",
+            ),
+            OpenApiParameter(
+                "bbox",
+                OpenApiTypes.STR,
+                OpenApiParameter.QUERY,
+                description="Only include features within this box, as min_lon,min_lat,max_lon,max_lat. "
+                "Lines are included if any part of them might be within it",
+                required=False,
+            ),
+        ],
+        responses={
+            (200, GEOJSON_CONTENT_TYPE): OpenApiResponse(OpenApiTypes.OBJECT, description="A FeatureCollection"),
+            400: OpenApiResponse(description="Invalid bounding box"),
+            404: OpenApiResponse(description="No such layer"),
+        },
+    )
+    def get(self, request: HttpRequest, layer: str) -> HttpResponse:
+        if layer not in LAYERS:
+            raise Http404(f"No such layer, expected one of: {', '.join(LAYERS.keys())}")
+
+        bbox = None
+        if "bbox" in request.GET:
+            try:
+                bbox = parse_bbox(request.GET["bbox"])
+            except ValueError as e:
+                return Response({"detail": f"Invalid bbox: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return JsonResponse(feature_collection(LAYERS[layer](bbox)), content_type=GEOJSON_CONTENT_TYPE)
+
+
+@method_decorator([cache_response(GEO_POLICY), read_from_replica], name="dispatch")
+class VectorTile(APIView):
+    permission_classes = [permissions.AllowAny]
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    @extend_schema(
+        tags=["Geographic & KML Data"],
+        auth=[],
+        summary="Get a Mapbox Vector Tile of the map, with one layer each for nodes, installs, accesspoints, "
+        "sectors, links, and los",
+        responses={
+            (200, vector_tiles.CONTENT_TYPE): OpenApiResponse(
+                OpenApiTypes.BINARY,
+                description="The tile, which is empty if there is nothing on the map there",
+            ),
+            404: OpenApiResponse(description="No such tile"),
+        },
+    )
+    def get(self, request: HttpRequest, z: int, x: int, y: int) -> HttpResponse:
+        if not vector_tiles.is_valid_tile(z, x, y):
+            raise Http404("No such tile")
+
+        bbox = vector_tiles.tile_query_bounds(z, x, y)
+        layers = {name: get_features(bbox) for name, get_features in LAYERS.items()}
+        return HttpResponse(vector_tiles.encode_tile(layers, z, x, y), content_type=vector_tiles.CONTENT_TYPE)
@@ -5,6 +5,7 @@ from typing import Any, Dict, List, Optional, Tuple, TypedDict, cast
 from django.db.models import Exists, F, OuterRef, Q
 from django.db.models.functions import Greatest
 from django.http import HttpRequest, HttpResponse
+from django.utils.decorators import method_decorator
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiResponse, extend_schema, extend_schema_view, inline_serializer
 from fastkml import Data, ExtendedData, geometry, kml, styles
@@ -21,8 +22,11 @@ from rest_framework_dataclasses.serializers import DataclassSerializer
 
 from meshapi.exceptions import InvalidAddressError, UnsupportedAddressError
 from meshapi.models import LOS, Install, Link
+from meshapi.util.map_artifacts import serve_map_artifact
+from meshapi.util.response_cache import KML_POLICY, cache_response
 from meshapi.validation import geocode_nyc_address
 from meshapi.views.forms import INVALID_ADDRESS_RESPONSE, UNSUPPORTED_ADDRESS_RESPONSE, VALIDATION_500_RESPONSE
+from meshdb.db_router import read_from_replica
 
 KML_CONTENT_TYPE = "application/vnd.google-earth.kml+xml"
 KML_CONTENT_TYPE_WITH_CHARSET = f"{KML_CONTENT_TYPE}; charset=utf-8"
@@ -98,6 +102,7 @@ def create_placemark(identifier: str, point: Point, active: bool, status: str, r
     return placemark
 
 
+@method_decorator([serve_map_artifact, cache_response(KML_POLICY), read_from_replica], name="dispatch")
 class WholeMeshKML(APIView):
     permission_classes = [permissions.AllowAny]
     content_negotiation_class = IgnoreClientContentNegotiation
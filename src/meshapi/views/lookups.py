@@ -1,6 +1,7 @@
 from typing import Any, List, Type
 
 from django.db.models import Q, QuerySet
+from django.utils.decorators import method_decorator
 from django_filters import rest_framework as filters
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
@@ -8,7 +9,7 @@ from rest_framework import generics
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from meshapi.models import LOS, AccessPoint, Building, Device, Install, Link, Member, Node, Sector
+from meshapi.models import LOS, AccessPoint, Building, Device, Install, Link, Member, MemberContactIndex, Node, Sector
 from meshapi.serializers import (
     AccessPointSerializer,
     BuildingSerializer,
@@ -20,10 +21,12 @@ from meshapi.serializers import (
     NodeSerializer,
     SectorSerializer,
 )
+from meshdb.db_router import read_from_replica
 
 ADDITIONAL_QUERY_PARAMS = {"page_size", "page"}
 
 
+@method_decorator(read_from_replica, name="dispatch")
 class FilterRequiredListAPIView(generics.ListAPIView):
     filterset_class: Type[filters.FilterSet]
 
@@ -51,13 +54,13 @@ class MemberFilter(filters.FilterSet):
 
     def filter_on_all_emails(self, queryset: QuerySet[Member], field_name: str, value: str) -> QuerySet[Member]:
         return queryset.filter(
-            Q(primary_email_address__icontains=value)
-            | Q(stripe_email_address__icontains=value)
-            | Q(additional_email_addresses__icontains=value)
+            id__in=MemberContactIndex.member_ids_matching(MemberContactIndex.ContactType.EMAIL, value)
         )
 
     def filter_on_all_phone_numbers(self, queryset: QuerySet[Member], field_name: str, value: str) -> QuerySet[Member]:
-        return queryset.filter(Q(phone_number__icontains=value) | Q(additional_phone_numbers__icontains=value))
+        return queryset.filter(
+            id__in=MemberContactIndex.member_ids_matching(MemberContactIndex.ContactType.PHONE, value)
+        )
 
     class Meta:
         model = Member
@@ -6,6 +6,9 @@ from typing import Any, Dict, List
 
 import requests
 from django.db.models import Count, Exists, F, OuterRef, Prefetch, Q, Subquery
+from django.http import Http404, HttpRequest, HttpResponse
+from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags, quote_etag
 from drf_spectacular.utils import OpenApiResponse, extend_schema, extend_schema_view, inline_serializer
 from rest_framework import generics, permissions, serializers, status
 from rest_framework.request import Request
@@ -19,14 +22,10 @@ from meshapi.serializers import (
     MapDataLinkSerializer,
     MapDataSectorSerializer,
 )
-
-LINKNYC_KIOSK_DATA_URL = "https://data.cityofnewyork.us/resource/s4kf-3yrf.json?$limit=100000"
-
-LINKNYC_KIOSK_STATUS_TRANSLATION = {
-    "Live": "active",
-    "Ready for Activation": "pending",
-    "Installed": "installed",
-}
+from meshapi.util.linknyc_kiosks import get_kiosk_snapshot
+from meshapi.util.map_artifacts import HASHED_CACHE_CONTROL, artifact_response, get_artifact, serve_map_artifact
+from meshapi.util.response_cache import MAP_DATA_POLICY, cache_response
+from meshdb.db_router import read_from_replica
 
 
 def convert_access_point_id_to_fake_node_number(access_point_id: uuid.UUID) -> int:
@@ -44,6 +43,7 @@ def convert_access_point_id_to_fake_node_number(access_point_id: uuid.UUID) -> i
         "deprecated/removed in the future)",
     ),
 )
+@method_decorator([serve_map_artifact, cache_response(MAP_DATA_POLICY), read_from_replica], name="dispatch")
 class MapDataNodeList(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = MapDataInstallSerializer
@@ -187,6 +187,7 @@ class MapDataNodeList(generics.ListAPIView):
         "(Warning: This endpoint is a legacy format and may be deprecated/removed in the future)",
     ),
 )
+@method_decorator([serve_map_artifact, cache_response(MAP_DATA_POLICY), read_from_replica], name="dispatch")
 class MapDataLinkList(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = MapDataLinkSerializer
@@ -398,6 +399,7 @@ class MapDataLinkList(generics.ListAPIView):
         "(Warning: This endpoint is a legacy format and may be deprecated/removed in the future)",
     ),
 )
+@method_decorator([serve_map_artifact, cache_response(MAP_DATA_POLICY), read_from_replica], name="dispatch")
 class MapDataSectorList(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = MapDataSectorSerializer
@@ -446,35 +448,7 @@ class KioskListWrapper(APIView):
 
     def get(self, request: Request) -> Response:
         try:
-            response = requests.get(LINKNYC_KIOSK_DATA_URL)
-            response.raise_for_status()
-            data = response.json()
-
-            if not data:
-                raise ValueError("Expected at least one kiosk to be returned from the City of New York dataset")
-
-            kiosks = []
-            for row in data:
-                if not row:
-                    logging.warning(
-                        "Got empty row from City of New York LinkNYC kiosk dataset. Skipping row and moving on."
-                    )
-                    continue
-                coordinates = [float(row["longitude"]), float(row["latitude"])]
-                kiosk_status = LINKNYC_KIOSK_STATUS_TRANSLATION.get(row["link_installation_status"])
-                kiosks.append(
-                    {
-                        "street_address": row["street_address"],
-                        "type": row["planned_kiosk_type"],
-                        "id": row["link_site_id"],
-                        "coordinates": coordinates,
-                        "status": kiosk_status,
-                    }
-                )
-            return Response(
-                kiosks,
-                status=status.HTTP_200_OK,
-            )
+            snapshot = get_kiosk_snapshot()
         except requests.exceptions.RequestException:
             logging.exception("Error fetching data from City of New York LinkNYC kiosk dataset")
             return Response(
@@ -487,3 +461,22 @@ class KioskListWrapper(APIView):
                 {"detail": "Invalid response received from City of New York"},
                 status=status.HTTP_502_BAD_GATEWAY,
             )
+
+        etag = quote_etag(snapshot["etag"])
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(snapshot["kiosks"], status=status.HTTP_200_OK, headers=headers)
+
+
+def map_artifact_by_hash(request: HttpRequest, content_hash: str) -> HttpResponse:
+    """
+    Serves a pre-built map data or KML artifact by its content hash. Since the content at these URLs can
+    never change, they may be cached indefinitely
+    """
+    artifact = get_artifact(content_hash)
+    if artifact is None:
+        raise Http404("No such artifact, it may have been replaced by a newer version")
+
+    return artifact_response(request, content_hash, artifact, HASHED_CACHE_CONTROL)
@@ -5,7 +5,7 @@ from django_filters import rest_framework as filters
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
 from meshapi.docs import query_form_password_param
-from meshapi.models import Install, Member
+from meshapi.models import Install, Member, MemberContactIndex
 from meshapi.permissions import LegacyMeshQueryPassword
 from meshapi.serializers.query_api import QueryFormSerializer
 from meshapi.views.lookups import FilterRequiredListAPIView
@@ -27,15 +27,15 @@ class QueryMemberFilter(filters.FilterSet):
     def filter_on_member_name(self, queryset: QuerySet[Member], field_name: str, value: str) -> QuerySet[Member]:
         return queryset.filter(Q(member__name__icontains=value))
 
-    def filter_on_all_emails(self, queryset: QuerySet[Member], field_name: str, value: str) -> QuerySet[Member]:
+    def filter_on_all_emails(self, queryset: QuerySet[Install], field_name: str, value: str) -> QuerySet[Install]:
         return queryset.filter(
-            Q(member__primary_email_address__icontains=value)
-            | Q(member__stripe_email_address__icontains=value)
-            | Q(member__additional_email_addresses__icontains=value)
+            member__in=MemberContactIndex.member_ids_matching(MemberContactIndex.ContactType.EMAIL, value)
         )
 
-    def filter_on_all_phone_numbers(self, queryset: QuerySet[Member], name: str, value: str) -> QuerySet[Member]:
-        return queryset.filter(Q(phone_number__icontains=value) | Q(additional_phone_numbers__icontains=value))
+    def filter_on_all_phone_numbers(self, queryset: QuerySet[Install], name: str, value: str) -> QuerySet[Install]:
+        return queryset.filter(
+            member__in=MemberContactIndex.member_ids_matching(MemberContactIndex.ContactType.PHONE, value)
+        )
 
     class Meta:
         model = Install
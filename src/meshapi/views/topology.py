@@ -0,0 +1,195 @@
+import uuid
+from typing import List, Optional
+
+from django.utils.decorators import method_decorator
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from meshapi.models import Link, Node
+from meshapi.permissions import HasTopologyViewPermission
+from meshapi.util.topology import Topology, TopologyNode, get_topology
+from meshapi.views.helpers import helper_err_response_schema
+from meshdb.db_router import read_from_replica
+
+
+def _network_number_parameter(name: str, description: str, required: bool = True) -> OpenApiParameter:
+    return OpenApiParameter(name, OpenApiTypes.INT, OpenApiParameter.QUERY, description=description, required=required)
+
+
+def _get_position(topology: Topology, request: Request, name: str) -> Optional[int]:
+    """
+    Returns the position in the topology of the node with the network number given by the named query
+    parameter, or None if the node exists but has no active links
+
+    :raises ParseError: if the parameter is missing or not a number
+    :raises NotFound: if there is no such node
+    """
+    value = request.query_params.get(name, "")
+    try:
+        network_number = int(value)
+    except ValueError:
+        raise ParseError(f"Invalid {name}: '{value}'. Must be a network number")
+
+    if network_number in topology.position_by_network_number:
+        return topology.position_by_network_number[network_number]
+    if not Node.objects.filter(network_number=network_number).exists():
+        raise NotFound(f"No node with network number {network_number}")
+    return None
+
+
+def _nodes(topology: Topology, positions: List[int]) -> List[TopologyNode]:
+    return [topology.nodes[position] for position in positions]
+
+
+@method_decorator(read_from_replica, name="dispatch")
+class TopologyPath(APIView):
+    permission_classes = [HasTopologyViewPermission]
+
+    @extend_schema(
+        tags=["Topology"],
+        summary="Find a shortest path (by number of hops) between two nodes over active links",
+        parameters=[
+            _network_number_parameter("from", "The network number of the node to start from"),
+            _network_number_parameter("to", "The network number of the node to finish at"),
+        ],
+        responses={
+            "200": OpenApiResponse(
+                OpenApiTypes.OBJECT,
+                description="The nodes along the path, including both ends, or an empty path and null hops if "
+                "the nodes are not connected",
+            ),
+            "400": OpenApiResponse(helper_err_response_schema, description="Invalid network number"),
+            "404": OpenApiResponse(helper_err_response_schema, description="No such node"),
+        },
+    )
+    def get(self, request: Request) -> Response:
+        topology = get_topology()
+        source = _get_position(topology, request, "from")
+        target = _get_position(topology, request, "to")
+
+        path = topology.shortest_path(source, target) if source is not None and target is not None else None
+        if path is None:
+            return Response({"hops": None, "path": []})
+        return Response({"hops": len(path) - 1, "path": _nodes(topology, path)})
+
+
+@method_decorator(read_from_replica, name="dispatch")
+class TopologyComponents(APIView):
+    permission_classes = [HasTopologyViewPermission]
+
+    @extend_schema(
+        tags=["Topology"],
+        summary="List the separate parts of the mesh, largest first. Nodes without any active links are left out",
+        responses={"200": OpenApiResponse(OpenApiTypes.OBJECT, description="The connected components")},
+    )
+    def get(self, request: Request) -> Response:
+        topology = get_topology()
+        return Response(
+            {
+                "components": [
+                    {
+                        "size": len(component),
+                        "has_pop": bool(topology.pops[component].any()),
+                        "nodes": _nodes(topology, component),
+                    }
+                    for component in topology.components()
+                ]
+            }
+        )
+
+
+@method_decorator(read_from_replica, name="dispatch")
+class TopologyArticulationPoints(APIView):
+    permission_classes = [HasTopologyViewPermission]
+
+    @extend_schema(
+        tags=["Topology"],
+        summary="List the nodes which, if they went down, would split the mesh",
+        responses={"200": OpenApiResponse(OpenApiTypes.OBJECT, description="The articulation points")},
+    )
+    def get(self, request: Request) -> Response:
+        topology = get_topology()
+        return Response({"nodes": _nodes(topology, topology.articulation_points())})
+
+
+@method_decorator(read_from_replica, name="dispatch")
+class TopologyPopReachability(APIView):
+    permission_classes = [HasTopologyViewPermission]
+
+    @extend_schema(
+        tags=["Topology"],
+        summary="Find the route from a node to its nearest POP, or if no node is given, list the nodes which "
+        "can't reach any POP",
+        parameters=[
+            _network_number_parameter("network_number", "The node to find the nearest POP to", required=False),
+        ],
+        responses={
+            "200": OpenApiResponse(
+                OpenApiTypes.OBJECT,
+                description="The path to the nearest POP (empty, with null hops, if there isn't one), or the "
+                "nodes which can't reach one",
+            ),
+            "400": OpenApiResponse(helper_err_response_schema, description="Invalid network number"),
+            "404": OpenApiResponse(helper_err_response_schema, description="No such node"),
+        },
+    )
+    def get(self, request: Request) -> Response:
+        topology = get_topology()
+        reachability = topology.pop_reachability()
+
+        if "network_number" not in request.query_params:
+            unreachable = [position for position, hops in enumerate(reachability.hops) if hops == -1]
+            return Response({"unreachable": _nodes(topology, unreachable)})
+
+        position = _get_position(topology, request, "network_number")
+        if position is None or reachability.hops[position] == -1:
+            return Response({"hops": None, "path": []})
+
+        path = [position]
+        while reachability.next_hop[path[-1]] != -1:
+            path.append(int(reachability.next_hop[path[-1]]))
+        return Response({"hops": len(path) - 1, "path": _nodes(topology, path)})
+
+
+@method_decorator(read_from_replica, name="dispatch")
+class TopologyIslanded(APIView):
+    permission_classes = [HasTopologyViewPermission]
+
+    @extend_schema(
+        tags=["Topology"],
+        summary="List the nodes which would lose their route to every POP if the given link went down",
+        parameters=[
+            OpenApiParameter(
+                "link",
+                OpenApiTypes.UUID,
+                OpenApiParameter.QUERY,
+                description="The ID of the link to take down",
+                required=True,
+            ),
+        ],
+        responses={
+            "200": OpenApiResponse(OpenApiTypes.OBJECT, description="The nodes which would be cut off"),
+            "400": OpenApiResponse(helper_err_response_schema, description="Invalid link ID"),
+            "404": OpenApiResponse(helper_err_response_schema, description="No such link"),
+        },
+    )
+    def get(self, request: Request) -> Response:
+        value = request.query_params.get("link", "")
+        try:
+            link_id = uuid.UUID(value)
+        except ValueError:
+            raise ParseError(f"Invalid link: '{value}'. Must be a link ID")
+
+        topology = get_topology()
+        if link_id not in topology.position_by_link_id:
+            if not Link.objects.filter(id=link_id).exists():
+                raise NotFound(f"No link with ID {link_id}")
+            # Inactive links aren't part of the topology, so nothing depends on them
+            return Response({"islanded": []})
+
+        islanded = topology.islanded_without_link(topology.position_by_link_id[link_id])
+        return Response({"islanded": _nodes(topology, islanded)})
@@ -3,6 +3,7 @@ from typing import List
 import drf_hooks.admin
 from django.contrib import admin
 
+from meshapi_hooks.circuit import get_circuit_state
 from meshapi_hooks.hooks import CelerySerializerHook
 
 admin.site.unregister(CelerySerializerHook)
@@ -10,9 +11,32 @@ admin.site.unregister(CelerySerializerHook)
 
 @admin.register(CelerySerializerHook)
 class CelerySerializerHookAdmin(drf_hooks.admin.HookAdmin):
-    fields = ("enabled", "user", "target", "event", "headers", "consecutive_failures")
-    readonly_fields = ["consecutive_failures"]
+    fields = (
+        "enabled",
+        "user",
+        "target",
+        "event",
+        "headers",
+        "batch_window_seconds",
+        "consecutive_failures",
+        "get_circuit_state",
+        "get_backlog_size",
+    )
+    readonly_fields = ["consecutive_failures", "get_circuit_state", "get_backlog_size"]
     raw_id_fields: List[str] = []
 
     class Meta:
         model = CelerySerializerHook
+
+    def get_circuit_state(self, obj: CelerySerializerHook) -> str:
+        if not obj.target:
+            return "-"
+        return get_circuit_state(obj.target).value
+
+    def get_backlog_size(self, obj: CelerySerializerHook) -> int:
+        if not obj.pk:
+            return 0
+        return obj.buffered_events.count()
+
+    get_circuit_state.short_description = "Circuit"  # type: ignore[attr-defined]
+    get_backlog_size.short_description = "Events waiting to be delivered"  # type: ignore[attr-defined]
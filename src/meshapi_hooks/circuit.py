@@ -0,0 +1,113 @@
+"""
+A circuit breaker for each webhook target, so that a recipient which is down doesn't have every event
+sent to it retrying over and over on our workers.
+
+The circuit starts out closed, and every delivery goes ahead as normal. After CIRCUIT_FAILURE_THRESHOLD
+failed HTTP attempts to the same target within CIRCUIT_FAILURE_WINDOW_SECONDS, it opens, and events for
+the target are parked in their hook's backlog (BufferedWebhookEvent) instead of being sent. Once it has
+been open for CIRCUIT_OPEN_SECONDS it is half-open: the backlog replay (see
+meshapi_hooks.tasks.replay_webhook_backlog_task) gets to make one attempt, which closes the circuit and
+carries on through the backlog if it succeeds, or opens it again if it doesn't.
+
+The state lives in the cache (Redis), so that it is shared by every worker. If the cache is unavailable,
+circuits are always closed.
+"""
+
+import enum
+import logging
+import time
+from typing import Optional
+
+from django.core.cache import cache
+
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_FAILURE_WINDOW_SECONDS = 60
+CIRCUIT_OPEN_SECONDS = 60
+
+# Long enough for the probe to time out, after which somebody else may try
+CIRCUIT_PROBE_SECONDS = 30
+
+
+class CircuitState(enum.Enum):
+    CLOSED = "Closed"
+    OPEN = "Open"
+    HALF_OPEN = "Half-open"
+
+
+def _opened_at_key(target: str) -> str:
+    return f"webhook:circuit:opened_at:{target}"
+
+
+def _failures_key(target: str) -> str:
+    return f"webhook:circuit:failures:{target}"
+
+
+def _probe_key(target: str) -> str:
+    return f"webhook:circuit:probe:{target}"
+
+
+def _get_opened_at(target: str) -> Optional[float]:
+    try:
+        return cache.get(_opened_at_key(target))
+    except Exception:
+        logging.warning(f"Could not check the circuit for {target}, assuming it is closed", exc_info=True)
+        return None
+
+
+def get_circuit_state(target: str) -> CircuitState:
+    opened_at = _get_opened_at(target)
+    if opened_at is None:
+        return CircuitState.CLOSED
+    if time.time() - opened_at < CIRCUIT_OPEN_SECONDS:
+        return CircuitState.OPEN
+    return CircuitState.HALF_OPEN
+
+
+def seconds_until_half_open(target: str) -> float:
+    opened_at = _get_opened_at(target)
+    if opened_at is None:
+        return 0
+    return max(0, opened_at + CIRCUIT_OPEN_SECONDS - time.time())
+
+
+def claim_probe(target: str) -> bool:
+    """
+    Claims the one attempt allowed while the circuit for the target is half-open
+    """
+    try:
+        return cache.add(_probe_key(target), 1, timeout=CIRCUIT_PROBE_SECONDS)
+    except Exception:
+        logging.warning(f"Could not claim the probe for {target}", exc_info=True)
+        return True
+
+
+def open_circuit(target: str) -> None:
+    try:
+        cache.set(_opened_at_key(target), time.time(), timeout=None)
+        cache.delete_many([_failures_key(target), _probe_key(target)])
+    except Exception:
+        logging.warning(f"Could not open the circuit for {target}", exc_info=True)
+
+
+def record_circuit_failure(target: str) -> None:
+    """
+    Counts a failed HTTP attempt to the target, opening its circuit if there have been too many lately
+    """
+    key = _failures_key(target)
+    try:
+        cache.add(key, 0, timeout=CIRCUIT_FAILURE_WINDOW_SECONDS)
+        failures = cache.incr(key)
+    except Exception:
+        logging.warning(f"Could not count the failure for {target}", exc_info=True)
+        return
+
+    if failures >= CIRCUIT_FAILURE_THRESHOLD:
+        logging.warning(f"Opening the circuit for {target} after {failures} failed deliveries")
+        open_circuit(target)
+
+
+def close_circuit(target: str) -> None:
+    try:
+        cache.delete_many([_opened_at_key(target), _failures_key(target), _probe_key(target)])
+    except Exception:
+        logging.warning(f"Could not close the circuit for {target}", exc_info=True)
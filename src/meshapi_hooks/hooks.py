@@ -1,8 +1,39 @@
-from typing import Any, Dict, Optional, Sequence
+from typing import Any, FrozenSet, Optional, Sequence
 
 from django.contrib.auth.models import User
-from django.db import models
-from drf_hooks.models import AbstractHook
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from drf_hooks.models import AbstractHook, get_event_lookup
+
+from meshapi.util.versioned_cache import SharedVersion, VersionedValue
+
+# Hooks are created and deleted by hand in the admin, so this is mostly a fallback for changes made
+# without sending signals (e.g. QuerySet.update())
+ENABLED_EVENTS_MAX_AGE_SECONDS = 60
+
+_version = SharedVersion("webhooks:version", "the enabled webhook events")
+
+
+def _load_enabled_events() -> FrozenSet[str]:
+    return frozenset(CelerySerializerHook.objects.filter(enabled=True).values_list("event", flat=True))
+
+
+_enabled_events = VersionedValue(_version, _load_enabled_events, ENABLED_EVENTS_MAX_AGE_SECONDS)
+
+
+def mark_enabled_events_stale() -> None:
+    """
+    Makes every process look up which events have enabled hooks again before firing any more
+    """
+    _version.bump()
+
+
+def has_enabled_hooks(event_name: str) -> bool:
+    """
+    Checks whether anybody is listening for the given event, without touching the database most of the time
+    """
+    return event_name in _enabled_events.get()
 
 
 class CelerySerializerHook(AbstractHook):
@@ -14,6 +45,10 @@ class CelerySerializerHook(AbstractHook):
 
     MAX_CONSECUTIVE_FAILURES_BEFORE_DISABLE = 5
 
+    # Shared by every hook with the same target URL, so that a slow recipient can't tie up the whole
+    # worker pool
+    MAX_CONCURRENT_DELIVERIES_PER_TARGET = 4
+
     enabled: models.BooleanField = models.BooleanField(
         default=True,
         help_text="Should this webhook be used? This field be automatically changed by the system "
@@ -24,6 +59,11 @@ class CelerySerializerHook(AbstractHook):
         help_text="The number of consecutive failures detected for this endpoint. "
         "This should not be modified by administrators",
     )
+    batch_window_seconds: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0,
+        help_text="If set, events are held for up to this many seconds and then delivered together, "
+        "in the order they happened, as a single JSON array. Leave at 0 to deliver each event on its own",
+    )
 
     def __str__(self) -> str:
         return f'Webhook for delivery of "{self.event}" event to {self.user}'
@@ -32,13 +72,91 @@ class CelerySerializerHook(AbstractHook):
         verbose_name = "Webhook Target"
         verbose_name_plural = "Webhook Targets"
 
-    def deliver_hook(self, serialized_hook: Dict[str, Any]) -> None:
+    def deliver_hook(self, serialized_hook: str) -> None:
         # Inline import to prevent circular import loop
-        from meshapi_hooks.tasks import deliver_webhook_task
+        from meshapi_hooks.tasks import deliver_webhook_batch_task, deliver_webhook_task
+
+        if not self.batch_window_seconds:
+            deliver_webhook_task.apply_async([self.id, serialized_hook])
+            return
 
-        deliver_webhook_task.apply_async([self.id, serialized_hook])
+        event = BufferedWebhookEvent.objects.create(hook=self, payload=serialized_hook)
+        # The first event in the window schedules the delivery of the batch, the rest just join it
+        if not BufferedWebhookEvent.objects.filter(hook=self, id__lt=event.id).exists():
+            transaction.on_commit(
+                lambda: deliver_webhook_batch_task.apply_async([self.id], countdown=self.batch_window_seconds)
+            )
+
+    @classmethod
+    def handle_model_event(cls, instance: models.Model, action: str) -> None:
+        """
+        Overrides drf-hooks, which serializes the instance and fires the hooks straight away, inside the
+        signal handler. Instead, once the transaction commits, we queue a task to serialize it once and
+        fan it out to every hook for the event (see meshapi_hooks.tasks.deliver_hook_event_task), so that
+        saves don't pay for nested serialization, and saves with nobody listening pay almost nothing
+        """
+        events = get_event_lookup()
+        model = instance._meta.label
+        if model not in events or action not in events[model]:
+            return
+        event_name, all_users = events[model][action]
+        if not has_enabled_hooks(event_name):
+            return
+
+        user = cls.get_user(instance, all_users)
+        user_id = user.pk if user else None
+        # The object will be gone by the time a deleted event is delivered, so we capture the pk now
+        pk = str(instance.pk)
+
+        def enqueue() -> None:
+            # Inline import to prevent circular import loop
+            from meshapi_hooks.tasks import deliver_hook_event_task
+
+            # drf-hooks' signal receivers run before django-simple-history's, so the record for this change
+            # only exists once the transaction has committed
+            history = getattr(type(instance), "history", None)
+            history_id = (
+                history.filter(**{instance._meta.pk.attname: pk})
+                .order_by("-history_id")
+                .values_list("history_id", flat=True)
+                .first()
+                if history is not None
+                else None
+            )
+            deliver_hook_event_task.apply_async([event_name, model, pk, history_id, user_id])
+
+        transaction.on_commit(enqueue)
 
     @classmethod
     def find_hooks(cls, event_name: str, user: Optional[User] = None) -> Sequence[AbstractHook]:
         hooks = super().find_hooks(event_name, user=user)
         return hooks.filter(enabled=True)
+
+
+class BufferedWebhookEvent(models.Model):
+    """
+    An event waiting to be delivered as part of a batch, for hooks with a batch window
+    """
+
+    hook = models.ForeignKey(CelerySerializerHook, on_delete=models.CASCADE, related_name="buffered_events")
+    payload = models.TextField(help_text="The serialized hook, exactly as it would be delivered on its own")
+    created = models.DateTimeField(auto_now_add=True)
+    claimed_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Set while a delivery including this event is in progress, so that an overlapping delivery "
+        "doesn't send it twice. A claim which has run out was abandoned by a worker which died",
+    )
+
+    def __str__(self) -> str:
+        return f"Buffered event {self.id} for {self.hook}"
+
+
+@receiver(post_save, sender=CelerySerializerHook, dispatch_uid="mark_enabled_events_stale_on_save")
+def mark_enabled_events_stale_on_save(sender: Any, instance: CelerySerializerHook, **kwargs: Any) -> None:
+    mark_enabled_events_stale()
+
+
+@receiver(post_delete, sender=CelerySerializerHook, dispatch_uid="mark_enabled_events_stale_on_delete")
+def mark_enabled_events_stale_on_delete(sender: Any, instance: CelerySerializerHook, **kwargs: Any) -> None:
+    mark_enabled_events_stale()
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("meshapi_hooks", "0002_celeryserializerhook_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="celeryserializerhook",
+            name="batch_window_seconds",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="If set, events are held for up to this many seconds and then delivered together, in the order they happened, as a single JSON array. Leave at 0 to deliver each event on its own",
+            ),
+        ),
+        migrations.CreateModel(
+            name="BufferedWebhookEvent",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "payload",
+                    models.TextField(help_text="The serialized hook, exactly as it would be delivered on its own"),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "hook",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="buffered_events",
+                        to=settings.HOOK_CUSTOM_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("meshapi_hooks", "0003_celeryserializerhook_batch_window_seconds_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bufferedwebhookevent",
+            name="claimed_until",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Set while a delivery including this event is in progress, so that an overlapping delivery doesn't send it twice. A claim which has run out was abandoned by a worker which died",
+                null=True,
+            ),
+        ),
+    ]
@@ -1,46 +1,368 @@
-from typing import Any, Dict
+import logging
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Iterator, List, Optional, Tuple
 
 import requests
 from celery import Task, shared_task
 from celery.exceptions import MaxRetriesExceededError
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
 
-from meshapi_hooks.hooks import CelerySerializerHook
+from meshapi_hooks.circuit import (
+    CIRCUIT_OPEN_SECONDS,
+    CIRCUIT_PROBE_SECONDS,
+    CircuitState,
+    claim_probe,
+    close_circuit,
+    get_circuit_state,
+    open_circuit,
+    record_circuit_failure,
+    seconds_until_half_open,
+)
+from meshapi_hooks.hooks import BufferedWebhookEvent, CelerySerializerHook
 
 HTTP_ATTEMPT_COUNT_PER_DELIVERY_ATTEMPT = 4
 
+DELIVERY_ERRORS = (requests.ConnectionError, requests.HTTPError, requests.Timeout)
 
-@shared_task(bind=True, max_retries=HTTP_ATTEMPT_COUNT_PER_DELIVERY_ATTEMPT - 1)
-def deliver_webhook_task(self: Task, hook_id: int, payload: Dict[str, Any]) -> None:
-    """Deliver the payload to the hook target"""
-    hook = CelerySerializerHook.objects.get(id=hook_id)
+# (connect, read) in seconds. Without these, a recipient which accepts the connection and never
+# responds holds on to a worker forever
+HTTP_TIMEOUT = (3.05, 10)
+
+# How long to wait before trying again when the target already has as many deliveries in flight as
+# it is allowed
+TARGET_BUSY_COUNTDOWN_SECONDS = 1
+
+# How long a backlog replay may run before another one is allowed to start, in case a worker dies
+# part way through
+REPLAY_LOCK_SECONDS = 10 * 60
+
+# How long a delivery may hold on to the events it is sending before they are up for grabs again, in case
+# a worker dies part way through
+DELIVERY_CLAIM_SECONDS = 5 * 60
+
+# Kept for the life of the worker process so that consecutive deliveries to the same target can reuse
+# the same keep-alive connection
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+
+@contextmanager
+def target_slot(hook: CelerySerializerHook) -> Iterator[bool]:
+    """
+    Claims one of the delivery slots for the hook's target for the duration of the block, yielding
+    False if they are all taken. If the cache is unavailable, deliveries are not limited at all
+    """
+    key = f"webhook:in_flight:{hook.target}"
     try:
-        response = requests.post(url=hook.target, data=payload, headers=hook.headers)
-        if response.status_code >= 400:
-            response.raise_for_status()
-    except (requests.ConnectionError, requests.HTTPError) as exc:
+        # The counter expires in case a worker dies without giving its slot back
+        cache.add(key, 0, timeout=10 * 60)
+        in_flight = cache.incr(key)
+    except Exception:
+        logging.warning(f"Could not count deliveries in flight to {hook.target}, not limiting them", exc_info=True)
+        yield True
+        return
+
+    try:
+        yield in_flight <= hook.MAX_CONCURRENT_DELIVERIES_PER_TARGET
+    finally:
         try:
-            self.retry(countdown=2**self.request.retries)
-        except MaxRetriesExceededError:
-            disable_message = (
-                f"we will attempt to deliver to "
-                f"this hook up to "
-                f"{(hook.MAX_CONSECUTIVE_FAILURES_BEFORE_DISABLE - hook.consecutive_failures)} "
-                f"more times (with {HTTP_ATTEMPT_COUNT_PER_DELIVERY_ATTEMPT} HTTP retries "
-                f"each attempt) before we disable it automatically"
-            )
-            hook.consecutive_failures += 1
-            if hook.consecutive_failures > hook.MAX_CONSECUTIVE_FAILURES_BEFORE_DISABLE:
-                disable_message = (
-                    f"we have disabled this hook due to exceeding the limit of "
-                    f"{hook.MAX_CONSECUTIVE_FAILURES_BEFORE_DISABLE} consecutive failures"
-                )
-                hook.enabled = False
-            hook.save()
-
-            raise RuntimeError(
-                f"Max retry count exceeded for target {hook.target}, {disable_message}",
-            ) from exc
+            cache.decr(key)
+        except Exception:
+            # The counter expires on its own anyway
+            logging.warning(f"Could not release delivery slot for {hook.target}", exc_info=True)
+
+
+def post_to_hook(hook: CelerySerializerHook, body: str) -> None:
+    response = session.post(url=hook.target, data=body, headers=hook.headers, timeout=HTTP_TIMEOUT)
+    if response.status_code >= 400:
+        response.raise_for_status()
+
+
+def batch_body(events: List[Tuple[int, str]]) -> str:
+    return "[" + ",".join(payload for _, payload in events) + "]"
+
+
+def record_delivery_failure(hook: CelerySerializerHook) -> str:
+    """
+    Counts a failed delivery attempt against the hook, disabling it if there have been too many in a
+    row, and returns a description of what will happen next
+    """
+    disable_message = (
+        f"we will attempt to deliver to "
+        f"this hook up to "
+        f"{(hook.MAX_CONSECUTIVE_FAILURES_BEFORE_DISABLE - hook.consecutive_failures)} "
+        f"more times (with {HTTP_ATTEMPT_COUNT_PER_DELIVERY_ATTEMPT} HTTP retries "
+        f"each attempt) before we disable it automatically"
+    )
+    hook.consecutive_failures += 1
+    if hook.consecutive_failures > hook.MAX_CONSECUTIVE_FAILURES_BEFORE_DISABLE:
+        disable_message = (
+            f"we have disabled this hook due to exceeding the limit of "
+            f"{hook.MAX_CONSECUTIVE_FAILURES_BEFORE_DISABLE} consecutive failures"
+        )
+        hook.enabled = False
+    hook.save()
+    return disable_message
+
 
+def record_delivery_success(hook: CelerySerializerHook) -> None:
+    close_circuit(hook.target)
     if hook.consecutive_failures != 0:
         hook.consecutive_failures = 0
         hook.save()
+
+
+@shared_task
+def deliver_hook_event_task(
+    event_name: str, model_label: str, pk: str, history_id: Optional[int], user_id: Optional[int]
+) -> None:
+    """
+    Serialize the object an event happened to, and deliver it to every enabled hook for the event
+
+    The object is serialized as of the given history record, so the payload matches the change even if the
+    object has been changed again (or deleted) since. Models without history are serialized as they are now
+    """
+    model = apps.get_model(model_label)
+    instance: Any = None
+    if history_id is not None:
+        historical_record = model.history.filter(history_id=history_id).first()
+        instance = historical_record.instance if historical_record else None
+    if instance is None:
+        instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        logging.warning(f"Could not deliver {event_name} event, {model_label} {pk} no longer exists")
+        return
+
+    payload = CelerySerializerHook.serialize_model(instance)
+    user = User.objects.get(pk=user_id) if user_id is not None else None
+    for hook in CelerySerializerHook.find_hooks(event_name, user=user):
+        hook.deliver_hook(hook.serialize_hook(payload))
+
+
+@shared_task(bind=True, max_retries=HTTP_ATTEMPT_COUNT_PER_DELIVERY_ATTEMPT - 1)
+def deliver_webhook_task(self: Task, hook_id: int, payload: str) -> None:
+    """Deliver the payload to the hook target"""
+    hook = CelerySerializerHook.objects.get(id=hook_id)
+    # Anything after a parked event has to wait its turn too, to keep them in order
+    if get_circuit_state(hook.target) != CircuitState.CLOSED or hook.buffered_events.exists():
+        BufferedWebhookEvent.objects.create(hook=hook, payload=payload)
+        schedule_backlog_replay(hook)
+        return
+
+    with target_slot(hook) as claimed:
+        if not claimed:
+            # Start over rather than retry, since this doesn't count as a failed attempt
+            deliver_webhook_task.apply_async([hook_id, payload], countdown=TARGET_BUSY_COUNTDOWN_SECONDS)
+            return
+
+        try:
+            post_to_hook(hook, payload)
+        except DELIVERY_ERRORS as exc:
+            record_circuit_failure(hook.target)
+            try:
+                self.retry(countdown=2**self.request.retries)
+            except MaxRetriesExceededError:
+                disable_message = record_delivery_failure(hook)
+                raise RuntimeError(
+                    f"Max retry count exceeded for target {hook.target}, {disable_message}",
+                ) from exc
+
+    record_delivery_success(hook)
+
+
+@shared_task(bind=True, max_retries=HTTP_ATTEMPT_COUNT_PER_DELIVERY_ATTEMPT - 1)
+def deliver_webhook_batch_task(self: Task, hook_id: int) -> None:
+    """Deliver every event buffered for the hook to its target, oldest first, as a single JSON array"""
+    hook = CelerySerializerHook.objects.get(id=hook_id)
+    # The events stay buffered until the backlog is replayed
+    if get_circuit_state(hook.target) != CircuitState.CLOSED:
+        schedule_backlog_replay(hook)
+        return
+
+    with target_slot(hook) as claimed:
+        if not claimed:
+            deliver_webhook_batch_task.apply_async([hook_id], countdown=TARGET_BUSY_COUNTDOWN_SECONDS)
+            return
+
+        events = claim_buffered_events(BufferedWebhookEvent.objects.filter(hook=hook))
+        if not events:
+            return
+
+        event_ids = [event_id for event_id, _ in events]
+        failure = None
+        try:
+            post_to_hook(hook, batch_body(events))
+        except DELIVERY_ERRORS as exc:
+            record_circuit_failure(hook.target)
+            # Hand the batch back, still ahead of anything buffered since, for the retry to pick up
+            release_buffered_events(event_ids)
+            failure = exc
+        else:
+            BufferedWebhookEvent.objects.filter(id__in=event_ids).delete()
+
+        if failure is not None:
+            try:
+                self.retry(countdown=2**self.request.retries)
+            except MaxRetriesExceededError:
+                # Drop the batch along with the failed attempt, just like a single event would be
+                BufferedWebhookEvent.objects.filter(id__in=event_ids).delete()
+                disable_message = record_delivery_failure(hook)
+                if hook.enabled:
+                    schedule_next_batch(hook)
+                else:
+                    # Nothing delivers a disabled hook's batches, and if these were left behind they would stop
+                    # the first event after it is re-enabled from scheduling one
+                    BufferedWebhookEvent.objects.filter(hook=hook).delete()
+                raise RuntimeError(
+                    f"Max retry count exceeded for target {hook.target}, {disable_message}",
+                ) from failure
+
+    record_delivery_success(hook)
+    schedule_next_batch(hook)
+
+
+def claim_buffered_events(
+    buffered_events: QuerySet[BufferedWebhookEvent], limit: Optional[int] = None
+) -> List[Tuple[int, str]]:
+    """
+    Claims the events which no other delivery is working on, so that they aren't sent twice. The claim is
+    committed straight away rather than held as a row lock, so that no transaction is left open while we
+    wait on the target
+
+    :param buffered_events: the events to claim from
+    :param limit: the most events to claim, oldest first, or None for all of them
+    :returns: the (id, payload) of each event claimed, oldest first
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            buffered_events.filter(Q(claimed_until__isnull=True) | Q(claimed_until__lt=now))
+            .order_by("id")
+            .select_for_update(skip_locked=True)
+            .values_list("id", "payload")[:limit]
+        )
+        BufferedWebhookEvent.objects.filter(id__in=[event_id for event_id, _ in events]).update(
+            claimed_until=now + timedelta(seconds=DELIVERY_CLAIM_SECONDS)
+        )
+    return events
+
+
+def release_buffered_events(event_ids: List[int]) -> None:
+    """Gives back the claim on events whose delivery failed, so that the next attempt can send them"""
+    BufferedWebhookEvent.objects.filter(id__in=event_ids).update(claimed_until=None)
+
+
+def schedule_next_batch(hook: CelerySerializerHook) -> None:
+    # Anything buffered while we were delivering saw this batch still pending, and so is relying on us to
+    # schedule its delivery
+    if BufferedWebhookEvent.objects.filter(hook=hook).exists():
+        deliver_webhook_batch_task.apply_async([hook.id], countdown=hook.batch_window_seconds)
+
+
+def schedule_backlog_replay(hook: CelerySerializerHook, countdown: Optional[float] = None) -> None:
+    """
+    Makes sure a replay of the hook's backlog is coming, by default for when its circuit goes half-open
+    """
+    if countdown is None:
+        countdown = seconds_until_half_open(hook.target)
+    try:
+        already_scheduled = not cache.add(f"webhook:replay_scheduled:{hook.id}", 1, timeout=countdown + 60)
+    except Exception:
+        logging.warning(f"Could not check for a scheduled replay for hook {hook.id}", exc_info=True)
+        already_scheduled = False
+
+    if not already_scheduled:
+        replay_webhook_backlog_task.apply_async([hook.id], countdown=countdown)
+
+
+def send_backlog(hook: CelerySerializerHook) -> None:
+    """
+    Sends every event parked for the hook, oldest first, one at a time (or all together for batched
+    hooks), deleting each once delivered
+
+    :raises requests.RequestException: if a delivery fails, leaving the failed event and everything after
+        it in the backlog
+    """
+    while True:
+        events = claim_buffered_events(
+            BufferedWebhookEvent.objects.filter(hook=hook), limit=None if hook.batch_window_seconds else 1
+        )
+        if not events:
+            return
+
+        event_ids = [event_id for event_id, _ in events]
+        try:
+            post_to_hook(hook, batch_body(events) if hook.batch_window_seconds else events[0][1])
+        except DELIVERY_ERRORS:
+            release_buffered_events(event_ids)
+            raise
+        BufferedWebhookEvent.objects.filter(id__in=event_ids).delete()
+
+
+@shared_task
+def replay_webhook_backlog_task(hook_id: int) -> None:
+    """
+    Deliver the events parked for the hook while its target's circuit was open, in order. If the circuit
+    is half-open, this is the probe which decides whether to close it
+    """
+    hook = CelerySerializerHook.objects.get(id=hook_id)
+    try:
+        cache.delete(f"webhook:replay_scheduled:{hook.id}")
+        replaying = cache.add(f"webhook:replaying:{hook.id}", 1, timeout=REPLAY_LOCK_SECONDS)
+    except Exception:
+        logging.warning(f"Could not lock the backlog for hook {hook.id}", exc_info=True)
+        replaying = True
+    if not replaying:
+        # Whoever is replaying it already will carry on until it's empty
+        return
+
+    try:
+        replay_backlog(hook)
+    finally:
+        try:
+            cache.delete(f"webhook:replaying:{hook.id}")
+        except Exception:
+            logging.warning(f"Could not unlock the backlog for hook {hook.id}", exc_info=True)
+
+    # Anything parked after we finished, but before we unlocked, is relying on us to schedule its delivery
+    if hook.enabled and BufferedWebhookEvent.objects.filter(hook=hook).exists():
+        schedule_backlog_replay(hook)
+
+
+def replay_backlog(hook: CelerySerializerHook) -> None:
+    if not hook.enabled:
+        # The backlog is kept, and will be replayed after the hook is re-enabled and its next event comes in
+        return
+
+    state = get_circuit_state(hook.target)
+    if state == CircuitState.OPEN:
+        schedule_backlog_replay(hook)
+        return
+    if state == CircuitState.HALF_OPEN and not claim_probe(hook.target):
+        schedule_backlog_replay(hook, countdown=CIRCUIT_PROBE_SECONDS)
+        return
+
+    with target_slot(hook) as claimed:
+        if not claimed:
+            schedule_backlog_replay(hook, countdown=TARGET_BUSY_COUNTDOWN_SECONDS)
+            return
+
+        try:
+            send_backlog(hook)
+        except DELIVERY_ERRORS:
+            # A failed probe only means the target is still down, which is what the backlog is for. It doesn't
+            # count towards disabling the hook, or an outage of a few probes would disable it for good
+            open_circuit(hook.target)
+            logging.warning(f"Could not replay the backlog for target {hook.target}, will try again later")
+            schedule_backlog_replay(hook, countdown=CIRCUIT_OPEN_SECONDS)
+            return
+
+    record_delivery_success(hook)
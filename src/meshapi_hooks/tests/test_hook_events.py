@@ -0,0 +1,110 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from meshapi.models import Member
+from meshapi.tests.sample_data import sample_member
+from meshapi_hooks.hooks import CelerySerializerHook, has_enabled_hooks
+from meshapi_hooks.tasks import deliver_hook_event_task
+
+
+@mock.patch("meshapi_hooks.tasks.deliver_hook_event_task.apply_async")
+class TestHookEvents(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="hook_client_application", password="test_pw")
+        self.hook = CelerySerializerHook(
+            user=self.user,
+            target="http://localhost:8091/webhook",
+            event="member.created",
+        )
+        self.hook.save()
+
+    def test_event_is_queued_after_commit_without_serializing(self, apply_async):
+        with mock.patch.object(CelerySerializerHook, "serialize_model") as serialize_model:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                member = Member(**sample_member)
+                member.save()
+
+            apply_async.assert_not_called()
+            for callback in callbacks:
+                callback()
+            serialize_model.assert_not_called()
+
+        history_id = member.history.latest().history_id
+        apply_async.assert_called_once_with(["member.created", "meshapi.Member", str(member.id), history_id, None])
+
+    def test_no_enabled_hooks(self, apply_async):
+        self.hook.enabled = False
+        self.hook.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Member(**sample_member).save()
+
+        apply_async.assert_not_called()
+
+    def test_enabled_hooks_are_cached(self, apply_async):
+        self.assertTrue(has_enabled_hooks("member.created"))
+        with self.assertNumQueries(0):
+            self.assertTrue(has_enabled_hooks("member.created"))
+            self.assertFalse(has_enabled_hooks("member.deleted"))
+
+        self.hook.enabled = False
+        self.hook.save()
+        self.assertFalse(has_enabled_hooks("member.created"))
+
+    def test_task_serializes_once_for_every_hook(self, apply_async):
+        CelerySerializerHook(user=self.user, target="http://localhost:8092/webhook", event="member.created").save()
+        member = Member(**sample_member)
+        member.save()
+
+        with mock.patch.object(CelerySerializerHook, "deliver_hook") as deliver_hook, mock.patch.object(
+            CelerySerializerHook, "serialize_model", wraps=CelerySerializerHook.serialize_model
+        ) as serialize_model:
+            deliver_hook_event_task.apply(args=["member.created", "meshapi.Member", str(member.id), None, None])
+
+        serialize_model.assert_called_once()
+        self.assertEqual(deliver_hook.call_count, 2)
+        payload = json.loads(deliver_hook.call_args.args[0])
+        self.assertEqual(payload["data"]["id"], str(member.id))
+        self.assertEqual(payload["data"]["name"], sample_member["name"])
+
+    def test_deleted_object_is_serialized_from_history(self, apply_async):
+        self.hook.event = "member.deleted"
+        self.hook.save()
+        member = Member(**sample_member)
+        member.save()
+        member_id = member.id
+
+        with self.captureOnCommitCallbacks(execute=True):
+            member.delete()
+
+        apply_async.assert_called_once()
+        args = apply_async.call_args.args[0]
+        self.assertEqual(args[:3], ["member.deleted", "meshapi.Member", str(member_id)])
+        self.assertIsNotNone(args[3])
+
+        with mock.patch.object(CelerySerializerHook, "deliver_hook") as deliver_hook:
+            deliver_hook_event_task.apply(args=args)
+
+        payload = json.loads(deliver_hook.call_args.args[0])
+        self.assertEqual(payload["hook"]["event"], "member.deleted")
+        self.assertEqual(payload["data"]["id"], str(member_id))
+        self.assertEqual(payload["data"]["name"], sample_member["name"])
+
+    def test_object_is_serialized_as_of_the_event(self, apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            member = Member(**sample_member)
+            member.save()
+        args = apply_async.call_args.args[0]
+
+        member.name = "Someone Else"
+        member.save()
+
+        with mock.patch.object(CelerySerializerHook, "deliver_hook") as deliver_hook:
+            deliver_hook_event_task.apply(args=args)
+
+        payload = json.loads(deliver_hook.call_args.args[0])
+        self.assertEqual(payload["data"]["id"], str(member.id))
+        self.assertEqual(payload["data"]["name"], sample_member["name"])
@@ -0,0 +1,204 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+import requests
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from meshapi_hooks.hooks import BufferedWebhookEvent, CelerySerializerHook
+from meshapi_hooks.tasks import HTTP_ATTEMPT_COUNT_PER_DELIVERY_ATTEMPT, HTTP_TIMEOUT, deliver_webhook_batch_task
+
+
+def ok_response():
+    response = requests.Response()
+    response.status_code = 200
+    return response
+
+
+class TestWebhookBatching(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="hook_client_application", password="test_pw")
+        self.hook = CelerySerializerHook(
+            user=user,
+            target="http://localhost:8091/webhook",
+            event="member.created",
+            batch_window_seconds=5,
+        )
+        self.hook.save()
+
+    def fire(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(count):
+                self.hook.deliver_hook(self.hook.serialize_hook({"index": i}))
+
+    @mock.patch("meshapi_hooks.tasks.deliver_webhook_task.apply_async")
+    def test_unbatched_hook_delivers_each_event(self, apply_async):
+        self.hook.batch_window_seconds = 0
+        self.hook.save()
+
+        self.fire(2)
+
+        self.assertEqual(apply_async.call_count, 2)
+        self.assertEqual(BufferedWebhookEvent.objects.count(), 0)
+
+    @mock.patch("meshapi_hooks.tasks.session.post", return_value=ok_response())
+    @mock.patch("meshapi_hooks.tasks.deliver_webhook_batch_task.apply_async")
+    def test_batch_is_delivered_in_order(self, apply_async, post):
+        self.fire(3)
+
+        # Only the first event schedules a delivery, at the end of the window
+        apply_async.assert_called_once_with([self.hook.id], countdown=5)
+        self.assertEqual(BufferedWebhookEvent.objects.filter(hook=self.hook).count(), 3)
+
+        deliver_webhook_batch_task.apply(args=[self.hook.id])
+
+        post.assert_called_once()
+        self.assertEqual(post.call_args.kwargs["timeout"], HTTP_TIMEOUT)
+        body = json.loads(post.call_args.kwargs["data"])
+        self.assertEqual([event["data"]["index"] for event in body], [0, 1, 2])
+        self.assertEqual(body[0]["hook"]["event"], "member.created")
+        self.assertEqual(BufferedWebhookEvent.objects.count(), 0)
+
+        # Nothing left to deliver
+        deliver_webhook_batch_task.apply(args=[self.hook.id])
+        post.assert_called_once()
+
+    @mock.patch("meshapi_hooks.tasks.session.post", side_effect=requests.ConnectionError)
+    @mock.patch("meshapi_hooks.tasks.deliver_webhook_batch_task.apply_async")
+    def test_failed_batch_counts_as_one_failure(self, apply_async, post):
+        self.fire(2)
+
+        result = deliver_webhook_batch_task.apply(args=[self.hook.id])
+
+        self.assertIsInstance(result.result, RuntimeError)
+        self.assertEqual(post.call_count, HTTP_ATTEMPT_COUNT_PER_DELIVERY_ATTEMPT)
+        self.assertEqual(BufferedWebhookEvent.objects.count(), 0)
+        self.hook.refresh_from_db()
+        self.assertEqual(self.hook.consecutive_failures, 1)
+        self.assertTrue(self.hook.enabled)
+
+    @mock.patch("meshapi_hooks.tasks.session.post")
+    @mock.patch("meshapi_hooks.tasks.deliver_webhook_batch_task.apply_async")
+    def test_batch_is_posted_outside_a_transaction(self, apply_async, post):
+        self.fire(2)
+        # The test itself runs inside a transaction, so look for one opened on top of it
+        savepoints_outside = len(connection.savepoint_ids)
+
+        def check(*args, **kwargs):
+            self.assertEqual(len(connection.savepoint_ids), savepoints_outside)
+            # The claim is what stops an overlapping delivery from sending the batch again
+            self.assertFalse(BufferedWebhookEvent.objects.filter(claimed_until__isnull=True).exists())
+            return ok_response()
+
+        post.side_effect = check
+        deliver_webhook_batch_task.apply(args=[self.hook.id])
+
+        post.assert_called_once()
+        self.assertEqual(BufferedWebhookEvent.objects.count(), 0)
+
+    @mock.patch("meshapi_hooks.tasks.session.post")
+    @mock.patch("meshapi_hooks.tasks.deliver_webhook_batch_task.apply_async")
+    def test_failed_batch_is_released_for_retry(self, apply_async, post):
+        self.fire(2)
+        apply_async.reset_mock()
+
+        def fail_once(*args, **kwargs):
+            if post.call_count == 1:
+                self.hook.deliver_hook(self.hook.serialize_hook({"index": 2}))
+                raise requests.ConnectionError
+            return ok_response()
+
+        post.side_effect = fail_once
+        deliver_webhook_batch_task.apply(args=[self.hook.id])
+
+        self.assertEqual(post.call_count, 2)
+        # The retry sends the failed batch again, still ahead of the event buffered in the meantime
+        body = json.loads(post.call_args.kwargs["data"])
+        self.assertEqual([event["data"]["index"] for event in body], [0, 1, 2])
+        self.assertEqual(BufferedWebhookEvent.objects.count(), 0)
+        apply_async.assert_not_called()
+
+    @mock.patch("meshapi_hooks.tasks.session.post", return_value=ok_response())
+    @mock.patch("meshapi_hooks.tasks.deliver_webhook_batch_task.apply_async")
+    def test_claimed_events_are_left_to_their_delivery(self, apply_async, post):
+        self.fire(2)
+        abandoned, in_flight = BufferedWebhookEvent.objects.order_by("id")
+        abandoned.claimed_until = timezone.now() - timedelta(seconds=1)
+        abandoned.save()
+        in_flight.claimed_until = timezone.now() + timedelta(minutes=1)
+        in_flight.save()
+
+        deliver_webhook_batch_task.apply(args=[self.hook.id])
+
+        body = json.loads(post.call_args.kwargs["data"])
+        self.assertEqual([event["data"]["index"] for event in body], [0])
+        self.assertEqual(list(BufferedWebhookEvent.objects.all()), [in_flight])
+
+    @mock.patch("meshapi_hooks.tasks.session.post")
+    @mock.patch("meshapi_hooks.tasks.deliver_webhook_batch_task.apply_async")
+    def test_event_buffered_during_last_retry_is_scheduled(self, apply_async, post):
+        self.fire(2)
+        apply_async.reset_mock()
+
+        def fail(*args, **kwargs):
+            if post.call_count == HTTP_ATTEMPT_COUNT_PER_DELIVERY_ATTEMPT:
+                # This one sees the failing batch still buffered, so leaves scheduling its delivery to it
+                self.hook.deliver_hook(self.hook.serialize_hook({"index": 2}))
+            raise requests.ConnectionError
+
+        post.side_effect = fail
+        with self.captureOnCommitCallbacks(execute=True):
+            result = deliver_webhook_batch_task.apply(args=[self.hook.id])
+
+        self.assertIsInstance(result.result, RuntimeError)
+        apply_async.assert_called_once_with([self.hook.id], countdown=5)
+        remaining = [json.loads(event.payload)["data"]["index"] for event in BufferedWebhookEvent.objects.all()]
+        self.assertEqual(remaining, [2])
+
+    @mock.patch("meshapi_hooks.tasks.session.post", side_effect=requests.ConnectionError)
+    @mock.patch("meshapi_hooks.tasks.deliver_webhook_batch_task.apply_async")
+    def test_disabled_hook_drops_its_buffered_events(self, apply_async, post):
+        self.hook.consecutive_failures = CelerySerializerHook.MAX_CONSECUTIVE_FAILURES_BEFORE_DISABLE
+        self.hook.save()
+        self.fire(1)
+        apply_async.reset_mock()
+
+        def fail(*args, **kwargs):
+            if post.call_count == 1:
+                BufferedWebhookEvent.objects.create(hook=self.hook, payload="{}")
+            raise requests.ConnectionError
+
+        post.side_effect = fail
+        deliver_webhook_batch_task.apply(args=[self.hook.id])
+
+        self.hook.refresh_from_db()
+        self.assertFalse(self.hook.enabled)
+        apply_async.assert_not_called()
+        self.assertEqual(BufferedWebhookEvent.objects.count(), 0)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    @mock.patch("meshapi_hooks.tasks.session.post", return_value=ok_response())
+    @mock.patch("meshapi_hooks.tasks.deliver_webhook_batch_task.apply_async")
+    def test_busy_target_is_retried_later(self, apply_async, post):
+        self.fire(1)
+        apply_async.reset_mock()
+
+        key = f"webhook:in_flight:{self.hook.target}"
+        cache.set(key, CelerySerializerHook.MAX_CONCURRENT_DELIVERIES_PER_TARGET)
+        deliver_webhook_batch_task.apply(args=[self.hook.id])
+
+        post.assert_not_called()
+        apply_async.assert_called_once()
+        self.assertEqual(cache.get(key), CelerySerializerHook.MAX_CONCURRENT_DELIVERIES_PER_TARGET)
+        self.assertEqual(BufferedWebhookEvent.objects.count(), 1)
+
+        cache.set(key, 0)
+        deliver_webhook_batch_task.apply(args=[self.hook.id])
+
+        post.assert_called_once()
+        self.assertEqual(cache.get(key), 0)
+        self.assertEqual(BufferedWebhookEvent.objects.count(), 0)
@@ -0,0 +1,160 @@
+import json
+import time
+from unittest import mock
+
+import requests
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from meshapi_hooks.circuit import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_OPEN_SECONDS,
+    CircuitState,
+    get_circuit_state,
+    open_circuit,
+    record_circuit_failure,
+)
+from meshapi_hooks.hooks import BufferedWebhookEvent, CelerySerializerHook
+from meshapi_hooks.tasks import deliver_webhook_task, replay_webhook_backlog_task
+
+TARGET = "http://localhost:8091/webhook"
+
+
+def ok_response():
+    response = requests.Response()
+    response.status_code = 200
+    return response
+
+
+def make_half_open(target):
+    cache.set(f"webhook:circuit:opened_at:{target}", time.time() - CIRCUIT_OPEN_SECONDS - 1, timeout=None)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+@mock.patch("meshapi_hooks.tasks.replay_webhook_backlog_task.apply_async")
+class TestWebhookCircuit(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username="hook_client_application", password="test_pw")
+        self.hook = CelerySerializerHook(user=user, target=TARGET, event="member.created")
+        self.hook.save()
+
+    def payload(self, index):
+        return self.hook.serialize_hook({"index": index})
+
+    def test_circuit_opens_after_repeated_failures(self, replay):
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD - 1):
+            record_circuit_failure(TARGET)
+        self.assertEqual(get_circuit_state(TARGET), CircuitState.CLOSED)
+
+        record_circuit_failure(TARGET)
+        self.assertEqual(get_circuit_state(TARGET), CircuitState.OPEN)
+
+        make_half_open(TARGET)
+        self.assertEqual(get_circuit_state(TARGET), CircuitState.HALF_OPEN)
+
+    @mock.patch("meshapi_hooks.tasks.session.post", return_value=ok_response())
+    def test_open_circuit_parks_events(self, post, replay):
+        open_circuit(TARGET)
+
+        deliver_webhook_task.apply(args=[self.hook.id, self.payload(0)])
+        deliver_webhook_task.apply(args=[self.hook.id, self.payload(1)])
+
+        post.assert_not_called()
+        self.assertEqual(BufferedWebhookEvent.objects.filter(hook=self.hook).count(), 2)
+        # Scheduled once, for when the circuit goes half-open
+        replay.assert_called_once()
+        self.assertGreater(replay.call_args.kwargs["countdown"], CIRCUIT_OPEN_SECONDS - 5)
+
+    @mock.patch("meshapi_hooks.tasks.session.post", side_effect=requests.ConnectionError)
+    @mock.patch("meshapi_hooks.circuit.CIRCUIT_FAILURE_THRESHOLD", 2)
+    def test_retries_stop_once_circuit_opens(self, post, replay):
+        deliver_webhook_task.apply(args=[self.hook.id, self.payload(0)])
+
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(get_circuit_state(TARGET), CircuitState.OPEN)
+        self.assertEqual(BufferedWebhookEvent.objects.filter(hook=self.hook).count(), 1)
+        replay.assert_called_once()
+
+    @mock.patch("meshapi_hooks.tasks.session.post", return_value=ok_response())
+    def test_successful_probe_replays_backlog_in_order(self, post, replay):
+        for i in range(3):
+            BufferedWebhookEvent.objects.create(hook=self.hook, payload=self.payload(i))
+        self.hook.consecutive_failures = 2
+        self.hook.save()
+        make_half_open(TARGET)
+
+        replay_webhook_backlog_task.apply(args=[self.hook.id])
+
+        self.assertEqual([json.loads(call.kwargs["data"])["data"]["index"] for call in post.call_args_list], [0, 1, 2])
+        self.assertEqual(get_circuit_state(TARGET), CircuitState.CLOSED)
+        self.assertEqual(BufferedWebhookEvent.objects.count(), 0)
+        self.hook.refresh_from_db()
+        self.assertEqual(self.hook.consecutive_failures, 0)
+        replay.assert_not_called()
+
+        # With the backlog gone, deliveries go straight through again
+        deliver_webhook_task.apply(args=[self.hook.id, self.payload(3)])
+        self.assertEqual(post.call_count, 4)
+
+    @mock.patch("meshapi_hooks.tasks.session.post", side_effect=requests.ConnectionError)
+    def test_failed_probe_reopens_circuit(self, post, replay):
+        for i in range(2):
+            BufferedWebhookEvent.objects.create(hook=self.hook, payload=self.payload(i))
+        make_half_open(TARGET)
+
+        replay_webhook_backlog_task.apply(args=[self.hook.id])
+
+        post.assert_called_once()
+        self.assertEqual(get_circuit_state(TARGET), CircuitState.OPEN)
+        self.assertEqual(BufferedWebhookEvent.objects.count(), 2)
+        # Ready for the next probe to send again
+        self.assertFalse(BufferedWebhookEvent.objects.filter(claimed_until__isnull=False).exists())
+        self.hook.refresh_from_db()
+        self.assertEqual(self.hook.consecutive_failures, 0)
+        replay.assert_called_once_with([self.hook.id], countdown=CIRCUIT_OPEN_SECONDS)
+
+    @mock.patch("meshapi_hooks.tasks.session.post")
+    def test_backlog_is_posted_outside_a_transaction(self, post, replay):
+        BufferedWebhookEvent.objects.create(hook=self.hook, payload=self.payload(0))
+        make_half_open(TARGET)
+        # The test itself runs inside a transaction, so look for one opened on top of it
+        savepoints_outside = len(connection.savepoint_ids)
+
+        def check(*args, **kwargs):
+            self.assertEqual(len(connection.savepoint_ids), savepoints_outside)
+            return ok_response()
+
+        post.side_effect = check
+        replay_webhook_backlog_task.apply(args=[self.hook.id])
+
+        post.assert_called_once()
+        self.assertEqual(BufferedWebhookEvent.objects.count(), 0)
+
+    @mock.patch("meshapi_hooks.tasks.session.post", side_effect=requests.ConnectionError)
+    def test_long_outage_does_not_disable_hook(self, post, replay):
+        BufferedWebhookEvent.objects.create(hook=self.hook, payload=self.payload(0))
+
+        for _ in range(CelerySerializerHook.MAX_CONSECUTIVE_FAILURES_BEFORE_DISABLE + 2):
+            make_half_open(TARGET)
+            replay_webhook_backlog_task.apply(args=[self.hook.id])
+
+        self.hook.refresh_from_db()
+        self.assertTrue(self.hook.enabled)
+        self.assertEqual(self.hook.consecutive_failures, 0)
+        self.assertEqual(BufferedWebhookEvent.objects.count(), 1)
+
+    @mock.patch("meshapi_hooks.tasks.session.post", return_value=ok_response())
+    def test_batched_backlog_is_replayed_as_one_array(self, post, replay):
+        self.hook.batch_window_seconds = 5
+        self.hook.save()
+        for i in range(3):
+            BufferedWebhookEvent.objects.create(hook=self.hook, payload=self.payload(i))
+        make_half_open(TARGET)
+
+        replay_webhook_backlog_task.apply(args=[self.hook.id])
+
+        post.assert_called_once()
+        self.assertEqual([event["data"]["index"] for event in json.loads(post.call_args.kwargs["data"])], [0, 1, 2])
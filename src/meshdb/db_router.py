@@ -0,0 +1,157 @@
+"""
+Routing of read-only traffic to a streaming replica of the primary database.
+
+Nothing is sent to the replica unless a view opts in with the read_from_replica decorator, and even then only
+for GET/HEAD/OPTIONS requests. Before a request is routed to the replica we check (at most once every
+DB_REPLICA_LAG_CHECK_INTERVAL seconds per process) that it is reachable and no more than DB_REPLICA_MAX_LAG
+seconds behind the primary, otherwise the request is served from the primary as before.
+
+So that someone who has just made a change doesn't immediately see a stale copy of it, any request that writes
+to the primary sets a short-lived cookie (see ReplicaStickinessMiddleware), and requests carrying that cookie
+are never routed to the replica. API clients which don't keep cookies are only protected by the lag check
+
+If no replica is configured (DB_REPLICA_HOST unset) all of this is a no-op
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional, Tuple, Type
+
+from datadog import statsd
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Model
+from django.http import HttpRequest, HttpResponse
+
+REPLICA_DB_ALIAS = "replica"
+READ_FROM_PRIMARY_COOKIE = "meshdb_read_from_primary"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# On a replica which has replayed everything it has received, pg_last_xact_replay_timestamp() is the time
+# of the last write to the primary, which can be hours ago on a quiet night, so we only look at it while
+# there is WAL still waiting to be replayed. On the primary (e.g. in dev, where the replica points at the
+# primary), pg_is_in_recovery() is false and the lag is always zero
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+_reading_from_replica: ContextVar[bool] = ContextVar("reading_from_replica", default=False)
+_wrote_to_primary: ContextVar[bool] = ContextVar("wrote_to_primary", default=False)
+
+# (time.monotonic() of the last check, whether the replica was usable at that time)
+_replica_status: Optional[Tuple[float, bool]] = None
+
+
+def replica_configured() -> bool:
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def get_replica_lag(connection: BaseDatabaseWrapper) -> float:
+    """
+    Returns how far behind the primary the given database is, in seconds
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(REPLICA_LAG_QUERY)
+        return float(cursor.fetchone()[0])
+
+
+def replica_usable() -> bool:
+    """
+    Returns True if the replica is configured, reachable, and not lagging too far behind the primary.
+    The result is cached for DB_REPLICA_LAG_CHECK_INTERVAL seconds so that we aren't adding a query to
+    every request
+    """
+    global _replica_status
+    if not replica_configured():
+        return False
+
+    now = time.monotonic()
+    if _replica_status is not None and now - _replica_status[0] < settings.DB_REPLICA_LAG_CHECK_INTERVAL:
+        return _replica_status[1]
+
+    usable = False
+    try:
+        lag = get_replica_lag(connections[REPLICA_DB_ALIAS])
+    except DatabaseError:
+        logging.exception("Could not reach the database replica, falling back to the primary")
+    else:
+        statsd.gauge("meshdb.db.replica.lag", lag)
+        usable = lag <= settings.DB_REPLICA_MAX_LAG
+        if not usable:
+            logging.warning(f"Database replica is {lag:.1f}s behind the primary, falling back to the primary")
+
+    _replica_status = (now, usable)
+    return usable
+
+
+def read_from_replica(view: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+    """
+    View decorator which sends the database reads made by the view to the replica, where it is safe to do so.
+    Only use this on views that never write to the database. For class based views, decorate dispatch()
+    with method_decorator(read_from_replica, name="dispatch")
+    """
+
+    @wraps(view)
+    def inner(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        if request.method not in SAFE_METHODS or not replica_configured():
+            return view(request, *args, **kwargs)
+
+        if READ_FROM_PRIMARY_COOKIE in request.COOKIES:
+            statsd.increment("meshdb.db.replica.request", tags=["database:primary", "reason:recent_write"])
+            return view(request, *args, **kwargs)
+
+        if not replica_usable():
+            statsd.increment("meshdb.db.replica.request", tags=["database:primary", "reason:unavailable"])
+            return view(request, *args, **kwargs)
+
+        statsd.increment("meshdb.db.replica.request", tags=["database:replica"])
+        token = _reading_from_replica.set(True)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _reading_from_replica.reset(token)
+
+    return inner
+
+
+@contextmanager
+def track_primary_writes() -> Iterator[Callable[[], bool]]:
+    """
+    Yields a function which returns whether anything has been written to the primary since the block began
+    """
+    token = _wrote_to_primary.set(False)
+    try:
+        yield _wrote_to_primary.get
+    finally:
+        _wrote_to_primary.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model: Type[Model], **hints: Any) -> Optional[str]:
+        if _reading_from_replica.get():
+            return REPLICA_DB_ALIAS
+        return None
+
+    def db_for_write(self, model: Type[Model], **hints: Any) -> Optional[str]:
+        _wrote_to_primary.set(True)
+
+        # Always explicit, otherwise Django would write an object loaded from the replica back to the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints: Any) -> Optional[bool]:
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, model_name: Optional[str] = None, **hints: Any) -> Optional[bool]:
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
@@ -57,6 +57,9 @@ FLAGS: Dict[str, Any] = {
     "TASK_ENABLED_RESET_DEV_DATABASE": [],
     "TASK_ENABLED_UPDATE_PANORAMAS": [],
     "TASK_ENABLED_SYNC_WITH_UISP": [],
+    "TASK_ENABLED_BUILD_MAP_ARTIFACTS": [],
+    "TASK_ENABLED_SYNC_JOIN_RECORDS": [],
+    "TASK_ENABLED_REFRESH_LINKNYC_KIOSKS": [],
 }
 
 USE_X_FORWARDED_HOST = True
@@ -231,6 +234,7 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "meshweb.middleware.MaintenanceModeMiddleware",
     "simple_history.middleware.HistoryRequestMiddleware",
+    "meshweb.middleware.ReplicaStickinessMiddleware",
 ]
 
 
@@ -268,7 +272,15 @@ WSGI_APPLICATION = "meshdb.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
+# Persistent connections. Each gunicorn worker and Celery worker process keeps its connection to each
+# database open for up to CONN_MAX_AGE seconds, rather than paying for a new TCP + TLS + auth handshake on
+# every request or task. With CONN_HEALTH_CHECKS, a connection that was dropped while idle (e.g. by a
+# database restart) is replaced before it is reused, rather than failing the next request. Celery's Django
+# fixup honours both of these between tasks. Set DB_CONN_MAX_AGE=0 to go back to a connection per request
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", 600))
+DB_CONN_HEALTH_CHECKS = os.environ.get("DB_CONN_HEALTH_CHECKS", "True") == "True"
+
+DATABASES: Dict[str, Dict[str, Any]] = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
         "NAME": os.environ.get("DB_NAME"),
@@ -276,6 +288,8 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASSWORD"),
         "HOST": os.environ.get("DB_HOST", "localhost"),
         "PORT": os.environ.get("DB_PORT", 5432),
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
     },
     "readonly": {
         "ENGINE": "django.db.backends.postgresql",
@@ -284,9 +298,44 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASSWORD_RO"),
         "HOST": os.environ.get("DB_HOST", "localhost"),
         "PORT": os.environ.get("DB_PORT", 5432),
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE_RO", DB_CONN_MAX_AGE)),
+        "CONN_HEALTH_CHECKS": os.environ.get("DB_CONN_HEALTH_CHECKS_RO", str(DB_CONN_HEALTH_CHECKS)) == "True",
     },
 }
 
+# Streaming replica of the default database, used for read-only public views that opt in with
+# meshdb.db_router.read_from_replica. It has the same users as the primary, so only the host differs
+DB_REPLICA_HOST = os.environ.get("DB_REPLICA_HOST")
+if DB_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": DB_REPLICA_HOST,
+        "PORT": os.environ.get("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["meshdb.db_router.ReplicaRouter"]
+
+# Requests fall back to the primary if the replica is more than this many seconds behind it
+DB_REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", 10))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get("DB_REPLICA_LAG_CHECK_INTERVAL", 5))
+
+# How long after a write the writer's own requests keep reading from the primary
+DB_REPLICA_STICKY_SECONDS = int(os.environ.get("DB_REPLICA_STICKY_SECONDS", 30))
+
+# Cache shared by every web worker, used for response caching (see meshapi.util.response_cache). This is
+# the same Redis as the Celery broker, on a different DB number by default
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/1"),
+        "KEY_PREFIX": "meshdb",
+    }
+}
+
+# Runs the tests without a shared cache, see meshdb.test_runner
+TEST_RUNNER = "meshdb.test_runner.MeshDBTestRunner"
+
 # django-dbbackup
 # https://django-dbbackup.readthedocs.io/en/master/installation.html
 local_backup_file = os.environ.get("LOCALBACKUP_FILE")
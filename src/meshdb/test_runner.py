@@ -0,0 +1,20 @@
+from typing import Any
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+# The test database is rolled back between tests without sending any signals, so anything kept in a shared
+# cache (responses, geocoder results, versions of process-local copies) would leak from one test, and one
+# test run, to the next. Tests which exercise caching override this again with a local memory cache
+TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+class MeshDBTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs: Any) -> None:
+        super().setup_test_environment(**kwargs)
+        self.cache_override = override_settings(CACHES=TEST_CACHES)
+        self.cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs: Any) -> None:
+        self.cache_override.disable()
+        super().teardown_test_environment(**kwargs)
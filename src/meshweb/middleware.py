@@ -1,9 +1,12 @@
 from typing import Callable
 
+from django.conf import settings
 from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
 from django.urls import reverse
 from flags.state import flag_enabled
 
+from meshdb.db_router import READ_FROM_PRIMARY_COOKIE, replica_configured, track_primary_writes
+
 
 class MaintenanceModeMiddleware:
     def __init__(self, get_response: Callable) -> None:
@@ -23,3 +26,29 @@ class MaintenanceModeMiddleware:
         response = self.get_response(request)
 
         return response
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Sets a short-lived cookie on the response to any request which wrote to the primary database, so that
+    the views using meshdb.db_router.read_from_replica don't show that user a copy of the data from before
+    their change while the replica catches up
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with track_primary_writes() as wrote_to_primary:
+            response = self.get_response(request)
+
+            if wrote_to_primary() and replica_configured():
+                response.set_cookie(
+                    READ_FROM_PRIMARY_COOKIE,
+                    "1",
+                    max_age=settings.DB_REPLICA_STICKY_SECONDS,
+                    httponly=True,
+                    samesite="Lax",
+                )
+
+        return response
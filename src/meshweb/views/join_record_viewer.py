@@ -3,11 +3,20 @@ from datetime import datetime, timezone
 
 from botocore.exceptions import ClientError
 from django.contrib.admin.views.decorators import staff_member_required
+from django.core.paginator import Paginator
 from django.http import HttpRequest, HttpResponse
 from django.template import loader
 
 from meshapi.management.commands import replay_join_records
-from meshapi.util.join_records import JoinRecordProcessor
+from meshapi.util.join_records import (
+    JoinRecordProcessor,
+    entry_to_join_record,
+    exclude_irrelevant_records,
+    get_consistent_join_records,
+    index_is_fresh,
+)
+
+JOIN_RECORD_VIEWER_PAGE_SIZE = 100
 
 
 @staff_member_required
@@ -31,22 +40,31 @@ def join_record_viewer(request: HttpRequest) -> HttpResponse:
         return HttpResponse(m, status=status)
 
     all = request.GET.get("all") == "True"
+    refresh = request.GET.get("refresh") == "True"
 
     template = loader.get_template("meshweb/join_record_viewer.html")
 
-    try:
-        records = JoinRecordProcessor().ensure_pre_post_consistency(since)
-    except ClientError:
-        status = 503
-        m = f"({status}) Could not retrieve join records. Check bucket credentials."
-        logging.exception(m)
-        return HttpResponse(m, status=status)
+    # The records are normally synced from S3 in the background (see meshapi.tasks). We sync them here if that
+    # hasn't happened recently for the period we're showing, or when something has just been submitted
+    if refresh or not index_is_fresh(since):
+        try:
+            JoinRecordProcessor().sync_index(since)
+        except ClientError:
+            status = 503
+            m = f"({status}) Could not retrieve join records. Check bucket credentials."
+            logging.exception(m)
+            return HttpResponse(m, status=status)
 
-    relevant_records = (
-        [r for _, r in records.items() if not replay_join_records.Command.filter_irrelevant_record(r)]
-        if not all
-        else records.values()
-    )
+    entries = get_consistent_join_records(since)
+    if not all:
+        entries = exclude_irrelevant_records(entries)
+    page = Paginator(entries, JOIN_RECORD_VIEWER_PAGE_SIZE).get_page(request.GET.get("page"))
 
-    context = {"records": relevant_records, "all": all, "logo": "meshweb/logo.svg"}
+    context = {
+        "records": [entry_to_join_record(entry) for entry in page],
+        "page": page,
+        "since": since_param or "",
+        "all": all,
+        "logo": "meshweb/logo.svg",
+    }
     return HttpResponse(template.render(context, request))
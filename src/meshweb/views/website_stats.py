@@ -15,6 +15,8 @@ from django.urls import reverse
 from matplotlib import ticker
 
 from meshapi.models import Install
+from meshapi.util.response_cache import WEBSITE_STATS_POLICY, cache_response
+from meshdb.db_router import read_from_replica
 
 # Make the SVG output include text instead of strokes
 plt.rcParams["svg.fonttype"] = "none"
@@ -248,6 +250,8 @@ def parse_stats_request_params(request: HttpRequest) -> Tuple[str, datetime, dat
     return data_source, start_datetime, end_datetime
 
 
+@cache_response(WEBSITE_STATS_POLICY)
+@read_from_replica
 def website_stats_graph(request: HttpRequest) -> HttpResponse:
     """
     Renders an SVG graph for embedding on the website, showing install growth over time
@@ -275,6 +279,8 @@ def website_stats_graph(request: HttpRequest) -> HttpResponse:
         )
 
 
+@cache_response(WEBSITE_STATS_POLICY)
+@read_from_replica
 def website_stats_json(request: HttpRequest) -> HttpResponse:
     """
     Renders an JSON response containing the information in the stats graphs rendered above,